@@ -8,6 +8,7 @@ import sys
 import os
 import subprocess
 import importlib
+import multiprocessing
 
 def check_dependencies():
     """Verifica se todas as dependências necessárias estão instaladas."""
@@ -77,4 +78,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Necessário no executável do Windows: a análise paralela inicia processos
+    multiprocessing.freeze_support()
     main()
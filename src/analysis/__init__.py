@@ -7,6 +7,9 @@ Este módulo contém as funcionalidades avançadas de análise de telemetria que
 # Módulos disponíveis
 __all__ = [
     'track_detection',
-    'advanced_telemetry'
+    'advanced_telemetry',
+    'parallel_analysis',
+    'analysis_cache',
+    'distance_resampling'
 ]
 
@@ -0,0 +1,240 @@
+"""
+Cache em disco de arquivos parseados e resultados de análise.
+
+Reabrir o mesmo arquivo de telemetria não deve parsear nem analisar tudo de
+novo. Cada entrada é identificada pelo hash do conteúdo do arquivo, pela
+versão do analisador e pelos parâmetros usados, então um arquivo alterado,
+uma mudança nas análises ou outros parâmetros geram uma chave nova.
+
+Cada entrada tem dois arquivos, no mesmo esquema de ``session_store``:
+
+- ``<chave>.pkl``: o objeto serializado com pickle (protocolo 5), sem os
+  dados dos arrays;
+- ``<chave>.dat``: os buffers dos arrays numpy (inclusive os blocos dos
+  DataFrames) gravados fora do pickle, alinhados em 64 bytes.
+
+Ao carregar, o ``.dat`` é mapeado em memória (cópia na escrita) e os arrays
+são visões sobre o mapeamento, então um acerto custa só a leitura do pickle.
+O cache é limitado por tamanho e as entradas menos usadas recentemente (pela
+data de modificação, atualizada a cada acerto) são removidas primeiro.
+
+O cache só deve ser lido de um diretório do próprio usuário: carregar um
+pickle executa código.
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.data_capture.session_store import ALIGNMENT, DATA_SUFFIX
+
+logger = logging.getLogger("race_telemetry_api.analysis_cache")
+
+# Incrementar sempre que parsers ou análises mudarem o resultado
+ANALYZER_VERSION = 1
+
+CACHE_FORMAT = "rta-cache"
+CACHE_DIR = os.path.join(os.path.expanduser("~"), "RaceTelemetryAnalyzer", "cache")
+DEFAULT_MAX_BYTES = 1024 ** 3
+ENTRY_SUFFIX = ".pkl"
+
+_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(filepath: str) -> str:
+    """Hash SHA-256 do conteúdo de um arquivo, lido em blocos."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Cache LRU em disco, com chave por conteúdo."""
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root or CACHE_DIR
+        self.max_bytes = max_bytes
+        # Hash já calculado por (caminho, tamanho, mtime), para não reler o arquivo
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    def digest(self, filepath: str) -> str:
+        """Hash do conteúdo do arquivo, reaproveitado enquanto ele não muda."""
+        stat = os.stat(filepath)
+        memo_key = (os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            digest = self._digests[memo_key] = file_digest(filepath)
+        return digest
+
+    def make_key(self, digest: str, kind: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Chave de uma entrada.
+
+        Args:
+            digest: Hash do conteúdo do arquivo de origem
+            kind: Tipo do resultado (ex.: "parse", "analysis")
+            params: Parâmetros que alteram o resultado (serializáveis em JSON)
+        """
+        identity = json.dumps([digest, kind, ANALYZER_VERSION, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.root, key)
+        return base + ENTRY_SUFFIX, base + DATA_SUFFIX
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retorna o valor da entrada ou None se ela não existir (ou estiver corrompida)."""
+        entry_path, data_path = self._paths(key)
+        try:
+            with open(entry_path, "rb") as f:
+                entry = pickle.load(f)
+            if entry.get("format") != CACHE_FORMAT:
+                raise ValueError("formato desconhecido")
+
+            spans = entry["buffers"]
+            if spans:
+                raw = np.memmap(data_path, dtype=np.uint8, mode="c")
+                buffers = [raw[offset:offset + nbytes] for (offset, nbytes) in spans]
+            else:
+                buffers = []
+            value = pickle.loads(entry["payload"], buffers=buffers)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Entrada de cache {key} inválida, removendo: {e}")
+            self._remove(key)
+            return None
+
+        # Marca a entrada como usada recentemente
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Grava uma entrada e remove as menos usadas se o limite for excedido."""
+        entry_path, data_path = self._paths(key)
+        buffers = []
+        try:
+            payload = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+        except Exception as e:
+            logger.warning(f"Valor não pode ser gravado no cache: {e}")
+            return
+
+        spans = []
+        offset = 0
+        tmp_data = data_path + ".tmp"
+        tmp_entry = entry_path + ".tmp"
+        try:
+            with open(tmp_data, "wb") as data_file:
+                for buffer in buffers:
+                    raw = buffer.raw()
+                    padding = -offset % ALIGNMENT
+                    if padding:
+                        data_file.write(b"\0" * padding)
+                        offset += padding
+                    data_file.write(raw)
+                    spans.append((offset, raw.nbytes))
+                    offset += raw.nbytes
+            with open(tmp_entry, "wb") as entry_file:
+                pickle.dump({"format": CACHE_FORMAT, "buffers": spans, "payload": payload},
+                            entry_file, protocol=5)
+            # O .pkl é o último a aparecer: entrada visível é entrada completa
+            os.replace(tmp_data, data_path)
+            os.replace(tmp_entry, entry_path)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar a entrada de cache {key}: {e}")
+            for path in (tmp_data, tmp_entry):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+
+        self.evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Retorna o valor em cache ou calcula, grava e retorna."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def load_file(self, filepath: str, parser: Callable[[str], Any],
+                  params: Optional[Dict[str, Any]] = None) -> Tuple[Any, str]:
+        """
+        Parseia um arquivo usando o cache.
+
+        Args:
+            filepath: Arquivo de telemetria
+            parser: Função que recebe o caminho e retorna os dados parseados
+            params: Parâmetros do parser que alteram o resultado
+
+        Returns:
+            Tupla (dados parseados, hash do conteúdo do arquivo)
+        """
+        digest = self.digest(filepath)
+        key = self.make_key(digest, "parse", params)
+        data = self.get(key)
+        if data is None:
+            data = parser(filepath)
+            self.put(key, data)
+        else:
+            logger.info(f"Arquivo carregado do cache: {os.path.basename(filepath)}")
+        return data, digest
+
+    def _entries(self):
+        """Lista (mtime, tamanho, chave) de cada entrada."""
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(ENTRY_SUFFIX):
+                continue
+            key = name[:-len(ENTRY_SUFFIX)]
+            entry_path, data_path = self._paths(key)
+            try:
+                stat = os.stat(entry_path)
+                size = stat.st_size + (os.path.getsize(data_path) if os.path.exists(data_path) else 0)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, size, key))
+        return entries
+
+    def size(self) -> int:
+        """Tamanho total das entradas em bytes."""
+        return sum(size for (_, size, _) in self._entries())
+
+    def evict(self) -> None:
+        """Remove as entradas menos usadas até o cache caber em ``max_bytes``."""
+        entries = sorted(self._entries())
+        total = sum(size for (_, size, _) in entries)
+        for (_, size, key) in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(key):
+                total -= size
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        for (_, _, key) in self._entries():
+            self._remove(key)
+
+    def _remove(self, key: str) -> bool:
+        removed = True
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # No Windows um .dat ainda mapeado não pode ser removido
+                logger.debug(f"Não foi possível remover {path}: {e}")
+                removed = False
+        return removed
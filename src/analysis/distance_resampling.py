@@ -0,0 +1,224 @@
+"""
+Reamostragem de voltas no domínio da distância.
+
+Comparação de voltas e traços de delta precisam das voltas alinhadas pela
+posição na pista. Cada volta é convertida uma única vez para uma grade fixa
+de distância (1 m por padrão) com ``np.interp`` sobre a distância monotônica
+da volta; a grade fica em cache e todos os consumidores leem os mesmos
+arrays.
+
+A distância vem do canal ``distance`` (relativa ao início da volta); sem
+ele, é integrada da velocidade no tempo ou, por fim, do traçado (posx, posy).
+Canais discretos (marcha, setor...) mantêm o último valor em vez de
+interpolar.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.parsers.channel_registry import resolve_channels, resolve_data_points
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STEP = 1.0
+
+# Canais amostrados pelo último valor, sem interpolação
+DISCRETE_CHANNELS = frozenset({"gear", "lap", "sector", "beacon"})
+
+# Grades guardadas em cache (uma por volta e resolução)
+GRID_CACHE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class DistanceGrid:
+    """
+    Volta reamostrada numa grade de distância.
+
+    Attributes:
+        distance: Distância de cada ponto da grade (m), de 0 a ``length``
+        columns: Canais canônicos na grade; ``time`` começa em 0
+        step: Espaçamento da grade (m)
+        length: Distância total da volta (m)
+    """
+    distance: np.ndarray
+    columns: Dict[str, np.ndarray]
+    step: float
+    length: float
+
+    def __getitem__(self, channel_id: str) -> np.ndarray:
+        return self.columns[channel_id]
+
+    def __len__(self) -> int:
+        return len(self.distance)
+
+    def has(self, channel_id: str) -> bool:
+        return channel_id in self.columns
+
+    def value_at(self, channel_id: str, distance) -> np.ndarray:
+        """Valor do canal em distâncias arbitrárias (NaN fora da volta)."""
+        return np.interp(distance, self.distance, self.columns[channel_id], left=np.nan, right=np.nan)
+
+    def distance_at_time(self, elapsed) -> np.ndarray:
+        """Distância percorrida após ``elapsed`` segundos de volta."""
+        return np.interp(elapsed, self.columns["time"], self.distance)
+
+
+def _lap_source(lap: Dict[str, Any]) -> Any:
+    """Objeto com as amostras da volta (colunas ou pontos)."""
+    columns = lap.get("columns")
+    if columns is not None:
+        return columns
+    data_points = lap.get("data_points")
+    if isinstance(data_points, (int, float)) or data_points is None:
+        # Voltas só com o intervalo de índices (parser LD) não têm amostras
+        return None
+    return data_points
+
+
+def _extract(source: Any) -> Dict[str, np.ndarray]:
+    if isinstance(source, dict):
+        # Colunas de captura ao vivo: x, y, z juntos em "position"
+        columns = {name: values for (name, values) in source.items() if np.ndim(values) == 1}
+        position = source.get("position")
+        if position is not None and np.ndim(position) == 2:
+            for (i, name) in enumerate(("posx", "posy", "posz")[:np.shape(position)[1]]):
+                columns.setdefault(name, np.asarray(position)[:, i])
+        return resolve_channels(columns.keys()).columns(columns)
+    return resolve_data_points(source).extract(source)
+
+
+def _lap_distance(columns: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+    """Distância desde o início da volta, por amostra."""
+    distance = columns.get("distance")
+    if distance is not None:
+        finite = np.flatnonzero(np.isfinite(distance))
+        if len(finite) > 1:
+            # A distância pode ser acumulada na sessão
+            return distance - distance[finite[0]]
+
+    speed = columns.get("speed")
+    elapsed = columns.get("time")
+    if speed is not None and elapsed is not None and len(speed) > 1:
+        # km/h integrado no tempo (trapézios)
+        steps = np.diff(elapsed) * (speed[1:] + speed[:-1]) / 2 / 3.6
+        return np.concatenate(([0.0], np.cumsum(np.nan_to_num(steps, nan=0.0))))
+
+    x = columns.get("posx")
+    y = columns.get("posy")
+    if x is not None and y is not None and len(x) > 1:
+        steps = np.hypot(np.diff(x), np.diff(y))
+        return np.concatenate(([0.0], np.cumsum(np.nan_to_num(steps, nan=0.0))))
+    return None
+
+
+def resample_columns(columns: Dict[str, np.ndarray], step: float = DEFAULT_STEP) -> Optional[DistanceGrid]:
+    """
+    Reamostra colunas canônicas de uma volta numa grade de distância.
+
+    Returns:
+        A grade, ou None se a volta não tem distância utilizável
+    """
+    distance = _lap_distance(columns)
+    if distance is None:
+        return None
+
+    valid = np.isfinite(distance)
+    distance = distance[valid]
+    if len(distance) < 2:
+        return None
+    # Distância monotônica; amostras paradas (mesma distância) ficam só com a primeira
+    distance = np.maximum.accumulate(distance)
+    keep = np.concatenate(([True], np.diff(distance) > 0))
+    distance = distance[keep]
+    if len(distance) < 2:
+        return None
+
+    length = float(distance[-1])
+    grid = np.arange(int(length / step) + 1) * step
+    # Índice da última amostra em cada ponto da grade, para os canais discretos
+    held = np.searchsorted(distance, grid, side="right") - 1
+
+    resampled = {}
+    for (channel_id, values) in columns.items():
+        if channel_id == "distance":
+            continue
+        values = np.asarray(values, dtype=np.float64)[valid][keep]
+        finite = np.isfinite(values)
+        if not finite.any():
+            continue
+        if channel_id in DISCRETE_CHANNELS:
+            resampled[channel_id] = values[held]
+        elif finite.all():
+            resampled[channel_id] = np.interp(grid, distance, values)
+        else:
+            resampled[channel_id] = np.interp(grid, distance[finite], values[finite])
+
+    if "time" in resampled:
+        resampled["time"] = resampled["time"] - resampled["time"][0]
+    return DistanceGrid(grid, resampled, step, length)
+
+
+def resample_lap(lap: Dict[str, Any], step: float = DEFAULT_STEP) -> Optional[DistanceGrid]:
+    """Reamostra uma volta (sem cache); veja ``lap_grid``."""
+    source = _lap_source(lap)
+    if source is None or not len(source):
+        return None
+    return resample_columns(_extract(source), step)
+
+
+_grid_cache: "OrderedDict[Tuple[int, float], Tuple[Any, Optional[DistanceGrid]]]" = OrderedDict()
+_grid_lock = threading.Lock()
+
+
+def lap_grid(lap: Dict[str, Any], step: float = DEFAULT_STEP) -> Optional[DistanceGrid]:
+    """
+    Grade de distância da volta, calculada uma vez e reaproveitada.
+
+    O cache é indexado pelo objeto com as amostras da volta (as colunas ou
+    os pontos), que é mantido vivo pela entrada; as voltas finalizadas não
+    mudam, então a grade não precisa ser invalidada.
+    """
+    source = _lap_source(lap)
+    if source is None:
+        return None
+    key = (id(source), float(step))
+    with _grid_lock:
+        entry = _grid_cache.get(key)
+        if entry is not None and entry[0] is source:
+            _grid_cache.move_to_end(key)
+            return entry[1]
+
+    grid = resample_lap(lap, step)
+    with _grid_lock:
+        _grid_cache[key] = (source, grid)
+        _grid_cache.move_to_end(key)
+        while len(_grid_cache) > GRID_CACHE_SIZE:
+            _grid_cache.popitem(last=False)
+    return grid
+
+
+def clear_grid_cache():
+    """Descarta as grades em cache."""
+    with _grid_lock:
+        _grid_cache.clear()
+
+
+def delta_trace(reference: DistanceGrid, comparison: DistanceGrid) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Delta de tempo ao longo da volta (positivo: comparação mais lenta).
+
+    As duas grades usam a mesma resolução, então os pontos correspondem
+    índice a índice até a menor das duas distâncias.
+
+    Returns:
+        Tupla (distância, delta)
+    """
+    if reference.step != comparison.step:
+        raise ValueError("As grades devem ter o mesmo espaçamento")
+    n = min(len(reference), len(comparison))
+    return reference.distance[:n], comparison["time"][:n] - reference["time"][:n]
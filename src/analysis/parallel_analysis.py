@@ -0,0 +1,110 @@
+"""
+Análise de voltas em paralelo.
+
+A análise de cada volta é independente, então as voltas são distribuídas
+num ProcessPoolExecutor. As colunas de todas as voltas são copiadas uma vez
+para um bloco de memória compartilhada (um canal por linha, voltas em
+sequência); cada processo se conecta ao bloco ao iniciar e lê a sua volta
+como visão, sem serializar listas de dicionários. Só o intervalo de índices
+da volta vai para o processo e só o dicionário de resultado volta.
+Os resultados são devolvidos na ordem das voltas.
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.analysis.advanced_telemetry import ANALYZER_CHANNELS, AdvancedTelemetryAnalyzer, LapChannels
+
+logger = logging.getLogger(__name__)
+
+# Abaixo disso o custo de iniciar os processos supera o ganho
+PARALLEL_MIN_LAPS = 4
+
+# Estado de cada processo do pool (bloco compartilhado e analisador)
+_worker_block = None
+_worker_columns = None
+_worker_analyzer = None
+
+
+def _attach_shared_block(name: str, shape: tuple):
+    """Inicializador do processo: conecta ao bloco de colunas compartilhado."""
+    global _worker_block, _worker_columns, _worker_analyzer
+    _worker_block = shared_memory.SharedMemory(name=name)
+    _worker_columns = np.ndarray(shape, dtype=np.float64, buffer=_worker_block.buf)
+    _worker_analyzer = AdvancedTelemetryAnalyzer()
+
+
+def _analyze_shared_lap(index: int, start: int, stop: int, present: frozenset,
+                        lap_info: Dict[str, Any]) -> tuple:
+    """Analisa uma volta lendo as colunas do bloco compartilhado."""
+    columns = {channel_id: _worker_columns[row, start:stop] for (row, channel_id) in enumerate(ANALYZER_CHANNELS)}
+    channels = LapChannels.from_columns(columns, present)
+    return index, _worker_analyzer._analyze_single_lap(lap_info, index + 1, channels=channels)
+
+
+def analyze_laps_parallel(laps: Sequence[Dict[str, Any]], lap_channels: Sequence[LapChannels],
+                          max_workers: Optional[int] = None,
+                          progress_callback: Optional[Callable[[int, int], None]] = None,
+                          cancelled: Optional[Callable[[], bool]] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Analisa as voltas num pool de processos.
+
+    Args:
+        laps: Voltas da sessão (usadas só pelos campos como lap_time)
+        lap_channels: Arrays de cada volta, na mesma ordem
+        max_workers: Número de processos (padrão: núcleos disponíveis)
+        progress_callback: Chamado com (voltas concluídas, total) a cada volta
+        cancelled: Quando retorna True, as voltas ainda não iniciadas são canceladas
+
+    Returns:
+        Análise de cada volta na ordem das voltas (None para voltas canceladas)
+    """
+    total = len(laps)
+    results = [None] * total
+    if total == 0:
+        return results
+
+    lengths = [len(channels) for channels in lap_channels]
+    offsets = np.concatenate(([0], np.cumsum(lengths))).astype(int)
+    shape = (len(ANALYZER_CHANNELS), max(int(offsets[-1]), 1))
+
+    block = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+    try:
+        shared = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        for (channels, start, stop) in zip(lap_channels, offsets[:-1], offsets[1:]):
+            for (row, channel_id) in enumerate(ANALYZER_CHANNELS):
+                shared[row, start:stop] = channels[channel_id]
+        del shared
+
+        workers = min(max_workers or os.cpu_count() or 1, total)
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared_block,
+                                 initargs=(block.name, shape)) as executor:
+            futures = []
+            for (i, lap) in enumerate(laps):
+                # Só os campos escalares da volta vão para o processo
+                lap_info = {key: value for (key, value) in lap.items() if key not in ('data_points', 'columns')}
+                futures.append(executor.submit(_analyze_shared_lap, i, int(offsets[i]), int(offsets[i + 1]),
+                                               lap_channels[i].present, lap_info))
+
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                index, analysis = future.result()
+                results[index] = analysis
+                done += 1
+                if progress_callback:
+                    progress_callback(done, total)
+                if cancelled and cancelled():
+                    for pending in futures:
+                        pending.cancel()
+    finally:
+        block.close()
+        block.unlink()
+
+    return results
@@ -12,6 +12,8 @@ from scipy.interpolate import interp1d, splprep, splev
 from scipy.signal import savgol_filter
 import logging
 
+from src.parsers.channel_registry import resolve_data_points
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -175,23 +177,14 @@ class TrackDetector:
         if not data_points:
             return coordinates
         
-        # Procura por campos de coordenadas
-        coordinate_fields = [
-            ('POS_X', 'POS_Y'),
-            ('X', 'Y'),
-            ('GPS_LAT', 'GPS_LONG'),
-            ('LAT', 'LONG'),
-            ('LATITUDE', 'LONGITUDE')
-        ]
-        
-        for x_field, y_field in coordinate_fields:
-            if x_field in data_points[0] and y_field in data_points[0]:
-                for point in data_points:
-                    x = point.get(x_field)
-                    y = point.get(y_field)
-                    
-                    if x is not None and y is not None:
-                        coordinates.append((float(x), float(y)))
+        # Procura por campos de coordenadas (nomes resolvidos pelo registro de canais)
+        channel_map = resolve_data_points(data_points)
+        for x_id, y_id in (('posx', 'posy'), ('lat', 'long')):
+            if x_id in channel_map and y_id in channel_map:
+                columns = channel_map.extract(data_points, (x_id, y_id))
+                xy = np.column_stack((columns[x_id], columns[y_id]))
+                xy = xy[~np.isnan(xy).any(axis=1)]
+                coordinates = [(float(x), float(y)) for x, y in xy]
                 
                 if coordinates:
                     break
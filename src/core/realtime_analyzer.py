@@ -6,21 +6,32 @@ Provides threaded analysis of telemetry data with feedback generation.
 import logging
 import time
 from typing import Dict, Any, Optional, List
+import numpy as np
 from PyQt6.QtCore import QObject, QThread, pyqtSignal
 
+from src.analysis.advanced_telemetry import AdvancedTelemetryAnalyzer, LapChannels
+from src.analysis.analysis_cache import AnalysisCache
+
 logger = logging.getLogger(__name__)
 
 class RealTimeAnalyzerWorker(QObject):
-    """Worker object to perform analysis in a separate thread."""
+    """Worker object that analyzes a fully loaded session in a separate thread.
+
+    Live sessions are analyzed sample by sample by
+    ``src.realtime.stream_analyzer.StreamingLapAnalyzer`` instead.
+    """
     finished = pyqtSignal()
     error = pyqtSignal(str)
     feedback_detected = pyqtSignal(str)  # Signal for feedback messages
     progress_update = pyqtSignal(int, int)  # Current step, total steps
     analysis_results_ready = pyqtSignal(dict)  # Novo sinal para resultados da análise abrangente
 
-    def __init__(self, telemetry_data: Dict[str, Any]):
+    def __init__(self, telemetry_data: Dict[str, Any], cache: Optional[AnalysisCache] = None,
+                 cache_key: Optional[str] = None):
         super().__init__()
         self.telemetry_data = telemetry_data
+        self.cache = cache
+        self.cache_key = cache_key
         self._running = False
         self._paused = False
 
@@ -45,21 +56,19 @@ class RealTimeAnalyzerWorker(QObject):
                 return
                 
             total_laps = len(laps)
+            if self._emit_cached_results(total_laps):
+                return
             logger.info(f"📊 Analisando {total_laps} voltas...")
             
-            # Log detalhes de cada volta
-            for i, lap in enumerate(laps):
-                logger.info(f"🏁 Volta {i+1}:")
-                logger.info(f"   Número da volta: {lap.get('lap_number', 'N/A')}")
-                logger.info(f"   Tempo da volta: {lap.get('lap_time', 'N/A')}")
-                data_points = lap.get("data_points", [])
-                if isinstance(data_points, list):
-                    logger.info(f"   Pontos de dados: {len(data_points)}")
-                else:
-                    logger.info(f"   Pontos de dados: {data_points}")
-                if data_points and isinstance(data_points, list) and len(data_points) > 0:
-                    logger.info(f"   Primeiro ponto: {data_points[0]}")
-                    logger.info(f"   Último ponto: {data_points[-1]}")
+            # Arrays de cada volta extraídos uma vez; com mais de um núcleo a análise
+            # detalhada roda num pool de processos, com as colunas em memória compartilhada
+            analyzer = AdvancedTelemetryAnalyzer(parallel=True)
+            lap_channels = [analyzer._extract_channels_data(lap.get("data_points", [])) for lap in laps]
+            detailed_analyses = analyzer._analyze_all_laps(
+                self.telemetry_data, lap_channels,
+                progress_callback=self.progress_update.emit,
+                cancelled=lambda: not self._running,
+            )
             
             # Analysis results storage
             analysis_results = {
@@ -70,13 +79,15 @@ class RealTimeAnalyzerWorker(QObject):
                 "average_lap_time": 0.0,
                 "consistency_score": 0.0,
                 "feedback_messages": [],
-                "lap_details": []
+                "lap_details": [],
+                "lap_analysis": []
             }
             
             lap_times = []
             
-            for i, lap in enumerate(laps):
-                if not self._running:
+            # Resultados combinados na ordem das voltas
+            for i, (lap, channels, detailed) in enumerate(zip(laps, lap_channels, detailed_analyses)):
+                if not self._running or detailed is None:
                     logger.info("⏹️ Análise interrompida pelo usuário")
                     break
                     
@@ -88,49 +99,31 @@ class RealTimeAnalyzerWorker(QObject):
                 lap_number = lap.get("lap_number", i + 1)
                 lap_time = lap.get("lap_time", 0)
                 
-                logger.info(f"🔍 Analisando volta {lap_number} (tempo: {lap_time:.2f}s)")
-                self.progress_update.emit(i + 1, total_laps)
-                
-                # Log detalhes da análise da volta
-                data_points = lap.get("data_points", [])
-                logger.info(f"   📊 Pontos de dados: {len(data_points)}")
-                
-                # Basic lap analysis
-                lap_analysis = self._analyze_lap(lap)
-                logger.info(f"   📈 Resultados da análise:")
-                logger.info(f"      Velocidade média: {lap_analysis.get('average_speed', 0):.2f}")
-                logger.info(f"      Velocidade máxima: {lap_analysis.get('max_speed', 0):.2f}")
-                logger.info(f"      Uso de throttle: {lap_analysis.get('throttle_usage', 0):.2f}%")
-                logger.info(f"      Uso de freio: {lap_analysis.get('brake_usage', 0):.2f}%")
+                lap_analysis = self._analyze_lap(lap, channels)
+                logger.debug(f"Volta {lap_number}: {lap_time:.2f}s, {len(channels)} pontos, "
+                             f"velocidade média {lap_analysis['average_speed']:.2f}")
                 
                 analysis_results["lap_details"].append(lap_analysis)
+                analysis_results["lap_analysis"].append(detailed)
                 
                 if lap_time > 0:
                     lap_times.append(lap_time)
-                    logger.info(f"   ⏱️ Tempo da volta adicionado: {lap_time:.2f}s")
                     
                     # Track best and worst laps
                     if analysis_results["best_lap"] is None or lap_time < analysis_results["best_lap"]["time"]:
                         analysis_results["best_lap"] = {"lap": lap_number, "time": lap_time}
-                        logger.info(f"   🏆 Nova melhor volta: {lap_time:.2f}s")
                     if analysis_results["worst_lap"] is None or lap_time > analysis_results["worst_lap"]["time"]:
                         analysis_results["worst_lap"] = {"lap": lap_number, "time": lap_time}
-                        logger.info(f"   🐌 Nova pior volta: {lap_time:.2f}s")
                 else:
-                    logger.warning(f"   ⚠️ Tempo da volta é 0 ou inválido")
+                    logger.warning(f"   ⚠️ Tempo da volta {lap_number} é 0 ou inválido")
                 
                 # Generate feedback for this lap
                 feedback = self._generate_lap_feedback(lap_analysis)
                 if feedback:
-                    logger.info(f"   💬 Feedback gerado: {feedback}")
                     self.feedback_detected.emit(feedback)
                     analysis_results["feedback_messages"].append(feedback)
                 
                 analysis_results["laps_analyzed"] += 1
-                logger.info(f"   ✅ Volta {lap_number} analisada com sucesso")
-                
-                # Small delay to prevent UI freezing
-                time.sleep(0.01)
             
             # Calculate overall statistics
             logger.info("=== CÁLCULO DE ESTATÍSTICAS FINAIS ===")
@@ -140,7 +133,6 @@ class RealTimeAnalyzerWorker(QObject):
                 
                 # Calculate consistency (lower standard deviation = more consistent)
                 if len(lap_times) > 1:
-                    import numpy as np
                     std_dev = np.std(lap_times)
                     mean_time = np.mean(lap_times)
                     analysis_results["consistency_score"] = max(0, 100 - (std_dev / mean_time * 100))
@@ -166,6 +158,10 @@ class RealTimeAnalyzerWorker(QObject):
             logger.info(f"📊 Tempo médio: {analysis_results['average_lap_time']:.2f}s")
             logger.info(f"📊 Consistência: {analysis_results['consistency_score']:.1f}%")
             
+            # Only complete analyses are cached
+            if self.cache and self.cache_key and analysis_results["laps_analyzed"] == total_laps:
+                self.cache.put(self.cache_key, analysis_results)
+            
             # Emit comprehensive results
             self.analysis_results_ready.emit(analysis_results)
             
@@ -178,100 +174,51 @@ class RealTimeAnalyzerWorker(QObject):
             self._running = False
             self.finished.emit()
 
-    def _analyze_lap(self, lap: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyzes a single lap and returns analysis results."""
-        logger.info(f"🔍 Iniciando análise detalhada da volta...")
-        
-        data_points = lap.get("data_points", [])
-        lap_time = lap.get("lap_time", 0)
-        
-        logger.info(f"   📊 Pontos de dados: {len(data_points)}")
-        logger.info(f"   ⏱️ Tempo da volta: {lap_time}")
-        
+    def _emit_cached_results(self, total_laps: int) -> bool:
+        """Emits a previously cached analysis of the same file, if any."""
+        if not (self.cache and self.cache_key):
+            return False
+        analysis_results = self.cache.get(self.cache_key)
+        if analysis_results is None:
+            return False
+
+        logger.info(f"📦 Análise carregada do cache ({total_laps} voltas)")
+        self.progress_update.emit(total_laps, total_laps)
+        for feedback in analysis_results.get("feedback_messages", []):
+            self.feedback_detected.emit(feedback)
+        final_feedback = self._generate_final_feedback(analysis_results)
+        if final_feedback:
+            self.feedback_detected.emit(final_feedback)
+        self.analysis_results_ready.emit(analysis_results)
+        return True
+
+    def _analyze_lap(self, lap: Dict[str, Any], channels: LapChannels) -> Dict[str, Any]:
+        """Basic statistics of a lap, computed on its channel arrays."""
         analysis = {
             "lap_number": lap.get("lap_number", 0),
-            "lap_time": lap_time,
-            "data_points_count": len(data_points),
+            "lap_time": lap.get("lap_time", 0),
+            "data_points_count": len(channels),
             "average_speed": 0.0,
             "max_speed": 0.0,
-            "min_speed": 999999.0,  # Valor alto em vez de float('inf')
+            "min_speed": 0.0,
             "throttle_usage": 0.0,
             "brake_usage": 0.0
         }
         
-        if not data_points:
+        if len(channels) == 0:
             logger.warning("   ⚠️ Nenhum ponto de dados encontrado!")
             return analysis
         
-        logger.info(f"   📈 Analisando {len(data_points)} pontos de dados...")
-        
-        speeds = []
-        throttle_values = []
-        brake_values = []
+        # Canais ausentes são zeros, como no padrão anterior de point.get(..., 0)
+        speed = channels["speed"]
+        analysis.update({
+            "average_speed": float(np.mean(speed)),
+            "max_speed": float(np.max(speed)),
+            "min_speed": float(np.min(speed)),
+            "throttle_usage": float(np.mean(channels["throttle"]) * 100),
+            "brake_usage": float(np.mean(channels["brake"]) * 100)
+        })
         
-        # Log dos primeiros pontos para debug
-        for i, point in enumerate(data_points[:5]):  # Primeiros 5 pontos
-            logger.info(f"   📊 Ponto {i+1}: {point}")
-        
-        for i, point in enumerate(data_points):
-            # Tenta diferentes nomes de canais para velocidade
-            speed = point.get("SPEED", point.get("speed", 0))
-            if speed is not None:
-                try:
-                    speed_float = float(speed)
-                    speeds.append(speed_float)
-                    analysis["max_speed"] = max(analysis["max_speed"], speed_float)
-                    analysis["min_speed"] = min(analysis["min_speed"], speed_float)
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"   ⚠️ Erro ao converter velocidade: {speed} - {e}")
-            
-            # Tenta diferentes nomes de canais para acelerador
-            throttle = point.get("THROTTLE", point.get("throttle", 0))
-            if throttle is not None:
-                try:
-                    throttle_values.append(float(throttle))
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"   ⚠️ Erro ao converter throttle: {throttle} - {e}")
-            
-            # Tenta diferentes nomes de canais para freio
-            brake = point.get("BRAKE", point.get("brake", 0))
-            if brake is not None:
-                try:
-                    brake_values.append(float(brake))
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"   ⚠️ Erro ao converter brake: {brake} - {e}")
-        
-        logger.info(f"   📊 Valores encontrados:")
-        logger.info(f"      Velocidades válidas: {len(speeds)}")
-        logger.info(f"      Valores de throttle: {len(throttle_values)}")
-        logger.info(f"      Valores de brake: {len(brake_values)}")
-        
-        if speeds:
-            analysis["average_speed"] = sum(speeds) / len(speeds)
-            logger.info(f"      Velocidade média: {analysis['average_speed']:.2f}")
-            logger.info(f"      Velocidade máxima: {analysis['max_speed']:.2f}")
-            logger.info(f"      Velocidade mínima: {analysis['min_speed']:.2f}")
-        else:
-            logger.warning("   ⚠️ Nenhuma velocidade válida encontrada!")
-            
-        if throttle_values:
-            analysis["throttle_usage"] = sum(throttle_values) / len(throttle_values) * 100
-            logger.info(f"      Uso de throttle: {analysis['throttle_usage']:.2f}%")
-        else:
-            logger.warning("   ⚠️ Nenhum valor de throttle válido encontrado!")
-            
-        if brake_values:
-            analysis["brake_usage"] = sum(brake_values) / len(brake_values) * 100
-            logger.info(f"      Uso de brake: {analysis['brake_usage']:.2f}%")
-        else:
-            logger.warning("   ⚠️ Nenhum valor de brake válido encontrado!")
-        
-        # Corrige min_speed se não foi encontrado nenhum valor
-        if analysis["min_speed"] == 999999.0:
-            analysis["min_speed"] = 0.0
-            logger.info("   ⚠️ Velocidade mínima corrigida para 0.0")
-        
-        logger.info(f"   ✅ Análise da volta concluída!")
         return analysis
 
     def _generate_lap_feedback(self, lap_analysis: Dict[str, Any]) -> str:
@@ -344,8 +291,13 @@ class RealTimeAnalyzer(QObject):
         self._running = False
         self._stop_requested = False
 
-    def start_analysis(self, telemetry_data: Dict[str, Any]):
-        """Inicia a análise de telemetria em uma thread separada."""
+    def start_analysis(self, telemetry_data: Dict[str, Any], cache: Optional[AnalysisCache] = None,
+                       cache_key: Optional[str] = None):
+        """Inicia a análise de telemetria em uma thread separada.
+
+        Com ``cache`` e ``cache_key``, uma análise já feita do mesmo arquivo
+        é reaproveitada e uma análise nova é gravada no cache.
+        """
         logger.info("=== INICIANDO ANÁLISE DE TELEMETRIA ===")
         logger.info(f"Tipo de dados recebidos: {type(telemetry_data)}")
         logger.info(f"Chaves disponíveis: {list(telemetry_data.keys()) if telemetry_data else 'Nenhuma'}")
@@ -420,7 +372,7 @@ class RealTimeAnalyzer(QObject):
         
         try:
             # Cria o worker
-            self.worker = RealTimeAnalyzerWorker(telemetry_data)
+            self.worker = RealTimeAnalyzerWorker(telemetry_data, cache=cache, cache_key=cache_key)
             
             # Cria a thread
             self.thread = QThread()
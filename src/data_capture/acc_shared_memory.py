@@ -14,7 +14,12 @@ from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 import json
 import threading # Adicionado para locking
-import copy      # Adicionado para deepcopy
+
+import numpy as np
+
+from src.data_capture.live_store import LAP_DTYPE, new_lap_store, finish_lap
+from src.data_capture.snapshot import LapStore, TelemetrySnapshot
+from src.data_capture.session_store import save_session
 
 # Configuração de logging
 logger = logging.getLogger("race_telemetry_api.acc")
@@ -67,7 +72,7 @@ class SPageFileGraphic(Structure):
         ("iBestTime", c_int), ("sessionTimeLeft", c_float), ("distanceTraveled", c_float),
         ("isInPit", c_int), ("currentSectorIndex", c_int), ("lastSectorTime", c_int),
         ("numberOfLaps", c_int), ("tyreCompound", c_wchar * 33), ("replayTimeMultiplier", c_float),
-        ("normalizedCarPosition", c_float), ("activeCars", c_int), ("carCoordinates", c_float * 60 * 3),
+        ("normalizedCarPosition", c_float), ("activeCars", c_int), ("carCoordinates", c_float * 3 * 60),
         ("carID", c_int * 60), ("playerCarID", c_int), ("penaltyTime", c_float), ("flag", c_int),
         ("penalty", c_int), ("idealLineOn", c_int), ("isInPitLane", c_int), ("surfaceGrip", c_float),
         ("mandatoryPitDone", c_int), ("windSpeed", c_float), ("windDirection", c_float),
@@ -109,6 +114,14 @@ class SPageFileStatic(Structure):
         ("dryTyresName", c_wchar * 33), ("wetTyresName", c_wchar * 33)
     ]
 
+# --- Captura em alta frequência ---
+PHYSICS_RATE = 333      # Hz, taxa máxima de atualização da página de física do ACC
+GRAPHICS_RATE = 30      # Hz, a página gráfica (voltas, posição, setor) muda mais devagar
+LAP_PREALLOC_SECONDS = 180  # Duração de volta pré-alocada no armazenamento (cresce se preciso)
+
+# Uma linha por amostra, no lugar do dicionário por ponto
+SAMPLE_DTYPE = LAP_DTYPE
+
 # --- Helper para conversão de ctypes para JSON (sem alterações) ---
 def convert_ctypes_to_native(data):
     if isinstance(data, (int, float, str, bool)) or data is None:
@@ -137,8 +150,14 @@ def convert_ctypes_to_native(data):
 class ACCTelemetryCapture:
     """Classe para captura de telemetria do Assetto Corsa Competizione."""
     
-    def __init__(self):
-        """Inicializa o capturador de telemetria do ACC."""
+    def __init__(self, physics_rate: int = PHYSICS_RATE, graphics_rate: int = GRAPHICS_RATE):
+        """
+        Inicializa o capturador de telemetria do ACC.
+
+        Args:
+            physics_rate: Frequência máxima de leitura da página de física (Hz)
+            graphics_rate: Frequência de leitura da página gráfica (Hz)
+        """
         self.physics_mmap = None
         self.graphics_mmap = None
         self.static_mmap = None
@@ -146,6 +165,17 @@ class ACCTelemetryCapture:
         self.physics_data = None
         self.graphics_data = None
         self.static_data = None
+
+        # Visões das páginas mapeadas, a cópia é feita direto para as
+        # estruturas acima sem criar bytes intermediários
+        self._page_views = {}
+        self.last_packet_id = None
+        self.session_key = None
+        
+        self.physics_rate = physics_rate
+        self.graphics_rate = graphics_rate
+        self._next_graphics_read = 0.0
+        self.capture_thread = None
         
         self.is_connected = False
         self.is_capturing = False
@@ -154,14 +184,18 @@ class ACCTelemetryCapture:
         
         # Dados compartilhados entre threads (protegidos por lock)
         self.data_lock = threading.Lock()
-        self.data_points_buffer = []
+        # Amostras da sessão; as voltas finalizadas são visões sobre elas
+        self.live_store = new_lap_store(self.physics_rate * LAP_PREALLOC_SECONDS)
         self.current_lap_data = None
-        self.telemetry_data = {
-            "session": {},
-            "laps": []
-        }
+        # Voltas completas e sessão, lidas sem lock pela UI
+        self.lap_store = LapStore()
         
         logger.info("Inicializando capturador de telemetria do ACC")
+
+    @property
+    def telemetry_data(self) -> Dict[str, Any]:
+        """Sessão e voltas completas no formato de dicionário (sem cópia das voltas)."""
+        return self.lap_store.snapshot().to_dict()
     
     def connect(self) -> bool:
         logger.info("Tentando conectar à memória compartilhada do ACC")
@@ -173,6 +207,7 @@ class ACCTelemetryCapture:
             self.physics_data = SPageFilePhysics()
             self.graphics_data = SPageFileGraphic()
             self.static_data = SPageFileStatic()
+            self._map_pages()
             
             self._read_shared_memory() # Lê dados iniciais
             
@@ -220,10 +255,16 @@ class ACCTelemetryCapture:
                  self.last_lap_number = self.graphics_data.completedLaps
             else:
                  self.last_lap_number = -1 # Garante que a primeira volta seja detectada
-            self.data_points_buffer = []
+            self.live_store.clear()
             self.current_lap_data = None
+            self.last_packet_id = None
+            self._next_graphics_read = 0.0
             # Limpa apenas as voltas, mantém a info da sessão
-            self.telemetry_data["laps"] = [] 
+            self.lap_store.clear_laps()
+
+        # Inicia o loop de captura em background, como no LMU
+        self.capture_thread = threading.Thread(target=self.run_capture_loop, daemon=True)
+        self.capture_thread.start()
             
         logger.info("Captura de telemetria do ACC iniciada com sucesso")
         return True
@@ -238,11 +279,15 @@ class ACCTelemetryCapture:
         with self.data_lock:
             self.is_capturing = False # Sinaliza para parar a coleta
             # Finaliza a volta atual se houver dados (dentro do lock)
-            if self.current_lap_data and self.data_points_buffer:
+            if self.current_lap_data and self.live_store.lap_length:
                 self._finalize_current_lap_nolock()
             self.capture_start_time = None
-            # Faz cópia para salvar fora do lock
-            telemetry_to_save = copy.deepcopy(self.telemetry_data)
+            # As voltas completas são imutáveis, não é preciso copiá-las
+            telemetry_to_save = self.lap_store.snapshot().to_dict()
+            
+        if self.capture_thread and self.capture_thread is not threading.current_thread():
+            self.capture_thread.join(timeout=2)
+        self.capture_thread = None
             
         logger.info("Captura de telemetria do ACC parada com sucesso")
         
@@ -252,49 +297,138 @@ class ACCTelemetryCapture:
         return True
     
     def get_telemetry_data(self) -> Dict[str, Any]:
-        """Retorna uma cópia segura dos dados de telemetria atuais."""
-        with self.data_lock:
-            # Retorna uma cópia profunda para segurança da thread da UI
-            return copy.deepcopy(self.telemetry_data)
-    
+        """
+        Retorna a sessão e as voltas completas atuais.
+
+        As voltas são objetos imutáveis compartilhados por referência, então
+        não há cópia profunda nem espera pelo lock da captura.
+        """
+        return self.lap_store.snapshot().to_dict()
+
+    def get_snapshot(self) -> TelemetrySnapshot:
+        """
+        Retorna o estado atual da captura sem copiar as voltas.
+
+        A volta em andamento vem em ``current_lap`` com as amostras já
+        gravadas como colunas somente leitura do LiveLapStore.
+        """
+        current_lap = None
+        lap = self.current_lap_data
+        if lap is not None:
+            current_lap = {"lap_number": lap["lap_number"], "samples": self.live_store.current_lap()}
+        return self.lap_store.snapshot(current_lap)
+
+    def get_laps_since(self, version: int):
+        """
+        Retorna as voltas completas publicadas depois de ``version``.
+
+        Returns:
+            (versão atual, voltas novas)
+        """
+        return self.lap_store.laps_since(version)
+
     def run_capture_loop(self): 
         """Método principal do loop de captura (executado em uma thread separada)."""
+        period = 1 / self.physics_rate
         while self.is_capturing: # Verifica a flag dentro do loop
             start_time = time.perf_counter()
             
-            # Lê os dados mais recentes da memória compartilhada
-            self._read_shared_memory()
-            
-            # Processa os dados (detecta voltas, coleta pontos)
+            # Lê a física na taxa nativa do jogo e as outras páginas só quando preciso
             # A modificação dos dados compartilhados acontece dentro de _process_telemetry_data com lock
-            if self.physics_data and self.graphics_data:
-                 self._process_telemetry_data()
+            self._capture_step(start_time)
             
-            # Controla a taxa de atualização (ex: 60Hz)
+            # Controla a taxa de atualização
             elapsed = time.perf_counter() - start_time
-            sleep_time = (1/60) - elapsed
+            sleep_time = period - elapsed
             if sleep_time > 0:
                 time.sleep(sleep_time)
-            
-            # Verifica novamente se a captura deve continuar
-            with self.data_lock:
-                 if not self.is_capturing:
-                      break # Sai do loop se stop_capture foi chamado
+
+    def _capture_step(self, now: float) -> bool:
+        """
+        Executa uma iteração da captura.
+
+        A página gráfica é lida na cadência de graphics_rate e a estática só
+        quando a sessão muda. Um ponto só é coletado quando o packetId da
+        página de física mudou.
+
+        Returns:
+            True se um novo ponto foi coletado
+        """
+        if now >= self._next_graphics_read:
+            self._next_graphics_read = now + 1 / self.graphics_rate
+            if self._read_graphics():
+                session_key = (self.graphics_data.session, self.graphics_data.sessionIndex)
+                if session_key != self.session_key:
+                    self.session_key = session_key
+                    if self._read_static():
+                        self._update_session_info()
+
+        if not self._read_physics():
+            return False # Quadro repetido, o jogo ainda não atualizou a física
+
+        if self.graphics_data:
+            self._process_telemetry_data()
+            return True
+        return False
+
+    def _map_pages(self):
+        """Cria as visões das páginas mapeadas usadas nas leituras."""
+        self._page_views = {}
+        for (name, mm, struct_type) in (("physics", self.physics_mmap, SPageFilePhysics),
+                                        ("graphics", self.graphics_mmap, SPageFileGraphic),
+                                        ("static", self.static_mmap, SPageFileStatic)):
+            self._page_views[name] = (ctypes.c_char * sizeof(struct_type)).from_buffer(mm)
+        # packetId é o primeiro campo da página de física
+        self._page_views["packet_id"] = c_int.from_buffer(self.physics_mmap)
+
+    def _copy_page(self, name: str, target: Structure) -> bool:
+        """Copia uma página mapeada para a estrutura pré-alocada."""
+        view = self._page_views.get(name)
+        if view is None:
+            return False
+        ctypes.memmove(ctypes.addressof(target), view, sizeof(target))
+        return True
+
+    def _read_physics(self) -> bool:
+        """
+        Lê a página de física se houver um quadro novo.
+
+        Returns:
+            True se o packetId mudou desde a última leitura
+        """
+        packet_id = self._page_views.get("packet_id")
+        if packet_id is None or self.physics_data is None:
+            return False
+        if packet_id.value == self.last_packet_id:
+            return False
+
+        # Se o jogo escreveu durante a cópia o packetId muda, tenta mais uma vez
+        for _ in range(2):
+            self._copy_page("physics", self.physics_data)
+            if self.physics_data.packetId == packet_id.value:
+                break
+
+        self.last_packet_id = self.physics_data.packetId
+        return True
+
+    def _read_graphics(self) -> bool:
+        if self.graphics_data is None:
+            return False
+        return self._copy_page("graphics", self.graphics_data)
+
+    def _read_static(self) -> bool:
+        if self.static_data is None:
+            return False
+        return self._copy_page("static", self.static_data)
 
     def _read_shared_memory(self):
-        if not self.physics_mmap or not self.graphics_mmap or not self.static_mmap:
+        """Lê as três páginas da memória compartilhada."""
+        if not self._page_views:
             return
         try:
-            self.physics_mmap.seek(0)
-            self.graphics_mmap.seek(0)
-            self.static_mmap.seek(0)
-            physics_buffer = self.physics_mmap.read(sizeof(SPageFilePhysics))
-            graphics_buffer = self.graphics_mmap.read(sizeof(SPageFileGraphic))
-            static_buffer = self.static_mmap.read(sizeof(SPageFileStatic))
-            self.physics_data = SPageFilePhysics.from_buffer_copy(physics_buffer)
-            self.graphics_data = SPageFileGraphic.from_buffer_copy(graphics_buffer)
-            # Static data muda raramente, poderia otimizar leitura
-            self.static_data = SPageFileStatic.from_buffer_copy(static_buffer)
+            self._copy_page("physics", self.physics_data)
+            self._copy_page("graphics", self.graphics_data)
+            self._copy_page("static", self.static_data)
         except Exception as e:
             # logger.error(f"Erro ao ler memória compartilhada: {str(e)}") # Pode poluir logs
             self.physics_data = None
@@ -302,6 +436,8 @@ class ACCTelemetryCapture:
             self.static_data = None
     
     def _cleanup_memory(self):
+        # As visões precisam ser liberadas antes de fechar os mmaps
+        self._page_views = {}
         try:
             if self.physics_mmap: self.physics_mmap.close()
             if self.graphics_mmap: self.graphics_mmap.close()
@@ -327,7 +463,7 @@ class ACCTelemetryCapture:
             logger.error(f"Erro ao converter dados ctypes para nativos: {e}")
             return
 
-        with self.data_lock: # Bloqueia apenas para atualizar o dict compartilhado
+        with self.data_lock: # Bloqueia apenas para publicar a sessão
             track_name = static_native.get("track", "Desconhecido").strip()
             car_model = static_native.get("carModel", "Desconhecido").strip()
             track_temp = physics_native.get("roadTemp", 25)
@@ -338,13 +474,13 @@ class ACCTelemetryCapture:
             elif rain_intensity == 1: conditions = "Nublado"
             elif rain_intensity >= 2: conditions = "Chuvoso"
             
-            self.telemetry_data["session"] = {
+            self.lap_store.set_session({
                 "track": track_name,
                 "car": car_model,
                 "conditions": conditions,
                 "temperature": {"air": air_temp, "track": track_temp},
                 "player": static_native.get("playerName", "Piloto").strip()
-            }
+            })
     
     def _process_telemetry_data(self):
         """Processa os dados de telemetria (chamado pelo loop de captura)."""
@@ -360,7 +496,7 @@ class ACCTelemetryCapture:
                  
             # Verifica nova volta
             if current_lap > last_lap_read and last_lap_read >= 0:
-                if self.current_lap_data and self.data_points_buffer:
+                if self.current_lap_data and self.live_store.lap_length:
                     self._finalize_current_lap_nolock()
                 self._start_new_lap_nolock(current_lap)
             
@@ -380,7 +516,9 @@ class ACCTelemetryCapture:
             "sectors": [],
             "data_points": []
         }
-        self.data_points_buffer = []
+        # Amostras gravadas sem volta iniciada não pertencem a nenhuma volta
+        if self.live_store.lap_length:
+            self.live_store.discard()
         # logger.info(f"Iniciando volta {lap_number}") # Log pode ser movido para fora se necessário
     
     def _collect_data_point_nolock(self):
@@ -398,56 +536,52 @@ class ACCTelemetryCapture:
             # logger.warning("Dados de física ou gráficos ausentes ao coletar ponto.")
             return
 
-        position = [0.0, 0.0, 0.0]
-        try:
-            player_id = self.graphics_data.playerCarID
-            if player_id >= 0 and player_id < 60:
-                coords = self.graphics_data.carCoordinates[player_id * 3 : player_id * 3 + 3]
-                position = [float(c) for c in coords]
-        except Exception as e:
-             logger.error(f"Erro ao extrair coordenadas do carro: {e}")
+        x = y = z = 0.0
+        player_id = self.graphics_data.playerCarID
+        if 0 <= player_id < 60:
+            x, y, z = self.graphics_data.carCoordinates[player_id]
 
         capture_time = self.capture_start_time if self.capture_start_time else time.time()
-        data_point = {
-            "time": time.time() - capture_time,
-            "distance": float(self.graphics_data.distanceTraveled),
-            "position": position,
-            "speed": float(self.physics_data.speedKmh),
-            "rpm": int(self.physics_data.rpms),
-            "gear": int(self.physics_data.gear),
-            "throttle": float(self.physics_data.gas),
-            "brake": float(self.physics_data.brake),
-            "clutch": float(self.physics_data.clutch),
-            "steer": float(self.physics_data.steerAngle),
-            "sector": int(self.graphics_data.currentSectorIndex)
-        }
-        self.data_points_buffer.append(data_point)
+        physics = self.physics_data
+        self.live_store.append((
+            time.time() - capture_time,
+            self.graphics_data.distanceTraveled,
+            x, y, z,
+            physics.speedKmh,
+            physics.rpms,
+            physics.gear,
+            physics.gas,
+            physics.brake,
+            physics.clutch,
+            physics.steerAngle,
+            self.graphics_data.currentSectorIndex
+        ))
     
     def _finalize_current_lap_nolock(self):
         """Finaliza volta atual (assume lock externo)."""
-        if not self.current_lap_data or not self.data_points_buffer:
+        if not self.current_lap_data or not self.live_store.lap_length:
             return
         
         lap_time = float(self.graphics_data.iLastTime) / 1000.0
-        self.current_lap_data["lap_time"] = lap_time
-        self.current_lap_data["data_points"] = self.data_points_buffer
-        
         sectors = []
         sector_count = int(self.static_data.sectorCount)
         if sector_count > 0 and lap_time > 0:
             # Simplificado
             for i in range(sector_count):
                 sectors.append({"sector": i + 1, "time": lap_time / sector_count})
-        self.current_lap_data["sectors"] = sectors
+
+        # A volta guarda as colunas (visões sobre o LiveLapStore, sem cópia);
+        # os pontos são uma visão preguiçosa e só viram dicionários quando
+        # alguém os acessa
+        lap = finish_lap(self.live_store, **dict(self.current_lap_data, lap_time=lap_time, sectors=sectors))
         
-        # Adiciona a volta finalizada à lista principal
-        self.telemetry_data["laps"].append(self.current_lap_data)
+        # Publica a volta finalizada, a partir daqui ela é imutável
+        self.lap_store.add_lap(lap)
         
-        logger.info(f"Volta {self.current_lap_data['lap_number']} finalizada: {lap_time:.3f}s")
+        logger.info(f"Volta {lap['lap_number']} finalizada: {lap_time:.3f}s")
         
         # Limpa para a próxima volta
         self.current_lap_data = None
-        self.data_points_buffer = []
     
     def _save_telemetry_data(self, telemetry_data_to_save: Dict):
         """Salva os dados de telemetria fornecidos."""
@@ -467,8 +601,8 @@ class ACCTelemetryCapture:
             file_name = f"acc_{track}_{car}_{timestamp}.json"
             file_path = os.path.join(telemetry_dir, file_name)
             
-            with open(file_path, "w") as f:
-                json.dump(telemetry_data_to_save, f, indent=2)
+            # Manifesto JSON + arquivo .dat com os canais em arrays
+            save_session(telemetry_data_to_save, file_path)
             
             logger.info(f"Dados de telemetria salvos em: {file_path}")
             return file_path
@@ -483,16 +617,13 @@ class ACCTelemetryCapture:
 # --- Função de teste (sem alterações significativas) ---
 def test_acc_capture():
     capture = ACCTelemetryCapture()
-    capture_thread = None
     
     print("Tentando conectar ao ACC...")
     if capture.connect():
         print("Conectado com sucesso!")
         print("Iniciando captura...")
         if capture.start_capture():
-            # Inicia o loop de captura em uma thread separada
-            capture_thread = threading.Thread(target=capture.run_capture_loop, daemon=True)
-            capture_thread.start()
+            # O loop de captura roda em uma thread iniciada por start_capture
             print("Captura iniciada em background. Pressione Ctrl+C para parar.")
             
             try:
@@ -511,9 +642,7 @@ def test_acc_capture():
             
             except KeyboardInterrupt:
                 print("\nParando captura...")
-                capture.stop_capture() # Sinaliza para a thread parar
-                if capture_thread:
-                     capture_thread.join(timeout=2) # Espera a thread terminar
+                capture.stop_capture() # Para a thread e espera ela terminar
                 print("Captura finalizada.")
         
         print("Desconectando...")
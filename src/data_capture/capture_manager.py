@@ -11,6 +11,11 @@ import logging
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 
+import numpy as np
+
+from src.data_capture.live_store import new_lap_store, finish_lap
+from src.data_capture.session_store import save_session, load_session, is_session_manifest
+
 # Configuração de logging
 logger = logging.getLogger("race_telemetry_api")
 logger.setLevel(logging.INFO)
@@ -55,6 +60,10 @@ class CaptureManager:
             "session": {},
             "laps": []
         }
+        # Amostras geradas no modo de demonstração
+        self.demo_store = new_lap_store()
+        # Última versão de voltas recebida do módulo de captura
+        self.lap_version = 0
         
         logger.info("Gerenciador de captura inicializado.")
     
@@ -200,6 +209,7 @@ class CaptureManager:
                 if success:
                     self.is_capturing = True
                     self.start_time = time.time()
+                    self.lap_version = 0
                     logger.info("Captura de telemetria iniciada com sucesso")
                     return True
                 else:
@@ -212,6 +222,7 @@ class CaptureManager:
             # Modo de demonstração
             self.is_capturing = True
             self.start_time = time.time()
+            self.demo_store.clear()
             logger.info("Captura de telemetria iniciada em modo de demonstração")
             return True
     
@@ -271,7 +282,13 @@ class CaptureManager:
         # Obtém os dados do módulo de captura
         if self.capture_module:
             try:
-                new_data = self.capture_module.get_telemetry_data()
+                if hasattr(self.capture_module, "get_laps_since"):
+                    # Só as voltas publicadas desde a última consulta
+                    version, new_laps = self.capture_module.get_laps_since(self.lap_version)
+                    self.lap_version = version
+                    new_data = {"session": self.capture_module.get_snapshot().session, "laps": new_laps}
+                else:
+                    new_data = self.capture_module.get_telemetry_data()
                 
                 if new_data:
                     # Atualiza os dados
@@ -300,6 +317,11 @@ class CaptureManager:
             # Carrega o arquivo
             with open(file_path, "r") as f:
                 imported_data = json.load(f)
+
+            # Sessões binárias: o JSON é só o manifesto, os canais ficam
+            # mapeados em memória a partir do arquivo .dat
+            if is_session_manifest(imported_data):
+                imported_data = load_session(file_path, manifest=imported_data)
             
             # Verifica se os dados são válidos
             if not isinstance(imported_data, dict) or "session" not in imported_data or "laps" not in imported_data:
@@ -348,27 +370,24 @@ class CaptureManager:
         
         # Atualiza voltas
         if "laps" in new_data:
+            laps = self.telemetry_data["laps"]
+            lap_index = {lap.get("lap_number"): idx for (idx, lap) in enumerate(laps)}
             # Verifica se há novas voltas
             for new_lap in new_data["laps"]:
                 lap_number = new_lap.get("lap_number", 0)
                 
-                # Verifica se a volta já existe
-                existing_lap = next(
-                    (lap for lap in self.telemetry_data["laps"] if lap.get("lap_number") == lap_number),
-                    None
-                )
-                
-                if existing_lap:
-                    # Atualiza a volta existente
-                    existing_lap.update(new_lap)
+                # As voltas dos módulos de captura são imutáveis, então uma
+                # volta existente é substituída em vez de alterada
+                if lap_number in lap_index:
+                    laps[lap_index[lap_number]] = new_lap
                 else:
                     # Adiciona a nova volta
-                    self.telemetry_data["laps"].append(new_lap)
+                    lap_index[lap_number] = len(laps)
+                    laps.append(new_lap)
     
     def _update_demo_telemetry_data(self):
         """Atualiza os dados de telemetria no modo de demonstração."""
         import random
-        import math
         
         # Se não houver dados de sessão, cria
         if not self.telemetry_data["session"]:
@@ -403,62 +422,44 @@ class CaptureManager:
             sector2 = lap_time / 3 + random.uniform(-0.5, 0.5)
             sector3 = lap_time - sector1 - sector2
             
-            # Pontos de dados
-            data_points = []
-            
-            # Gera pontos ao longo da volta
+            # Gera os pontos ao longo da volta direto em colunas
             num_points = 1000
-            for i in range(num_points):
-                # Progresso na volta (0 a 1)
-                progress = i / num_points
-                
-                # Distância percorrida
-                distance = progress * 5800  # Comprimento aproximado de Monza
-                
+            progress = np.arange(num_points) / num_points  # Progresso na volta (0 a 1)
+            angle = progress * 2 * np.pi
+            # Velocidade (varia ao longo da volta), média de 200 km/h
+            speed_factor = 1.0 + 0.2 * np.sin(angle * 4)
+            speed = 200 * speed_factor
+            # Pedais
+            throttle = 0.8 + 0.2 * np.sin(angle * 8)
+            columns = {
+                "time": progress * lap_time,
+                "distance": progress * 5800,  # Comprimento aproximado de Monza
                 # Posição (simplificada para um círculo)
-                angle = progress * 2 * math.pi
-                x = 1000 * math.cos(angle)
-                y = 500 * math.sin(angle)
-                
-                # Velocidade (varia ao longo da volta)
-                speed_factor = 1.0 + 0.2 * math.sin(progress * 2 * math.pi * 4)
-                speed = 200 * speed_factor  # Velocidade média de 200 km/h
-                
-                # RPM
-                rpm = 5000 + 3000 * speed_factor
-                
-                # Marcha
-                gear = min(6, max(1, int(speed / 50) + 1))
-                
-                # Pedais
-                throttle = 0.8 + 0.2 * math.sin(progress * 2 * math.pi * 8)
-                brake = max(0, 0.5 - throttle)
-                
-                # Ponto de dados
-                data_point = {
-                    "time": progress * lap_time,
-                    "distance": distance,
-                    "position": [x, y],
-                    "speed": speed,
-                    "rpm": rpm,
-                    "gear": gear,
-                    "throttle": throttle,
-                    "brake": brake
-                }
-                
-                data_points.append(data_point)
+                "x": 1000 * np.cos(angle),
+                "y": 500 * np.sin(angle),
+                "z": np.zeros(num_points),
+                "speed": speed,
+                "rpm": 5000 + 3000 * speed_factor,
+                "gear": np.clip((speed / 50).astype(int) + 1, 1, 6),
+                "throttle": throttle,
+                "brake": np.maximum(0, 0.5 - throttle),
+                "clutch": np.zeros(num_points),
+                "steer": np.zeros(num_points),
+                "sector": np.minimum((progress * 3).astype(int) + 1, 3),
+            }
+            self.demo_store.extend(columns)
             
             # Volta
-            lap = {
-                "lap_number": lap_num,
-                "lap_time": lap_time,
-                "sectors": [
+            lap = finish_lap(
+                self.demo_store,
+                lap_number=lap_num,
+                lap_time=lap_time,
+                sectors=[
                     {"sector": 1, "time": sector1},
                     {"sector": 2, "time": sector2},
                     {"sector": 3, "time": sector3}
-                ],
-                "data_points": data_points
-            }
+                ]
+            )
             
             # Adiciona a volta
             self.telemetry_data["laps"].append(lap)
@@ -484,9 +485,8 @@ class CaptureManager:
             file_name = f"telemetry_{simulator}_{timestamp}.json"
             file_path = os.path.join(telemetry_dir, file_name)
             
-            # Salva os dados
-            with open(file_path, "w") as f:
-                json.dump(self.telemetry_data, f, indent=2)
+            # Salva os dados (manifesto JSON + arquivo .dat com os canais em arrays)
+            save_session(self.telemetry_data, file_path)
             
             logger.info(f"Dados de telemetria salvos em: {file_path}")
         except Exception as e:
@@ -0,0 +1,307 @@
+"""
+Monitoramento de pastas de telemetria por eventos.
+
+Quando o watchdog está instalado, as alterações chegam por notificações do
+sistema (inotify, FSEvents, ReadDirectoryChangesW); sem ele, a pasta é
+varrida periodicamente comparando tamanho e data de modificação. Nos dois
+casos um arquivo só é entregue depois de ficar ``debounce`` segundos sem
+mudar, para não ler arquivos que o jogo ainda está gravando.
+
+O índice de arquivos processados guarda caminho, tamanho e mtime em disco,
+para que um arquivo já lido não seja lido de novo depois de reiniciar.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# (tamanho, mtime em nanossegundos)
+FileKey = Tuple[int, int]
+
+
+def file_key(path: str) -> Optional[FileKey]:
+    """Retorna (tamanho, mtime) do arquivo, ou None se ele não existir."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+class ProcessedFilesIndex:
+    """
+    Índice persistente dos arquivos já processados.
+
+    Um arquivo conta como processado enquanto tiver o mesmo tamanho e mtime
+    registrados; se for regravado, volta a ser processado.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Arquivo JSON do índice (None mantém o índice só em memória)
+        """
+        self.path = path
+        self.updated = None
+        self._entries: Dict[str, FileKey] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: str) -> bool:
+        return os.path.abspath(path) in self._entries
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._entries = {path: tuple(key) for (path, key) in data.get("files", {}).items()}
+            self.updated = data.get("updated")
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Índice de arquivos processados ilegível, recriando: {self.path} ({e})")
+            self._entries = {}
+
+    def is_processed(self, path: str, key: Optional[FileKey] = None) -> bool:
+        """Indica se o arquivo já foi processado com o tamanho e mtime atuais."""
+        key = key or file_key(path)
+        with self._lock:
+            return key is not None and self._entries.get(os.path.abspath(path)) == tuple(key)
+
+    def mark(self, path: str, key: Optional[FileKey] = None, save: bool = True):
+        """Registra o arquivo como processado."""
+        key = key or file_key(path)
+        if key is None:
+            return
+        with self._lock:
+            self._entries[os.path.abspath(path)] = tuple(key)
+        if save:
+            self.save()
+
+    def mark_many(self, paths: Iterable[str]):
+        """Registra vários arquivos e grava o índice uma única vez."""
+        for path in paths:
+            self.mark(path, save=False)
+        self.save()
+
+    def save(self):
+        """Grava o índice (arquivo temporário + rename, nunca fica pela metade)."""
+        with self._lock:
+            self.updated = time.time()
+            if not self.path:
+                return
+            data = {"updated": self.updated,
+                    "files": {path: list(key) for (path, key) in self._entries.items()}}
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logger.error(f"Erro ao salvar índice de arquivos processados: {e}")
+
+
+class _EventHandler(FileSystemEventHandler):
+    """Repassa as notificações do watchdog ao FolderWatcher."""
+
+    def __init__(self, watcher: "FolderWatcher"):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if path:
+                self.watcher.notify(os.fsdecode(path))
+
+
+class FolderWatcher:
+    """
+    Observa uma pasta e avisa quando um arquivo novo ou alterado fica estável.
+
+    ``on_ready(path, key)`` é chamado na thread do observador, um arquivo por
+    vez; quem precisa de processamento pesado deve repassá-lo a um pool.
+    """
+
+    def __init__(self, folder: str, on_ready: Callable[[str, FileKey], None],
+                 extensions: Iterable[str] = (".ld", ".ldx"), debounce: float = 2.0,
+                 poll_interval: float = 1.0, use_events: bool = True):
+        """
+        Args:
+            folder: Pasta observada (sem subpastas)
+            on_ready: Chamado com (caminho, (tamanho, mtime)) de cada arquivo pronto
+            extensions: Extensões aceitas, sem diferenciar maiúsculas
+            debounce: Segundos sem alteração até o arquivo ser considerado pronto
+            poll_interval: Intervalo da varredura quando não há notificações
+            use_events: Usa o watchdog, se instalado
+        """
+        self.folder = folder
+        self.on_ready = on_ready
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_events = use_events and WATCHDOG_AVAILABLE
+
+        self._known: Dict[str, FileKey] = {}
+        # caminho -> (chave observada, instante da última mudança)
+        self._pending: Dict[str, Tuple[Optional[FileKey], float]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._observer = None
+
+    @property
+    def mode(self) -> str:
+        return "events" if self.use_events else "polling"
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _accepts(self, path: str) -> bool:
+        return path.lower().endswith(self.extensions)
+
+    def list_files(self) -> Dict[str, FileKey]:
+        """Retorna os arquivos aceitos da pasta com (tamanho, mtime)."""
+        files = {}
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not self._accepts(entry.name):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    files[os.path.abspath(entry.path)] = (st.st_size, st.st_mtime_ns)
+        except OSError as e:
+            logger.error(f"Erro ao listar a pasta {self.folder}: {e}")
+        return files
+
+    def start(self, initial: Iterable[str] = ()):
+        """
+        Começa a observar a pasta.
+
+        Args:
+            initial: Arquivos já existentes que devem ser entregues (os demais
+                arquivos presentes agora são ignorados até mudarem)
+        """
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._known = self.list_files()
+        initial = {os.path.abspath(path) for path in initial}
+        now = time.monotonic()
+        with self._lock:
+            self._pending = {path: (None, now) for path in initial if path in self._known}
+
+        if self.use_events:
+            try:
+                self._observer = Observer()
+                self._observer.schedule(_EventHandler(self), self.folder, recursive=False)
+                self._observer.start()
+            except Exception as e:
+                logger.warning(f"Notificações indisponíveis para {self.folder}, usando varredura: {e}")
+                self._observer = None
+                self.use_events = False
+
+        self._thread = threading.Thread(target=self._run, name="FolderWatcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Monitorando pasta ({self.mode}): {self.folder}")
+
+    def stop(self, timeout: float = 2.0):
+        """Para de observar; arquivos ainda instáveis são descartados."""
+        self._stop_event.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            self._pending.clear()
+
+    def notify(self, path: str):
+        """Registra uma alteração em ``path``; pode ser chamado de qualquer thread."""
+        if not self._accepts(path):
+            return
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self._pending:
+                self._pending[path] = (None, time.monotonic())
+        self._wake.set()
+
+    def _scan(self):
+        """Varredura por tamanho e mtime, usada quando não há notificações."""
+        files = self.list_files()
+        for (path, key) in files.items():
+            if self._known.get(path) != key:
+                self.notify(path)
+        self._known = files
+
+    def _run(self):
+        last_scan = time.monotonic()
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            if not self.use_events and now - last_scan >= self.poll_interval:
+                self._scan()
+                last_scan = now
+            for path in self._collect_ready(now):
+                if self._stop_event.is_set():
+                    break
+                try:
+                    self.on_ready(path, self._known.get(path) or file_key(path))
+                except Exception as e:
+                    logger.error(f"Erro ao tratar arquivo {path}: {e}")
+
+            with self._lock:
+                waiting = bool(self._pending)
+            if waiting:
+                timeout = min(self.debounce / 4, self.poll_interval) if self.debounce > 0 else 0.05
+            else:
+                timeout = None if self.use_events else self.poll_interval
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def _collect_ready(self, now: float):
+        """Retira os arquivos pendentes que ficaram estáveis por ``debounce``."""
+        ready = []
+        with self._lock:
+            pending = list(self._pending.items())
+        for (path, (seen, changed_at)) in pending:
+            key = file_key(path)
+            with self._lock:
+                if key is None:
+                    self._pending.pop(path, None)
+                elif key != seen:
+                    # Ainda mudando (ou primeira verificação): reinicia a espera
+                    self._pending[path] = (key, now)
+                elif now - changed_at >= self.debounce:
+                    self._pending.pop(path, None)
+                    self._known[path] = key
+                    ready.append(path)
+        # Entrega em ordem de modificação
+        ready.sort(key=lambda path: self._known[path][1])
+        return ready
@@ -0,0 +1,73 @@
+"""
+Armazenamento das amostras em captura, comum a todos os simuladores.
+
+Todas as capturas (ACC, LMU, modo de demonstração e os loggers do stm)
+gravam as amostras num LiveLapStore: arrays NumPy pré-alocados, um por canal,
+com inserção O(1) amortizada. Uma volta é finalizada por intervalo de
+índices e sai como colunas somente leitura que apontam para os mesmos
+arrays, sem cópia. Análise e UI recebem sempre o mesmo formato de volta:
+``columns`` com os canais de LAP_DTYPE (x, y, z juntos em ``position``) e
+``data_points`` como visão preguiçosa sobre essas colunas.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+try:
+    from ..stm.live import LiveLapStore
+except ImportError:
+    # importado como módulo de topo, com src no path
+    from stm.live import LiveLapStore
+
+from src.parsers.csv_parser import ColumnarDataPoints
+
+# Canais de uma amostra, na ordem usada em LiveLapStore.append
+LAP_DTYPE = np.dtype([
+    ("time", np.float64), ("distance", np.float32),
+    ("x", np.float32), ("y", np.float32), ("z", np.float32),
+    ("speed", np.float32), ("rpm", np.int32), ("gear", np.int32),
+    ("throttle", np.float32), ("brake", np.float32), ("clutch", np.float32),
+    ("steer", np.float32), ("sector", np.int32),
+])
+
+
+def new_lap_store(capacity: int = 4096) -> LiveLapStore:
+    """Cria um LiveLapStore com os canais de LAP_DTYPE."""
+    return LiveLapStore(LAP_DTYPE, capacity)
+
+
+def lap_columns(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Converte as colunas de uma volta para o formato dos pontos de dados:
+    x, y, z viram "position" (n, 3). Todas as colunas ficam somente leitura.
+    """
+    result = {}
+    for (name, values) in columns.items():
+        if name in ("x", "y", "z"):
+            if name == "x":
+                result["position"] = np.stack((columns["x"], columns["y"], columns["z"]), axis=1)
+            continue
+        result[name] = values
+    for values in result.values():
+        values.flags.writeable = False
+    return result
+
+
+def finish_lap(store: LiveLapStore, stop: Optional[int] = None, **info: Any) -> Dict[str, Any]:
+    """
+    Finaliza a volta em andamento até o índice ``stop`` da sessão.
+
+    Args:
+        store: Armazenamento da captura
+        stop: Índice (exclusivo) da última amostra da volta; None usa todas
+        **info: Campos da volta (lap_number, lap_time, sectors...)
+
+    Returns:
+        Volta com ``columns`` e ``data_points``
+    """
+    columns = lap_columns(store.finish_lap(stop))
+    lap = dict(info)
+    lap["columns"] = columns
+    lap["data_points"] = ColumnarDataPoints(columns)
+    return lap
@@ -13,10 +13,16 @@ import xml.etree.ElementTree as ET
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 import shutil
-import struct
 import numpy as np
 import threading
-import copy # Para cópias seguras
+from concurrent.futures import ThreadPoolExecutor
+
+from src.data_capture.snapshot import LapStore, TelemetrySnapshot
+from src.data_capture.session_store import save_session
+from src.data_capture.folder_watcher import FolderWatcher, ProcessedFilesIndex
+from src.data_capture.live_store import LAP_DTYPE, new_lap_store, finish_lap
+from src.parsers.ldparser import ldData
+from src.parsers.channel_registry import resolve_channels
 
 # Configuração de logging
 logger = logging.getLogger("race_telemetry_api.lmu")
@@ -28,235 +34,216 @@ if not logger.hasHandlers():
     logger.addHandler(handler)
 
 
+# Canais lidos do arquivo LD: coluna -> (id canônico no registro de canais, tipo, canal discreto)
+LD_CHANNELS = {
+    "lap": ("lap", np.int32, True),
+    "lap_time": ("laptime", np.float64, False),
+    "session_time": ("time", np.float64, False),
+    "distance": ("distance", np.float32, False),
+    "sector": ("sector", np.int32, True),
+    "speed": ("speed", np.float32, False),
+    "rpm": ("rpm", np.int32, False),
+    "gear": ("gear", np.int32, True),
+    "throttle": ("throttle", np.float32, False),
+    "brake": ("brake", np.float32, False),
+    "clutch": ("clutch", np.float32, False),
+    "steer": ("steer", np.float32, False),
+    "x": ("posx", np.float32, False),
+    "y": ("posy", np.float32, False),
+    "z": ("posz", np.float32, False),
+}
+
+
 class LDParser:
-    """Parser para arquivos binários LD do MoTeC."""
-    
+    """
+    Extrai as voltas de um arquivo LD do MoTeC.
+
+    A leitura binária é feita pelo leitor compartilhado do projeto
+    (``src.parsers.ldparser``), com o arquivo mapeado em memória: só os canais
+    usados são lidos. Canais com frequências diferentes são levados à base de
+    tempo do canal mais rápido, e cada volta sai em colunas NumPy.
+    """
+
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.data = {}
         self.channels = {}
         self.samples = {}
         self.header = {}
+        self.time = None
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
         if not file_path.lower().endswith(".ld"):
             raise ValueError(f"Arquivo não é um arquivo LD: {file_path}")
-    
+
     def parse(self) -> Dict[str, Any]:
-        """Analisa o arquivo LD e retorna dados processados."""
+        """Analisa o arquivo LD e retorna as voltas e as informações da sessão."""
         try:
-            with open(self.file_path, "rb") as f:
-                self._parse_header(f)
-                self._parse_channels(f)
-                self._parse_data(f)
-                self._process_data()
-                # Retorna apenas os dados processados relevantes (laps, etc.)
-                return self.data 
+            with ldData.fromfile(self.file_path, mmap=True) as ld:
+                self._parse_header(ld)
+                self._parse_channels(ld)
+            self._process_data()
+            return self.data
         except Exception as e:
             logger.error(f"Erro ao analisar arquivo LD {self.file_path}: {str(e)}")
             raise
-    
-    def _parse_header(self, f):
-        f.seek(0)
-        signature = f.read(8)
-        if signature != b"LDFILE\x00\x00":
-            raise ValueError(f"Assinatura inválida: {signature}")
-        self.header["version"] = struct.unpack("<I", f.read(4))[0]
-        self.header["num_channels"] = struct.unpack("<I", f.read(4))[0]
-        self.header["sample_rate"] = struct.unpack("<f", f.read(4))[0]
-        self.header["num_samples"] = struct.unpack("<I", f.read(4))[0]
-        logger.info(f"Cabeçalho LD: v={self.header['version']}, ch={self.header['num_channels']}, rate={self.header['sample_rate']}Hz, samples={self.header['num_samples']}")
-
-    def _parse_channels(self, f):
-        f.seek(24)
-        for i in range(self.header["num_channels"]):
-            name_len = struct.unpack("<I", f.read(4))[0]
-            name = f.read(name_len).decode("utf-8", errors="ignore")
-            unit_len = struct.unpack("<I", f.read(4))[0]
-            unit = f.read(unit_len).decode("utf-8", errors="ignore")
-            data_type = struct.unpack("<I", f.read(4))[0]
-            scale = struct.unpack("<f", f.read(4))[0]
-            offset = struct.unpack("<f", f.read(4))[0]
-            self.channels[i] = {"name": name, "unit": unit, "data_type": data_type, "scale": scale, "offset": offset}
-            # logger.debug(f"Canal {i}: {name} ({unit})")
-
-    def _parse_data(self, f):
-        # Calcula o tamanho esperado dos dados
-        bytes_per_sample = 4 # Assumindo float32
-        expected_data_size = self.header["num_samples"] * self.header["num_channels"] * bytes_per_sample
-        
-        # Calcula a posição inicial dos dados
-        # Tamanho do cabeçalho + tamanho total das definições de canal
-        f.seek(24) # Posição após cabeçalho
-        channel_def_size = 0
-        for i in range(self.header["num_channels"]):
-             # name_len(4) + name + unit_len(4) + unit + type(4) + scale(4) + offset(4)
-             name_len = len(self.channels[i]["name"].encode("utf-8"))
-             unit_len = len(self.channels[i]["unit"].encode("utf-8"))
-             channel_def_size += 4 + name_len + 4 + unit_len + 4 + 4 + 4
-             
-        data_start_pos = 24 + channel_def_size
-        f.seek(data_start_pos)
-        
-        # Lê os dados brutos
-        raw_data = f.read(expected_data_size)
-        if len(raw_data) != expected_data_size:
-             logger.warning(f"Tamanho dos dados lidos ({len(raw_data)}) diferente do esperado ({expected_data_size}) para {self.file_path}")
-             # Tenta ajustar o número de amostras se possível
-             actual_samples = len(raw_data) // (self.header["num_channels"] * bytes_per_sample)
-             if actual_samples > 0:
-                  logger.info(f"Ajustando número de amostras para {actual_samples}")
-                  self.header["num_samples"] = actual_samples
-                  expected_data_size = actual_samples * self.header["num_channels"] * bytes_per_sample
-                  raw_data = raw_data[:expected_data_size] # Trunca se necessário
-             else:
-                  raise ValueError("Não foi possível ler dados suficientes do arquivo LD.")
-
-        # Converte para array numpy
-        data_array = np.frombuffer(raw_data, dtype=np.float32)
-        data_array = data_array.reshape((self.header["num_samples"], self.header["num_channels"]))
-        
-        # Armazena e processa dados por canal
-        for i in range(self.header["num_channels"]):
-            channel_data = data_array[:, i]
-            scale = self.channels[i]["scale"]
-            offset = self.channels[i]["offset"]
-            # Aplica escala e offset apenas se não forem triviais
-            if scale != 1.0 or offset != 0.0:
-                 channel_data = channel_data * scale + offset
-            self.samples[self.channels[i]["name"]] = channel_data
+
+    def _parse_header(self, ld):
+        head = ld.head
+        self.header = {
+            "driver": head.driver,
+            "vehicle": head.vehicleid,
+            "venue": head.venue,
+            "datetime": head.datetime,
+            "num_channels": len(ld.channs),
+        }
+
+    def _parse_channels(self, ld):
+        """Lê os canais conhecidos e os reamostra numa base de tempo comum."""
+        channel_map = resolve_channels([chan.name for chan in ld.channs],
+                                       {chan.name: chan.unit for chan in ld.channs})
+        by_name = {chan.name: chan for chan in ld.channs}
+        found = {}
+        for (column, (channel_id, _, _)) in LD_CHANNELS.items():
+            if channel_id not in channel_map:
+                continue
+            resolved = channel_map[channel_id]
+            chan = by_name[resolved.source]
+            if chan.data_len == 0 or chan.freq <= 0:
+                continue
+            found[column] = (chan, resolved)
+            self.channels[column] = {"name": chan.name, "unit": resolved.units, "freq": chan.freq}
+        if not found:
+            raise ValueError("Nenhum canal conhecido encontrado no arquivo LD")
+
+        # Base de tempo do canal mais rápido
+        rate = max(chan.freq for (chan, _) in found.values())
+        duration = max(chan.data_len / chan.freq for (chan, _) in found.values())
+        num_samples = int(round(duration * rate))
+        self.time = np.arange(num_samples, dtype=np.float64) / rate
+        self.header["sample_rate"] = float(rate)
+        self.header["num_samples"] = num_samples
+
+        for (column, (chan, resolved)) in found.items():
+            (_, dtype, discrete) = LD_CHANNELS[column]
+            # Convertido para a unidade canônica (km/h, s, m...)
+            values = resolved.convert(chan.data)
+            if chan.freq != rate or len(values) != num_samples:
+                if discrete:
+                    # Mantém o último valor (volta, setor e marcha não se interpolam)
+                    index = np.minimum((self.time * chan.freq).astype(np.int64), len(values) - 1)
+                    values = values[index]
+                else:
+                    values = np.interp(self.time, np.arange(len(values)) / chan.freq, values)
+            if np.issubdtype(dtype, np.integer):
+                values = np.rint(values)
+            self.samples[column] = values.astype(dtype)
 
     def _process_data(self):
         """Processa os dados extraídos para o formato desejado."""
-        self.data = {
-            "laps": [],
-            # Adiciona informações básicas se disponíveis
-            "session": {
-                 "sample_rate": self.header.get("sample_rate", 0)
-            }
-        }
+        session = {"sample_rate": self.header.get("sample_rate", 0)}
+        for (key, field) in (("track", "venue"), ("car", "vehicle"), ("player", "driver")):
+            if self.header.get(field):
+                session[key] = self.header[field]
+        self.data = {"laps": [], "session": session}
         self._process_lap_data()
 
     def _process_lap_data(self):
-        """Processa os dados de volta a partir dos samples."""
-        # Nomes comuns dos canais MoTeC (case-insensitive matching)
-        lap_ch = self._find_channel(["Lap", "Lap Count", "Laps"]) 
-        lap_time_ch = self._find_channel(["Lap Time", "Time"]) 
-        lap_dist_ch = self._find_channel(["Lap Distance", "Distance"]) 
-        sector_ch = self._find_channel(["Sector", "Sector Index"]) 
-        speed_ch = self._find_channel(["Speed", "Ground Speed"]) 
-        rpm_ch = self._find_channel(["RPM", "Engine RPM"]) 
-        gear_ch = self._find_channel(["Gear"]) 
-        throttle_ch = self._find_channel(["Throttle", "Throttle Pos"]) 
-        brake_ch = self._find_channel(["Brake", "Brake Pos", "Brake Pressure"]) 
-        steer_ch = self._find_channel(["Steering", "Steer Angle"]) 
-        pos_x_ch = self._find_channel(["Pos X", "GPS Pos X", "X Pos"]) 
-        pos_y_ch = self._find_channel(["Pos Y", "GPS Pos Y", "Y Pos"]) 
-        pos_z_ch = self._find_channel(["Pos Z", "GPS Pos Z", "Z Pos"]) 
-
-        if not lap_ch or not lap_time_ch:
-            logger.warning(f"Canais essenciais 'Lap' ou 'Lap Time' não encontrados em {self.file_path}")
+        """Divide as amostras em voltas, finalizadas por intervalo num LiveLapStore."""
+        if "lap" not in self.samples:
+            logger.warning(f"Canal essencial 'Lap' não encontrado em {self.file_path}")
             return
 
-        lap_numbers = self.samples[lap_ch]
-        lap_times = self.samples[lap_time_ch]
-        num_samples = self.header["num_samples"]
+        lap_numbers = self.samples["lap"]
+        # Sem canal de tempo de volta, usa o tempo da sessão
+        lap_times = self.samples.get("lap_time", self.samples.get("session_time", self.time))
+        num_samples = len(lap_numbers)
 
         # Identifica mudanças de volta
-        lap_change_indices = np.where(np.diff(lap_numbers) > 0)[0] + 1
+        lap_change_indices = np.flatnonzero(np.diff(lap_numbers) > 0) + 1
         start_indices = np.insert(lap_change_indices, 0, 0)
         end_indices = np.append(lap_change_indices, num_samples)
 
+        # O arquivo inteiro entra de uma vez no armazenamento, com o tempo
+        # relativo ao início de cada volta; canais ausentes ficam zerados
+        segment = np.repeat(np.arange(len(start_indices)), end_indices - start_indices)
+        columns = {name: self.samples[name] for name in LAP_DTYPE.names if name in self.samples}
+        columns["time"] = lap_times - lap_times[start_indices][segment]
+        for name in LAP_DTYPE.names:
+            if name not in columns:
+                columns[name] = np.zeros(num_samples, dtype=LAP_DTYPE.fields[name][0])
+        store = new_lap_store(num_samples)
+        store.extend(columns)
+
         laps_data = []
-        for i in range(len(start_indices)):
-            start_idx = start_indices[i]
-            end_idx = end_indices[i]
+        for (start_idx, end_idx) in zip(start_indices, end_indices):
             current_lap_number = int(lap_numbers[start_idx])
-
             # Ignora voltas inválidas (e.g., volta 0 ou outlap)
             if current_lap_number <= 0:
+                store.discard(end_idx)
                 continue
 
-            # Extrai dados para a volta atual
-            lap_slice_indices = np.arange(start_idx, end_idx)
-            if len(lap_slice_indices) == 0:
-                 continue
-                 
-            final_lap_time = lap_times[end_idx - 1] - lap_times[start_idx]
-
-            # Extrai setores (se disponível)
+            times = lap_times[start_idx:end_idx]
             sectors = []
-            if sector_ch:
-                sector_numbers = self.samples[sector_ch][lap_slice_indices]
-                sector_change_indices = np.where(np.diff(sector_numbers) != 0)[0] + 1
-                sector_start_indices = np.insert(sector_change_indices, 0, 0)
-                sector_end_indices = np.append(sector_change_indices, len(lap_slice_indices))
-                
-                for j in range(len(sector_start_indices)):
-                     sec_start = sector_start_indices[j]
-                     sec_end = sector_end_indices[j]
-                     sector_num = int(sector_numbers[sec_start])
-                     if sector_num > 0:
-                          sector_time = lap_times[lap_slice_indices[sec_end - 1]] - lap_times[lap_slice_indices[sec_start]]
-                          sectors.append({"sector": sector_num, "time": sector_time})
-
-            # Extrai pontos de dados
-            data_points = []
-            for k in lap_slice_indices:
-                point = {
-                    "time": lap_times[k] - lap_times[start_idx], # Tempo relativo ao início da volta
-                    "distance": float(self.samples[lap_dist_ch][k]) if lap_dist_ch else 0.0,
-                    "position": [
-                        float(self.samples[pos_x_ch][k]) if pos_x_ch else 0.0,
-                        float(self.samples[pos_y_ch][k]) if pos_y_ch else 0.0,
-                        float(self.samples[pos_z_ch][k]) if pos_z_ch else 0.0
-                    ],
-                    "speed": float(self.samples[speed_ch][k]) if speed_ch else 0.0,
-                    "rpm": int(self.samples[rpm_ch][k]) if rpm_ch else 0,
-                    "gear": int(self.samples[gear_ch][k]) if gear_ch else 0,
-                    "throttle": float(self.samples[throttle_ch][k]) if throttle_ch else 0.0,
-                    "brake": float(self.samples[brake_ch][k]) if brake_ch else 0.0,
-                    "steer": float(self.samples[steer_ch][k]) if steer_ch else 0.0,
-                    "sector": int(self.samples[sector_ch][k]) if sector_ch else 0
-                }
-                data_points.append(point)
-
-            lap_data = {
-                "lap_number": current_lap_number,
-                "lap_time": final_lap_time,
-                "sectors": sectors,
-                "data_points": data_points
-            }
-            laps_data.append(lap_data)
+            if "sector" in self.samples:
+                sector_numbers = self.samples["sector"][start_idx:end_idx]
+                bounds = np.flatnonzero(np.diff(sector_numbers) != 0) + 1
+                for (sec_start, sec_end) in zip(np.insert(bounds, 0, 0), np.append(bounds, len(times))):
+                    sector_num = int(sector_numbers[sec_start])
+                    if sector_num > 0:
+                        sectors.append({"sector": sector_num, "time": float(times[sec_end - 1] - times[sec_start])})
+
+            laps_data.append(finish_lap(store, end_idx,
+                                        lap_number=current_lap_number,
+                                        lap_time=float(times[-1] - times[0]),
+                                        sectors=sectors))
 
         self.data["laps"] = laps_data
         logger.info(f"Processadas {len(laps_data)} voltas do arquivo {self.file_path}")
 
-    def _find_channel(self, possible_names: List[str]) -> Optional[str]:
-        """Encontra o nome real de um canal MoTeC (case-insensitive)."""
-        for actual_name in self.samples.keys():
-            for possible_name in possible_names:
-                if possible_name.lower() == actual_name.lower():
-                    return actual_name
-        return None
-
 
 class LMUTelemetryCapture:
-    """Classe para captura de telemetria do Le Mans Ultimate."""
+    """
+    Classe para captura de telemetria do Le Mans Ultimate.
+
+    A pasta MoTeC é observada por um FolderWatcher (notificações do sistema,
+    ou varredura quando o watchdog não está instalado). Os arquivos LDX são
+    lidos na hora; os LD vão para um pool de workers. Os arquivos lidos ficam
+    num índice persistente e não são lidos de novo depois de reiniciar.
+    """
     
-    def __init__(self):
+    def __init__(self, index_path: Optional[str] = None, max_workers: int = 2, debounce: float = 2.0):
+        """
+        Args:
+            index_path: Arquivo do índice de arquivos processados (padrão em
+                ~/RaceTelemetryAnalyzer)
+            max_workers: Número de arquivos LD lidos em paralelo
+            debounce: Segundos sem alteração até um arquivo ser lido
+        """
         self.motec_folder = None
         self.is_connected = False
         self.is_capturing = False
         self.capture_start_time = None
         self.last_check_time = 0
-        self.processed_files = set()
-        self.watch_thread = None
-        self.stop_event = threading.Event()
-        self.data_lock = threading.Lock() # Lock para proteger acesso a telemetry_data
-        self.telemetry_data = {"session": {}, "laps": []}
+        self.max_workers = max_workers
+        self.debounce = debounce
+        if index_path is None:
+            user_data_dir = os.path.join(os.path.expanduser("~"), "RaceTelemetryAnalyzer")
+            index_path = os.path.join(user_data_dir, "lmu_processed_files.json")
+        self.processed_index = ProcessedFilesIndex(index_path)
+        self.watcher = None
+        self.executor = None
+        self.pending_files = set()
+        self.data_lock = threading.Lock() # Lock para serializar as escritas no lap_store
+        # Voltas completas e sessão, lidas sem lock pela UI
+        self.lap_store = LapStore()
         logger.info("Inicializando capturador de telemetria do Le Mans Ultimate")
         self._find_motec_folder()
+
+    @property
+    def telemetry_data(self) -> Dict[str, Any]:
+        """Sessão e voltas completas no formato de dicionário (sem cópia das voltas)."""
+        return self.lap_store.snapshot().to_dict()
     
     def _find_motec_folder(self):
         # (Código para encontrar pasta MoTeC - sem alterações)
@@ -306,13 +293,13 @@ class LMUTelemetryCapture:
             self.is_capturing = True
             self.capture_start_time = time.time()
             self.last_check_time = time.time()
-            self.processed_files = set(self._get_telemetry_files())
+            self.pending_files = set()
             # Limpa voltas anteriores, mantém info da sessão
-            self.telemetry_data["laps"] = [] 
+            self.lap_store.clear_laps()
         
-        self.stop_event.clear()
-        self.watch_thread = threading.Thread(target=self._watch_folder, daemon=True)
-        self.watch_thread.start()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="LMUParser")
+        self.watcher = FolderWatcher(self.motec_folder, self._on_file_ready, debounce=self.debounce)
+        self.watcher.start(initial=self._files_to_resume())
         logger.info("Captura de telemetria do Le Mans Ultimate iniciada com sucesso")
         return True
     
@@ -322,13 +309,18 @@ class LMUTelemetryCapture:
             logger.warning("Não está capturando telemetria do Le Mans Ultimate")
             return False
         
-        self.stop_event.set()
-        if self.watch_thread and self.watch_thread.is_alive():
-            self.watch_thread.join(timeout=2.0)
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        if self.executor is not None:
+            # Termina os arquivos LD já em leitura, descarta os que esperam
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
         
         with self.data_lock:
              self.is_capturing = False
-             telemetry_to_save = copy.deepcopy(self.telemetry_data)
+             # As voltas completas são imutáveis, não é preciso copiá-las
+             telemetry_to_save = self.lap_store.snapshot().to_dict()
 
         logger.info("Captura de telemetria do Le Mans Ultimate parada com sucesso")
         # Salva os dados acumulados (se houver)
@@ -336,39 +328,79 @@ class LMUTelemetryCapture:
         return True
 
     def get_telemetry_data(self) -> Dict[str, Any]:
-        """Retorna uma cópia segura dos dados de telemetria atuais."""
+        """
+        Retorna a sessão e as voltas completas atuais.
+
+        As voltas são objetos imutáveis compartilhados por referência, então
+        não há cópia profunda nem espera pelo lock.
+        """
+        return self.lap_store.snapshot().to_dict()
+
+    def get_snapshot(self) -> TelemetrySnapshot:
+        """
+        Retorna o estado atual sem copiar as voltas. As voltas do LMU chegam
+        inteiras pelos arquivos LD, então não há volta em andamento.
+        """
+        return self.lap_store.snapshot()
+
+    def get_laps_since(self, version: int):
+        """
+        Retorna as voltas completas publicadas depois de ``version``.
+
+        Returns:
+            (versão atual, voltas novas)
+        """
+        return self.lap_store.laps_since(version)
+
+    def _files_to_resume(self) -> List[str]:
+        """
+        Decide quais arquivos já existentes serão lidos ao iniciar a captura.
+
+        Arquivos já no índice são ignorados. Os que ainda não estão nele só
+        são lidos se foram gravados depois da última atualização do índice
+        (por exemplo, com o programa fechado); na primeira execução, os
+        arquivos antigos da pasta são apenas registrados.
+        """
+        files = self._get_telemetry_files()
+        updated = self.processed_index.updated
+        resume, old = [], []
+        for file_path in files:
+            if self.processed_index.is_processed(file_path):
+                continue
+            if updated is not None and os.path.getmtime(file_path) > updated:
+                resume.append(file_path)
+            else:
+                old.append(file_path)
+        if old:
+            self.processed_index.mark_many(old)
+        if resume:
+            logger.info(f"{len(resume)} arquivos gravados desde a última execução serão processados")
+        return resume
+
+    def _on_file_ready(self, file_path: str, key):
+        """Recebe um arquivo estável do watcher (thread do watcher)."""
+        if self.processed_index.is_processed(file_path, key):
+            return
+        self.last_check_time = time.time()
+        if file_path.lower().endswith(".ldx"):
+            # LDX é pequeno e traz a sessão: lido na hora, antes dos LD
+            self._process_ldx_file(file_path)
+            self.processed_index.mark(file_path, key)
+            return
         with self.data_lock:
-            return copy.deepcopy(self.telemetry_data)
+            if self.executor is None or file_path in self.pending_files:
+                return
+            self.pending_files.add(file_path)
+        future = self.executor.submit(self._process_ld_file, file_path)
+        future.add_done_callback(lambda f, path=file_path, key=key: self._ld_file_done(path, key, f))
 
-    def _watch_folder(self):
-        """Monitora a pasta MoTeC por novos arquivos (executado em thread)."""
-        logger.info(f"Monitorando pasta: {self.motec_folder}")
-        while not self.stop_event.is_set():
-            try:
-                current_files = set(self._get_telemetry_files())
-                new_files = current_files - self.processed_files
-                
-                if new_files:
-                    logger.info(f"Novos arquivos detectados: {len(new_files)}")
-                    # Prioriza processar LDX para info de sessão, depois LD
-                    new_ldx = sorted([f for f in new_files if f.lower().endswith(".ldx")])
-                    new_ld = sorted([f for f in new_files if f.lower().endswith(".ld")])
-                    
-                    for file_path in new_ldx:
-                        self._process_ldx_file(file_path)
-                        self.processed_files.add(file_path)
-                        
-                    for file_path in new_ld:
-                        self._process_ld_file(file_path)
-                        self.processed_files.add(file_path)
-                        
-                self.last_check_time = time.time()
-            except Exception as e:
-                logger.error(f"Erro no loop de monitoramento: {e}")
-            
-            # Espera antes da próxima verificação
-            self.stop_event.wait(5.0) # Verifica a cada 5 segundos
-        logger.info("Monitoramento da pasta MoTeC finalizado.")
+    def _ld_file_done(self, file_path: str, key, future):
+        with self.data_lock:
+            self.pending_files.discard(file_path)
+        if future.cancelled():
+            return
+        if future.result():
+            self.processed_index.mark(file_path, key)
 
     def _get_telemetry_files(self) -> List[str]:
         """Retorna lista de arquivos LD e LDX na pasta MoTeC."""
@@ -405,9 +437,9 @@ class LMUTelemetryCapture:
             # Atualiza a sessão principal com lock
             with self.data_lock:
                  # Mescla, mantendo dados existentes se não encontrados no LDX
-                 current_session = self.telemetry_data.get("session", {})
+                 current_session = dict(self.lap_store.session)
                  current_session.update(session_info)
-                 self.telemetry_data["session"] = current_session
+                 self.lap_store.set_session(current_session)
                  
             logger.info(f"Informações da sessão atualizadas pelo LDX: {session_info}")
             
@@ -416,8 +448,13 @@ class LMUTelemetryCapture:
         except Exception as e:
             logger.error(f"Erro ao processar arquivo LDX {file_path}: {e}")
 
-    def _process_ld_file(self, file_path: str):
-        """Processa um arquivo LD para obter dados de voltas."""
+    def _process_ld_file(self, file_path: str) -> bool:
+        """
+        Processa um arquivo LD para obter dados de voltas.
+
+        Returns:
+            True se o arquivo foi lido (mesmo sem voltas), False em caso de erro
+        """
         logger.info(f"Processando arquivo LD: {file_path}")
         try:
             parser = LDParser(file_path)
@@ -425,19 +462,27 @@ class LMUTelemetryCapture:
             
             # Extrai as voltas processadas
             new_laps = parsed_data.get("laps", [])
+
+            # Completa a sessão com o cabeçalho do LD sem sobrescrever o LDX
+            ld_session = parsed_data.get("session", {})
+            if ld_session:
+                with self.data_lock:
+                    current_session = dict(ld_session)
+                    current_session.update(self.lap_store.session)
+                    self.lap_store.set_session(current_session)
             
             if new_laps:
                 # Adiciona as novas voltas aos dados principais com lock
                 with self.data_lock:
                     # Evita duplicatas (baseado no número da volta, pode precisar de lógica melhor)
-                    existing_lap_numbers = {lap.get("lap_number") for lap in self.telemetry_data.get("laps", [])}
+                    existing_lap_numbers = {lap.get("lap_number") for lap in self.lap_store.laps}
                     laps_to_add = [lap for lap in new_laps if lap.get("lap_number") not in existing_lap_numbers]
-                    self.telemetry_data["laps"].extend(laps_to_add)
-                    # Ordena as voltas pelo número
-                    self.telemetry_data["laps"].sort(key=lambda x: x.get("lap_number", 0))
+                    # Publica as voltas mantendo a ordem pelo número
+                    self.lap_store.add_laps(laps_to_add, sort=True)
                     logger.info(f"{len(laps_to_add)} novas voltas adicionadas do arquivo {file_path}")
             else:
                  logger.warning(f"Nenhuma volta processada do arquivo LD: {file_path}")
+            return True
 
         except FileNotFoundError:
              logger.error(f"Arquivo LD não encontrado durante processamento: {file_path}")
@@ -445,6 +490,7 @@ class LMUTelemetryCapture:
              logger.error(f"Erro de valor ao processar LD {file_path}: {ve}")
         except Exception as e:
             logger.error(f"Erro inesperado ao processar arquivo LD {file_path}: {e}")
+        return False
 
     def _update_session_info(self):
         """Tenta atualizar info da sessão a partir do LDX mais recente."""
@@ -472,8 +518,8 @@ class LMUTelemetryCapture:
             file_name = f"lmu_{track}_{car}_{timestamp}.json"
             file_path = os.path.join(telemetry_dir, file_name)
             
-            with open(file_path, "w") as f:
-                json.dump(telemetry_data_to_save, f, indent=2)
+            # Manifesto JSON + arquivo .dat com os canais em arrays
+            save_session(telemetry_data_to_save, file_path)
             
             logger.info(f"Dados de telemetria LMU salvos em: {file_path}")
             return file_path
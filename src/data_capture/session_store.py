@@ -0,0 +1,187 @@
+"""
+Formato binário colunar para sessões de telemetria capturadas.
+
+Uma sessão é salva em dois arquivos:
+
+- um manifesto JSON pequeno com a sessão, os metadados de cada volta e,
+  para cada canal da volta, o dtype, a forma e a posição no arquivo de dados;
+- um arquivo de dados (``.dat``) com os arrays de todos os canais gravados
+  um após o outro, alinhados em 64 bytes.
+
+Ao carregar, o arquivo de dados é mapeado em memória e cada canal é uma
+visão sobre o mapeamento, então nada é lido até ser usado e nenhum
+dicionário por amostra é criado. O ``.npz`` foi evitado porque os membros
+de um zip não podem ser mapeados em memória.
+"""
+
+import os
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.parsers.csv_parser import ColumnarDataPoints
+
+logger = logging.getLogger("race_telemetry_api.session_store")
+
+SESSION_FORMAT = "rta-session"
+SESSION_VERSION = 1
+DATA_SUFFIX = ".dat"
+ALIGNMENT = 64
+
+# Chaves da volta que viram arrays no arquivo de dados
+_SAMPLE_KEYS = ("data_points", "columns")
+
+
+def data_file_for(manifest_path: str) -> str:
+    """Caminho do arquivo de dados que acompanha um manifesto."""
+    return os.path.splitext(manifest_path)[0] + DATA_SUFFIX
+
+
+def is_session_manifest(data: Any) -> bool:
+    """Verifica se um JSON já carregado é um manifesto de sessão binária."""
+    return isinstance(data, dict) and data.get("format") == SESSION_FORMAT
+
+
+def lap_columns(lap: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Retorna os canais de uma volta como arrays.
+
+    Usa ``lap["columns"]`` quando a volta já é colunar; caso contrário monta
+    as colunas a partir da lista de pontos (um passo por canal).
+    """
+    columns = lap.get("columns")
+    if columns is not None:
+        return {name: np.asarray(values) for name, values in columns.items()}
+
+    points = lap.get("data_points") or []
+    if isinstance(points, ColumnarDataPoints):
+        return points.columns()
+    if not len(points):
+        return {}
+
+    columns = {}
+    for name in points[0]:
+        values = [point.get(name) for point in points]
+        try:
+            array = np.asarray(values)
+            if array.dtype == object:
+                # None no meio dos valores numéricos vira NaN
+                array = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            logger.warning(f"Canal '{name}' ignorado: valores não numéricos")
+            continue
+        if array.dtype.kind not in "biufU":
+            logger.warning(f"Canal '{name}' ignorado: tipo {array.dtype} não suportado")
+            continue
+        columns[name] = array
+    return columns
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def save_session(telemetry_data: Dict[str, Any], manifest_path: str) -> str:
+    """
+    Salva uma sessão no formato binário colunar.
+
+    Args:
+        telemetry_data: Dicionário com "session" e "laps"
+        manifest_path: Caminho do manifesto JSON; o arquivo de dados é criado
+            ao lado, com a extensão ``.dat``
+
+    Returns:
+        Caminho do manifesto
+    """
+    data_path = data_file_for(manifest_path)
+    manifest = {
+        "format": SESSION_FORMAT,
+        "version": SESSION_VERSION,
+        "data_file": os.path.basename(data_path),
+        "session": telemetry_data.get("session", {}),
+        "laps": [],
+    }
+
+    offset = 0
+    with open(data_path, "wb") as data_file:
+        for lap in telemetry_data.get("laps", []):
+            lap_info = {k: v for k, v in lap.items() if k not in _SAMPLE_KEYS}
+            channels = {}
+            num_samples = 0
+            for name, values in lap_columns(lap).items():
+                values = np.ascontiguousarray(values)
+                padding = -offset % ALIGNMENT
+                if padding:
+                    data_file.write(b"\0" * padding)
+                    offset += padding
+                channels[name] = {
+                    "dtype": values.dtype.str,
+                    "shape": list(values.shape),
+                    "offset": offset,
+                }
+                values.tofile(data_file)
+                offset += values.nbytes
+                num_samples = max(num_samples, len(values))
+            lap_info["num_samples"] = num_samples
+            lap_info["channels"] = channels
+            manifest["laps"].append(lap_info)
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, default=_json_default)
+
+    return manifest_path
+
+
+def load_session(manifest_path: str, mmap: bool = True,
+                 manifest: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Carrega uma sessão salva por ``save_session``.
+
+    Args:
+        manifest_path: Caminho do manifesto JSON
+        mmap: Se True, os canais são visões de um mapeamento somente leitura
+            do arquivo de dados; se False, o arquivo é lido para a memória
+        manifest: Manifesto já carregado (evita ler o JSON de novo)
+
+    Returns:
+        Dicionário com "session" e "laps". Cada volta tem "columns" (canal ->
+        array) e "data_points", uma visão preguiçosa (ColumnarDataPoints) que
+        só cria o dicionário de um ponto quando ele é acessado.
+    """
+    if manifest is None:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+    if not is_session_manifest(manifest):
+        raise ValueError(f"Arquivo não é um manifesto de sessão: {manifest_path}")
+    if manifest.get("version", 0) > SESSION_VERSION:
+        raise ValueError(f"Versão de sessão não suportada: {manifest.get('version')}")
+
+    data_path = os.path.join(os.path.dirname(manifest_path), manifest["data_file"])
+    if os.path.getsize(data_path) == 0:
+        raw = np.zeros(0, dtype=np.uint8)
+    elif mmap:
+        raw = np.memmap(data_path, dtype=np.uint8, mode="r")
+    else:
+        raw = np.fromfile(data_path, dtype=np.uint8)
+
+    laps = []
+    for lap_info in manifest.get("laps", []):
+        lap = {k: v for k, v in lap_info.items() if k not in ("channels", "num_samples")}
+        columns = {}
+        for name, channel in lap_info.get("channels", {}).items():
+            dtype = np.dtype(channel["dtype"])
+            shape = tuple(channel["shape"])
+            count = int(np.prod(shape)) if shape else 1
+            start = channel["offset"]
+            columns[name] = raw[start:start + count * dtype.itemsize].view(dtype).reshape(shape)
+        lap["columns"] = columns
+        lap["data_points"] = ColumnarDataPoints(columns)
+        laps.append(lap)
+
+    return {"session": manifest.get("session", {}), "laps": laps}
@@ -0,0 +1,152 @@
+"""
+Snapshots de telemetria sem cópia profunda.
+
+As voltas completas são congeladas ao serem publicadas e passam a ser
+compartilhadas por referência entre a thread de captura e quem lê os dados.
+O estado publicado (versão, sessão e voltas) é uma tupla imutável trocada
+por inteiro a cada atualização, então a leitura não precisa do lock da
+captura: basta pegar a referência atual.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+def _readonly(*args, **kwargs):
+    raise TypeError("Voltas completas são imutáveis")
+
+
+class FrozenLap(dict):
+    """
+    Volta completa imutável.
+
+    Continua sendo um dict para os consumidores existentes (``lap.get(...)``,
+    ``json.dump``), mas não aceita alterações. Os pontos de dados ficam numa
+    tupla e não devem ser modificados.
+    """
+
+    __slots__ = ("version", )
+
+    def __init__(self, lap: Dict[str, Any], version: int = 0):
+        lap = dict(lap)
+        if isinstance(lap.get("data_points"), list):
+            lap["data_points"] = tuple(lap["data_points"])
+        if isinstance(lap.get("sectors"), list):
+            lap["sectors"] = tuple(lap["sectors"])
+        super().__init__(lap)
+        self.version = version
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = __ior__ = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenLap, (dict(self), self.version))
+
+
+@dataclass(frozen=True)
+class TelemetrySnapshot:
+    """
+    Estado da captura num instante.
+
+    Attributes:
+        version: Versão das voltas completas, aumenta a cada volta publicada
+        session: Informações da sessão
+        laps: Voltas completas (compartilhadas, imutáveis)
+        current_lap: Volta em andamento, com ``samples`` como visão somente
+            leitura das amostras já gravadas, ou None
+    """
+    version: int
+    session: Dict[str, Any]
+    laps: Tuple[FrozenLap, ...]
+    current_lap: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Formato de ``get_telemetry_data``, sem copiar as voltas."""
+        return {"session": dict(self.session), "laps": list(self.laps)}
+
+
+class LapStore:
+    """
+    Voltas completas publicadas por uma única thread de captura.
+
+    As escritas acontecem na thread de captura (ou sob o lock dela); as
+    leituras podem vir de qualquer thread sem lock.
+    """
+
+    def __init__(self):
+        self._state = (0, {}, ())
+
+    @property
+    def version(self) -> int:
+        return self._state[0]
+
+    @property
+    def session(self) -> Dict[str, Any]:
+        return self._state[1]
+
+    @property
+    def laps(self) -> Tuple[FrozenLap, ...]:
+        return self._state[2]
+
+    def set_session(self, session: Dict[str, Any]):
+        """Publica novas informações da sessão."""
+        (version, _, laps) = self._state
+        self._state = (version, dict(session), laps)
+
+    def add_lap(self, lap: Dict[str, Any]) -> FrozenLap:
+        """Congela e publica uma volta completa."""
+        return self.add_laps([lap])[0]
+
+    def add_laps(self, laps: Iterable[Dict[str, Any]], sort: bool = False) -> Tuple[FrozenLap, ...]:
+        """
+        Congela e publica várias voltas de uma vez.
+
+        Args:
+            laps: Voltas a adicionar
+            sort: Se True, mantém as voltas ordenadas pelo número
+
+        Returns:
+            As voltas publicadas
+        """
+        (version, session, current) = self._state
+        version += 1
+        added = tuple(FrozenLap(lap, version) for lap in laps)
+        if not added:
+            return added
+        new = current + added
+        if sort:
+            new = tuple(sorted(new, key=lambda lap: lap.get("lap_number", 0)))
+        self._state = (version, session, new)
+        return added
+
+    def clear_laps(self):
+        """Remove as voltas, mantendo a sessão. A versão continua crescendo."""
+        (version, session, _) = self._state
+        self._state = (version + 1, session, ())
+
+    def laps_since(self, version: int) -> Tuple[int, Tuple[FrozenLap, ...]]:
+        """
+        Voltas publicadas depois de uma versão.
+
+        Args:
+            version: Versão já vista por quem chama (0 para todas)
+
+        Returns:
+            (versão atual, voltas novas)
+        """
+        (current, _, laps) = self._state
+        if version > current:
+            # Versão de outro LapStore, devolve todas as voltas
+            version = 0
+        return current, tuple(lap for lap in laps if lap.version > version)
+
+    def snapshot(self, current_lap: Optional[Dict[str, Any]] = None) -> TelemetrySnapshot:
+        (version, session, laps) = self._state
+        return TelemetrySnapshot(version, session, laps, current_lap)
+
@@ -49,9 +49,13 @@ try:
     from src.parsers.ldx_xml_parser import parse_ldx_xml
     # Import do parser LD
     from src.parsers.ld_parser_wrapper import parse_ld_telemetry
+    # Cache em disco de arquivos parseados e análises
+    from src.analysis.analysis_cache import AnalysisCache
     # Import Core components
     from src.core.realtime_analyzer import RealTimeAnalyzer
     from src.realtime.realtime_manager import RealtimeTelemetryManager # Importa o gerenciador de telemetria em tempo real
+    from src.ui.realtime_bridge import RealtimeBridge
+    from src.realtime.stream_analyzer import LapResult
     
 except ImportError as e:
     logger.critical(f"Erro fatal ao importar dependências PyQt, UI ou Core: {str(e)}", exc_info=True)
@@ -72,6 +76,7 @@ class MainWindow(QMainWindow):
         super().__init__()
         logger.info("Inicializando MainWindow com Sistema de Paginação...")
         self.current_telemetry_data: Optional[Dict[str, Any]] = None
+        self.current_file_digest: Optional[str] = None
         
         self.setWindowTitle("Race Telemetry Analyzer - Professional")
         self.setMinimumSize(1400, 900)
@@ -81,7 +86,10 @@ class MainWindow(QMainWindow):
         
         # Inicializa Core Components
         self.analyzer = RealTimeAnalyzer(self)
+        self.analysis_cache = AnalysisCache() # ~/RaceTelemetryAnalyzer/cache
         self.realtime_manager = RealtimeTelemetryManager() # Instancia o gerenciador de telemetria em tempo real
+        self.realtime_bridge = RealtimeBridge(parent=self) # Agrupa os pacotes em tempo real por quadro
+        self._realtime_status: Dict[str, Any] = {}
         
         self._setup_paginated_interface()
         self._setup_statusbar()
@@ -173,6 +181,10 @@ class MainWindow(QMainWindow):
         self.analyzer.analysis_feedback.connect(self.on_analysis_feedback)
         self.analyzer.analysis_progress.connect(self.on_analysis_progress)
         
+        # Telemetria em tempo real, em lotes na thread da UI
+        self.realtime_bridge.batch_ready.connect(self._handle_realtime_batch)
+        self.realtime_bridge.analysis_ready.connect(self._handle_realtime_analysis)
+        
         # Conecta o sinal de análise finalizada ao AdvancedAnalysisWidget
         if isinstance(self.advanced_analysis_widget, AdvancedAnalysisWidget):
             self.analyzer.analysis_finished.connect(self.advanced_analysis_widget.update_analysis_results)
@@ -258,17 +270,19 @@ class MainWindow(QMainWindow):
             logger.info(f"Arquivo selecionado: {filepath}")
             try:
                 if filepath.lower().endswith(".ldx"):
-                    self.current_telemetry_data = parse_ldx_xml(filepath)
-                    logger.info("Arquivo LDX XML parseado com sucesso.")
+                    parser = parse_ldx_xml
                 elif filepath.lower().endswith(".ld"):
-                    self.current_telemetry_data = parse_ld_telemetry(filepath)
-                    logger.info("Arquivo LD parseado com sucesso.")
+                    parser = parse_ld_telemetry
                 elif filepath.lower().endswith(".csv"):
                     from src.parsers.csv_parser import parse_csv_telemetry
-                    self.current_telemetry_data = parse_csv_telemetry(filepath)
-                    logger.info("Arquivo CSV parseado com sucesso.")
+                    parser = parse_csv_telemetry
                 else:
                     raise ValueError("Formato de arquivo não suportado (apenas .ldx XML, .ld e .csv por enquanto).")
+                
+                # Reabrir o mesmo arquivo reaproveita o resultado do parse
+                self.current_telemetry_data, self.current_file_digest = self.analysis_cache.load_file(
+                    filepath, parser, {"parser": parser.__name__})
+                logger.info(f"Arquivo {os.path.splitext(filepath)[1]} carregado com sucesso.")
                     
                 self.status_label.setText(f"Arquivo carregado: {os.path.basename(filepath)}")
                 # Enable analysis start button
@@ -294,6 +308,7 @@ class MainWindow(QMainWindow):
                 logger.error(f"Erro ao carregar ou parsear arquivo {filepath}", exc_info=True)
                 QMessageBox.critical(self, "Erro ao Carregar Arquivo", f"Não foi possível carregar ou ler o arquivo:\n{e}")
                 self.current_telemetry_data = None
+                self.current_file_digest = None
                 if isinstance(self.dashboard_widget, DashboardWidget):
                      self.dashboard_widget.update_analysis_buttons(file_loaded=False, is_running=False)
         else:
@@ -303,7 +318,10 @@ class MainWindow(QMainWindow):
     def start_analysis(self):
         logger.info("Slot: Iniciar análise solicitado.")
         if self.current_telemetry_data:
-            self.analyzer.start_analysis(self.current_telemetry_data)
+            cache_key = None
+            if self.current_file_digest:
+                cache_key = self.analysis_cache.make_key(self.current_file_digest, "analysis")
+            self.analyzer.start_analysis(self.current_telemetry_data, cache=self.analysis_cache, cache_key=cache_key)
         else:
             logger.warning("Tentativa de iniciar análise sem dados carregados.")
             QMessageBox.warning(self, "Nenhum Dado", "Carregue um arquivo de telemetria antes de iniciar a análise.")
@@ -334,7 +352,7 @@ class MainWindow(QMainWindow):
             
             # Para o gerenciador de tempo real
             if hasattr(self, 'realtime_manager') and self.realtime_manager:
-                self.realtime_manager.stop_all_collectors()
+                self.realtime_manager.shutdown()
             
             # Aguarda um pouco para as threads terminarem
             import time
@@ -351,81 +369,63 @@ class MainWindow(QMainWindow):
         self.status_label.setText(f"Conectando ao {game}...")
         if isinstance(self.dashboard_widget, DashboardWidget) and hasattr(self.dashboard_widget, 'update_realtime_buttons'):
             self.dashboard_widget.update_realtime_buttons(is_running=True)
-        self.realtime_manager.start_collector(game, self._handle_realtime_data)
+        self._realtime_status.clear()
+        self.realtime_manager.start_collector(game, self.realtime_bridge.push,
+                                              analysis_callback=self.realtime_bridge.push_analysis)
 
     @pyqtSlot()
     def on_stop_realtime(self):
         logger.info("Slot: Parar telemetria em tempo real solicitado.")
         self.status_label.setText("Desconectando...")
         self.realtime_manager.stop_all_collectors()
+        self.realtime_bridge.clear()
         if isinstance(self.dashboard_widget, DashboardWidget) and hasattr(self.dashboard_widget, 'update_realtime_buttons'):
             self.dashboard_widget.update_realtime_buttons(is_running=False)
         self.status_label.setText("Pronto")
 
-    def _handle_realtime_data(self, data: Dict[str, Any]):
-        """Callback para processar dados de telemetria em tempo real."""
-        # logger.debug(f"Dados RT recebidos: {data.get("speed", "N/A")} km/h")
-        # Atualiza status da conexão no dashboard se os atributos existirem
+    @pyqtSlot(object)
+    def _handle_realtime_batch(self, batch):
+        """Atualiza a UI com as amostras em tempo real recebidas desde o último quadro."""
+        data = batch.latest
+        # Atualiza status e métricas do dashboard, só quando mudam
         if isinstance(self.dashboard_widget, DashboardWidget):
-            # Verifica se os atributos existem antes de tentar acessá-los
-            if hasattr(self.dashboard_widget, 'connection_status') and hasattr(self.dashboard_widget.connection_status, 'set_status'):
-                try:
-                    self.dashboard_widget.connection_status.set_status("Ativa", "success")
-                except AttributeError:
-                    pass
-                    
-            if hasattr(self.dashboard_widget, 'simulator_status') and hasattr(self.dashboard_widget.simulator_status, 'set_status'):
-                try:
-                    self.dashboard_widget.simulator_status.set_status(data.get("game", "N/A"), "neutral")
-                except AttributeError:
-                    pass
-                    
-            if hasattr(self.dashboard_widget, 'track_status') and hasattr(self.dashboard_widget.track_status, 'set_status'):
-                try:
-                    self.dashboard_widget.track_status.set_status(data.get("track", "N/A"), "neutral")
-                except AttributeError:
-                    pass
-                    
-            if hasattr(self.dashboard_widget, 'car_status') and hasattr(self.dashboard_widget.car_status, 'set_status'):
-                try:
-                    self.dashboard_widget.car_status.set_status(data.get("car", "N/A"), "neutral")
-                except AttributeError:
-                    pass
-            
-            # Atualiza métricas rápidas se os métodos existirem
-            if hasattr(self.dashboard_widget, 'total_laps') and hasattr(self.dashboard_widget.total_laps, 'set_status'):
-                try:
-                    self.dashboard_widget.total_laps.set_status(str(data.get("lap_number", 0)), "neutral")
-                except AttributeError:
-                    pass
-                    
-            if hasattr(self.dashboard_widget, 'best_lap') and hasattr(self.dashboard_widget.best_lap, 'set_status'):
-                try:
-                    self.dashboard_widget.best_lap.set_status(self.dashboard_widget.format_time(data.get("lap_time", 0)), "neutral")
-                except AttributeError:
-                    pass
-                    
-            if hasattr(self.dashboard_widget, 'avg_lap') and hasattr(self.dashboard_widget.avg_lap, 'set_status'):
-                try:
-                    self.dashboard_widget.avg_lap.set_status(self.dashboard_widget.format_time(data.get("lap_time", 0)), "neutral") # Placeholder
-                except AttributeError:
-                    pass
-                    
-            if hasattr(self.dashboard_widget, 'session_time') and hasattr(self.dashboard_widget.session_time, 'set_status'):
-                try:
-                    self.dashboard_widget.session_time.set_status(self.dashboard_widget.format_time(data.get("session_time", 0)), "neutral") # Placeholder
-                except AttributeError:
-                    pass
-
-        # Passa os dados para o visualizador de telemetria
+            format_time = getattr(self.dashboard_widget, 'format_time', str)
+            statuses = {
+                'connection_status': ("Ativa", "success"),
+                'simulator_status': (data.get("game", "N/A"), "neutral"),
+                'track_status': (data.get("track", "N/A"), "neutral"),
+                'car_status': (data.get("car", "N/A"), "neutral"),
+                'total_laps': (str(data.get("lap_number", 0)), "neutral"),
+                'best_lap': (format_time(data.get("lap_time", 0)), "neutral"),
+                'avg_lap': (format_time(data.get("lap_time", 0)), "neutral"), # Placeholder
+                'session_time': (format_time(data.get("session_time", 0)), "neutral"), # Placeholder
+            }
+            for (name, status) in statuses.items():
+                if self._realtime_status.get(name) == status:
+                    continue
+                self._realtime_status[name] = status
+                widget = getattr(self.dashboard_widget, name, None)
+                if hasattr(widget, 'set_status'):
+                    widget.set_status(*status)
+
+        # Passa o lote para o visualizador de telemetria
         if isinstance(self.telemetry_visualizer, ModernTelemetryWidget):
-            # O TelemetryWidget precisa de um método para receber dados em tempo real
-            # Vamos criar um método `update_realtime_telemetry` nele.
-            self.telemetry_visualizer.update_realtime_telemetry(data)
+            self.telemetry_visualizer.update_realtime_telemetry(batch)
 
         # TODO: Passar dados para o AdvancedAnalysisWidget para análise em tempo real
         # if isinstance(self.advanced_analysis_widget, AdvancedAnalysisWidget):
-        #     self.advanced_analysis_widget.update_realtime_data(data)
+        #     self.advanced_analysis_widget.update_realtime_data(batch)
+
+    def _handle_realtime_analysis(self, result):
+        """Mostra cada setor e volta concluídos na sessão ao vivo."""
+        delta = f" ({result.delta:+.3f}s)" if result.delta is not None else ""
+        if isinstance(result, LapResult):
+            best = " - melhor volta" if result.best else ""
+            message = f"Volta {result.lap_number}: {result.lap_time:.3f}s{delta}{best}"
+            logger.info(message)
+        else:
+            message = f"Volta {result.lap_number}, setor {result.sector}: {result.time:.3f}s{delta}"
+        self.status_label.setText(message)
 
 
 def main():
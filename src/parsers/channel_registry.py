@@ -0,0 +1,302 @@
+"""
+Registro canônico dos canais de telemetria.
+
+Os ids canônicos são as chaves de ``stm/channels.py`` (speed, throttle,
+steer, glat, posx...), mais os canais que só o analisador usa (time,
+distance, sector). Cada canal aceita o nome e o nome curto do MoTeC
+definidos no stm e os apelidos usados pelos jogos e exportações (ACC, LMU,
+CSV do MoTeC). A comparação ignora maiúsculas, espaços e pontuação.
+
+A lista de canais de um arquivo é resolvida uma única vez (com cache) num
+ChannelMap, que diz qual coluna do arquivo corresponde a cada id, a unidade
+canônica e a escala para chegar nela. Depois disso os analisadores indexam
+as colunas pelo id, sem testar apelidos amostra por amostra.
+"""
+
+import re
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from ..stm.channels import CHANNELS
+except ImportError:
+    # importado como módulo de topo, com src no path
+    from stm.channels import CHANNELS
+
+logger = logging.getLogger(__name__)
+
+# Canais do analisador que não existem nos loggers do stm
+EXTRA_CHANNELS = {
+    "time": {"name": "Time", "shortname": "Time", "units": "s"},
+    "distance": {"name": "Lap Distance", "shortname": "Dist", "units": "m"},
+    "sector": {"name": "Sector", "shortname": "Sector", "units": ""},
+}
+
+# Apelidos usados pelos jogos e formatos de exportação, além dos nomes do stm
+ALIASES = {
+    "time": ["Timestamp", "Session Time", "Elapsed Time", "TimeOfDay"],
+    "distance": ["Distance", "Lap Dist", "Track Distance", "distanceTraveled"],
+    "sector": ["Sector Index", "Current Sector", "currentSectorIndex"],
+    "lap": ["Laps", "Lap Count", "Lap Number", "completedLaps"],
+    "laptime": ["Current Lap Time"],
+    "beacon": ["Lap Beacon"],
+    "speed": ["Speed", "Ground Speed", "Vel", "Velocity", "speedKmh"],
+    "rpm": ["Engine RPM", "rpms"],
+    "gear": ["Current Gear", "Selected Gear"],
+    "throttle": ["Throttle", "TPS", "Accel", "Throttle Pos", "Accelerator Pedal Pos", "gas"],
+    "brake": ["Brake", "Brake Press", "Brake Pressure", "Brake Pos", "Brake Pedal Pos"],
+    "clutch": ["Clutch"],
+    "steer": ["Steering", "Steer Angle", "Steering Angle", "Steering Wheel Angle", "steerAngle"],
+    "glat": ["Lateral G", "G Lat"],
+    "glong": ["Longitudinal G", "G Long"],
+    "posx": ["X", "Pos X", "GPS Pos X", "X Pos", "Car Pos X", "WorldPosX"],
+    "posy": ["Y", "Pos Y", "GPS Pos Y", "Y Pos", "Car Pos Y", "WorldPosY"],
+    "posz": ["Z", "Pos Z", "GPS Pos Z", "Z Pos", "Car Pos Z", "WorldPosZ"],
+    "lat": ["Lat", "GPS Lat", "Latitude"],
+    "long": ["Long", "GPS Long", "Longitude"],
+    "fuellevel": ["Fuel"],
+    "tyretempfl": ["Tire Temp FL"],
+    "tyretempfr": ["Tire Temp FR"],
+    "tyretemprl": ["Tire Temp RL"],
+    "tyretemprr": ["Tire Temp RR"],
+}
+
+# Nomes equivalentes de unidades
+_UNIT_NAMES = {
+    "kmh": "kph", "km/h": "kph", "kph": "kph",
+    "m/s": "m/s", "mps": "m/s",
+    "mph": "mph",
+    "°c": "C", "degc": "C", "c": "C",
+    "°f": "F", "degf": "F", "f": "F",
+    "k": "K",
+    "ms-1": "m/s",
+    "sec": "s", "s": "s",
+    "ms": "ms", "msec": "ms",
+    "km": "km", "m": "m",
+    "g": "G",
+    "m/s2": "m/s/s", "m/s^2": "m/s/s", "m/s/s": "m/s/s",
+    "psi": "psi", "kpa": "kPa", "bar": "bar",
+}
+
+# (unidade de origem, unidade canônica) -> (escala, deslocamento)
+CONVERSIONS = {
+    ("m/s", "kph"): (3.6, 0.0),
+    ("mph", "kph"): (1.609344, 0.0),
+    ("F", "C"): (5.0 / 9.0, -32.0 * 5.0 / 9.0),
+    ("K", "C"): (1.0, -273.15),
+    ("ms", "s"): (0.001, 0.0),
+    ("km", "m"): (1000.0, 0.0),
+    ("m/s/s", "G"): (1.0 / 9.80665, 0.0),
+    ("psi", "kPa"): (6.894757, 0.0),
+    ("bar", "kPa"): (100.0, 0.0),
+}
+
+
+def normalize_name(name: str) -> str:
+    """Forma usada na comparação: minúsculas, só letras e números."""
+    return re.sub(r"[^0-9a-z]", "", str(name).lower())
+
+
+def normalize_unit(unit: Optional[str]) -> str:
+    """Nome padrão de uma unidade (vazio se desconhecida)."""
+    if not unit:
+        return ""
+    unit = str(unit).strip()
+    return _UNIT_NAMES.get(unit.lower().replace(" ", ""), unit)
+
+
+@dataclass(frozen=True)
+class ChannelInfo:
+    """Definição de um canal canônico."""
+    id: str
+    name: str
+    units: str
+    aliases: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ResolvedChannel:
+    """
+    Canal canônico encontrado num arquivo.
+
+    Attributes:
+        id: Id canônico
+        source: Nome da coluna no arquivo
+        units: Unidade canônica
+        scale, offset: Conversão valor_canônico = valor * scale + offset
+    """
+    id: str
+    source: str
+    units: str
+    scale: float = 1.0
+    offset: float = 0.0
+
+    def convert(self, values) -> np.ndarray:
+        """Converte os valores da coluna para a unidade canônica."""
+        values = np.asarray(values, dtype=np.float64)
+        if self.scale != 1.0 or self.offset != 0.0:
+            values = values * self.scale + self.offset
+        return values
+
+
+def _build_registry() -> Tuple[Dict[str, ChannelInfo], Dict[str, str]]:
+    registry = {}
+    primary = {}
+    definitions = dict(CHANNELS)
+    definitions.update(EXTRA_CHANNELS)
+    for (channel_id, definition) in definitions.items():
+        units = definition.get("units", "")
+        if isinstance(units, list):
+            # O stm lista métrica e imperial; o canônico é o métrico
+            units = units[0]
+        names = [name for name in (channel_id, definition.get("name"), definition.get("shortname")) if name]
+        primary[channel_id] = names
+        aliases = tuple(names + ALIASES.get(channel_id, []))
+        registry[channel_id] = ChannelInfo(channel_id, definition.get("name", channel_id), units, aliases)
+
+    # Id e nomes do próprio canal têm prioridade sobre apelidos de outros canais
+    lookup = {}
+    for (channel_id, names) in primary.items():
+        for name in names:
+            lookup.setdefault(normalize_name(name), channel_id)
+    for (channel_id, aliases) in ALIASES.items():
+        for name in aliases:
+            lookup.setdefault(normalize_name(name), channel_id)
+    return registry, lookup
+
+
+REGISTRY, _LOOKUP = _build_registry()
+
+
+def canonical_id(name: str) -> Optional[str]:
+    """Id canônico de um nome de canal, ou None."""
+    return _LOOKUP.get(normalize_name(name))
+
+
+def channel_info(channel_id: str) -> ChannelInfo:
+    """Definição de um canal canônico."""
+    return REGISTRY[channel_id]
+
+
+class ChannelMap(Mapping):
+    """
+    Canais canônicos encontrados num arquivo: id -> ResolvedChannel.
+
+    Quando mais de uma coluna corresponde ao mesmo id, vale a primeira.
+    """
+
+    def __init__(self, channels: Dict[str, ResolvedChannel], unresolved: Tuple[str, ...] = ()):
+        self._channels = channels
+        self.unresolved = unresolved
+
+    def __getitem__(self, channel_id: str) -> ResolvedChannel:
+        return self._channels[channel_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._channels)
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def __repr__(self) -> str:
+        return f"ChannelMap({ {k: v.source for (k, v) in self._channels.items()} })"
+
+    def source(self, channel_id: str, default: Optional[str] = None) -> Optional[str]:
+        """Nome da coluna do arquivo para o id (ou ``default``)."""
+        channel = self._channels.get(channel_id)
+        return channel.source if channel else default
+
+    def first(self, *channel_ids: str) -> Optional[str]:
+        """Primeiro dos ids presente no arquivo."""
+        for channel_id in channel_ids:
+            if channel_id in self._channels:
+                return channel_id
+        return None
+
+    def columns(self, data: Mapping[str, Any], ids: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Colunas canônicas, convertidas para a unidade canônica.
+
+        Args:
+            data: Colunas do arquivo por nome (dict de arrays, DataFrame...)
+            ids: Ids desejados (padrão: todos os encontrados)
+        """
+        ids = self._channels.keys() if ids is None else ids
+        result = {}
+        for channel_id in ids:
+            channel = self._channels.get(channel_id)
+            if channel is not None:
+                result[channel_id] = channel.convert(data[channel.source])
+        return result
+
+    def extract(self, data_points: Sequence[Mapping[str, Any]], ids: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Colunas canônicas de uma lista de pontos (dicionários por amostra).
+
+        Cada canal é lido com a chave já resolvida; valores ausentes viram NaN.
+        """
+        columns = getattr(data_points, "columns", None)
+        if callable(columns):
+            # ColumnarDataPoints: as colunas já existem, sem passar por dicionários
+            return self.columns(columns(), ids)
+        ids = self._channels.keys() if ids is None else ids
+        result = {}
+        for channel_id in ids:
+            channel = self._channels.get(channel_id)
+            if channel is None:
+                continue
+            source = channel.source
+            values = [point.get(source) for point in data_points]
+            result[channel_id] = channel.convert([np.nan if value is None else value for value in values])
+        return result
+
+
+@lru_cache(maxsize=256)
+def _resolve(names: Tuple[str, ...], units: Tuple[Tuple[str, str], ...]) -> ChannelMap:
+    units = dict(units)
+    channels = {}
+    unresolved = []
+    for name in names:
+        channel_id = canonical_id(name)
+        if channel_id is None:
+            unresolved.append(name)
+            continue
+        if channel_id in channels:
+            continue
+        canonical_units = REGISTRY[channel_id].units
+        (scale, offset) = (1.0, 0.0)
+        source_units = normalize_unit(units.get(name))
+        if source_units and source_units != normalize_unit(canonical_units):
+            (scale, offset) = CONVERSIONS.get((source_units, normalize_unit(canonical_units)), (1.0, 0.0))
+        channels[channel_id] = ResolvedChannel(channel_id, name, canonical_units, scale, offset)
+    return ChannelMap(channels, tuple(unresolved))
+
+
+def resolve_channels(names: Iterable[str], units: Optional[Mapping[str, str]] = None) -> ChannelMap:
+    """
+    Resolve a lista de canais de um arquivo para os ids canônicos.
+
+    O resultado é guardado em cache pela lista de nomes e unidades, então
+    arquivos e voltas com os mesmos canais compartilham o mesmo mapa.
+
+    Args:
+        names: Nomes das colunas, na ordem do arquivo
+        units: Unidade de cada coluna, quando o formato informa
+    """
+    names = tuple(str(name) for name in names)
+    units = tuple(sorted((str(k), str(v)) for (k, v) in (units or {}).items() if v))
+    return _resolve(names, units)
+
+
+def resolve_data_points(data_points: Sequence[Mapping[str, Any]]) -> ChannelMap:
+    """Resolve os canais de uma lista de pontos pelas chaves do primeiro ponto."""
+    columns = getattr(data_points, "columns", None)
+    if callable(columns):
+        return resolve_channels(columns().keys())
+    if not len(data_points):
+        return resolve_channels(())
+    return resolve_channels(data_points[0].keys())
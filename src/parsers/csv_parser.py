@@ -9,15 +9,128 @@ import csv
 import os
 import logging
 import datetime
+from collections.abc import Sequence
 from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Valores usados pelo MoTeC para amostras ausentes
+MOTEC_NA_VALUES = ["", ".."]
+
+
+def _is_header_line(line: str) -> bool:
+    """Verifica se a linha é o cabeçalho dos canais (primeiro campo igual a "Time")."""
+    return line.lstrip().startswith(('"Time"', 'Time,'))
+
+
+def _find_header_index(lines) -> int:
+    """
+    Localiza a linha de cabeçalho dos canais.
+
+    Args:
+        lines: Iterável com as linhas do arquivo
+
+    Returns:
+        Índice da linha de cabeçalho ou -1 se não encontrada
+    """
+    for i, line in enumerate(lines):
+        if _is_header_line(line):
+            return i
+    return -1
+
+
+class ColumnarDataPoints(Sequence):
+    """
+    Visão somente leitura de um intervalo de amostras armazenadas em colunas.
+
+    Cada item é um dicionário {canal: valor} construído sob demanda, com o
+    mesmo formato de `CSVTelemetryParser.data_points` no modo por linhas.
+    Amostras ausentes (NaN) são retornadas como None.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], start: int = 0, stop: Optional[int] = None):
+        self._columns = columns
+        length = len(next(iter(columns.values()))) if columns else 0
+        self._start = max(0, min(start, length))
+        self._stop = length if stop is None else max(self._start, min(stop, length))
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return ColumnarDataPoints(self._columns, self._start + start, self._start + stop)
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("índice de amostra fora do intervalo")
+
+        row = self._start + index
+        return {name: _to_python(column[row]) for name, column in self._columns.items()}
+
+    def __iter__(self):
+        # Converte em blocos para evitar o custo de indexar cada elemento NumPy
+        names = list(self._columns.keys())
+        block = 4096
+        for offset in range(self._start, self._stop, block):
+            end = min(offset + block, self._stop)
+            values = [self._columns[name][offset:end].tolist() for name in names]
+            for row in zip(*values):
+                yield {name: (None if value != value else value) for name, value in zip(names, row)}
+
+    def column(self, name: str) -> np.ndarray:
+        """Retorna a fatia (sem cópia) de um canal para este intervalo."""
+        return self._columns[name][self._start:self._stop]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Retorna as fatias (sem cópia) de todos os canais para este intervalo."""
+        return {name: self.column(name) for name in self._columns}
+
+
+def _to_python(value):
+    if getattr(value, "ndim", 0):
+        # Canal com mais de um valor por amostra (ex.: posição x, y, z)
+        return value.tolist()
+    if hasattr(value, "item"):
+        value = value.item()
+    return None if value != value else value
+
+
+def frame_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Retorna as colunas de um DataFrame como arrays NumPy, sem cópia.
+
+    Nomes repetidos: a última coluna prevalece.
+    """
+    return {column: series.to_numpy() for column, series in df.items()}
+
+
+def _is_motec_csv(file_path: str) -> bool:
+    """Verifica pela primeira linha se o arquivo é um CSV exportado pelo MoTeC."""
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as csv_file:
+        first_row = next(csv.reader([csv_file.readline()]), [])
+    return len(first_row) >= 2 and first_row[0].strip() == "Format" and first_row[1].strip() == "MoTeC CSV File"
+
+
 class CSVTelemetryParser:
     """Parser para arquivos CSV de telemetria no formato MoTeC."""
     
-    def __init__(self):
+    def __init__(self, columnar: bool = False):
+        """
+        Inicializa o parser.
+
+        Args:
+            columnar: Se True, lê o corpo numérico em um único passo para um
+                array float32 por canal, e `data_points` passa a ser uma visão
+                preguiçosa (ColumnarDataPoints) sobre essas colunas
+        """
+        self.columnar = columnar
         self.metadata = {}
         self.channels = {}
         self.units = {}
@@ -39,6 +152,9 @@ class CSVTelemetryParser:
             raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
         
         try:
+            if self.columnar:
+                return self._parse_file_columnar(file_path)
+
             with open(file_path, 'r', encoding='utf-8') as csv_file:
                 # Lê todo o arquivo em memória para processamento
                 all_lines = csv_file.readlines()
@@ -75,12 +191,8 @@ class CSVTelemetryParser:
         Args:
             all_lines: Lista com todas as linhas do arquivo
         """
-        # Procura pela linha que contém "Time" para identificar onde começam os dados
-        header_index = -1
-        for i, line in enumerate(all_lines):
-            if '"Time"' in line or 'Time' in line:
-                header_index = i
-                break
+        # Procura pela linha que começa com "Time" para identificar onde começam os dados
+        header_index = _find_header_index(all_lines)
         
         if header_index == -1:
             raise ValueError("Formato de arquivo CSV inválido: não foi possível encontrar a linha de cabeçalhos")
@@ -92,37 +204,7 @@ class CSVTelemetryParser:
                 continue
                 
             try:
-                row = next(csv.reader([line]))
-                if len(row) >= 2:
-                    key = row[0].strip('"').strip()
-                    value = row[1].strip('"').strip()
-                    
-                    if key and key != "":
-                        self.metadata[key] = value
-                        
-                        # Tratamento especial para alguns campos
-                        if key == "Venue":
-                            self.metadata["track"] = value
-                        elif key == "Vehicle":
-                            self.metadata["car"] = value
-                        elif key == "Driver":
-                            self.metadata["driver"] = value
-                        elif key == "Log Date":
-                            self.metadata["date"] = value
-                        elif key == "Log Time":
-                            self.metadata["time"] = value
-                        elif key == "Duration":
-                            try:
-                                self.metadata["duration"] = float(value) if value else 0
-                            except ValueError:
-                                self.metadata["duration"] = 0
-                        elif key == "Sample Rate":
-                            try:
-                                self.metadata["sample_rate"] = float(value.split()[0]) if value else 20.0
-                            except (ValueError, IndexError):
-                                self.metadata["sample_rate"] = 20.0
-                        elif key == "Beacon Markers":
-                            self.metadata["beacon_markers"] = value
+                self._store_metadata_row(next(csv.reader([line])))
             except Exception as e:
                 logger.warning(f"Erro ao processar linha de metadados: {line.strip()} - {e}")
                 continue
@@ -134,6 +216,216 @@ class CSVTelemetryParser:
         # Armazena as linhas de dados para processamento posterior
         self.data_lines = all_lines[header_index + 3:] if header_index + 3 < len(all_lines) else []
     
+    def _store_metadata_row(self, row: List[str]) -> None:
+        """
+        Armazena um par chave/valor do bloco de metadados.
+
+        Args:
+            row: Campos de uma linha de metadados já separados
+        """
+        if len(row) < 2:
+            return
+
+        key = row[0].strip('"').strip()
+        value = row[1].strip('"').strip()
+
+        if not key:
+            return
+
+        self.metadata[key] = value
+
+        # Tratamento especial para alguns campos
+        if key == "Venue":
+            self.metadata["track"] = value
+        elif key == "Vehicle":
+            self.metadata["car"] = value
+        elif key == "Driver":
+            self.metadata["driver"] = value
+        elif key == "Log Date":
+            self.metadata["date"] = value
+        elif key == "Log Time":
+            self.metadata["time"] = value
+        elif key == "Duration":
+            try:
+                self.metadata["duration"] = float(value) if value else 0
+            except ValueError:
+                self.metadata["duration"] = 0
+        elif key == "Sample Rate":
+            try:
+                self.metadata["sample_rate"] = float(value.split()[0]) if value else 20.0
+            except (ValueError, IndexError):
+                self.metadata["sample_rate"] = 20.0
+        elif key == "Beacon Markers":
+            self.metadata["beacon_markers"] = value
+
+    def _parse_file_columnar(self, file_path: str) -> Dict[str, Any]:
+        """
+        Analisa o arquivo no modo colunar.
+
+        O bloco de metadados, cabeçalho e unidades é lido uma única vez e o
+        corpo numérico é convertido em um único passo (engine C do pandas)
+        para um array float32 por canal.
+
+        Args:
+            file_path: Caminho para o arquivo CSV
+
+        Returns:
+            Dicionário com o mesmo formato de `parse_file`
+        """
+        body = self.read_motec_frame(file_path)
+
+        # Nomes repetidos: o último canal prevalece, como no modo por linhas
+        self.channels.update(frame_columns(body))
+
+        self.data_points = ColumnarDataPoints(self.channels)
+        self._process_laps_columnar()
+
+        return {
+            "metadata": self.metadata,
+            "channels": self.channels,
+            "units": self.units,
+            "data_points": self.data_points,
+            "laps": self.laps,
+            "beacons": self.beacons
+        }
+
+    def read_motec_frame(self, file_path: str) -> pd.DataFrame:
+        """
+        Lê um CSV MoTeC para um DataFrame com uma coluna float32 por canal.
+
+        Os metadados e as unidades ficam em `self.metadata` e `self.units`.
+        O bloco de cabeçalho é consumido do mesmo handle que depois é entregue
+        à engine C do pandas, de modo que o arquivo é lido em um único passo
+        e o corpo numérico não precisa ser re-tokenizado para pular linhas.
+
+        Args:
+            file_path: Caminho para o arquivo CSV
+
+        Returns:
+            DataFrame com os canais na ordem do arquivo
+        """
+        with open(file_path, 'rb') as csv_file:
+            channel_names = self._read_header_block(csv_file)
+
+            body = pd.read_csv(
+                csv_file,
+                engine="c",
+                header=None,
+                usecols=range(len(channel_names)),
+                dtype=np.float32,
+                # Conversão rápida; a diferença de precisão some no float32
+                float_precision="legacy",
+                na_values=MOTEC_NA_VALUES,
+                keep_default_na=False,
+                skip_blank_lines=True,
+                on_bad_lines="skip",
+                encoding="utf-8",
+            )
+
+        body.columns = channel_names
+        return body
+
+    def _read_header_block(self, csv_file) -> List[str]:
+        """
+        Lê metadados, nomes de canais e unidades sem carregar o corpo do arquivo.
+
+        Args:
+            csv_file: Arquivo aberto em modo binário, posicionado no início;
+                ao retornar, fica posicionado logo após a linha de unidades
+
+        Returns:
+            Lista com os nomes dos canais
+        """
+        while True:
+            raw_line = csv_file.readline()
+            if not raw_line:
+                raise ValueError("Formato de arquivo CSV inválido: não foi possível encontrar a linha de cabeçalhos")
+
+            line = raw_line.decode('utf-8', errors='replace')
+            if _is_header_line(line):
+                break
+            if line.strip():
+                try:
+                    self._store_metadata_row(next(csv.reader([line])))
+                except Exception as e:
+                    logger.warning(f"Erro ao processar linha de metadados: {line.strip()} - {e}")
+
+        channel_names = [name.strip() for name in next(csv.reader([line]))]
+        units_line = csv_file.readline().decode('utf-8', errors='replace')
+        units = [unit.strip() for unit in next(csv.reader([units_line]), [])]
+
+        for i, channel in enumerate(channel_names):
+            self.units[channel] = units[i] if i < len(units) else ""
+
+        # As linhas em branco antes do corpo são ignoradas pelo read_csv
+        return channel_names
+
+    def _process_laps_columnar(self) -> None:
+        """
+        Identifica voltas por intervalos de índices sobre as colunas.
+
+        Usa as bordas de subida do LAP_BEACON, depois os marcadores de beacon
+        dos metadados e, por fim, uma volta única com todos os dados.
+        """
+        if not len(self.data_points):
+            return
+
+        n_samples = len(self.data_points)
+        time = self.channels.get("Time")
+        if time is None:
+            time = np.zeros(n_samples, dtype=np.float32)
+
+        bounds = []
+        lap_beacon = self.channels.get("LAP_BEACON")
+        if lap_beacon is not None:
+            active = lap_beacon == 1
+            edges = np.flatnonzero(active[1:] & ~active[:-1]) + 1
+            if len(edges):
+                # A primeira volta (saída dos boxes) começa na amostra 0
+                starts = np.concatenate(([0], edges))
+                stops = np.append(edges, n_samples)
+                bounds = list(zip(starts.tolist(), stops.tolist()))
+
+        if not bounds:
+            markers = self.metadata.get("Beacon Markers", "").split()
+            try:
+                beacon_times = [float(t) for t in markers]
+            except ValueError:
+                logger.error(f"Formato inválido para marcadores de beacon: {self.metadata.get('Beacon Markers')}")
+                beacon_times = []
+
+            if beacon_times:
+                duration = self.metadata.get("duration") or float(time[-1])
+                end_times = beacon_times[1:] + [duration]
+                starts = np.searchsorted(time, beacon_times, side="left")
+                stops = np.searchsorted(time, end_times, side="left")
+                for start_time, end_time, start, stop in zip(beacon_times, end_times, starts.tolist(), stops.tolist()):
+                    self.laps.append(self._make_columnar_lap(len(self.laps) + 1, start, stop, start_time, end_time))
+                return
+
+        if not bounds:
+            bounds = [(0, n_samples)]
+            logger.info("Criada volta única com todos os dados")
+
+        for start, stop in bounds:
+            start_time = float(time[start])
+            if stop < n_samples:
+                end_time = float(time[stop])
+            else:
+                end_time = self.metadata.get("duration") or float(time[-1])
+            self.laps.append(self._make_columnar_lap(len(self.laps) + 1, start, stop, start_time, end_time))
+
+    def _make_columnar_lap(self, lap_number: int, start: int, stop: int,
+                           start_time: float, end_time: float) -> Dict[str, Any]:
+        """Cria o dicionário de uma volta com `data_points` como visão das colunas."""
+        return {
+            "lap_number": lap_number,
+            "start_time": start_time,
+            "end_time": end_time,
+            "lap_time": end_time - start_time,
+            "data_points": ColumnarDataPoints(self.channels, start, stop)
+        }
+
     def _parse_channels_and_units(self, all_lines: List[str]) -> None:
         """
         Analisa os nomes dos canais e unidades do arquivo CSV.
@@ -373,35 +665,26 @@ def parse_csv_telemetry(filepath: str) -> Dict[str, Any]:
     logger.info(f"Iniciando parse do arquivo CSV: {filepath}")
     
     try:
-        # Tenta ler o arquivo CSV com diferentes configurações
-        try:
-            # Primeira tentativa: leitura padrão
-            df = pd.read_csv(filepath)
-        except pd.errors.ParserError as e:
-            logger.warning(f"Erro na leitura padrão: {e}. Tentando com configurações alternativas...")
+        motec_parser = None
+        if _is_motec_csv(filepath):
+            # Arquivos MoTeC CSV têm um bloco de metadados antes dos canais
+            logger.info("Detectado arquivo MoTeC CSV - lendo metadados, canais e unidades...")
+            motec_parser = CSVTelemetryParser(columnar=True)
+            df = motec_parser.read_motec_frame(filepath)
+        else:
+            # Tenta ler o arquivo CSV com diferentes configurações
             try:
-                # Segunda tentativa: com separador diferente
-                df = pd.read_csv(filepath, sep=None, engine='python')
-            except Exception as e2:
-                logger.warning(f"Erro com engine python: {e2}. Tentando com delimitador automático...")
-                # Terceira tentativa: detecta o delimitador automaticamente
-                df = pd.read_csv(filepath, sep=None, engine='python', on_bad_lines='skip')
-        
-        logger.info(f"Arquivo CSV carregado com sucesso. Shape: {df.shape}")
-        
-        # Verifica se é um arquivo MoTeC CSV (tem cabeçalhos específicos)
-        if 'Format' in df.columns and 'MoTeC CSV File' in df.columns:
-            logger.info("Detectado arquivo MoTeC CSV - criando dados de exemplo...")
-            # Para arquivos MoTeC CSV, cria dados de exemplo por enquanto
-            df = pd.DataFrame({
-                'TIME': [0.0, 1.0, 2.0, 3.0, 4.0],
-                'SPEED': [0.0, 50.0, 100.0, 80.0, 0.0],
-                'THROTTLE': [0.0, 50.0, 100.0, 80.0, 0.0],
-                'BRAKE': [100.0, 0.0, 0.0, 20.0, 100.0],
-                'CLUTCH': [100.0, 0.0, 0.0, 0.0, 100.0],
-                'GEAR': [0, 1, 2, 2, 0],
-                'RPMS': [0.0, 2000.0, 4000.0, 3500.0, 0.0]
-            })
+                # Primeira tentativa: leitura padrão
+                df = pd.read_csv(filepath)
+            except pd.errors.ParserError as e:
+                logger.warning(f"Erro na leitura padrão: {e}. Tentando com configurações alternativas...")
+                try:
+                    # Segunda tentativa: com separador diferente
+                    df = pd.read_csv(filepath, sep=None, engine='python')
+                except Exception as e2:
+                    logger.warning(f"Erro com engine python: {e2}. Tentando com delimitador automático...")
+                    # Terceira tentativa: detecta o delimitador automaticamente
+                    df = pd.read_csv(filepath, sep=None, engine='python', on_bad_lines='skip')
         
         logger.info(f"Arquivo CSV carregado com sucesso. Shape: {df.shape}")
         
@@ -417,6 +700,42 @@ def parse_csv_telemetry(filepath: str) -> Dict[str, Any]:
         
         logger.info(f"Colunas importantes detectadas: {important_columns}")
         
+        # Colunas sem cópia; voltas e dicionários por amostra usam os mesmos arrays
+        channels = frame_columns(df)
+        n_rows = len(df)
+        
+        # Coluna de tempo usada para o tempo de cada volta
+        time_values = None
+        for col in df.columns:
+            col_upper = col.upper()
+            if 'TIME' in col_upper and 'LAP' not in col_upper:
+                time_values = channels[col]
+                break
+        
+        def make_laps(lap_indices):
+            """Voltas entre índices consecutivos (fim inclusivo)."""
+            # Adiciona início e fim se necessário
+            if not lap_indices or lap_indices[0] != 0:
+                lap_indices.insert(0, 0)
+            if lap_indices[-1] != n_rows - 1:
+                lap_indices.append(n_rows - 1)
+            
+            starts = np.asarray(lap_indices[:-1])
+            ends = np.asarray(lap_indices[1:])
+            if time_values is not None:
+                lap_times = (time_values[ends] - time_values[starts]).astype(np.float64)
+                lap_times[ends == starts] = 0.0
+            else:
+                lap_times = np.zeros(len(starts))
+            
+            return [{
+                'lap_number': i + 1,
+                'start_index': start_idx,
+                'end_index': end_idx,
+                'lap_time': lap_time,
+                'data_points': end_idx - start_idx + 1
+            } for i, (start_idx, end_idx, lap_time) in enumerate(zip(starts.tolist(), ends.tolist(), lap_times.tolist()))]
+        
         # Detecta voltas baseado em diferentes estratégias
         laps = []
         
@@ -428,48 +747,16 @@ def parse_csv_telemetry(filepath: str) -> Dict[str, Any]:
                 lap_beacon_col = col
                 break
         
-        if lap_beacon_col:
+        if lap_beacon_col and n_rows:
             logger.info(f"Usando coluna de beacon de volta: {lap_beacon_col}")
-            # Encontra pontos onde há mudança de volta
-            lap_changes = df[lap_beacon_col].diff() != 0
-            lap_indices = df[lap_changes].index.tolist()
-            
-            # Adiciona início e fim se necessário
-            if 0 not in lap_indices:
-                lap_indices.insert(0, 0)
-            if len(df) - 1 not in lap_indices:
-                lap_indices.append(len(df) - 1)
-            
-            # Cria as voltas
-            for i in range(len(lap_indices) - 1):
-                start_idx = lap_indices[i]
-                end_idx = lap_indices[i + 1]
-                
-                lap_data = df.iloc[start_idx:end_idx + 1]
-                
-                # Calcula tempo da volta se houver coluna de tempo
-                time_col = None
-                for col in df.columns:
-                    col_upper = col.upper()
-                    if 'TIME' in col_upper and 'LAP' not in col_upper:
-                        time_col = col
-                        break
-                
-                lap_time = 0.0
-                if time_col and len(lap_data) > 1:
-                    lap_time = lap_data[time_col].iloc[-1] - lap_data[time_col].iloc[0]
-                
-                lap_info = {
-                    'lap_number': i + 1,
-                    'start_index': start_idx,
-                    'end_index': end_idx,
-                    'lap_time': lap_time,
-                    'data_points': len(lap_data)
-                }
-                laps.append(lap_info)
+            # Encontra pontos onde há mudança de volta (a amostra 0 sempre abre uma volta;
+            # como no diff do pandas, uma amostra NaN também conta como mudança)
+            beacon = channels[lap_beacon_col]
+            lap_changes = np.flatnonzero((beacon[1:] != beacon[:-1]) | np.isnan(beacon[1:])) + 1
+            laps = make_laps([0] + lap_changes.tolist())
         
         # Estratégia 2: Se não encontrou beacon, tenta detectar por padrões de velocidade
-        if not laps:
+        if not laps and n_rows:
             logger.info("Tentando detectar voltas por padrões de velocidade...")
             
             speed_col = None
@@ -480,9 +767,10 @@ def parse_csv_telemetry(filepath: str) -> Dict[str, Any]:
                     break
             
             if speed_col:
+                speed = np.asarray(channels[speed_col], dtype=np.float64)
                 # Detecta pontos onde a velocidade é muito baixa (possível linha de chegada)
-                speed_threshold = df[speed_col].quantile(0.1)  # 10% mais baixo
-                low_speed_points = df[df[speed_col] <= speed_threshold].index.tolist()
+                speed_threshold = np.nanquantile(speed, 0.1) if np.isfinite(speed).any() else np.nan  # 10% mais baixo
+                low_speed_points = np.flatnonzero(speed <= speed_threshold).tolist()
                 
                 if len(low_speed_points) > 1:
                     # Agrupa pontos próximos
@@ -491,39 +779,7 @@ def parse_csv_telemetry(filepath: str) -> Dict[str, Any]:
                         if point - lap_indices[-1] > 50:  # Mínimo 50 pontos entre voltas
                             lap_indices.append(point)
                     
-                    # Adiciona início e fim
-                    if 0 not in lap_indices:
-                        lap_indices.insert(0, 0)
-                    if len(df) - 1 not in lap_indices:
-                        lap_indices.append(len(df) - 1)
-                    
-                    # Cria as voltas
-                    for i in range(len(lap_indices) - 1):
-                        start_idx = lap_indices[i]
-                        end_idx = lap_indices[i + 1]
-                        
-                        lap_data = df.iloc[start_idx:end_idx + 1]
-                        
-                        # Calcula tempo da volta
-                        time_col = None
-                        for col in df.columns:
-                            col_upper = col.upper()
-                            if 'TIME' in col_upper and 'LAP' not in col_upper:
-                                time_col = col
-                                break
-                        
-                        lap_time = 0.0
-                        if time_col and len(lap_data) > 1:
-                            lap_time = lap_data[time_col].iloc[-1] - lap_data[time_col].iloc[0]
-                        
-                        lap_info = {
-                            'lap_number': i + 1,
-                            'start_index': start_idx,
-                            'end_index': end_idx,
-                            'lap_time': lap_time,
-                            'data_points': len(lap_data)
-                        }
-                        laps.append(lap_info)
+                    laps = make_laps(lap_indices)
         
         # Estratégia 3: Se ainda não encontrou voltas, trata todo o arquivo como uma volta
         if not laps:
@@ -562,14 +818,21 @@ def parse_csv_telemetry(filepath: str) -> Dict[str, Any]:
             'parse_timestamp': datetime.datetime.now().isoformat()
         }
         
-        # Converte DataFrame para lista de dicionários para compatibilidade
-        data_points = df.to_dict('records')
+        units = {}
+        if motec_parser is not None:
+            metadata.update(motec_parser.metadata)
+            units = motec_parser.units
+        
+        # Os dicionários por amostra são criados sob demanda
+        data_points = ColumnarDataPoints(channels)
         
         # Cria o resultado estruturado
         result = {
             'metadata': metadata,
             'data': df,  # Mantém o DataFrame original
-            'data_points': data_points,  # Lista de dicionários para compatibilidade
+            'data_points': data_points,  # Visão de dicionários para compatibilidade
+            'channels': channels,
+            'units': units,
             'laps': laps,
             'beacons': beacons,
             'columns': list(df.columns),
@@ -1,5 +1,5 @@
 """
-Wrapper para integrar o ldparser do GitHub no Race Telemetry Analyzer.
+Wrapper para integrar o ldparser no Race Telemetry Analyzer.
 Permite ler arquivos .ld de telemetria do MoTec/Assetto Corsa Competizione.
 """
 
@@ -9,18 +9,28 @@ from typing import Dict, List, Any, Optional
 import numpy as np
 import pandas as pd
 
-# Importa o ldparser do GitHub
+# Importa o leitor .ld compartilhado do projeto
 try:
-    from src.parsers.ldparser_github import ldData
+    from src.parsers.ldparser import ldData
 except ImportError as e:
     logging.error(f"Erro ao importar ldparser: {e}")
     ldData = None
 
+from src.parsers.channel_registry import resolve_channels
+
 logger = logging.getLogger(__name__)
 
+# Canais importantes para telemetria (ids do registro de canais)
+IMPORTANT_CHANNELS = (
+    'time', 'speed', 'rpm', 'gear', 'throttle', 'brake', 'clutch', 'steer',
+    'laptime', 'lap', 'beacon', 'distance', 'fuellevel',
+    'tyretempfl', 'tyretempfr', 'tyretemprl', 'tyretemprr',
+    'posx', 'posy', 'posz', 'lat', 'long',
+)
+
 def parse_ld_telemetry(filepath: str) -> Dict[str, Any]:
     """
-    Parseia um arquivo LD (Motec) usando o ldparser do GitHub.
+    Parseia um arquivo LD (Motec) usando o ldparser.
     
     Args:
         filepath: Caminho para o arquivo .ld
@@ -43,9 +53,9 @@ def parse_ld_telemetry(filepath: str) -> Dict[str, Any]:
         if ldData is None:
             raise ImportError("ldparser não está disponível. Verifique a instalação.")
         
-        # Carrega o arquivo LD
+        # Carrega o arquivo LD (mapeado em memória: só os canais usados são lidos)
         logger.info("Carregando arquivo LD...")
-        ld_data = ldData.fromfile(filepath)
+        ld_data = ldData.fromfile(filepath, mmap=True)
         
         if ld_data is None:
             raise ValueError("Não foi possível carregar dados do arquivo LD")
@@ -58,33 +68,16 @@ def parse_ld_telemetry(filepath: str) -> Dict[str, Any]:
             logger.warning(f"Não foi possível contar os canais: {e}")
             channel_count = "desconhecido"
         
-        # Lista de canais importantes para telemetria
-        important_channels = [
-            'Time', 'Speed', 'RPM', 'Gear', 'Throttle', 'Brake', 'Clutch',
-            'Steering', 'LapTime', 'LapNumber', 'Fuel', 'TireTempFL', 'TireTempFR',
-            'TireTempRL', 'TireTempRR', 'X', 'Y', 'Z', 'Latitude', 'Longitude'
-        ]
-        
-        # Filtra apenas os canais importantes que existem no arquivo
-        available_channels = []
-        try:
-            for channel in important_channels:
-                if channel in ld_data:
-                    available_channels.append(channel)
-                else:
-                    logger.debug(f"Canal '{channel}' não encontrado no arquivo")
-        except Exception as e:
-            logger.warning(f"Erro ao verificar canais: {e}")
-            # Tenta listar todos os canais disponíveis
-            try:
-                available_channels = list(ld_data.keys()) if hasattr(ld_data, 'keys') else []
-            except:
-                available_channels = []
+        # Resolve os canais do arquivo uma vez; as colunas mantêm o nome original
+        channel_map = resolve_channels([chan.name for chan in ld_data.channs],
+                                       {chan.name: chan.unit for chan in ld_data.channs})
+        available_channels = [channel_map.source(channel_id) for channel_id in IMPORTANT_CHANNELS
+                              if channel_id in channel_map]
         
         if not available_channels:
             logger.warning("Nenhum canal importante encontrado, tentando usar todos os canais disponíveis")
             try:
-                available_channels = list(ld_data) if hasattr(ld_data, '__iter__') else []
+                available_channels = [chan.name for chan in ld_data.channs]
             except Exception as e:
                 logger.error(f"Erro ao listar canais: {e}")
                 available_channels = []
@@ -141,29 +134,42 @@ def parse_ld_telemetry(filepath: str) -> Dict[str, Any]:
                 df_data[channel_name] = np.full(max_length, np.nan)
                 continue
         
+        # Os dados já escalados são cópias; o mapeamento pode ser liberado
+        ld_data.close()
+        
         if not df_data:
             raise ValueError("Nenhum dado foi processado com sucesso")
         
         df = pd.DataFrame(df_data)
         logger.info(f"DataFrame criado com sucesso: {df.shape}")
         
+        def column(channel_id):
+            """Coluna do DataFrame para o id canônico (None se ausente)."""
+            name = channel_map.source(channel_id)
+            return name if name in df.columns else None
+        
+        time_column = column('time')
+        beacon_column = column('beacon')
+        speed_column = column('speed')
+        
         # Extrai metadados
         metadata = {
             'filename': os.path.basename(filepath),
             'filepath': filepath,
             'channels': available_channels,
+            'channel_ids': {channel_id: channel_map.source(channel_id) for channel_id in channel_map},
             'total_samples': len(df),
-            'duration': df['Time'].max() - df['Time'].min() if 'Time' in df.columns else 0,
+            'duration': df[time_column].max() - df[time_column].min() if time_column else 0,
             'format': 'LD'
         }
         
-        # Detecta voltas baseado na coluna LAP_BEACON
+        # Detecta voltas baseado no canal de beacon (LAP_BEACON)
         laps = []
-        if 'LAP_BEACON' in df.columns:
-            logger.info("Detectando voltas usando LAP_BEACON...")
+        if beacon_column:
+            logger.info(f"Detectando voltas usando {beacon_column}...")
             
-            # Encontra mudanças na coluna LAP_BEACON
-            lap_beacon = df['LAP_BEACON'].fillna(0)
+            # Encontra mudanças no canal de beacon
+            lap_beacon = df[beacon_column].fillna(0)
             lap_changes = lap_beacon.diff() != 0
             lap_indices = df[lap_changes].index.tolist()
             
@@ -182,10 +188,10 @@ def parse_ld_telemetry(filepath: str) -> Dict[str, Any]:
                 
                 lap_data = df.iloc[start_idx:end_idx + 1]
                 
-                # Calcula tempo da volta se houver coluna TIME
+                # Calcula tempo da volta se houver canal de tempo
                 lap_time = 0.0
-                if 'TIME' in df.columns:
-                    time_data = lap_data['TIME'].dropna()
+                if time_column:
+                    time_data = lap_data[time_column].dropna()
                     if len(time_data) > 1:
                         lap_time = time_data.iloc[-1] - time_data.iloc[0]
                 
@@ -198,18 +204,18 @@ def parse_ld_telemetry(filepath: str) -> Dict[str, Any]:
                 }
                 laps.append(lap_info)
             
-            logger.info(f"Detectadas {len(laps)} voltas usando LAP_BEACON")
+            logger.info(f"Detectadas {len(laps)} voltas usando {beacon_column}")
         
         # Se não encontrou voltas, tenta detectar por padrões de velocidade
         if not laps:
             logger.info("Tentando detectar voltas por padrões de velocidade...")
             
-            if 'SPEED' in df.columns:
-                speed_data = df['SPEED'].dropna()
+            if speed_column:
+                speed_data = df[speed_column].dropna()
                 if len(speed_data) > 0:
                     # Detecta pontos onde a velocidade é muito baixa (possível linha de chegada)
                     speed_threshold = speed_data.quantile(0.1)  # 10% mais baixo
-                    low_speed_points = df[df['SPEED'] <= speed_threshold].index.tolist()
+                    low_speed_points = df[df[speed_column] <= speed_threshold].index.tolist()
                     
                     if len(low_speed_points) > 1:
                         # Agrupa pontos próximos
@@ -233,8 +239,8 @@ def parse_ld_telemetry(filepath: str) -> Dict[str, Any]:
                             
                             # Calcula tempo da volta
                             lap_time = 0.0
-                            if 'TIME' in df.columns:
-                                time_data = lap_data['TIME'].dropna()
+                            if time_column:
+                                time_data = lap_data[time_column].dropna()
                                 if len(time_data) > 1:
                                     lap_time = time_data.iloc[-1] - time_data.iloc[0]
                             
@@ -253,8 +259,8 @@ def parse_ld_telemetry(filepath: str) -> Dict[str, Any]:
         if not laps:
             logger.info("Tratando todo o arquivo como uma volta...")
             lap_time = 0.0
-            if 'TIME' in df.columns:
-                time_data = df['TIME'].dropna()
+            if time_column:
+                time_data = df[time_column].dropna()
                 if len(time_data) > 1:
                     lap_time = time_data.iloc[-1] - time_data.iloc[0]
             
@@ -270,28 +276,27 @@ def parse_ld_telemetry(filepath: str) -> Dict[str, Any]:
         
         # Cria beacons para compatibilidade
         beacons = []
-        if 'Time' in df.columns:
+        if time_column:
             try:
                 # Cria beacons a cada segundo
                 time_step = 1.0  # 1 segundo
-                current_time = df['Time'].min()
-                end_time = df['Time'].max()
+                current_time = df[time_column].min()
+                end_time = df[time_column].max()
                 
                 while current_time <= end_time:
                     # Encontra o índice mais próximo do tempo atual
-                    time_diff = np.abs(df['Time'] - current_time)
+                    time_diff = np.abs(df[time_column] - current_time)
                     closest_idx = time_diff.idxmin()
                     
                     beacon = {
                         'time': float(current_time),
                         'index': int(closest_idx),
-                        'speed': float(df.loc[closest_idx, 'Speed']) if 'Speed' in df.columns else 0,
-                        'rpm': float(df.loc[closest_idx, 'RPM']) if 'RPM' in df.columns else 0,
-                        'gear': int(df.loc[closest_idx, 'Gear']) if 'Gear' in df.columns else 0,
-                        'throttle': float(df.loc[closest_idx, 'Throttle']) if 'Throttle' in df.columns else 0,
-                        'brake': float(df.loc[closest_idx, 'Brake']) if 'Brake' in df.columns else 0,
-                        'clutch': float(df.loc[closest_idx, 'Clutch']) if 'Clutch' in df.columns else 0
                     }
+                    for channel_id in ('speed', 'rpm', 'throttle', 'brake', 'clutch'):
+                        name = column(channel_id)
+                        beacon[channel_id] = float(df.loc[closest_idx, name]) if name else 0
+                    name = column('gear')
+                    beacon['gear'] = int(df.loc[closest_idx, name]) if name else 0
                     beacons.append(beacon)
                     current_time += time_step
                 
@@ -414,8 +419,8 @@ def get_available_channels(file_path: str) -> List[str]:
         return []
     
     try:
-        ld_data = ldData.fromfile(file_path)
-        return list(ld_data)
+        with ldData.fromfile(file_path, mmap=True) as ld_data:
+            return list(ld_data)
     except Exception as e:
         logger.error(f"Erro ao ler canais do arquivo .ld: {e}")
         return [] 
\ No newline at end of file
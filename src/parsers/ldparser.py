@@ -4,10 +4,17 @@ Code created through reverse engineering the data format.
 """
 
 import datetime
+import mmap as mmap_
 import struct
 
 import numpy as np
 
+try:
+    from ..stm.motec.codec import sample_dtype, raw_samples, to_engineering
+except ImportError:
+    # imported as a top level module, with src on the path
+    from stm.motec.codec import sample_dtype, raw_samples, to_engineering
+
 
 class ldData(object):
     """Container for parsed data of an ld file.
@@ -15,9 +22,10 @@ class ldData(object):
     Allows reading and writing.
     """
 
-    def __init__(self, head, channs):
+    def __init__(self, head, channs, buf=None):
         self.head = head
         self.channs = channs
+        self._buf = buf
 
     def __getitem__(self, item):
         if not isinstance(item, int):
@@ -103,12 +111,42 @@ class ldData(object):
         return cls(head, channs)
 
     @classmethod
-    def fromfile(cls, f):
-        # type: (str) -> ldData
+    def fromfile(cls, f, mmap=False):
+        # type: (str, bool) -> ldData
         """Parse data of an ld file
+
+        With mmap=True the file is mapped once, all headers are parsed from
+        the mapping and each channel's samples are a view on it. Only the
+        pages of the channels that are actually accessed get read.
         """
+        if mmap:
+            return cls(*read_ldfile_mmap(f))
         return cls(*read_ldfile(f))
 
+    def close(self):
+        """Release the memory mapping, if any
+
+        Channel data that was already scaled stays available, raw views
+        on the mapping are dropped.
+        """
+        if self._buf is None:
+            return
+        for c in self.channs:
+            c._raw, c._buf = None, None
+        try:
+            self._buf.close()
+        except BufferError:
+            # views still referenced elsewhere, the mapping is released
+            # once they are garbage collected
+            pass
+        self._buf = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def write(self, f):
         # type: (str) -> ()
         """Write an ld file containing the current header information and channel data
@@ -307,7 +345,8 @@ class ldChan(object):
 
     Parses and stores the channel meta data of a channel in a ld file.
     Needs the pointer to the channel meta block in the ld file.
-    The actual data is read on demand using the 'data' property.
+    The actual data is read on demand using the 'data' property, the
+    unscaled samples are available through the 'raw' property.
     """
 
     fmt = '<' + (
@@ -323,10 +362,12 @@ class ldChan(object):
 
     def __init__(self, _f, meta_ptr, prev_meta_ptr, next_meta_ptr, data_ptr, data_len,
                  dtype, freq, shift, mul, scale, dec,
-                 name, short_name, unit):
+                 name, short_name, unit, buf=None):
 
         self._f = _f
+        self._buf = buf
         self.meta_ptr = meta_ptr
+        self._raw = None
         self._data = None
 
         (self.prev_meta_ptr, self.next_meta_ptr, self.data_ptr, self.data_len,
@@ -344,35 +385,39 @@ class ldChan(object):
         """
         with open(_f, 'rb') as f:
             f.seek(meta_ptr)
+            fields = struct.unpack(ldChan.fmt, f.read(struct.calcsize(ldChan.fmt)))
 
-            (prev_meta_ptr, next_meta_ptr, data_ptr, data_len, _,
-             dtype_a, dtype, freq, shift, mul, scale, dec,
-             name, short_name, unit) = struct.unpack(ldChan.fmt, f.read(struct.calcsize(ldChan.fmt)))
+        return cls._fromfields(_f, meta_ptr, fields)
 
-        name, short_name, unit = map(decode_string, [name, short_name, unit])
+    @classmethod
+    def frombuffer(cls, _f, buf, meta_ptr):
+        # type: (str, mmap.mmap, int) -> ldChan
+        """Parses the header information of an ld channel from a mapped ld file
 
-        def safe_get(lst, idx):
-            if idx < 0 or idx >= len(lst):
-                return None
-            return lst[idx]
+        The channel keeps a reference to the buffer and reads its samples from it.
+        """
+        fields = struct.unpack_from(ldChan.fmt, buf, meta_ptr)
+        return cls._fromfields(_f, meta_ptr, fields, buf)
 
-        if dtype_a in [0x07]:
-            dtype = safe_get([None, np.float16, None, np.float32], dtype - 1)
-        elif dtype_a in [0, 0x03, 0x05]:
-            dtype = safe_get([None, np.int16, None, np.int32], dtype - 1)
-        else:
-            dtype = None
+    @classmethod
+    def _fromfields(cls, _f, meta_ptr, fields, buf=None):
+        (prev_meta_ptr, next_meta_ptr, data_ptr, data_len, _,
+         dtype_a, dtype, freq, shift, mul, scale, dec,
+         name, short_name, unit) = fields
+
+        name, short_name, unit = map(decode_string, [name, short_name, unit])
+        dtype = sample_dtype(dtype_a, dtype)
 
         return cls(_f, meta_ptr, prev_meta_ptr, next_meta_ptr, data_ptr, data_len,
-                   dtype, freq, shift, mul, scale, dec,name, short_name, unit)
+                   dtype, freq, shift, mul, scale, dec, name, short_name, unit, buf)
 
     def write(self, f, n):
-        if self.dtype == np.float16 or self.dtype == np.float32:
+        dtype_ = np.dtype(self.dtype)
+        if dtype_.kind == 'f':
             dtype_a = 0x07
-            dtype = {np.float16: 2, np.float32: 4}[self.dtype]
         else:
-            dtype_a = 0x05 if self.dtype == np.int32 else 0x03
-            dtype = {np.int16: 2, np.int32: 4}[self.dtype]
+            dtype_a = 0x05 if dtype_.itemsize == 4 else 0x03
+        dtype = dtype_.itemsize
 
         f.write(struct.pack(ldChan.fmt,
                             self.prev_meta_ptr, self.next_meta_ptr, self.data_ptr, self.data_len,
@@ -380,30 +425,38 @@ class ldChan(object):
                             self.name.encode(), self.short_name.encode(), self.unit.encode()))
 
     @property
-    def data(self):
+    def raw(self):
         # type: () -> np.array
-        """ Read the data words of the channel
+        """ The data words of the channel, without scaling
+
+        For mapped files this is a read-only view on the mapping, no data is copied.
         """
         if self.dtype is None:
             raise ValueError(f'Channel {self.name} has unknown data type')
+        if self._raw is None:
+            if self._buf is not None:
+                self._raw = raw_samples(self._buf, self.dtype, self.data_ptr, self.data_len)
+                if len(self._raw) != self.data_len:
+                    print("Not all data read!", self.name, self.freq,
+                          hex(self.data_ptr), hex(self.data_len), hex(len(self._raw)))
+            else:
+                # jump to data and read
+                with open(self._f, 'rb') as f:
+                    f.seek(self.data_ptr)
+                    self._raw = np.fromfile(f, count=self.data_len, dtype=self.dtype)
+                    if len(self._raw) != self.data_len:
+                        print("Not all data read!", self.name, self.freq,
+                              hex(self.data_ptr), hex(self.data_len),
+                              hex(len(self._raw)), hex(f.tell()))
+        return self._raw
+
+    @property
+    def data(self):
+        # type: () -> np.array
+        """ Read the data words of the channel, in engineering units
+        """
         if self._data is None:
-            # jump to data and read
-            with open(self._f, 'rb') as f:
-                f.seek(self.data_ptr)
-                try:
-                    self._data = np.fromfile(f,
-                                            count=self.data_len, dtype=self.dtype)
-
-                    self._data = (self._data/self.scale * pow(10., -self.dec) + self.shift) * self.mul
-
-                    if len(self._data) != self.data_len:
-                        raise ValueError("Not all data read!")
-
-                except ValueError as v:
-                    print(v, self.name, self.freq,
-                          hex(self.data_ptr), hex(self.data_len),
-                          hex(len(self._data)),hex(f.tell()))
-                    # raise v
+            self._data = to_engineering(self.raw, self.shift, self.mul, self.scale, self.dec)
         return self._data
 
     def __str__(self):
@@ -424,17 +477,22 @@ def decode_string(bytes):
         return ""
         # raise e
 
-def read_channels(f_, meta_ptr):
-    # type: (str, int) -> list
+def read_channels(f_, meta_ptr, buf=None):
+    # type: (str, int, mmap.mmap) -> list
     """ Read channel data inside ld file
 
     Cycles through the channels inside an ld file,
      starting with the one where meta_ptr points to.
+     If buf is given, the headers are parsed from that mapping
+     instead of reopening the file for each channel.
      Returns a list of ldchan objects.
     """
     chans = []
     while meta_ptr:
-        chan_ = ldChan.fromfile(f_, meta_ptr)
+        if buf is not None:
+            chan_ = ldChan.frombuffer(f_, buf, meta_ptr)
+        else:
+            chan_ = ldChan.fromfile(f_, meta_ptr)
         chans.append(chan_)
         meta_ptr = chan_.next_meta_ptr
     return chans
@@ -444,11 +502,23 @@ def read_ldfile(f_):
     # type: (str) -> (ldHead, list)
     """ Read an ld file, return header and list of channels
     """
-    head_ = ldHead.fromfile(open(f_,'rb'))
+    with open(f_, 'rb') as f:
+        head_ = ldHead.fromfile(f)
     chans = read_channels(f_, head_.meta_ptr)
     return head_, chans
 
 
+def read_ldfile_mmap(f_):
+    # type: (str) -> (ldHead, list, mmap.mmap)
+    """ Map an ld file once, return header, list of channels and the mapping
+    """
+    with open(f_, 'rb') as f:
+        buf = mmap_.mmap(f.fileno(), 0, access=mmap_.ACCESS_READ)
+    head_ = ldHead.fromfile(buf)
+    chans = read_channels(f_, head_.meta_ptr, buf)
+    return head_, chans, buf
+
+
 if __name__ == '__main__':
     """ Small test of the parser.
     
@@ -2,9 +2,15 @@
 Módulo de coleta de dados em tempo real.
 """
 
-from .acc_collector import ACCDataCollector
-from .lmu_collector import LMUDataCollector
+from .acc_collector import ACCDataCollector, ACCSource
+from .lmu_collector import LMUDataCollector, LMUSource
 from .realtime_manager import RealtimeTelemetryManager
+from .stream_analyzer import StreamingLapAnalyzer, SectorResult, LapResult
+from .udp_service import RealtimeService, DatagramSource, CoalescingQueue, DROP_OLDEST, BLOCK
 
-__all__ = ['ACCDataCollector', 'LMUDataCollector', 'RealtimeTelemetryManager']
-
+__all__ = [
+    'ACCDataCollector', 'ACCSource', 'LMUDataCollector', 'LMUSource',
+    'RealtimeTelemetryManager', 'StreamingLapAnalyzer', 'SectorResult', 'LapResult',
+    'RealtimeService', 'DatagramSource',
+    'CoalescingQueue', 'DROP_OLDEST', 'BLOCK'
+]
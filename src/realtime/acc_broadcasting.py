@@ -0,0 +1,506 @@
+"""
+Decodificador do protocolo de broadcasting UDP do Assetto Corsa Competizione.
+
+O ACC só envia dados de broadcasting para clientes registrados: o cliente
+manda REGISTER_COMMAND_APPLICATION para a porta configurada em
+``Documents/Assetto Corsa Competizione/Config/broadcasting.json`` e passa a
+receber, no mesmo socket, as mensagens abaixo. Todos os valores são
+little-endian; strings são um uint16 com o tamanho seguido de UTF-8.
+
+As mensagens são lidas com ``struct.Struct`` pré-compilados sobre um
+``memoryview`` do buffer de recepção, sem copiar o pacote. O estado dos
+carros fica numa tabela colunar (um array NumPy por canal, uma linha por
+carro), atualizada no lugar a cada REALTIME_CAR_UPDATE.
+"""
+
+import struct
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 4
+
+# Mensagens enviadas ao ACC
+REGISTER_COMMAND_APPLICATION = 1
+UNREGISTER_COMMAND_APPLICATION = 9
+REQUEST_ENTRY_LIST = 10
+REQUEST_TRACK_DATA = 11
+
+# Mensagens recebidas do ACC
+REGISTRATION_RESULT = 1
+REALTIME_UPDATE = 2
+REALTIME_CAR_UPDATE = 3
+ENTRY_LIST = 4
+TRACK_DATA = 5
+ENTRY_LIST_CAR = 6
+BROADCASTING_EVENT = 7
+
+# Tempo de volta ausente (int32.MaxValue no protocolo)
+NO_LAP_TIME = 2 ** 31 - 1
+
+SESSION_TYPES = {
+    0: "Practice", 4: "Qualifying", 9: "Superpole", 10: "Race",
+    11: "Hotlap", 12: "Hotstint", 13: "HotlapSuperpole", 14: "Replay",
+}
+
+SESSION_PHASES = {
+    0: "None", 1: "Starting", 2: "PreFormation", 3: "FormationLap",
+    4: "PreSession", 5: "Session", 6: "SessionOver", 7: "PostSession",
+    8: "ResultUI",
+}
+
+CAR_LOCATIONS = {0: "None", 1: "Track", 2: "Pitlane", 3: "PitEntry", 4: "PitExit"}
+
+BROADCASTING_EVENT_TYPES = {
+    0: "None", 1: "GreenFlag", 2: "SessionOver", 3: "PenaltyCommMsg",
+    4: "Accident", 5: "LapCompleted", 6: "BestSessionLap", 7: "BestPersonalLap",
+}
+
+U8 = struct.Struct("<B")
+U16 = struct.Struct("<H")
+I32 = struct.Struct("<i")
+F32X2 = struct.Struct("<ff")
+
+REGISTRATION_RESULT_HEAD = struct.Struct("<iBB")
+# event index, session index, tipo, fase, tempo da sessão, fim da sessão, carro em foco
+REALTIME_UPDATE_HEAD = struct.Struct("<HHBBffi")
+# hora do dia, temperatura ambiente, da pista, nuvens, chuva, pista molhada
+REALTIME_UPDATE_WEATHER = struct.Struct("<fBBBBB")
+# carro, piloto, pilotos, marcha, x, y, yaw, local, km/h, posição, posição na
+# categoria, posição na pista, posição no spline, voltas, delta
+REALTIME_CAR_UPDATE_HEAD = struct.Struct("<HHBBfffBHHHHfHi")
+# tempo (ms), carro, piloto, número de parciais
+LAP_HEAD = struct.Struct("<iHHB")
+# inválida, válida para melhor volta, volta de saída, volta de entrada
+LAP_TAIL = struct.Struct("<BBBB")
+ENTRY_LIST_HEAD = struct.Struct("<iH")
+ENTRY_LIST_CAR_HEAD = struct.Struct("<HB")
+# número do carro, categoria, piloto atual, nacionalidade
+ENTRY_LIST_CAR_INFO = struct.Struct("<iBBH")
+DRIVER_INFO = struct.Struct("<BH")
+TRACK_DATA_INFO = struct.Struct("<ii")
+BROADCASTING_EVENT_TAIL = struct.Struct("<ii")
+
+_ARRAYS = {}
+
+
+def _array_struct(code: str, count: int) -> struct.Struct:
+    """Struct para ``count`` valores do mesmo tipo, compilado uma vez."""
+    s = _ARRAYS.get((code, count))
+    if s is None:
+        s = _ARRAYS[(code, count)] = struct.Struct(f"<{count}{code}")
+    return s
+
+
+def read_string(buf: memoryview, offset: int) -> Tuple[str, int]:
+    """Lê uma string do protocolo (uint16 + UTF-8) e retorna (texto, offset)."""
+    (length, ) = U16.unpack_from(buf, offset)
+    offset += 2
+    return str(buf[offset:offset + length], "utf-8", "replace"), offset + length
+
+
+def read_lap(buf: memoryview, offset: int) -> Tuple[tuple, int]:
+    """
+    Lê um LapInfo.
+
+    Returns:
+        ((tempo em ms, carro, piloto, parciais em ms, inválida, válida para
+        melhor volta, volta de saída, volta de entrada), offset)
+    """
+    (lap_ms, car_index, driver_index, split_count) = LAP_HEAD.unpack_from(buf, offset)
+    offset += LAP_HEAD.size
+    splits = _array_struct("i", split_count).unpack_from(buf, offset)
+    offset += 4 * split_count
+    (invalid, valid_for_best, outlap, inlap) = LAP_TAIL.unpack_from(buf, offset)
+    return (lap_ms, car_index, driver_index, splits, invalid, valid_for_best, outlap, inlap), offset + LAP_TAIL.size
+
+
+def lap_seconds(lap_ms: int) -> Optional[float]:
+    """Converte um tempo de volta em ms para segundos (None se ausente)."""
+    if lap_ms == NO_LAP_TIME or lap_ms < 0:
+        return None
+    return lap_ms / 1000.0
+
+
+def _pack_string(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return U16.pack(len(data)) + data
+
+
+def register_request(display_name: str, connection_password: str,
+                     update_interval_ms: int, command_password: str = "") -> bytes:
+    """Mensagem de registro do cliente no ACC."""
+    return (U8.pack(REGISTER_COMMAND_APPLICATION) + U8.pack(PROTOCOL_VERSION)
+            + _pack_string(display_name) + _pack_string(connection_password)
+            + I32.pack(update_interval_ms) + _pack_string(command_password))
+
+
+def unregister_request(connection_id: int) -> bytes:
+    """Mensagem de cancelamento do registro."""
+    return U8.pack(UNREGISTER_COMMAND_APPLICATION) + I32.pack(connection_id)
+
+
+def entry_list_request(connection_id: int) -> bytes:
+    """Pedido da lista de carros."""
+    return U8.pack(REQUEST_ENTRY_LIST) + I32.pack(connection_id)
+
+
+def track_data_request(connection_id: int) -> bytes:
+    """Pedido dos dados da pista."""
+    return U8.pack(REQUEST_TRACK_DATA) + I32.pack(connection_id)
+
+
+# Canais da tabela de carros. Os primeiros seguem a ordem de
+# REALTIME_CAR_UPDATE_HEAD, para que a linha seja gravada direto da tupla
+CAR_COLUMNS = (
+    ("car_index", np.uint16),
+    ("driver_index", np.uint16),
+    ("driver_count", np.uint8),
+    ("gear", np.int8),
+    ("world_x", np.float32),
+    ("world_y", np.float32),
+    ("yaw", np.float32),
+    ("car_location", np.uint8),
+    ("kmh", np.uint16),
+    ("position", np.uint16),
+    ("cup_position", np.uint16),
+    ("track_position", np.uint16),
+    ("spline_position", np.float32),
+    ("laps", np.uint16),
+    ("delta", np.int32),
+    ("best_lap_ms", np.int32),
+    ("last_lap_ms", np.int32),
+    ("current_lap_ms", np.int32),
+    ("current_lap_invalid", np.bool_),
+    ("session_time", np.float64),
+)
+
+
+class CarStateTable:
+    """
+    Estado atual de todos os carros da sessão em formato colunar.
+
+    Cada canal é um array NumPy com uma posição por carro; ``rows`` liga o
+    índice do carro no ACC à linha da tabela. A capacidade dobra quando
+    necessário, então um carro novo não realoca a tabela a cada pacote.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = max(1, int(capacity))
+        self.data = {name: np.zeros(self.capacity, dtype=dtype) for (name, dtype) in CAR_COLUMNS}
+        self.rows: Dict[int, int] = {}
+        self._order = [name for (name, _) in CAR_COLUMNS]
+        self._arrays = [self.data[name] for name in self._order]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, car_index: int) -> bool:
+        return car_index in self.rows
+
+    def _grow(self):
+        self.capacity *= 2
+        for name in self._order:
+            old = self.data[name]
+            self.data[name] = np.zeros(self.capacity, dtype=old.dtype)
+            self.data[name][:len(old)] = old
+        self._arrays = [self.data[name] for name in self._order]
+
+    def row_for(self, car_index: int) -> int:
+        """Linha do carro, criando uma nova se ele ainda não existe."""
+        row = self.rows.get(car_index)
+        if row is None:
+            row = len(self.rows)
+            if row >= self.capacity:
+                self._grow()
+            self.rows[car_index] = row
+            for array in self._arrays:
+                array[row] = 0
+        return row
+
+    def set_row(self, row: int, values: Iterable):
+        """Grava os valores de uma linha, na ordem de CAR_COLUMNS."""
+        for (array, value) in zip(self._arrays, values):
+            array[row] = value
+
+    def reset(self, car_indices: Iterable[int]):
+        """Recomeça a tabela com os carros da lista de inscritos."""
+        self.rows = {}
+        for car_index in car_indices:
+            self.row_for(car_index)
+
+    def column(self, name: str) -> np.ndarray:
+        """Canal de todos os carros, como visão somente leitura."""
+        view = self.data[name][:len(self.rows)].view()
+        view.flags.writeable = False
+        return view
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Todos os canais como visões somente leitura."""
+        return {name: self.column(name) for name in self._order}
+
+    def car(self, car_index: int) -> Optional[Dict[str, Any]]:
+        """Estado de um carro como dicionário, ou None se desconhecido."""
+        row = self.rows.get(car_index)
+        if row is None:
+            return None
+        return {name: array[row].item() for (name, array) in zip(self._order, self._arrays)}
+
+
+class ACCBroadcastingDecoder:
+    """
+    Decodifica as mensagens do broadcasting do ACC e mantém o estado da
+    sessão: resultado do registro, dados da pista, lista de inscritos,
+    estado da sessão e a tabela de carros.
+    """
+
+    def __init__(self, car_capacity: int = 64):
+        self.connection_id: Optional[int] = None
+        self.registered = False
+        self.readonly = True
+        self.error_message = ""
+        self.track: Dict[str, Any] = {}
+        self.session: Dict[str, Any] = {}
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self.cars = CarStateTable(car_capacity)
+        self.events: List[Dict[str, Any]] = []
+        self.focused_car_index = -1
+        self._handlers = {
+            REGISTRATION_RESULT: self._registration_result,
+            REALTIME_UPDATE: self._realtime_update,
+            REALTIME_CAR_UPDATE: self._realtime_car_update,
+            ENTRY_LIST: self._entry_list,
+            ENTRY_LIST_CAR: self._entry_list_car,
+            TRACK_DATA: self._track_data,
+            BROADCASTING_EVENT: self._broadcasting_event,
+        }
+
+    def decode(self, data) -> Tuple[int, Any]:
+        """
+        Decodifica uma mensagem.
+
+        Args:
+            data: Pacote recebido (bytes, bytearray ou memoryview)
+
+        Returns:
+            (tipo da mensagem, resultado). Para REALTIME_CAR_UPDATE o
+            resultado é o índice do carro; para as demais, o estado
+            atualizado correspondente. Tipos desconhecidos retornam
+            (tipo, None).
+        """
+        buf = data if isinstance(data, memoryview) else memoryview(data)
+        (msg_type, ) = U8.unpack_from(buf, 0)
+        handler = self._handlers.get(msg_type)
+        if handler is None:
+            logger.debug(f"Mensagem de broadcasting desconhecida: {msg_type}")
+            return msg_type, None
+        return msg_type, handler(buf, 1)
+
+    def _registration_result(self, buf: memoryview, offset: int):
+        (self.connection_id, success, readonly) = REGISTRATION_RESULT_HEAD.unpack_from(buf, offset)
+        self.registered = bool(success)
+        self.readonly = readonly == 0
+        (self.error_message, _) = read_string(buf, offset + REGISTRATION_RESULT_HEAD.size)
+        return self.registered
+
+    def _realtime_update(self, buf: memoryview, offset: int):
+        (event_index, session_index, session_type, phase, session_time, session_end_time,
+         focused_car_index) = REALTIME_UPDATE_HEAD.unpack_from(buf, offset)
+        offset += REALTIME_UPDATE_HEAD.size
+        (camera_set, offset) = read_string(buf, offset)
+        (camera, offset) = read_string(buf, offset)
+        (hud_page, offset) = read_string(buf, offset)
+        (replay_playing, ) = U8.unpack_from(buf, offset)
+        offset += 1
+        replay_time = replay_remaining = None
+        if replay_playing:
+            (replay_time, replay_remaining) = F32X2.unpack_from(buf, offset)
+            offset += F32X2.size
+        (time_of_day, ambient_temp, track_temp, clouds, rain, wetness) = \
+            REALTIME_UPDATE_WEATHER.unpack_from(buf, offset)
+        offset += REALTIME_UPDATE_WEATHER.size
+        (best_lap, _) = read_lap(buf, offset)
+
+        self.focused_car_index = focused_car_index
+        self.session = {
+            "event_index": event_index,
+            "session_index": session_index,
+            "session_type": SESSION_TYPES.get(session_type, str(session_type)),
+            "phase": SESSION_PHASES.get(phase, str(phase)),
+            "session_time": session_time / 1000.0,
+            "session_end_time": session_end_time / 1000.0,
+            "focused_car_index": focused_car_index,
+            "camera_set": camera_set,
+            "camera": camera,
+            "hud_page": hud_page,
+            "replay_playing": bool(replay_playing),
+            "replay_session_time": replay_time,
+            "replay_remaining_time": replay_remaining,
+            "time_of_day": time_of_day / 1000.0,
+            "ambient_temp": ambient_temp,
+            "track_temp": track_temp,
+            "clouds": clouds / 10.0,
+            "rain_level": rain / 10.0,
+            "wetness": wetness / 10.0,
+            "best_session_lap": lap_seconds(best_lap[0]),
+        }
+        return self.session
+
+    def _realtime_car_update(self, buf: memoryview, offset: int):
+        head = REALTIME_CAR_UPDATE_HEAD.unpack_from(buf, offset)
+        offset += REALTIME_CAR_UPDATE_HEAD.size
+        (best_lap, offset) = read_lap(buf, offset)
+        (last_lap, offset) = read_lap(buf, offset)
+        (current_lap, _) = read_lap(buf, offset)
+
+        car_index = head[0]
+        row = self.cars.row_for(car_index)
+        self.cars.set_row(row, head)
+        data = self.cars.data
+        # A marcha vem deslocada de 2 (R = -1, N = 0)
+        data["gear"][row] = head[3] - 2
+        data["best_lap_ms"][row] = best_lap[0]
+        data["last_lap_ms"][row] = last_lap[0]
+        data["current_lap_ms"][row] = current_lap[0]
+        data["current_lap_invalid"][row] = current_lap[4]
+        data["session_time"][row] = self.session.get("session_time", 0.0)
+        return car_index
+
+    def _entry_list(self, buf: memoryview, offset: int):
+        (self.connection_id, count) = ENTRY_LIST_HEAD.unpack_from(buf, offset)
+        offset += ENTRY_LIST_HEAD.size
+        car_indices = _array_struct("H", count).unpack_from(buf, offset)
+        self.entries = {car_index: self.entries.get(car_index, {}) for car_index in car_indices}
+        self.cars.reset(car_indices)
+        return car_indices
+
+    def _entry_list_car(self, buf: memoryview, offset: int):
+        (car_index, car_model) = ENTRY_LIST_CAR_HEAD.unpack_from(buf, offset)
+        offset += ENTRY_LIST_CAR_HEAD.size
+        (team_name, offset) = read_string(buf, offset)
+        (race_number, cup_category, current_driver, nationality) = ENTRY_LIST_CAR_INFO.unpack_from(buf, offset)
+        offset += ENTRY_LIST_CAR_INFO.size
+        (driver_count, ) = U8.unpack_from(buf, offset)
+        offset += 1
+        drivers = []
+        for _ in range(driver_count):
+            (first_name, offset) = read_string(buf, offset)
+            (last_name, offset) = read_string(buf, offset)
+            (short_name, offset) = read_string(buf, offset)
+            (category, driver_nationality) = DRIVER_INFO.unpack_from(buf, offset)
+            offset += DRIVER_INFO.size
+            drivers.append({
+                "first_name": first_name,
+                "last_name": last_name,
+                "short_name": short_name,
+                "category": category,
+                "nationality": driver_nationality,
+            })
+
+        entry = {
+            "car_index": car_index,
+            "car_model": car_model,
+            "team_name": team_name,
+            "race_number": race_number,
+            "cup_category": cup_category,
+            "current_driver_index": current_driver,
+            "nationality": nationality,
+            "drivers": drivers,
+        }
+        self.entries[car_index] = entry
+        return entry
+
+    def _track_data(self, buf: memoryview, offset: int):
+        (self.connection_id, ) = I32.unpack_from(buf, offset)
+        offset += 4
+        (track_name, offset) = read_string(buf, offset)
+        (track_id, track_meters) = TRACK_DATA_INFO.unpack_from(buf, offset)
+        offset += TRACK_DATA_INFO.size
+
+        camera_sets = {}
+        (count, ) = U8.unpack_from(buf, offset)
+        offset += 1
+        for _ in range(count):
+            (set_name, offset) = read_string(buf, offset)
+            (camera_count, ) = U8.unpack_from(buf, offset)
+            offset += 1
+            cameras = []
+            for _ in range(camera_count):
+                (camera, offset) = read_string(buf, offset)
+                cameras.append(camera)
+            camera_sets[set_name] = cameras
+
+        hud_pages = []
+        (count, ) = U8.unpack_from(buf, offset)
+        offset += 1
+        for _ in range(count):
+            (page, offset) = read_string(buf, offset)
+            hud_pages.append(page)
+
+        self.track = {
+            "track_name": track_name,
+            "track_id": track_id,
+            "track_meters": track_meters,
+            "camera_sets": camera_sets,
+            "hud_pages": hud_pages,
+        }
+        return self.track
+
+    def _broadcasting_event(self, buf: memoryview, offset: int):
+        (event_type, ) = U8.unpack_from(buf, offset)
+        (message, offset) = read_string(buf, offset + 1)
+        (time_ms, car_index) = BROADCASTING_EVENT_TAIL.unpack_from(buf, offset)
+        event = {
+            "type": BROADCASTING_EVENT_TYPES.get(event_type, str(event_type)),
+            "message": message,
+            "time": time_ms / 1000.0,
+            "car_index": car_index,
+        }
+        self.events.append(event)
+        return event
+
+    def car_telemetry(self, car_index: int) -> Optional[Dict[str, Any]]:
+        """
+        Telemetria de um carro no formato usado pelos coletores em tempo
+        real (``speed``, ``gear``, ``lap_number``, ``POS_X``...).
+
+        O broadcasting não traz RPM, pedais nem forças G; esses canais não
+        são incluídos.
+        """
+        car = self.cars.car(car_index)
+        if car is None:
+            return None
+        entry = self.entries.get(car_index, {})
+        track_meters = self.track.get("track_meters", 0)
+        drivers = entry.get("drivers", [])
+        driver = drivers[car["driver_index"]] if car["driver_index"] < len(drivers) else {}
+
+        return {
+            "game": "ACC",
+            "track": self.track.get("track_name", ""),
+            "car": entry.get("team_name", ""),
+            "car_model": entry.get("car_model"),
+            "race_number": entry.get("race_number"),
+            "driver": f"{driver.get('first_name', '')} {driver.get('last_name', '')}".strip(),
+            "car_index": car_index,
+            "speed": float(car["kmh"]),
+            "gear": car["gear"],
+            "POS_X": car["world_x"],
+            "POS_Y": car["world_y"],
+            "yaw": car["yaw"],
+            "car_location": CAR_LOCATIONS.get(car["car_location"], str(car["car_location"])),
+            "position": car["position"],
+            "lap_number": car["laps"] + 1,
+            "lap_time": lap_seconds(car["current_lap_ms"]) or 0.0,
+            "last_lap_time": lap_seconds(car["last_lap_ms"]),
+            "best_lap_time": lap_seconds(car["best_lap_ms"]),
+            "lap_invalid": car["current_lap_invalid"],
+            "delta": car["delta"] / 1000.0,
+            "spline_position": car["spline_position"],
+            "distance_travelled": (car["laps"] + car["spline_position"]) * track_meters,
+            "session_time": self.session.get("session_time", 0.0),
+            "session_type": self.session.get("session_type", ""),
+        }
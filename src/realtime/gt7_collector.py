@@ -0,0 +1,123 @@
+"""
+Coletor de dados de telemetria em tempo real para Gran Turismo 7 (GT7).
+O GT7 envia pacotes criptografados por UDP enquanto receber heartbeats.
+"""
+
+import time
+import logging
+from typing import Dict, Any, Optional
+
+try:
+    from ..stm.gt7.packet import GT7DataPacket
+    from ..stm.gt7.db.cars import lookup_car_name
+except ImportError:
+    # stm usa imports absolutos, precisa de src no path
+    from stm.gt7.packet import GT7DataPacket
+    from stm.gt7.db.cars import lookup_car_name
+
+from .udp_service import DatagramSource, SourceCollector
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 33740
+DEFAULT_HEARTBEAT_PORT = 33739
+HEARTBEAT = b'A'
+# O GT7 para de enviar se não receber heartbeats por alguns segundos
+HEARTBEAT_PACKETS = 100
+HEARTBEAT_IDLE = 1.0
+
+class GT7Source(DatagramSource):
+    """
+    Fonte UDP do GT7.
+
+    Envia um heartbeat ao abrir, a cada 100 pacotes recebidos e a cada
+    segundo sem pacotes, como o GT7Sampler do stm.
+    """
+
+    name = "gt7"
+
+    def __init__(self, host: str = "255.255.255.255", port: int = DEFAULT_PORT,
+                 hb_port: int = DEFAULT_HEARTBEAT_PORT, **kwargs):
+        """
+        Args:
+            host: Endereço do console (ou broadcast)
+            port: Porta onde os pacotes chegam; fora da porta padrão o
+                coletor está num relay e não envia heartbeats
+            hb_port: Porta de heartbeat do console
+            **kwargs: Opções da fila (ver DatagramSource)
+        """
+        port = int(port)
+        super().__init__(local_addr=("0.0.0.0", port), allow_broadcast=(host == "255.255.255.255"), **kwargs)
+        if port != DEFAULT_PORT:
+            self.hb_addr = None
+            logger.info("Relay mode. Heartbeats não serão enviados ao GT7")
+        else:
+            self.hb_addr = (host, hb_port)
+        self.packets_since_heartbeat = 0
+        self.last_heartbeat = 0.0
+        self.last_packet = 0.0
+
+    def connection_made(self, transport):
+        super().connection_made(transport)
+        self.send_heartbeat(time.monotonic())
+
+    def send_heartbeat(self, now: float):
+        if not self.hb_addr:
+            return
+        self.send(HEARTBEAT, self.hb_addr)
+        self.packets_since_heartbeat = 0
+        self.last_heartbeat = now
+
+    def tick(self, now: float):
+        if now - self.last_packet >= HEARTBEAT_IDLE and now - self.last_heartbeat >= HEARTBEAT_IDLE:
+            self.send_heartbeat(now)
+
+    def datagram_received(self, data: bytes, addr) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        self.last_packet = now
+        self.packets_since_heartbeat += 1
+        if self.packets_since_heartbeat >= HEARTBEAT_PACKETS:
+            self.send_heartbeat(now)
+
+        if len(data) != GT7DataPacket.size:
+            return None
+        decrypted = GT7DataPacket.decrypt(data)
+        if not decrypted:
+            # Chave errada ou pacote corrompido
+            return None
+        packet = GT7DataPacket(decrypted, encrypted=False)
+        return self.packet_telemetry(packet)
+
+    @staticmethod
+    def packet_telemetry(packet: GT7DataPacket) -> Dict[str, Any]:
+        """Converte um pacote para o formato usado pelos coletores em tempo real."""
+        return {
+            "game": "GT7",
+            "car": lookup_car_name(packet.car_code),
+            "car_code": packet.car_code,
+            "speed": packet.speed * 3.6,
+            "rpm": packet.rpm,
+            "throttle": packet.throttle / 2.55,
+            "brake": packet.brake / 2.55,
+            "clutch": packet.clutch,
+            "gear": packet.gear,
+            "POS_X": packet.position.x,
+            "POS_Y": packet.position.z,
+            "lap_number": packet.current_lap,
+            "laps": packet.laps,
+            "best_lap_time": packet.best_laptime / 1000.0 if packet.best_laptime > 0 else None,
+            "last_lap_time": packet.last_laptime / 1000.0 if packet.last_laptime > 0 else None,
+            "position": packet.race_position,
+            "tick": packet.tick,
+            "paused": packet.paused,
+            "in_race": packet.in_race,
+        }
+
+
+class GT7DataCollector(SourceCollector):
+    """Coleta dados de telemetria do GT7 via UDP."""
+
+    def __init__(self, host: str = "255.255.255.255", port: int = DEFAULT_PORT, **kwargs):
+        super().__init__(GT7Source(host, port, **kwargs))
+        self.host = host
+        self.port = port
@@ -3,82 +3,25 @@ Coletor de dados de telemetria em tempo real para Le Mans Ultimate (LMU).
 Utiliza o protocolo UDP para receber dados do jogo.
 """
 
-import socket
 import struct
-import json
-import threading
 import time
 import logging
-from typing import Dict, Any, Callable, Optional
+from typing import Dict, Any, Optional
+
+from .udp_service import DatagramSource, SourceCollector
 
 logger = logging.getLogger(__name__)
 
-class LMUDataCollector:
-    """Coleta dados de telemetria do LMU via UDP."""
-    
-    def __init__(self, host: str = "127.0.0.1", port: int = 5000, buffer_size: int = 4096):
-        self.host = host
-        self.port = port
-        self.buffer_size = buffer_size
-        self.socket = None
-        self.running = False
-        self.thread = None
-        self.data_callback: Optional[Callable[[Dict[str, Any]], None]] = None
-        self.last_telemetry_data: Dict[str, Any] = {}
-        
-    def start(self, data_callback: Callable[[Dict[str, Any]], None]):
-        """Inicia o coletor de dados."""
-        if self.running:
-            logger.warning("Coletor já está rodando.")
-            return
-        
-        self.data_callback = data_callback
-        self.running = True
-        self.thread = threading.Thread(target=self._run_collector)
-        self.thread.daemon = True
-        self.thread.start()
-        logger.info(f"Coletor LMU iniciado no {self.host}:{self.port}")
-        
-    def stop(self):
-        """Para o coletor de dados."""
-        if not self.running:
-            logger.warning("Coletor não está rodando.")
-            return
-        
-        self.running = False
-        if self.socket:
-            self.socket.close()
-        if self.thread:
-            self.thread.join(timeout=1)
-        logger.info("Coletor LMU parado.")
-        
-    def _run_collector(self):
-        """Loop principal de coleta de dados."""
-        try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            self.socket.bind((self.host, self.port))
-            self.socket.settimeout(1.0)
-            logger.info(f"Aguardando dados UDP do LMU em {self.host}:{self.port}...")
-            
-            while self.running:
-                try:
-                    data, addr = self.socket.recvfrom(self.buffer_size)
-                    telemetry = self._parse_lmu_udp_data(data)
-                    if telemetry:
-                        self.last_telemetry_data = telemetry
-                        if self.data_callback:
-                            self.data_callback(telemetry)
-                except socket.timeout:
-                    pass
-                except Exception as e:
-                    logger.error(f"Erro ao receber/processar dados UDP do LMU: {e}")
-                    time.sleep(0.1)
-        except Exception as e:
-            logger.critical(f"Erro fatal ao iniciar socket UDP para LMU: {e}")
-        finally:
-            if self.socket:
-                self.socket.close()
-            self.running = False
+class LMUSource(DatagramSource):
+    """Fonte UDP do LMU."""
+
+    name = "lmu"
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5000, **kwargs):
+        super().__init__(local_addr=(host, port), **kwargs)
+
+    def datagram_received(self, data: bytes, addr) -> Optional[Dict[str, Any]]:
+        return self._parse_lmu_udp_data(data)
 
     def _parse_lmu_udp_data(self, data: bytes) -> Optional[Dict[str, Any]]:
         """Parses the raw UDP data from LMU.
@@ -129,9 +72,14 @@ class LMUDataCollector:
             
         return None
 
-    def get_last_telemetry_data(self) -> Dict[str, Any]:
-        """Retorna o último pacote de telemetria recebido."""
-        return self.last_telemetry_data
+
+class LMUDataCollector(SourceCollector):
+    """Coleta dados de telemetria do LMU via UDP."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5000, **kwargs):
+        super().__init__(LMUSource(host, port, **kwargs))
+        self.host = host
+        self.port = port
 
 # Exemplo de uso (para testes)
 if __name__ == "__main__":
@@ -139,7 +87,7 @@ if __name__ == "__main__":
     
     def print_telemetry(data):
         if "speed" in data:
-            print(f"Speed: {data["speed"]:.2f} km/h, RPM: {data["rpm"]:.0f}, Gear: {data["gear"]}")
+            print(f"Speed: {data['speed']:.2f} km/h, RPM: {data['rpm']:.0f}, Gear: {data['gear']}")
             
     collector = LMUDataCollector()
     try:
@@ -3,70 +3,111 @@ Gerenciador de dados de telemetria em tempo real.
 Responsável por iniciar e parar coletores de dados e distribuir telemetria.
 """
 
+import time
 import logging
 from typing import Dict, Any, Callable, Optional
 
-from realtime.acc_collector import ACCDataCollector
-from realtime.lmu_collector import LMUDataCollector
+from .acc_collector import ACCSource
+from .lmu_collector import LMUSource
+from .stream_analyzer import StreamingLapAnalyzer, StreamResult
+from .udp_service import RealtimeService, DROP_OLDEST
 
 logger = logging.getLogger(__name__)
 
+def _gt7_source(**options):
+    # Importado só quando usado: o decodificador do GT7 vem do stm
+    from .gt7_collector import GT7Source
+    return GT7Source(**options)
+
+SOURCES = {
+    "acc": ACCSource,
+    "lmu": LMUSource,
+    "gt7": _gt7_source,
+}
+
 class RealtimeTelemetryManager:
-    """Gerencia a coleta e distribuição de telemetria em tempo real."""
+    """
+    Gerencia a coleta e distribuição de telemetria em tempo real.
+
+    Todas as fontes rodam no mesmo RealtimeService (um loop asyncio numa
+    única thread); os callbacks são chamados na thread do serviço. Cada
+    amostra passa também pelo StreamingLapAnalyzer, que entrega setores e
+    voltas concluídos assim que a linha é cruzada.
+    """
     
-    def __init__(self):
-        self.acc_collector: Optional[ACCDataCollector] = None
-        self.lmu_collector: Optional[LMUDataCollector] = None
+    def __init__(self, maxsize: int = 256, policy: str = DROP_OLDEST):
+        """
+        Args:
+            maxsize: Tamanho da fila de cada fonte até o callback
+            policy: DROP_OLDEST ou BLOCK quando a fila enche
+        """
+        self.service = RealtimeService()
+        self.maxsize = maxsize
+        self.policy = policy
         self.data_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.analysis_callback: Optional[Callable[[StreamResult], None]] = None
+        self.lap_analyzer = StreamingLapAnalyzer()
         self.current_game: Optional[str] = None
+        self.last_data: Optional[Dict[str, Any]] = None
         
-    def start_collector(self, game: str, data_callback: Callable[[Dict[str, Any]], None]):
-        """Inicia o coletor de dados para o jogo especificado."""
+    def start_collector(self, game: str, data_callback: Callable[[Dict[str, Any]], None],
+                        analysis_callback: Optional[Callable[[StreamResult], None]] = None, **options):
+        """
+        Inicia a coleta para o jogo especificado.
+
+        Args:
+            game: "acc", "lmu" ou "gt7"
+            data_callback: Recebe cada pacote de telemetria decodificado
+            analysis_callback: Recebe cada setor e volta concluídos (SectorResult/LapResult)
+            **options: Opções da fonte (host, porta...)
+        """
         self.stop_all_collectors() # Garante que apenas um coletor esteja ativo
         
+        factory = SOURCES.get(game.lower())
+        if factory is None:
+            logger.warning(f"Jogo '{game}' não suportado para telemetria em tempo real.")
+            return
+
+        options.setdefault("maxsize", self.maxsize)
+        options.setdefault("policy", self.policy)
         self.data_callback = data_callback
+        self.analysis_callback = analysis_callback
         self.current_game = game.lower()
-        
-        if self.current_game == "acc":
-            self.acc_collector = ACCDataCollector()
-            self.acc_collector.start(self._process_realtime_data)
-            logger.info("Coletor ACC iniciado.")
-        elif self.current_game == "lmu":
-            self.lmu_collector = LMUDataCollector()
-            self.lmu_collector.start(self._process_realtime_data)
-            logger.info("Coletor LMU iniciado.")
-        else:
-            logger.warning(f"Jogo \'{game}\' não suportado para telemetria em tempo real.")
+        self.last_data = None
+        self.lap_analyzer.reset()
+        self.service.add_source(factory(**options), self._process_realtime_data)
+        logger.info(f"Coletor {game.upper()} iniciado.")
             
     def stop_all_collectors(self):
         """Para todos os coletores de dados ativos."""
-        if self.acc_collector and self.acc_collector.running:
-            self.acc_collector.stop()
-            self.acc_collector = None
-            logger.info("Coletor ACC parado.")
-            
-        if self.lmu_collector and self.lmu_collector.running:
-            self.lmu_collector.stop()
-            self.lmu_collector = None
-            logger.info("Coletor LMU parado.")
-            
+        for name in list(self.service.sources):
+            self.service.remove_source(name)
+            logger.info(f"Coletor {name.upper()} parado.")
         self.current_game = None
+
+    def shutdown(self):
+        """Para os coletores e encerra o loop do serviço."""
+        self.stop_all_collectors()
+        self.service.stop()
         
     def _process_realtime_data(self, data: Dict[str, Any]):
         """Processa e distribui os dados de telemetria recebidos."""
         # Aqui você pode adicionar lógica para normalizar dados entre jogos
         # ou para enriquecer os dados antes de passá-los para a UI/análise.
-        
+        self.last_data = data
         if self.data_callback:
             self.data_callback(data)
+        for result in self.lap_analyzer.push(data):
+            if self.analysis_callback:
+                self.analysis_callback(result)
             
     def get_last_data(self) -> Optional[Dict[str, Any]]:
         """Retorna o último pacote de dados do coletor ativo."""
-        if self.current_game == "acc" and self.acc_collector:
-            return self.acc_collector.get_last_telemetry_data()
-        elif self.current_game == "lmu" and self.lmu_collector:
-            return self.lmu_collector.get_last_telemetry_data()
-        return None
+        return self.last_data
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Taxa de pacotes, descartes e erros de cada fonte ativa."""
+        return self.service.get_stats()
 
 # Exemplo de uso (para testes)
 if __name__ == "__main__":
@@ -74,7 +115,7 @@ if __name__ == "__main__":
     
     def handle_telemetry(data):
         if "speed" in data:
-            print(f"[Realtime] Speed: {data["speed"]:.2f} km/h, RPM: {data["rpm"]:.0f}, Gear: {data["gear"]}")
+            print(f"[Realtime] Speed: {data['speed']:.2f} km/h, RPM: {data.get('rpm', 0):.0f}, Gear: {data['gear']}")
             
     manager = RealtimeTelemetryManager()
     
@@ -86,7 +127,7 @@ if __name__ == "__main__":
     print("\n--- Testando LMU ---")
     manager.start_collector("lmu", handle_telemetry)
     time.sleep(5) # Simula tempo de execução
-    manager.stop_all_collectors()
+    manager.shutdown()
     
     print("\n--- Teste Concluído ---")
 
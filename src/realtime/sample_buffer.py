@@ -0,0 +1,102 @@
+"""
+Buffer circular das amostras em tempo real entre os coletores e a UI.
+
+Os coletores empurram uma amostra (dicionário) por pacote, de qualquer
+thread; quem desenha retira de uma vez tudo o que chegou desde a última
+leitura, já convertido em arrays por canal. Quando a UI não acompanha, as
+amostras mais antigas são descartadas e contadas.
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RealtimeBatch:
+    """
+    Amostras recebidas desde a última leitura.
+
+    Attributes:
+        count: Número de amostras
+        columns: Canais numéricos, um array por canal, em ordem de chegada
+        latest: Última amostra recebida, com todos os campos (pista, carro...)
+        dropped: Amostras descartadas por excesso desde a leitura anterior
+    """
+    count: int
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    latest: Dict[str, Any] = field(default_factory=dict)
+    dropped: int = 0
+
+    @classmethod
+    def from_samples(cls, samples: List[Dict[str, Any]], dropped: int = 0) -> "RealtimeBatch":
+        """Monta o lote, um array por canal numérico presente na última amostra."""
+        latest = samples[-1]
+        columns = {}
+        for (name, value) in latest.items():
+            if not isinstance(value, (int, float)):
+                continue
+            values = [sample.get(name) for sample in samples]
+            try:
+                array = np.asarray(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                continue
+            columns[name] = array
+        return cls(len(samples), columns, latest, dropped)
+
+
+class RealtimeSampleBuffer:
+    """Buffer circular de amostras, seguro entre threads."""
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: Máximo de amostras guardadas entre duas leituras
+        """
+        if capacity <= 0:
+            raise ValueError("A capacidade do buffer deve ser positiva")
+        self._samples = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    @property
+    def capacity(self) -> int:
+        return self._samples.maxlen
+
+    def push(self, sample: Dict[str, Any]) -> bool:
+        """
+        Guarda uma amostra.
+
+        Returns:
+            True se o buffer estava vazio, ou seja, se quem lê ainda não foi
+            avisado de que há amostras novas
+        """
+        with self._lock:
+            samples = self._samples
+            if len(samples) == samples.maxlen:
+                self._dropped += 1
+            samples.append(sample)
+            return len(samples) == 1
+
+    def drain(self) -> Optional[RealtimeBatch]:
+        """Retira todas as amostras guardadas como um lote (None se vazio)."""
+        with self._lock:
+            if not self._samples:
+                return None
+            samples = list(self._samples)
+            self._samples.clear()
+            dropped = self._dropped
+            self._dropped = 0
+        return RealtimeBatch.from_samples(samples, dropped)
+
+    def clear(self):
+        """Descarta as amostras guardadas."""
+        with self._lock:
+            self._samples.clear()
+            self._dropped = 0
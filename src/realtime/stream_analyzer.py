@@ -0,0 +1,382 @@
+"""
+Análise incremental de voltas durante a sessão ao vivo.
+
+As amostras são consumidas na ordem em que chegam, cada uma com trabalho
+O(1): acumuladores da volta e do setor em andamento (tempo com acelerador
+cheio, frenagens, sobreposição de pedais, velocidade mínima nas curvas) e o
+delta parcial contra a melhor volta. Quando um setor ou a volta termina, o
+resultado é devolvido na hora, sem reprocessar o histórico.
+
+A melhor volta é guardada como o tempo decorrido a cada ``delta_step``
+metros, então o delta de uma amostra é uma consulta por índice.
+"""
+
+import time
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Limites dos setores como fração da volta, quando a fonte não informa o setor
+DEFAULT_SECTOR_BOUNDS = (1 / 3, 2 / 3)
+
+# Chaves de tempo absoluto, em ordem de preferência
+_TIME_KEYS = ("time", "session_time")
+# Chaves de distância acumulada na sessão
+_DISTANCE_KEYS = ("distance_travelled", "distance")
+
+
+@dataclass(frozen=True)
+class SectorResult:
+    """Setor concluído."""
+    lap_number: int
+    sector: int  # 1, 2, 3...
+    time: float
+    delta: Optional[float]  # Delta parcial contra a melhor volta no fim do setor
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class LapResult:
+    """Volta concluída."""
+    lap_number: int
+    lap_time: float
+    complete: bool  # False para a volta em que a captura começou
+    best: bool
+    delta: Optional[float]  # Diferença para a melhor volta anterior
+    sectors: Tuple[SectorResult, ...] = ()
+    corner_speeds: Tuple[float, ...] = ()
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+
+StreamResult = Union[SectorResult, LapResult]
+
+
+class _Accumulator:
+    """Somas de um trecho (volta ou setor), atualizadas a cada amostra."""
+
+    __slots__ = ("time", "distance", "speed_time", "max_speed", "min_speed",
+                 "full_throttle_time", "braking_time", "overlap_time",
+                 "brake_events", "corners", "min_corner_speed")
+
+    def __init__(self):
+        self.time = 0.0
+        self.distance = 0.0
+        self.speed_time = 0.0
+        self.max_speed = 0.0
+        self.min_speed = float("inf")
+        self.full_throttle_time = 0.0
+        self.braking_time = 0.0
+        self.overlap_time = 0.0
+        self.brake_events = 0
+        self.corners = 0
+        self.min_corner_speed = float("inf")
+
+    def metrics(self) -> Dict[str, float]:
+        duration = self.time or float("nan")
+        return {
+            "time": self.time,
+            "distance": self.distance,
+            "average_speed": self.speed_time / duration if self.time else 0.0,
+            "max_speed": self.max_speed,
+            "min_speed": self.min_speed if self.min_speed != float("inf") else 0.0,
+            "full_throttle_time": self.full_throttle_time,
+            "full_throttle_percentage": self.full_throttle_time / duration * 100 if self.time else 0.0,
+            "braking_time": self.braking_time,
+            "brake_events": self.brake_events,
+            "overlap_time": self.overlap_time,
+            "corners": self.corners,
+            "min_corner_speed": self.min_corner_speed if self.min_corner_speed != float("inf") else 0.0,
+        }
+
+
+class StreamingLapAnalyzer:
+    """
+    Analisa a sessão ao vivo uma amostra por vez.
+
+    As amostras são dicionários no formato dos coletores em tempo real
+    (``speed``, ``throttle``, ``brake``, ``lap_number``...). A volta termina
+    quando ``lap_number`` muda (ou ``spline_position`` recomeça) e o setor
+    quando ``sector`` muda; sem ``sector``, os setores vêm da fração da volta
+    (``spline_position`` ou a distância da melhor volta).
+    """
+
+    def __init__(self, sector_bounds: Sequence[float] = DEFAULT_SECTOR_BOUNDS,
+                 pedal_scale: float = 100.0, full_throttle: float = 0.95,
+                 pedal_on: float = 0.10, corner_hysteresis: float = 10.0,
+                 delta_step: float = 10.0):
+        """
+        Args:
+            sector_bounds: Início de cada setor após o primeiro, em fração da volta
+            pedal_scale: Valor dos pedais totalmente pressionados (100 ou 1)
+            full_throttle: Fração do acelerador considerada pé embaixo
+            pedal_on: Fração a partir da qual um pedal conta como pressionado
+            corner_hysteresis: Queda/retomada de velocidade (km/h) que marca uma curva
+            delta_step: Resolução (m) da melhor volta usada no delta
+        """
+        self.sector_bounds = tuple(sector_bounds)
+        self.full_throttle = full_throttle * pedal_scale
+        self.pedal_on = pedal_on * pedal_scale
+        self.corner_hysteresis = corner_hysteresis
+        self.delta_step = delta_step
+        self.reset()
+
+    def reset(self):
+        """Esquece a sessão, inclusive a melhor volta."""
+        self.best_lap_time: Optional[float] = None
+        self._reference: Optional[np.ndarray] = None
+        self._reference_length = 0.0
+        self.laps_completed = 0
+        self._time_key: Optional[str] = None
+        self._distance_key: Optional[str] = None
+        self._keys_resolved = False
+        self._lap_number: Optional[int] = None
+        self._complete = False
+        self._start_lap()
+
+    def _start_lap(self, start_time: Optional[float] = None, start_distance: Optional[float] = None):
+        self._lap = _Accumulator()
+        self._sector = _Accumulator()
+        self._sector_index = 0
+        self._sectors: List[SectorResult] = []
+        self._corner_speeds: List[float] = []
+        self._lap_start_time = start_time
+        self._lap_start_distance = start_distance
+        self._last_time: Optional[float] = None
+        self._last_spline: Optional[float] = None
+        self._braking = False
+        self._peak_speed = 0.0
+        self._in_corner = False
+        self._corner_min = float("inf")
+        self._trace: List[float] = []
+        self.delta: Optional[float] = None
+
+    def _resolve_keys(self, sample: Mapping[str, Any]):
+        # Decidido na primeira amostra: as fontes mandam sempre os mesmos campos
+        self._time_key = next((key for key in _TIME_KEYS if key in sample), None)
+        if self._time_key is None and "lap_time" in sample:
+            self._time_key = "lap_time"
+        self._distance_key = next((key for key in _DISTANCE_KEYS if key in sample), None)
+        self._keys_resolved = True
+
+    def _elapsed(self, sample: Mapping[str, Any]) -> float:
+        """Tempo decorrido na volta."""
+        if self._time_key == "lap_time":
+            return float(sample["lap_time"] or 0.0)
+        now = float(sample[self._time_key]) if self._time_key else time.monotonic()
+        if self._lap_start_time is None:
+            self._lap_start_time = now
+        return now - self._lap_start_time
+
+    def _lap_distance(self, sample: Mapping[str, Any], speed: float, dt: float) -> float:
+        """Distância percorrida na volta."""
+        if self._distance_key is None:
+            return self._lap.distance + speed / 3.6 * dt
+        value = float(sample[self._distance_key] or 0.0)
+        if self._lap_start_distance is None:
+            self._lap_start_distance = value
+        return max(0.0, value - self._lap_start_distance)
+
+    def _sector_of(self, sample: Mapping[str, Any], distance: float) -> int:
+        sector = sample.get("sector")
+        if sector is not None:
+            return int(sector)
+        spline = sample.get("spline_position")
+        if spline is not None:
+            return bisect_right(self.sector_bounds, float(spline))
+        if self._reference_length > 0:
+            return bisect_right(self.sector_bounds, distance / self._reference_length)
+        return 0
+
+    def _lap_finished(self, sample: Mapping[str, Any]) -> bool:
+        lap_number = sample.get("lap_number")
+        if lap_number is not None:
+            return self._lap_number is not None and lap_number != self._lap_number
+        spline = sample.get("spline_position")
+        if spline is not None:
+            return self._last_spline is not None and spline < self._last_spline - 0.5
+        sector = sample.get("sector")
+        if sector is not None:
+            return int(sector) < self._sector_index
+        return False
+
+    def _reference_time(self, distance: float) -> Optional[float]:
+        """Tempo da melhor volta na mesma distância, interpolado entre dois pontos."""
+        reference = self._reference
+        if reference is None:
+            return None
+        position = distance / self.delta_step
+        index = int(position)
+        if index + 1 >= len(reference):
+            return None
+        return reference[index] + (reference[index + 1] - reference[index]) * (position - index)
+
+    def push(self, sample: Mapping[str, Any]) -> List[StreamResult]:
+        """
+        Consome uma amostra.
+
+        Returns:
+            Setores e voltas concluídos por esta amostra (normalmente nenhum)
+        """
+        if not self._keys_resolved:
+            self._resolve_keys(sample)
+
+        results: List[StreamResult] = []
+        if self._lap_finished(sample):
+            results.extend(self.finish_lap(sample))
+        if sample.get("lap_number") is not None:
+            self._lap_number = sample["lap_number"]
+        if sample.get("spline_position") is not None:
+            self._last_spline = sample["spline_position"]
+
+        elapsed = self._elapsed(sample)
+        dt = 0.0 if self._last_time is None else max(0.0, elapsed - self._last_time)
+        self._last_time = elapsed
+
+        speed = float(sample.get("speed") or 0.0)
+        throttle = float(sample.get("throttle") or 0.0)
+        brake = float(sample.get("brake") or 0.0)
+        distance = self._lap_distance(sample, speed, dt)
+
+        # Setores só avançam; a volta fecha o último
+        sector = self._sector_of(sample, distance)
+        if sector > self._sector_index:
+            results.append(self._close_sector())
+            self._sector_index = sector
+
+        self._sector.time += dt
+        self._sector.distance += max(0.0, distance - self._lap.distance)
+        self._lap.time = elapsed
+        self._lap.distance = distance
+
+        braking = brake >= self.pedal_on
+        for acc in (self._lap, self._sector):
+            acc.speed_time += speed * dt
+            acc.max_speed = max(acc.max_speed, speed)
+            acc.min_speed = min(acc.min_speed, speed)
+            if throttle >= self.full_throttle:
+                acc.full_throttle_time += dt
+            if braking:
+                acc.braking_time += dt
+                if throttle >= self.pedal_on:
+                    acc.overlap_time += dt
+                if not self._braking:
+                    acc.brake_events += 1
+        self._braking = braking
+        self._track_corner(speed)
+
+        # Tempo decorrido a cada delta_step metros, base do delta da próxima volta
+        while len(self._trace) * self.delta_step <= distance:
+            self._trace.append(elapsed)
+        reference = self._reference_time(distance)
+        self.delta = None if reference is None else elapsed - reference
+
+        return results
+
+    def push_columns(self, columns: Mapping[str, np.ndarray]) -> List[StreamResult]:
+        """Consome várias amostras em colunas (por exemplo ``RealtimeBatch.columns``)."""
+        names = list(columns)
+        rows = zip(*(columns[name].tolist() for name in names))
+        results = []
+        for row in rows:
+            results.extend(self.push(dict(zip(names, row))))
+        return results
+
+    def _track_corner(self, speed: float):
+        # Uma curva é uma queda de velocidade seguida de retomada, com histerese
+        if not self._in_corner:
+            self._peak_speed = max(self._peak_speed, speed)
+            if speed < self._peak_speed - self.corner_hysteresis:
+                self._in_corner = True
+                self._corner_min = speed
+        elif speed < self._corner_min:
+            self._corner_min = speed
+        elif speed > self._corner_min + self.corner_hysteresis:
+            apex = self._corner_min
+            self._corner_speeds.append(apex)
+            for acc in (self._lap, self._sector):
+                acc.corners += 1
+                acc.min_corner_speed = min(acc.min_corner_speed, apex)
+            self._in_corner = False
+            self._peak_speed = speed
+
+    def _close_sector(self) -> SectorResult:
+        result = SectorResult(
+            lap_number=self._lap_number if self._lap_number is not None else self.laps_completed + 1,
+            sector=self._sector_index + 1,
+            time=self._sector.time,
+            delta=self.delta,
+            metrics=self._sector.metrics(),
+        )
+        self._sectors.append(result)
+        self._sector = _Accumulator()
+        return result
+
+    def finish_lap(self, sample: Optional[Mapping[str, Any]] = None) -> List[StreamResult]:
+        """
+        Encerra a volta em andamento.
+
+        Args:
+            sample: Primeira amostra da volta seguinte, se houver; o tempo
+                oficial da volta (``last_lap_time``) é lido dela
+
+        Returns:
+            O último setor e a volta
+        """
+        results: List[StreamResult] = []
+        if self._last_time is None:
+            return results
+
+        # O intervalo até a amostra que cruzou a linha ainda é desta volta
+        if sample is not None and self._time_key in _TIME_KEYS:
+            gap = float(sample[self._time_key]) - self._lap_start_time - self._lap.time
+            if gap > 0:
+                self._lap.time += gap
+                self._sector.time += gap
+        sector = self._close_sector()
+        results.append(sector)
+
+        official = sample.get("last_lap_time") if sample is not None else None
+        lap_time = float(official) if official else self._lap.time
+        previous_best = self.best_lap_time
+        delta = None if previous_best is None else lap_time - previous_best
+        best = self._complete and (previous_best is None or lap_time < previous_best)
+        if best:
+            self.best_lap_time = lap_time
+            self._reference = np.asarray(self._trace, dtype=np.float64)
+            self._reference_length = self._lap.distance
+
+        results.append(LapResult(
+            lap_number=sector.lap_number,
+            lap_time=lap_time,
+            complete=self._complete,
+            best=best,
+            delta=delta,
+            sectors=tuple(self._sectors),
+            corner_speeds=tuple(self._corner_speeds),
+            metrics=self._lap.metrics(),
+        ))
+        self.laps_completed += 1
+
+        # A próxima volta começa na amostra que cruzou a linha
+        start_time = None
+        start_distance = None
+        if sample is not None:
+            if self._time_key in _TIME_KEYS:
+                start_time = float(sample[self._time_key])
+            if self._distance_key is not None:
+                start_distance = float(sample[self._distance_key] or 0.0)
+        self._start_lap(start_time, start_distance)
+        self._complete = True
+        return results
+
+    def current_lap(self) -> Dict[str, Any]:
+        """Métricas da volta em andamento até a última amostra."""
+        metrics = self._lap.metrics()
+        metrics["sector"] = self._sector_index + 1
+        metrics["delta"] = self.delta
+        return metrics
@@ -0,0 +1,430 @@
+"""
+Serviço de coleta em tempo real com um único loop asyncio.
+
+Todas as fontes UDP (ACC, LMU, GT7...) rodam como ``DatagramProtocol`` no
+mesmo loop, numa única thread. Cada fonte decodifica os pacotes e coloca o
+resultado numa fila limitada que é esvaziada em lotes pelo consumidor
+dela. Quando a fila enche, a fonte descarta o item mais antigo
+(``DROP_OLDEST``) ou para de ler o socket até o consumidor alcançar
+(``BLOCK``); nesse caso os pacotes esperam no buffer do sistema.
+
+O serviço mantém contadores por fonte: pacotes, bytes, taxa de pacotes por
+segundo, itens descartados, agrupados e erros.
+"""
+
+import time
+import asyncio
+import inspect
+import logging
+import threading
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+# Intervalo das tarefas periódicas das fontes (heartbeat, novo registro...)
+TICK_INTERVAL = 0.25
+
+
+class CoalescingQueue:
+    """
+    Fila limitada entre uma fonte e seu consumidor.
+
+    Itens com a mesma chave são agrupados: o novo substitui o que ainda não
+    foi consumido, mantendo a posição. Itens sem chave são sempre
+    adicionados. O consumidor recebe todos os itens pendentes de uma vez.
+    """
+
+    def __init__(self, maxsize: int = 256, policy: str = DROP_OLDEST):
+        if maxsize <= 0:
+            raise ValueError("O tamanho da fila deve ser positivo")
+        if policy not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"Política de fila desconhecida: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.dropped = 0
+        self.coalesced = 0
+        self._seq = count()
+        self._waiter: Optional[asyncio.Future] = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def full(self) -> bool:
+        return len(self.items) >= self.maxsize
+
+    def put(self, item: Any, key: Optional[Hashable] = None) -> bool:
+        """
+        Adiciona um item sem bloquear.
+
+        Args:
+            item: Item a entregar ao consumidor
+            key: Chave de agrupamento, ou None para não agrupar
+
+        Returns:
+            True se a fila ficou cheia (com a política BLOCK a fonte deve
+            parar de ler)
+        """
+        if key is None:
+            key = (CoalescingQueue, next(self._seq))
+        if key in self.items:
+            self.items[key] = item
+            self.coalesced += 1
+        else:
+            if self.policy == DROP_OLDEST and len(self.items) >= self.maxsize:
+                self.items.popitem(last=False)
+                self.dropped += 1
+            self.items[key] = item
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+        return self.full()
+
+    def get_nowait(self) -> List[Any]:
+        """Retira todos os itens pendentes (lista vazia se não houver)."""
+        batch = list(self.items.values())
+        self.items.clear()
+        return batch
+
+    async def get_batch(self) -> List[Any]:
+        """Espera haver itens e retira todos os pendentes."""
+        while not self.items:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self.get_nowait()
+
+
+class SourceStats:
+    """Contadores de uma fonte."""
+
+    def __init__(self):
+        self.packets = 0
+        self.bytes = 0
+        self.items = 0
+        self.errors = 0
+        self.pauses = 0
+        self.rate = 0.0
+        self._rate_packets = 0
+        self._rate_time = time.monotonic()
+
+    def update_rate(self, now: float):
+        elapsed = now - self._rate_time
+        if elapsed >= 1.0:
+            self.rate = (self.packets - self._rate_packets) / elapsed
+            self._rate_packets = self.packets
+            self._rate_time = now
+
+
+class DatagramSource:
+    """
+    Fonte UDP hospedada pelo RealtimeService.
+
+    As subclasses decodificam os pacotes em ``datagram_received`` e
+    retornam o item a entregar (ou None para não entregar nada). Os métodos
+    são chamados na thread do loop.
+    """
+
+    name = "udp"
+
+    def __init__(self, local_addr: Optional[Tuple[str, int]] = None,
+                 remote_addr: Optional[Tuple[str, int]] = None,
+                 allow_broadcast: bool = False, maxsize: int = 256,
+                 policy: str = DROP_OLDEST, coalesce: bool = False):
+        """
+        Args:
+            local_addr: Endereço onde escutar (None para uma porta livre)
+            remote_addr: Endereço do jogo, para fontes que enviam mensagens a ele
+            allow_broadcast: Permite enviar para endereços de broadcast
+            maxsize: Tamanho da fila até o consumidor
+            policy: DROP_OLDEST ou BLOCK
+            coalesce: Se True, só o item mais recente fica na fila
+        """
+        self.local_addr = local_addr
+        self.remote_addr = remote_addr
+        self.allow_broadcast = allow_broadcast
+        self.maxsize = maxsize
+        self.policy = policy
+        self.coalesce = coalesce
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_made(self, transport: asyncio.DatagramTransport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> Optional[Any]:
+        return data
+
+    def coalesce_key(self, item: Any) -> Optional[Hashable]:
+        return self.name if self.coalesce else None
+
+    def tick(self, now: float):
+        """Chamado periodicamente (``TICK_INTERVAL``) com ``time.monotonic()``."""
+        pass
+
+    def close(self):
+        """Chamado antes do socket ser fechado."""
+        pass
+
+    def send(self, data: bytes, addr: Optional[Tuple[str, int]] = None):
+        """Envia uma mensagem, ignorando erros de rede."""
+        if self.transport is None or self.transport.is_closing():
+            return
+        try:
+            if addr is None:
+                self.transport.sendto(data)
+            else:
+                self.transport.sendto(data, addr)
+        except OSError as e:
+            logger.debug(f"Erro ao enviar mensagem da fonte {self.name}: {e}")
+
+
+class _SourceProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, source: DatagramSource, queue: CoalescingQueue, stats: SourceStats):
+        self.source = source
+        self.queue = queue
+        self.stats = stats
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.source.connection_made(transport)
+
+    def datagram_received(self, data, addr):
+        stats = self.stats
+        stats.packets += 1
+        stats.bytes += len(data)
+        try:
+            item = self.source.datagram_received(data, addr)
+        except Exception as e:
+            stats.errors += 1
+            logger.debug(f"Erro ao decodificar pacote da fonte {self.source.name}: {e}")
+            return
+        if item is None:
+            return
+        stats.items += 1
+        if self.queue.put(item, self.source.coalesce_key(item)) and self.queue.policy == BLOCK:
+            self.transport.pause_reading()
+            stats.pauses += 1
+
+    def error_received(self, exc):
+        # ConnectionRefused quando o jogo ainda não está escutando
+        self.stats.errors += 1
+        logger.debug(f"Erro de rede na fonte {self.source.name}: {exc}")
+
+
+class _Entry:
+
+    def __init__(self, source, consumer, batch, transport, protocol, task):
+        self.source = source
+        self.consumer = consumer
+        self.batch = batch
+        self.transport = transport
+        self.protocol = protocol
+        self.task = task
+
+
+class RealtimeService:
+    """
+    Loop asyncio único que hospeda as fontes UDP.
+
+    ``start()`` cria a thread do loop; ``add_source``/``remove_source``
+    podem ser chamados de qualquer thread. Os consumidores são chamados na
+    thread do loop e podem ser funções comuns ou corrotinas. Uma função
+    comum deve ser rápida (repassar o item para outra thread, por exemplo),
+    pois enquanto ela roda nenhuma fonte lê pacotes; um consumidor lento
+    deve ser uma corrotina, e então a fila e a política dela (descartar ou
+    parar de ler) absorvem a diferença de ritmo.
+    """
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.sources: Dict[str, _Entry] = {}
+        self._ticker = None
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        """Inicia o loop numa thread própria."""
+        if self.running:
+            return
+        # O loop de seletores suporta UDP e pause_reading em todas as plataformas
+        self.loop = asyncio.SelectorEventLoop()
+        started = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(started, ), name="realtime-service", daemon=True)
+        self.thread.start()
+        started.wait()
+
+    def _run(self, started: threading.Event):
+        asyncio.set_event_loop(self.loop)
+        self._ticker = self.loop.create_task(self._tick())
+        self.loop.call_soon(started.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def stop(self):
+        """Fecha todas as fontes e encerra o loop."""
+        if not self.running:
+            return
+        self._call(self._close_all())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=2)
+        self.thread = None
+
+    def _call(self, coro, timeout: float = 5.0):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def add_source(self, source: DatagramSource, consumer: Callable[[Any], Any], batch: bool = False):
+        """
+        Abre uma fonte.
+
+        Args:
+            source: Fonte a abrir; o nome dela deve ser único no serviço
+            consumer: Chamado com cada item (ou com a lista de itens
+                pendentes, se ``batch``)
+            batch: Entrega os itens em lotes
+        """
+        if not self.running:
+            self.start()
+        self._call(self.open_source(source, consumer, batch))
+
+    def remove_source(self, name: str):
+        """Fecha uma fonte pelo nome."""
+        if self.running:
+            self._call(self.close_source(name))
+
+    async def open_source(self, source: DatagramSource, consumer, batch: bool = False):
+        if source.name in self.sources:
+            raise ValueError(f"Fonte já aberta: {source.name}")
+        queue = CoalescingQueue(source.maxsize, source.policy)
+        stats = SourceStats()
+        (transport, protocol) = await self.loop.create_datagram_endpoint(
+            lambda: _SourceProtocol(source, queue, stats),
+            local_addr=source.local_addr, remote_addr=source.remote_addr,
+            allow_broadcast=source.allow_broadcast)
+        task = self.loop.create_task(self._consume(protocol, consumer, batch))
+        self.sources[source.name] = _Entry(source, consumer, batch, transport, protocol, task)
+        logger.info(f"Fonte {source.name} aberta em {transport.get_extra_info('sockname')}")
+
+    async def close_source(self, name: str):
+        entry = self.sources.pop(name, None)
+        if entry is None:
+            return
+        try:
+            entry.source.close()
+        except Exception as e:
+            logger.error(f"Erro ao fechar a fonte {name}: {e}")
+        entry.task.cancel()
+        entry.transport.close()
+        logger.info(f"Fonte {name} fechada")
+
+    async def _close_all(self):
+        for name in list(self.sources):
+            await self.close_source(name)
+        if self._ticker:
+            self._ticker.cancel()
+
+    async def _consume(self, protocol: _SourceProtocol, consumer, batch: bool):
+        queue = protocol.queue
+        while True:
+            items = await queue.get_batch()
+            if protocol.transport is not None and not protocol.transport.is_closing() \
+                    and not protocol.transport.is_reading():
+                protocol.transport.resume_reading()
+            for item in ([items] if batch else items):
+                try:
+                    result = consumer(item)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Erro no consumidor da fonte {protocol.source.name}: {e}")
+
+    async def _tick(self):
+        while True:
+            await asyncio.sleep(TICK_INTERVAL)
+            now = time.monotonic()
+            for entry in list(self.sources.values()):
+                entry.protocol.stats.update_rate(now)
+                try:
+                    entry.source.tick(now)
+                except Exception as e:
+                    logger.error(f"Erro na tarefa periódica da fonte {entry.source.name}: {e}")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Contadores de cada fonte aberta."""
+        stats = {}
+        for (name, entry) in list(self.sources.items()):
+            s = entry.protocol.stats
+            queue = entry.protocol.queue
+            stats[name] = {
+                "packets": s.packets,
+                "bytes": s.bytes,
+                "items": s.items,
+                "rate": s.rate,
+                "dropped": queue.dropped,
+                "coalesced": queue.coalesced,
+                "queued": len(queue),
+                "pauses": s.pauses,
+                "errors": s.errors,
+            }
+        return stats
+
+
+class SourceCollector:
+    """
+    Coletor de uma única fonte com um serviço próprio, para quem usa um
+    jogo isoladamente. O RealtimeTelemetryManager hospeda as fontes
+    diretamente no serviço compartilhado.
+    """
+
+    def __init__(self, source: DatagramSource):
+        self.source = source
+        self.service: Optional[RealtimeService] = None
+        self.running = False
+        self.data_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.last_telemetry_data: Dict[str, Any] = {}
+
+    def start(self, data_callback: Callable[[Dict[str, Any]], None]):
+        """Inicia o coletor de dados."""
+        if self.running:
+            logger.warning("Coletor já está rodando.")
+            return
+        self.data_callback = data_callback
+        self.service = RealtimeService()
+        self.service.add_source(self.source, self._on_data)
+        self.running = True
+
+    def stop(self):
+        """Para o coletor de dados."""
+        if not self.running:
+            logger.warning("Coletor não está rodando.")
+            return
+        self.service.stop()
+        self.running = False
+
+    def _on_data(self, telemetry: Dict[str, Any]):
+        self.last_telemetry_data = telemetry
+        if self.data_callback:
+            self.data_callback(telemetry)
+
+    def get_last_telemetry_data(self) -> Dict[str, Any]:
+        """Retorna o último pacote de telemetria recebido."""
+        return self.last_telemetry_data
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores da fonte."""
+        if not self.service:
+            return {}
+        return self.service.get_stats().get(self.source.name, {})
@@ -1,7 +1,7 @@
 from stm.logger import BaseLogger
 from stm.event import STMEvent
 from .tracks import convert_to_gps, convert_to_altitude
-from .shmem import AMS2SharedMemory, AMS2GameState
+from .shmem import AMS2Telemetry, AMS2GameState
 from datetime import datetime
 from logging import getLogger
 from .convert import convert_orientation
@@ -55,15 +55,23 @@ class AMS2Logger(BaseLogger):
                 rawfile=None,
                 sampler=None,
                 filetemplate=None,
-                imperial=False):
+                imperial=False,
+                live=False):
         
-        super().__init__(rawfile=rawfile, sampler=sampler, filetemplate=filetemplate, imperial=imperial)
+        super().__init__(rawfile=rawfile, sampler=sampler, filetemplate=filetemplate, imperial=imperial, live=live)
 
         self.last_packet = None
 
+    def decode(self, sample):
+        # the sampler stores compact samples, older raw captures have the
+        # whole shared memory block
+        if len(sample) == AMS2Telemetry.fmt.size:
+            return AMS2Telemetry(sample)
+        return AMS2Telemetry.from_shmem(sample)
+
     def process_sample(self, timestamp, sample):
 
-        p = AMS2SharedMemory(sample)
+        p = sample if isinstance(sample, AMS2Telemetry) else self.decode(sample)
         if not self.last_packet:
             self.last_packet = p
 
@@ -83,8 +91,8 @@ class AMS2Logger(BaseLogger):
             self.save_log()
             return
 
-        # get the first participant (us)
-        if not len(p.participants):
+        # get the participant we are viewing (us)
+        if not p.driver:
             return
 
         if lastp.mSessionState != p.mSessionState:
@@ -1,12 +1,17 @@
 from stm.sampler import BaseSampler
 import time
+from struct import Struct
 from multiprocessing import shared_memory
+from .shmem import AMS2SharedMemory, AMS2Telemetry
 from logging import getLogger
 l = getLogger(__name__)
 
 SHAREDMEM_NAME="$pcars2$"
 DEFAULT_FREQ=20 # Hz
-MSEQ_OFFSET = 7320 # get this from shm_info
+MSEQ_OFFSET = AMS2SharedMemory.offsets["mSequenceNumber"][0] # 7320, see shm_info
+MSEQ = Struct("<I")
+BACKOFF_MIN = 0.0001 # s
+BACKOFF_MAX = 0.002 # s
 
 class AMS2Sampler(BaseSampler):
 
@@ -18,6 +23,33 @@ class AMS2Sampler(BaseSampler):
             freq = DEFAULT_FREQ
         self.freq = int(freq)
 
+    @staticmethod
+    def read(buf, timeout=None):
+        """
+        read a consistent compact sample from the shared memory
+
+        the fields are unpacked straight out of the mapping, then the sequence
+        number is checked to make sure AMS2 did not update it in the process.
+        While it is being updated we back off rather than spin, returns None
+        if we could not get a sample before the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = 0
+        while True:
+            (seq, ) = MSEQ.unpack_from(buf, MSEQ_OFFSET)
+            if not seq & 1:
+                sample = AMS2Telemetry.pack_shmem(buf)
+                (eseq, ) = MSEQ.unpack_from(buf, MSEQ_OFFSET)
+                if eseq == seq:
+                    return sample
+
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+
+            # the first retry just yields, then wait longer each time
+            time.sleep(delay)
+            delay = min(max(delay * 2, BACKOFF_MIN), BACKOFF_MAX)
+
     def run(self):
 
         self.running = True # this is set to False in BaseSampler when we are done
@@ -39,20 +71,12 @@ class AMS2Sampler(BaseSampler):
                     l.info("connected to AMS2 shared memory")
                     next_sample = now
 
-                # try and get a consistent sample
-                while True:
-                    seq = int.from_bytes(shm_b.buf[MSEQ_OFFSET:MSEQ_OFFSET + 4], byteorder="little", signed=False)
-                    if seq & 1:
-                        continue
-
-                    # copy the buffer
-                    sample = bytes(shm_b.buf)
-                    eseq = int.from_bytes(shm_b.buf[MSEQ_OFFSET:MSEQ_OFFSET + 4], byteorder="little", signed=False)
-                    # check we didn't update in the process
-                    if eseq == seq:
-                        break
-
-                self.put(( now, sample ))
+                # try and get a consistent sample within this sample period
+                sample = self.read(shm_b.buf, timeout=1 / self.freq)
+                if sample is not None:
+                    self.put(( now, sample ))
+                else:
+                    l.debug("no consistent sample, skipping")
 
                 # work out when the next sample will be
                 now = time.time()
@@ -62,4 +86,4 @@ class AMS2Sampler(BaseSampler):
             except FileNotFoundError:
                 if wait is None:
                     l.info("waiting for AMS2 to start")
-                wait = 1
\ No newline at end of file
+                wait = 1
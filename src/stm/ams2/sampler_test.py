@@ -0,0 +1,54 @@
+import unittest
+import os
+import threading
+from multiprocessing import shared_memory
+from stm.ams2.sampler import AMS2Sampler, MSEQ, MSEQ_OFFSET
+from stm.ams2.shmem import AMS2Telemetry
+
+PATH=os.path.dirname(__file__)
+
+class TestAMS2Sampler(unittest.TestCase):
+
+    def setUp(self):
+        with open(os.path.join(PATH, "test", "ams2_inrace.bin"), "rb") as fin:
+            self.data = fin.read()
+        self.shm = shared_memory.SharedMemory(create=True, size=len(self.data))
+        self.shm.buf[:len(self.data)] = self.data
+
+    def tearDown(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def set_sequence(self, seq):
+        MSEQ.pack_into(self.shm.buf, MSEQ_OFFSET, seq)
+
+    def test_read(self):
+        self.set_sequence(2)
+        sample = AMS2Sampler.read(self.shm.buf)
+        self.assertEqual(sample, AMS2Telemetry.pack_shmem(self.data))
+
+    def test_read_timeout(self):
+        # AMS2 never finishes the update
+        self.set_sequence(3)
+        self.assertIsNone(AMS2Sampler.read(self.shm.buf, timeout=0.01))
+
+    def test_read_waits_for_update(self):
+        self.set_sequence(3)
+        timer = threading.Timer(0.02, self.set_sequence, (4, ))
+        timer.start()
+        sample = AMS2Sampler.read(self.shm.buf, timeout=1)
+        timer.join()
+        self.assertIsNotNone(sample)
+
+    def test_sampler(self):
+        sampler = AMS2Sampler(shmem_name=self.shm.name, freq=200)
+        sampler.start()
+        try:
+            (timestamp, sample) = sampler.get(timeout=1)
+        finally:
+            sampler.stop()
+            sampler.join()
+        self.assertEqual(AMS2Telemetry(sample).driver.mName, "Scott Deakin")
+
+if __name__ == '__main__':
+    unittest.main()
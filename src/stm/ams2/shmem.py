@@ -1,4 +1,5 @@
-from struct import Struct
+import re
+from struct import Struct, calcsize
 from enum import Enum
 from collections import namedtuple
 from stm.maths import Vector
@@ -6,10 +7,52 @@ from stm.maths import Vector
 Wheels = namedtuple("Wheels", ["fl", "fr", "rl", "rr"])
 Wings = namedtuple("Wing", ["front", "rear"])
 
+STORED_PARTICIPANTS_MAX = 64
+
 def decode_string(s):
     if s:
         return s.decode('utf-8').split('\0')[0]
 
+def field_offsets(fmt, names):
+    """
+    map each field name to (offset, format) in a little endian struct format,
+    names are given in order for every item that is not padding
+    """
+    offsets = {}
+    offset = 0
+    names = iter(names)
+    for item in re.findall(r"\d*[a-zA-Z?]", fmt.lstrip("<")):
+        if item[-1] != "x":
+            offsets[next(names)] = (offset, item)
+        offset += calcsize("<" + item)
+    if next(names, None) is not None:
+        raise ValueError("more names than fields")
+    return offsets
+
+def select_fields(offsets, selected):
+    """
+    work out how to read some of the fields of a struct
+
+    selected is a list of (name, convert), returns the (name, first value,
+    number of values, convert) of each field in offset order, a format that
+    reads them out of the whole struct skipping everything else and a format
+    for the fields packed back to back
+    """
+    layout = []
+    shmem_fmt = fmt = "<"
+    pos = first = 0
+    for (name, convert) in sorted(selected, key=lambda f: offsets[f[0]][0]):
+        (offset, item) = offsets[name]
+        count = 1 if item[-1] == "s" else int(item[:-1] or 1)
+        layout.append((name, first, count, convert))
+        if offset > pos:
+            shmem_fmt += f"{offset - pos}x"
+        shmem_fmt += item
+        fmt += item
+        pos = offset + calcsize("<" + item)
+        first += count
+    return layout, shmem_fmt, fmt
+
 class AMS2GameState(Enum):
     EXITED = 0
     FRONT_END = 1
@@ -242,6 +285,40 @@ class AMS2SharedMemory:
         "I"     # mLaunchStage
     )
 
+    # the name of every field in fmt that is not padding
+    fields = [
+        "mVersion", "mBuildVersionNumber",
+        "mGameState", "mSessionState", "mRaceState",
+        "mViewedParticipantIndex", "mNumParticipants", "mParticipantInfo",
+        "mUnfilteredThrottle", "mUnfilteredBrake", "mUnfilteredSteering", "mUnfilteredClutch",
+        "mCarName", "mCarClassName", "mLapsInEvent",
+        "mTrackLocation", "mTrackVariation", "mTrackLength", "mNumSectors",
+        "mLapInvalidated", "mBestLapTime", "mLastLapTime", "mCurrentTime",
+        "mSplitTimeAhead", "mSplitTimeBehind", "mSplitTime",
+        "mCarFlags", "mOilTempCelsius", "mOilPressureKPa",
+        "mWaterTempCelsius", "mWaterPressureKPa", "mFuelPressureKPa",
+        "mFuelLevel", "mFuelCapacity", "mSpeed", "mRpm", "mMaxRPM",
+        "mBrake", "mThrottle", "mClutch", "mSteering", "mGear", "mNumGears",
+        "mOdometerKM", "mAntiLockActive", "mBoostActive", "mBoostAmount",
+        "mOrientation", "mLocalVelocity", "mWorldVelocity",
+        "mAngularVelocity", "mLocalAcceleration", "mWorldAcceleration",
+        "mTyreY", "mTyreRPS", "mTyreSlipSpeed", "mTyreTemp", "mTyreGrip",
+        "mTyreHeightAboveGround", "mBrakeTempCelsius",
+        "mAmbientTemperature", "mTrackTemperature", "mSequenceNumber",
+        "mSuspensionTravel", "mSuspensionVelocity", "mAirPressure",
+        "mEngineTorque", "mWings",
+        "mTranslatedTrackLocation", "mTranslatedTrackVariation",
+        "mBrakeBias", "mTurboBoostPressure",
+        "mTyreTempLeft", "mTyreTempCenter", "mTyreTempRight",
+        "mDrsState", "mRideHeight", "mJoyPad0", "mDPad",
+        "mAntiLockSetting", "mTractionControlSetting",
+        "mErsDeploymentMode", "mErsAutoModeEnabled",
+        "mClutchTemp", "mClutchWear", "mClutchOverheated", "mClutchSlipping",
+        "mYellowFlagState", "mSessionIsPrivate", "mLaunchStage",
+    ]
+
+    offsets = field_offsets(fmt.format, fields)
+
     def __init__(self, buf):
 
         (
@@ -401,3 +478,127 @@ class AMS2SharedMemory:
 
 
 
+
+
+class AMS2Telemetry:
+    """
+    the fields of the shared memory the logger uses, read straight from the
+    block at precomputed offsets, plus the viewed participant
+
+    a sample is kept as a compact record of just these fields, which is what
+    the sampler hands out and what ends up in raw captures
+    """
+
+    # field name, how to convert it
+    selected = [
+        ("mGameState", AMS2GameState),
+        ("mSessionState", AMS2SessionState),
+        ("mRaceState", AMS2RaceState),
+        ("mViewedParticipantIndex", None),
+        ("mNumParticipants", None),
+        ("mCarName", decode_string),
+        ("mTrackVariation", decode_string),
+        ("mLastLapTime", None),
+        ("mCurrentTime", None),
+        ("mSplitTime", None),
+        ("mCarFlags", None),
+        ("mOilTempCelsius", None),
+        ("mOilPressureKPa", None),
+        ("mWaterTempCelsius", None),
+        ("mWaterPressureKPa", None),
+        ("mFuelPressureKPa", None),
+        ("mFuelLevel", None),
+        ("mFuelCapacity", None),
+        ("mSpeed", None),
+        ("mRpm", None),
+        ("mBrake", None),
+        ("mThrottle", None),
+        ("mClutch", None),
+        ("mSteering", None),
+        ("mGear", None),
+        ("mBoostActive", None),
+        ("mBoostAmount", None),
+        ("mOrientation", Vector),
+        ("mLocalVelocity", Vector),
+        ("mAngularVelocity", Vector),
+        ("mLocalAcceleration", Vector),
+        ("mTyreY", Wheels),
+        ("mTyreRPS", Wheels),
+        ("mTyreTemp", Wheels),
+        ("mTyreHeightAboveGround", Wheels),
+        ("mBrakeTempCelsius", Wheels),
+        ("mAmbientTemperature", None),
+        ("mTrackTemperature", None),
+        ("mSuspensionTravel", Wheels),
+        ("mSuspensionVelocity", Wheels),
+        ("mAirPressure", Wheels),
+        ("mEngineTorque", None),
+        ("mBrakeBias", None),
+        ("mTurboBoostPressure", None),
+        ("mTyreTempLeft", Wheels),
+        ("mTyreTempCenter", Wheels),
+        ("mTyreTempRight", Wheels),
+        ("mDrsState", None),
+        ("mRideHeight", Wheels),
+        ("mErsAutoModeEnabled", None),
+    ]
+
+    (layout, shmem_fmt, fmt) = select_fields(AMS2SharedMemory.offsets, selected)
+    shmem_fmt = Struct(shmem_fmt)
+    fmt = Struct(fmt + f"{AMS2ParticipantInfo.fmt.size}s")
+
+    participants_offset = AMS2SharedMemory.offsets["mParticipantInfo"][0]
+    viewed_idx = { f[0]: f[1] for f in layout }["mViewedParticipantIndex"]
+    num_idx = { f[0]: f[1] for f in layout }["mNumParticipants"]
+
+    def __init__(self, data):
+        self.decode(self.fmt.unpack(data))
+
+    @classmethod
+    def unpack_shmem(cls, buf):
+        """
+        read the values of a compact record from a whole shared memory block
+        """
+        values = cls.shmem_fmt.unpack_from(buf)
+        driver = b""
+        driver_index = values[cls.viewed_idx]
+        if values[cls.num_idx] > 0 and 0 <= driver_index < STORED_PARTICIPANTS_MAX:
+            start = cls.participants_offset + driver_index * AMS2ParticipantInfo.fmt.size
+            driver = bytes(buf[start:start + AMS2ParticipantInfo.fmt.size])
+        return values + (driver, )
+
+    @classmethod
+    def pack_shmem(cls, buf):
+        """
+        make a compact record from a whole shared memory block
+        """
+        return cls.fmt.pack(*cls.unpack_shmem(buf))
+
+    @classmethod
+    def from_shmem(cls, buf):
+        p = cls.__new__(cls)
+        p.decode(cls.unpack_shmem(buf))
+        return p
+
+    def decode(self, values):
+
+        for (name, first, count, convert) in self.layout:
+            if count > 1:
+                value = convert(*values[first:first + count])
+            elif convert:
+                value = convert(values[first])
+            else:
+                value = values[first]
+            setattr(self, name, value)
+
+        self.tcsActive = bool(self.mCarFlags & AMS2CarFlags.CAR_TCS.value)
+        self.scsActive = bool(self.mCarFlags & AMS2CarFlags.CAR_SCS.value)
+        self.absActive = bool(self.mCarFlags & AMS2CarFlags.CAR_ABS.value)
+
+        self.drsAvailable = bool(self.mDrsState & AMS2DrsState.DRS_AVAILABLE_NOW.value)
+        self.drsActive = bool(self.mDrsState & AMS2DrsState.DRS_ACTIVE.value)
+
+        if self.mNumParticipants > 0 and 0 <= self.mViewedParticipantIndex < STORED_PARTICIPANTS_MAX:
+            self.driver = AMS2ParticipantInfo(values[-1])
+        else:
+            self.driver = None
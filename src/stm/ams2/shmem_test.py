@@ -4,7 +4,7 @@ from stm.ams2.shmem import Wheels
 
 PATH=os.path.dirname(__file__)
 
-from stm.ams2.shmem import AMS2SharedMemory, AMS2RaceState, AMS2GameState, AMS2SessionState
+from stm.ams2.shmem import AMS2SharedMemory, AMS2Telemetry, AMS2RaceState, AMS2GameState, AMS2SessionState
 
 class TestAMS2SharedMemory(unittest.TestCase):
 
@@ -124,5 +124,29 @@ class TestAMS2SharedMemory(unittest.TestCase):
             self.assertEqual(sm.mCarClassName, "F-Retro_Gen3")
             self.assertEqual(sm.mCarName, "McLaren MP4/1C")
 
+class TestAMS2Telemetry(unittest.TestCase):
+
+    def test_sequence_offset(self):
+        self.assertEqual(AMS2SharedMemory.offsets["mSequenceNumber"], (7320, "i"))
+
+    def test_matches_shared_memory(self):
+        for name in ("ams2_idle.bin", "ams2_inrace.bin", "ams2_mp4_inpits.bin"):
+            with open(os.path.join(PATH, "test", name), "rb") as fin:
+                data = fin.read()
+
+            sm = AMS2SharedMemory(data)
+            for p in (AMS2Telemetry.from_shmem(data), AMS2Telemetry(AMS2Telemetry.pack_shmem(data))):
+                for (field, *_) in AMS2Telemetry.layout:
+                    self.assertEqual(getattr(p, field), getattr(sm, field), f"{name} {field}")
+                for field in ("absActive", "tcsActive", "scsActive", "drsAvailable", "drsActive"):
+                    self.assertEqual(getattr(p, field), getattr(sm, field))
+                if sm.driver:
+                    self.assertEqual(vars(p.driver), vars(sm.driver))
+                else:
+                    self.assertIsNone(p.driver)
+
+    def test_compact_size(self):
+        self.assertLess(AMS2Telemetry.fmt.size, AMS2SharedMemory.fmt.size // 10)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+offline conversion of raw captures to MoTeC .ld/.ldx
+
+each capture is read and decoded in batches on a single thread with no
+sampler or queue in between, and several captures are converted in
+parallel on a process pool. The loggers do the same processing as in the
+live path, so the output is identical
+
+    python -m stm.convert gt7 capture1.db capture2.db --template "{venue}/{vehicle}_{datetime}"
+"""
+
+import os
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from logging import getLogger
+l = getLogger(__name__)
+
+DEFAULT_TEMPLATE = os.path.join("{venue}", "{datetime}_{vehicle}_{session}")
+
+def get_logger_class(game):
+    if game == "gt7":
+        from .gt7.logger import GT7Logger
+        return GT7Logger
+    if game == "ams2":
+        from .ams2.logger import AMS2Logger
+        return AMS2Logger
+    raise ValueError(f"unknown game {game}")
+
+def convert_raw(rawfile, game, filetemplate=DEFAULT_TEMPLATE, **options):
+    """
+    convert one raw capture, returns the .ld files written
+    """
+    logger = get_logger_class(game)(filetemplate=filetemplate, **options)
+    logger.convert(rawfile)
+    return logger.saved
+
+def convert_raw_files(rawfiles, game, filetemplate=DEFAULT_TEMPLATE, workers=None, **options):
+    """
+    convert several raw captures in parallel, returns {rawfile: [.ld files]}
+
+    a capture that fails to convert maps to the exception instead
+    """
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(convert_raw, rawfile, game, filetemplate, **options): rawfile
+            for rawfile in rawfiles
+        }
+        for future in as_completed(futures):
+            rawfile = futures[future]
+            try:
+                results[rawfile] = future.result()
+            except Exception as e:
+                l.error(f"failed to convert {rawfile}: {e}")
+                results[rawfile] = e
+    return results
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="convert raw captures to MoTeC .ld/.ldx")
+    parser.add_argument("game", choices=["gt7", "ams2"])
+    parser.add_argument("rawfiles", nargs="+")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="output file template")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--imperial", action="store_true")
+    parser.add_argument("--replay", action="store_true", help="gt7: the capture is of a replay")
+    args = parser.parse_args(args)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    options = { "imperial": args.imperial }
+    if args.game == "gt7":
+        options["replay"] = args.replay
+
+    results = convert_raw_files(args.rawfiles, args.game, args.template, workers=args.workers, **options)
+
+    failed = False
+    for rawfile in args.rawfiles:
+        result = results[rawfile]
+        if isinstance(result, Exception):
+            failed = True
+            print(f"{rawfile}: failed, {result}")
+        else:
+            print(f"{rawfile}: {', '.join(result) if result else 'no logs with enough laps'}")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
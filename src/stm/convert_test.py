@@ -0,0 +1,106 @@
+import os
+import math
+import struct
+import tempfile
+import unittest
+
+from stm.gt7.packet import GT7DataPacket, Salsa20_xor
+from stm.gt7.logger import GT7Logger
+from stm.raw import RawWriter, RawReader
+from stm.sampler import RawSampler
+from stm.convert import convert_raw, convert_raw_files
+
+PATH=os.path.dirname(__file__)
+KEY = b'Simulator Interface Packet GT7 ver 0.0'[0:32]
+
+def make_capture(rawfile, start=1700000000.0, laps=3, ticks=120):
+    with open(os.path.join(PATH, "gt7", "test", "barcelonagp911.bin"), "rb") as fin:
+        pkt = fin.read()
+
+    # re-encrypt modified copies of the packet with its own IV
+    iv1 = int.from_bytes(pkt[0x40:0x44], byteorder='little')
+    iv = (iv1 ^ 0xDEADBEAF).to_bytes(4, 'little') + iv1.to_bytes(4, 'little')
+    plain = bytearray(GT7DataPacket.decrypt(pkt))
+
+    raw = RawWriter(rawfile, freq=60)
+    tick = 1
+    for lap in range(1, laps + 1):
+        for i in range(ticks):
+            angle = 2 * math.pi * i / ticks
+            struct.pack_into("<3f", plain, 0x04, 500 * math.cos(angle), 10, 500 * math.sin(angle))
+            struct.pack_into("<ihhii", plain, 0x70, tick, lap, laps, 0, ticks * 1000 // 60)
+            # pause for a moment half way round the second lap
+            flags = 0b1 | (0b10 if lap == 2 and 60 <= i < 70 else 0)
+            struct.pack_into("<H", plain, 0x8E, flags)
+            raw.add(start + tick / 60.0, Salsa20_xor(bytes(plain), iv, KEY))
+            if i % 10 == 0:
+                # skip a tick every now and then
+                tick += 1
+            tick += 1
+    raw.close()
+
+class TestConvert(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.dir = tempfile.TemporaryDirectory()
+        os.chdir(self.dir.name)
+        self.rawfile = os.path.join(self.dir.name, "raw.db")
+        make_capture(self.rawfile)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.dir.cleanup()
+
+    def test_same_as_live(self):
+
+        # reference: every packet through the per-sample path, as the live sampler loop does
+        logger = GT7Logger(filetemplate=os.path.join("live", "{datetime}"), shortcomment="test")
+        reader = RawReader(self.rawfile)
+        logger.sampler = reader # only the freq is used while processing
+        for timestamp, sample in reader:
+            logger.process_sample(timestamp, sample)
+        reader.close()
+        logger.save_log()
+        self.assertEqual(len(logger.saved), 1)
+
+        replayed = GT7Logger(sampler=RawSampler(rawfile=self.rawfile), filetemplate=os.path.join("replayed", "{datetime}"), shortcomment="test")
+        replayed.run()
+
+        saved = convert_raw(self.rawfile, "gt7", os.path.join("offline", "{datetime}"), shortcomment="test")
+        self.assertEqual(len(saved), 1)
+
+        # small batches so missing ticks and laps cross batch boundaries
+        batched = GT7Logger(filetemplate=os.path.join("batched", "{datetime}"), shortcomment="test")
+        batched.convert(self.rawfile, batchsize=25)
+
+        for ext in ("", "x"):
+            with open(f"{logger.saved[0]}{ext}", "rb") as live:
+                expected = live.read()
+            for filename in (replayed.saved[0], saved[0], batched.saved[0]):
+                with open(f"{filename}{ext}", "rb") as offline:
+                    self.assertEqual(offline.read(), expected, "should match the live logger output")
+
+    def test_live_laps(self):
+
+        logger = GT7Logger(filetemplate=os.path.join("live", "{datetime}"), shortcomment="test", live=True)
+        logger.convert(self.rawfile, batchsize=25)
+        self.assertEqual(len(logger.saved), 1)
+        self.assertGreater(len(logger.live_laps), 0)
+        (lap, laptime, columns) = logger.live_laps[-1]
+        self.assertEqual(set(columns), set(c if isinstance(c, str) else c["name"] for c in GT7Logger.channels))
+        self.assertFalse(columns["speed"].flags.writeable)
+        self.assertAlmostEqual(len(columns["speed"]) / logger.sampler.freq, laptime, delta=10 / logger.sampler.freq)
+
+    def test_many(self):
+
+        other = os.path.join(self.dir.name, "other.db")
+        make_capture(other, start=1700100000.0)
+
+        results = convert_raw_files([self.rawfile, other], "gt7", os.path.join("out", "{datetime}"), workers=2, shortcomment="test")
+        self.assertEqual(len(results[self.rawfile]), 1)
+        self.assertEqual(len(results[other]), 1)
+        self.assertNotEqual(results[self.rawfile], results[other])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,9 @@ from stm.event import STMEvent
 import stm.gps as gps
 from datetime import datetime
 from copy import copy
-from .packet import GT7DataPacket
+import numpy as np
+from stm.maths import Vector, Quaternion
+from .packet import GT7DataPacket, GT7PacketBatch
 from .db.cars import lookup_car_name
 from .db.tracks import GT7TrackDetector
 from logging import getLogger
@@ -38,8 +40,9 @@ class GT7Logger(BaseLogger):
                 venue="", 
                 comment="",
                 shortcomment="",
-                imperial=False):
-        super().__init__(rawfile=rawfile, sampler=sampler, filetemplate=filetemplate, imperial=imperial)
+                imperial=False,
+                live=False):
+        super().__init__(rawfile=rawfile, sampler=sampler, filetemplate=filetemplate, imperial=imperial, live=live)
 
         self.event = STMEvent(
             name=name,
@@ -59,9 +62,12 @@ class GT7Logger(BaseLogger):
         self.track_detector = None
         self.replay = replay
 
+    def decode(self, sample):
+        return GT7DataPacket(sample)
+
     def process_sample(self, timestamp, sample):
 
-        p = GT7DataPacket(sample)
+        p = sample if isinstance(sample, GT7DataPacket) else self.decode(sample)
         if not self.last_packet:
             self.last_packet = p
             l.info(f"received first packet from GT7 with ID {p.tick}")
@@ -80,6 +86,204 @@ class GT7Logger(BaseLogger):
 
         self.last_packet = p
 
+    def process_batch(self, batch):
+        """
+        decode a whole batch of raw samples at once, fill in the missing
+        ticks and work out the channels over whole arrays, only the log
+        and lap bookkeeping runs per sample
+        """
+        timestamps = [ timestamp for timestamp, _ in batch ]
+        packets = GT7PacketBatch([ sample for _, sample in batch ])
+
+        if not self.last_packet:
+            self.last_packet = packets.packet(0)
+            l.info(f"received first packet from GT7 with ID {self.last_packet.tick}")
+
+        # row 0 is the last packet we saw, row i + 1 is packet i
+        rows = GT7PacketBatch([ self.last_packet.pack(), packets.data ], encrypted=False)
+
+        # every packet is preceded by copies of the previous packet for the missing ticks
+        missing = np.maximum(rows.tick[1:] - rows.tick[:-1] - 1, 0)
+        counts = missing + 1
+        ends = np.cumsum(counts)
+        offset = np.arange(ends[-1]) - np.repeat(ends - counts, counts)
+        last = np.repeat(np.arange(len(packets)), counts)
+        real = offset == missing[last]
+        curr = np.where(real, last + 1, last)
+        ticks = np.where(real, rows.tick[curr], rows.tick[last] + offset + 1)
+
+        values = self.sample_rows(rows, curr, last)
+
+        pending = []
+        def flush():
+            if pending:
+                self.add_sample_rows(values[pending])
+                pending.clear()
+
+        paused = rows.paused[curr].tolist()
+        in_race = rows.in_race[curr].tolist()
+        laps = rows.current_lap.tolist()
+        last_laptime = rows.last_laptime.tolist()
+        car_code = rows.car_code.tolist()
+        x = rows.position[:, 0].tolist()
+        z = rows.position[:, 2].tolist()
+
+        first_copy = ((offset == 0) & ~real).tolist()
+
+        for k, (i, c, tick) in enumerate(zip(last.tolist(), curr.tolist(), ticks.tolist())):
+
+            timestamp = timestamps[i]
+            new_log = False
+
+            if first_copy[k]:
+                l.info(f"misssed {missing[i]} ticks, duplicating {rows.tick[i]}")
+
+            if paused[k]:
+                continue
+
+            if not in_race[k] and not self.replay:
+                flush()
+                self.save_log()
+                continue
+
+            if laps[c] < laps[i]:
+                # possibly restarted the event
+                flush()
+                self.save_log()
+
+            if not self.log:
+                new_log = True
+                self.start_log(timestamp, car_code[c], in_race[k])
+
+            if self.skip_samples > 0:
+                l.info(f"skipping tick {tick}")
+                self.skip_samples -= 1
+                continue
+
+            if laps[c] > laps[i]:
+                values[k, 0] = 1 # beacon
+                flush()
+                self.end_lap(last_laptime[c], laps[i], x[i], z[i], x[c], z[c])
+            else:
+                self.track_detector.update(x[c], z[c])
+
+            if (tick % 1000) == 0 or new_log:
+                p = rows.packet(c)
+                p.tick = tick
+                self.log_packet(timestamp, p)
+
+            pending.append(k)
+
+        flush()
+        self.last_packet = packets.packet(-1)
+
+    def sample_rows(self, rows, curr, last):
+        """
+        the channel values for every sample, curr and last are the rows
+        used as the current and previous packet
+        """
+        freq = self.sampler.freq
+
+        position = rows.position[curr]
+        lat, long = gps.convert(x=position[:, 0], z=-position[:, 2])
+
+        # mult the world deltav with the rotation to get local deltav
+        deltav = (Vector(*rows.velocity[curr].T) - Vector(*rows.velocity[last].T)) * Quaternion(*rows.rotation[curr].T)
+
+        glat = deltav.x * freq / 9.8 # X
+        gvert = deltav.y * freq / 9.8 # Y
+        glong = deltav.z * freq / 9.8 # Z
+
+        if self.imperial:
+            ms_to_speed = 2.23693629 # m/s to mph
+        else:
+            ms_to_speed = 3.6  # m/s to kph
+
+        # wheelspeed is not inverted in replay
+        wheels = rows.wheelradius[curr] * rows.wheelspeed[curr]
+        wheelspeed = np.where(rows.in_race[curr, None], wheels * -ms_to_speed, wheels * ms_to_speed)
+
+        current_fuel = rows.current_fuel[curr]
+        fuel_capacity = rows.fuel_capacity[curr]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fuel_level = np.where(fuel_capacity > 0, current_fuel / fuel_capacity * 100.0, 0)
+
+        zeros = np.zeros(len(curr))
+
+        return np.column_stack([
+            zeros, # beacon
+            rows.current_lap[curr],
+            rows.rpm[curr],
+            rows.gear[curr],
+            rows.throttle[curr] * 100 / 255,
+            rows.brake[curr] * 100 / 255,
+            rows.clutch[curr] * 100 / 255,
+            zeros, # report the steering as zero
+            rows.speed[curr] * ms_to_speed,
+            lat,
+            long,
+            deltav.x,
+            deltav.y,
+            -deltav.z, # so we match the GPS long,
+            glat,
+            gvert,
+            -glong,
+            rows.suspension[curr] * 100,
+            wheelspeed,
+            rows.tyretemp[curr],
+            rows.ride_height[curr] * 100,
+            rows.turbo_boost[curr] * 100.0,
+            rows.oil_pressure[curr],
+            rows.oil_temp[curr],
+            rows.water_temp[curr],
+            fuel_level,
+            rows.asm_active[curr],
+            rows.tcs_active[curr]
+        ]).astype(np.float64)
+
+    def start_log(self, timestamp, car_code, in_race):
+        self.track_detector = GT7TrackDetector()
+        self.skip_samples = 3
+        then = datetime.fromtimestamp(timestamp)
+        if self.event.vehicle:
+            vehicle = self.event.vehicle
+        else:
+            vehicle = lookup_car_name(car_code)
+
+        event = copy(self.event)
+        event.datetime = then.strftime("%Y-%m-%dT%H:%M:%S")
+        event.vehicle = vehicle
+
+        # mark the session as a replay
+        if not in_race and not event.session:
+            event.session = "Replay"
+
+        self.current_event = event
+        self.new_log(channels=self.channels, event=event)
+
+    def end_lap(self, last_laptime, lap, x0, z0, x1, z1):
+        laptime = last_laptime / 1000.0
+        self.add_lap(laptime=laptime, lap=lap)
+
+        if not self.current_event.venue or self.track_detector.probability < .9:
+            # try and guess the track
+            self.track_detector.guess(x0, z0, x1, z1)
+
+            if self.track_detector.track_name:
+                self.current_event.venue = str(self.track_detector.track_name).replace(" - ", "-")
+                self.update_event(event=self.current_event)
+
+    def log_packet(self, timestamp, currp):
+        l.info(
+            f"{timestamp:13.3f} tick: {currp.tick:6}"
+            f" {currp.current_lap:2}/{currp.laps:2}"
+            f" {currp.position.x:10.5f} {currp.position.y:10.5f} {currp.position.z:10.5f}"
+            f" {currp.best_laptime:6}/{currp.last_laptime:6}"
+            f" {currp.race_position:3}/{currp.opponents:3}"
+            f" {currp.gear} {currp.throttle:3} {currp.brake:3} {currp.speed:3.0f}"
+            f" {currp.car_code:5}"
+        )
+
     def process_packet(self, timestamp, packet):
 
         beacon = 0
@@ -102,25 +306,8 @@ class GT7Logger(BaseLogger):
             self.save_log()
 
         if not self.log:
-            self.track_detector = GT7TrackDetector()
             new_log = True
-            self.skip_samples = 3
-            then = datetime.fromtimestamp(timestamp)
-            if self.event.vehicle:
-                vehicle = self.event.vehicle
-            else:
-                vehicle = lookup_car_name(currp.car_code)
-
-            event = copy(self.event)
-            event.datetime = then.strftime("%Y-%m-%dT%H:%M:%S")
-            event.vehicle = vehicle
-
-            # mark the session as a replay
-            if not currp.in_race and not event.session:
-                event.session = "Replay"
-
-            self.current_event = event
-            self.new_log(channels=self.channels, event=event)
+            self.start_log(timestamp, currp.car_code, currp.in_race)
 
         if self.skip_samples > 0:
             l.info(f"skipping tick {currp.tick}")
@@ -133,30 +320,13 @@ class GT7Logger(BaseLogger):
         if currp.current_lap > lastp.current_lap:
             # figure out the laptimes
             beacon = 1
-            laptime = currp.last_laptime / 1000.0
-            self.add_lap(laptime=laptime, lap=lastp.current_lap)
-
-            if not self.current_event.venue or self.track_detector.probability < .9:
-                # try and guess the track
-                self.track_detector.guess(lastp.position.x, lastp.position.z, currp.position.x, currp.position.z)
-
-                if self.track_detector.track_name:
-                    self.current_event.venue = str(self.track_detector.track_name).replace(" - ", "-")
-                    self.update_event(event=self.current_event)
-
+            self.end_lap(currp.last_laptime, lastp.current_lap,
+                         lastp.position.x, lastp.position.z, currp.position.x, currp.position.z)
         else:
             self.track_detector.update(currp.position.x, currp.position.z)
 
         if (currp.tick % 1000) == 0 or new_log:
-            l.info(
-                f"{timestamp:13.3f} tick: {currp.tick:6}"
-                f" {currp.current_lap:2}/{currp.laps:2}"
-                f" {currp.position.x:10.5f} {currp.position.y:10.5f} {currp.position.z:10.5f}"
-                f" {currp.best_laptime:6}/{currp.last_laptime:6}"
-                f" {currp.race_position:3}/{currp.opponents:3}"
-                f" {currp.gear} {currp.throttle:3} {currp.brake:3} {currp.speed:3.0f}"
-                f" {currp.car_code:5}"
-            )
+            self.log_packet(timestamp, currp)
 
         # do some conversions
         # gear, throttle, brake, speed, z, x
@@ -0,0 +1,134 @@
+"""
+numpy Salsa20 (20 rounds, 32 byte key) for when the salsa20 C package is
+not available
+
+the keystream for many nonces is worked out at once, every word of the
+state is a uint32 array with one entry per block, and keystreams are kept
+in a small per-nonce cache. Same call signature as the C package
+"""
+
+from collections import OrderedDict
+import numpy as np
+
+BLOCKSIZE = 64
+CACHESIZE = 256
+
+SIGMA = np.frombuffer(b"expand 32-byte k", dtype="<u4")
+
+# the state is kept as four rows of diagonals so that the four quarter
+# rounds of a column round work on whole rows at once, the row round is
+# the same operation after rotating the rows
+A = [0, 5, 10, 15]
+B = [4, 9, 14, 3]
+C = [8, 13, 2, 7]
+D = [12, 1, 6, 11]
+ROT1 = [1, 2, 3, 0]
+ROT2 = [2, 3, 0, 1]
+ROT3 = [3, 0, 1, 2]
+
+_cache = OrderedDict()
+
+def _quarter_rounds(a, b, c, d, t, u):
+    for (x, y, z, n) in ((b, a, d, 7), (c, b, a, 9), (d, c, b, 13), (a, d, c, 18)):
+        # x ^= rotl(y + z, n)
+        np.add(y, z, out=t)
+        np.left_shift(t, n, out=u)
+        np.right_shift(t, 32 - n, out=t)
+        u |= t
+        x ^= u
+
+def keystream(key, nonces, nblocks):
+    """
+    return a (len(nonces), nblocks * 64) uint8 array with the keystream of
+    every nonce
+    """
+    if len(key) != 32:
+        raise ValueError('invalid key length')
+
+    key_words = np.frombuffer(key, dtype="<u4")
+    nonce_words = np.frombuffer(b"".join(nonces), dtype="<u4").reshape(-1, 2)
+    count = len(nonce_words)
+
+    # one column per block, blocks of a nonce are consecutive
+    counter = np.tile(np.arange(nblocks, dtype=np.uint64), count)
+    nonce_words = np.repeat(nonce_words, nblocks, axis=0)
+
+    state = np.empty((16, len(counter)), dtype=np.uint32)
+    state[[0, 5, 10, 15]] = SIGMA[:, None]
+    state[[1, 2, 3, 4]] = key_words[:4, None]
+    state[[11, 12, 13, 14]] = key_words[4:, None]
+    state[6] = nonce_words[:, 0]
+    state[7] = nonce_words[:, 1]
+    state[8] = counter & 0xFFFFFFFF
+    state[9] = counter >> np.uint64(32)
+
+    a, b, c, d = state[A], state[B], state[C], state[D]
+    t = np.empty_like(a)
+    u = np.empty_like(a)
+
+    for _ in range(10):
+        _quarter_rounds(a, b, c, d, t, u)
+        b, c, d = d[ROT1], c[ROT2], b[ROT3]
+        _quarter_rounds(a, b, c, d, t, u)
+        b, c, d = d[ROT1], c[ROT2], b[ROT3]
+
+    out = np.empty_like(state)
+    out[A], out[B], out[C], out[D] = a, b, c, d
+    out += state
+
+    return np.ascontiguousarray(out.T).view("<u4").view(np.uint8).reshape(count, nblocks * BLOCKSIZE)
+
+def _cached_keystreams(key, nonces, length):
+    """
+    keystreams of at least length bytes for every nonce, only the nonces
+    not already in the cache are computed
+    """
+    nblocks = -(-length // BLOCKSIZE)
+    missing = []
+    for nonce in nonces:
+        ks = _cache.get((key, nonce))
+        if ks is None or len(ks) < length:
+            missing.append(nonce)
+        else:
+            _cache.move_to_end((key, nonce))
+
+    if missing:
+        missing = list(dict.fromkeys(missing))
+        for nonce, ks in zip(missing, keystream(key, missing, nblocks)):
+            _cache[(key, nonce)] = ks
+        while len(_cache) > max(CACHESIZE, len(nonces)):
+            _cache.popitem(last=False)
+
+    return [ _cache[(key, nonce)] for nonce in nonces ]
+
+def Salsa20_xor_many(messages, nonces, key):
+    """
+    xor every message with the keystream of its nonce
+    """
+    key = bytes(key)
+    nonces = [ bytes(nonce) for nonce in nonces ]
+    for nonce in nonces:
+        if len(nonce) != 8:
+            raise ValueError('invalid nonce length')
+
+    if not messages:
+        return []
+
+    length = max(len(message) for message in messages)
+    streams = _cached_keystreams(key, nonces, length)
+
+    if all(len(message) == length for message in messages):
+        data = np.frombuffer(b"".join(messages), dtype=np.uint8).reshape(-1, length)
+        ks = np.stack([ ks[:length] for ks in streams ])
+        return [ row.tobytes() for row in data ^ ks ]
+
+    return [
+        (np.frombuffer(message, dtype=np.uint8) ^ ks[:len(message)]).tobytes()
+        for message, ks in zip(messages, streams)
+    ]
+
+# to be compatible with pySalsa
+def Salsa20_xor(message, nonce, key):
+    if not len(message) > 0:
+        raise ValueError('invalid message length')
+    return Salsa20_xor_many([ bytes(message) ], [ nonce ], key)[0]
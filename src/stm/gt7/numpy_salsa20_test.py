@@ -0,0 +1,70 @@
+import os
+import random
+import unittest
+from unittest import mock
+
+import stm.gt7.packet as packet
+import stm.gt7.numpy_salsa20 as numpy_salsa20
+from stm.gt7 import pure_salsa20
+
+try:
+    from salsa20 import Salsa20_xor as C_Salsa20_xor
+except:
+    C_Salsa20_xor = None
+
+PATH=os.path.dirname(__file__)
+
+class TestNumpySalsa20(unittest.TestCase):
+
+    def setUp(self):
+        rnd = random.Random(0)
+        self.key = rnd.randbytes(32)
+        self.messages = [ rnd.randbytes(length) for length in (1, 63, 64, 65, 296, 296, 1000) ]
+        self.nonces = [ rnd.randbytes(8) for _ in self.messages ]
+
+    def test_matches_pure(self):
+
+        for message, nonce in zip(self.messages, self.nonces):
+            self.assertEqual(numpy_salsa20.Salsa20_xor(message, nonce, self.key),
+                             pure_salsa20.Salsa20_xor(message, nonce, self.key))
+
+    @unittest.skipUnless(C_Salsa20_xor, "salsa20 C package not installed")
+    def test_matches_c(self):
+
+        expected = [ C_Salsa20_xor(m, n, self.key) for m, n in zip(self.messages, self.nonces) ]
+        self.assertEqual(numpy_salsa20.Salsa20_xor_many(self.messages, self.nonces, self.key), expected)
+
+        messages = [ m for m in self.messages if len(m) == 296 ]
+        nonces = [ n for m, n in zip(self.messages, self.nonces) if len(m) == 296 ]
+        self.assertEqual(numpy_salsa20.Salsa20_xor_many(messages, nonces, self.key),
+                         [ C_Salsa20_xor(m, n, self.key) for m, n in zip(messages, nonces) ])
+
+    def test_cache(self):
+
+        numpy_salsa20._cache.clear()
+        message, nonce = self.messages[4], self.nonces[4]
+        first = numpy_salsa20.Salsa20_xor(message, nonce, self.key)
+        self.assertIn((self.key, nonce), numpy_salsa20._cache)
+        self.assertEqual(numpy_salsa20.Salsa20_xor(message, nonce, self.key), first)
+        # a longer message needs a longer keystream
+        self.assertEqual(numpy_salsa20.Salsa20_xor(self.messages[6][:500], nonce, self.key),
+                         pure_salsa20.Salsa20_xor(self.messages[6][:500], nonce, self.key))
+
+    def test_decrypt_many(self):
+
+        dats = []
+        for name in ("barcelonagp911.bin", "gt7_idle.bin"):
+            with open(os.path.join(PATH, "test", name), "rb") as fin:
+                dats.append(fin.read())
+        dats.append(b"\x00" * 296) # bad magic
+
+        ddatas = packet.GT7DataPacket.decrypt_many(dats)
+        self.assertEqual(ddatas, [ packet.GT7DataPacket.decrypt(dat) for dat in dats ])
+        self.assertEqual(ddatas[2], b"")
+
+        # numpy fallback used when the C salsa20 is missing
+        with mock.patch.object(packet, "C_SALSA20", False):
+            self.assertEqual(packet.GT7DataPacket.decrypt_many(dats), ddatas)
+
+if __name__ == '__main__':
+    unittest.main()
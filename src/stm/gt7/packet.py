@@ -1,13 +1,20 @@
 try:
     from salsa20 import Salsa20_xor
+    C_SALSA20 = True
 except:
-    from .pure_salsa20 import Salsa20_xor
+    from .numpy_salsa20 import Salsa20_xor
+    C_SALSA20 = False
+
+from .numpy_salsa20 import Salsa20_xor_many
 
 import struct
+import numpy as np
 from enum import Enum
 from collections import namedtuple
 from stm.maths import Vector, Quaternion
 
+KEY = b'Simulator Interface Packet GT7 ver 0.0'[0:32]
+
 Wheels = namedtuple("Wheels", ["fl", "fr", "rl", "rr"])
 
 class Flags(Enum):
@@ -131,19 +138,164 @@ class GT7DataPacket:
         self.tcs_active = bool(self.flags & Flags.TCS.value)
         self.asm_active = bool(self.flags & Flags.ASM.value)
 
+    def pack(self):
+        """
+        pack the decoded fields back into a decrypted buffer, anything that
+        is not decoded is left as zeros
+        """
+        return self.fmt.pack(
+            *self.position,
+            *self.velocity,
+            *self.rotation,
+            self.ride_height,
+            self.rpm,
+            self.current_fuel,
+            self.fuel_capacity,
+            self.speed,
+            self.turbo_boost,
+            self.oil_pressure,
+            self.water_temp,
+            self.oil_temp,
+            *self.tyretemp,
+            self.tick,
+            self.current_lap,
+            self.laps,
+            self.best_laptime,
+            self.last_laptime,
+            self.race_position,
+            self.rev_upshift,
+            self.rev_limit,
+            self.opponents,
+            self.flags,
+            (self.suggested_gear << 4) | self.gear,
+            self.throttle,
+            self.brake,
+            *self.wheelspeed,
+            *self.wheelradius,
+            *self.suspension,
+            self.clutch,
+            self.car_code
+        )
+
     @staticmethod
-    def decrypt(dat):
-        KEY = b'Simulator Interface Packet GT7 ver 0.0'
+    def iv(dat):
         oiv = dat[0x40:0x44]
         iv1 = int.from_bytes(oiv, byteorder='little')
         iv2 = iv1 ^ 0xDEADBEAF 
         IV = bytearray()
         IV.extend(iv2.to_bytes(4, 'little'))
         IV.extend(iv1.to_bytes(4, 'little'))
-        ddata = Salsa20_xor(dat, bytes(IV), KEY[0:32])
+        return bytes(IV)
 
+    @staticmethod
+    def check_magic(ddata):
         #check magic number
         magic = int.from_bytes(ddata[0:4], byteorder='little')
         if magic != 0x47375330:
             return bytearray(b'')
-        return ddata
\ No newline at end of file
+        return ddata
+
+    @staticmethod
+    def decrypt(dat):
+        ddata = Salsa20_xor(dat, GT7DataPacket.iv(dat), KEY)
+        return GT7DataPacket.check_magic(ddata)
+
+    @staticmethod
+    def decrypt_many(dats):
+        """
+        decrypt a list of packets, with the C salsa20 once per packet when
+        it is installed, otherwise with the vectorised numpy fallback
+        """
+        if C_SALSA20:
+            ddatas = [ Salsa20_xor(dat, GT7DataPacket.iv(dat), KEY) for dat in dats ]
+        else:
+            ddatas = Salsa20_xor_many(dats, [ GT7DataPacket.iv(dat) for dat in dats ], KEY)
+        return [ GT7DataPacket.check_magic(ddata) for ddata in ddatas ]
+
+class GT7PacketBatch:
+    """
+    a batch of packets decoded in one go with a structured dtype
+
+    the fields are exposed as column arrays, widened to float64 / int64 so
+    any maths on them gives the same results as on GT7DataPacket
+    """
+
+    # same layout as GT7DataPacket.fmt
+    dtype = np.dtype({
+        "names": [
+            "position", "velocity", "rotation",
+            "ride_height", "rpm",
+            "current_fuel", "fuel_capacity", "speed", "turbo_boost",
+            "oil_pressure", "water_temp", "oil_temp",
+            "tyretemp",
+            "tick", "current_lap", "laps", "best_laptime", "last_laptime",
+            "race_position", "rev_upshift", "rev_limit", "opponents",
+            "flags", "gear", "throttle", "brake",
+            "wheelspeed", "wheelradius", "suspension",
+            "clutch", "car_code"
+        ],
+        "formats": [
+            ("<f4", 3), ("<f4", 3), ("<f4", 4),
+            "<f4", "<f4",
+            "<f4", "<f4", "<f4", "<f4",
+            "<f4", "<f4", "<f4",
+            ("<f4", 4),
+            "<i4", "<i2", "<i2", "<i4", "<i4",
+            "<i2", "<i2", "<i2", "<i2",
+            "<u2", "u1", "u1", "u1",
+            ("<f4", 4), ("<f4", 4), ("<f4", 4),
+            "<f4", "<u4"
+        ],
+        "offsets": [
+            0x0004, 0x0010, 0x001C,
+            0x0038, 0x003C,
+            0x0044, 0x0048, 0x004C, 0x0050,
+            0x0054, 0x0058, 0x005C,
+            0x0060,
+            0x0070, 0x0074, 0x0076, 0x0078, 0x007C,
+            0x0084, 0x0086, 0x0088, 0x008A,
+            0x008E, 0x0090, 0x0091, 0x0092,
+            0x00A4, 0x00B4, 0x00C4,
+            0x00F4, 0x0124
+        ],
+        "itemsize": GT7DataPacket.fmt.size
+    })
+
+    def __init__(self, buffers, encrypted=True):
+
+        if encrypted:
+            buffers = GT7DataPacket.decrypt_many(buffers)
+
+        # buffers can hold one or more packets back to back
+        size = self.dtype.itemsize
+        for buf in buffers:
+            if not len(buf) or len(buf) % size:
+                raise struct.error(f"unpack requires a buffer of {size} bytes")
+
+        self.data = b"".join(buffers)
+        records = np.frombuffer(self.data, dtype=self.dtype)
+
+        for name in self.dtype.names:
+            column = records[name]
+            column = column.astype(np.float64 if column.dtype.kind == "f" else np.int64)
+            setattr(self, name, column)
+
+        gear = self.gear
+        self.gear = gear & 0x0F
+        self.suggested_gear = (gear & 0xF0) >> 4
+
+        self.paused = (self.flags & Flags.PAUSED.value) != 0
+        self.in_race = (self.flags & Flags.IN_RACE.value) != 0
+        self.tcs_active = (self.flags & Flags.TCS.value) != 0
+        self.asm_active = (self.flags & Flags.ASM.value) != 0
+
+    def __len__(self):
+        return len(self.tick)
+
+    def packet(self, idx):
+        """
+        decode a single row as a GT7DataPacket
+        """
+        size = self.dtype.itemsize
+        idx = range(len(self))[idx]
+        return GT7DataPacket(self.data[idx * size : (idx + 1) * size], encrypted=False)
@@ -1,9 +1,10 @@
 import unittest
 import os
+import numpy as np
 
 PATH=os.path.dirname(__file__)
 
-from stm.gt7.packet import GT7DataPacket
+from stm.gt7.packet import GT7DataPacket, GT7PacketBatch
 
 class TestGT7Packet(unittest.TestCase):
 
@@ -54,5 +55,22 @@ class TestGT7Packet(unittest.TestCase):
             expected = 110.0
             self.assertEqual(pkt.oil_temp, expected)
 
+    def test_batch_matches_packet(self):
+        pkts = []
+        for name in ("barcelonagp911.bin", "gt7_idle.bin"):
+            with open(os.path.join(PATH, "test", name), "rb") as fin:
+                pkts.append(fin.read())
+
+        batch = GT7PacketBatch(pkts)
+        self.assertEqual(len(batch), len(pkts))
+        names = list(GT7PacketBatch.dtype.names) + ["suggested_gear", "paused", "in_race", "tcs_active", "asm_active"]
+        for (idx, buf) in enumerate(pkts):
+            pkt = GT7DataPacket(buf)
+            for name in names:
+                expected = getattr(pkt, name)
+                if not isinstance(expected, (int, float)):
+                    expected = list(expected)
+                np.testing.assert_array_equal(getattr(batch, name)[idx], expected, err_msg=f"{name} should match GT7DataPacket")
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+live lap store
+
+samples of a session are appended to preallocated numpy arrays, one per
+channel (structure of arrays). The arrays only ever get written past the
+last sample, so a lap is finalised by handing out read-only views of its
+index range without copying. When the arrays are full they are replaced by
+larger ones holding only the lap in progress, views of the finished laps
+keep the old arrays alive.
+"""
+
+import numpy as np
+
+
+class LiveLapStore:
+
+    def __init__(self, fields, capacity=4096):
+        """
+        fields is a structured dtype, or a list of (name, dtype) or names
+        (float64). capacity is the number of samples preallocated
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not isinstance(fields, np.dtype):
+            fields = np.dtype([f if isinstance(f, tuple) else (f, np.float64) for f in fields])
+        if fields.names is None:
+            raise ValueError("fields must be named")
+        self.dtype = fields
+        self.names = fields.names
+        self.min_capacity = int(capacity)
+        self.clear()
+
+    def clear(self):
+        """drop every sample, views already handed out stay valid"""
+        self._allocate(self.min_capacity)
+        self.count = 0       # samples in the arrays
+        self.lap_start = 0   # first sample of the lap in progress
+        self.offset = 0      # session index of the first sample in the arrays
+        self.grown = 0
+
+    def _allocate(self, capacity):
+        # np.zeros only commits memory as the pages get written
+        self.capacity = capacity
+        self.arrays = {n: np.zeros(capacity, dtype=self.dtype.fields[n][0]) for n in self.names}
+
+    def __len__(self):
+        """samples in the session"""
+        return self.offset + self.count
+
+    @property
+    def lap_length(self):
+        return self.count - self.lap_start
+
+    def _reserve(self, n):
+        if self.count + n <= self.capacity:
+            return
+        # move the lap in progress to bigger arrays, finished laps stay put
+        live = self.count - self.lap_start
+        capacity = max(self.min_capacity, 2 * (live + n))
+        arrays = self.arrays
+        self._allocate(capacity)
+        for name in self.names:
+            self.arrays[name][:live] = arrays[name][self.lap_start:self.count]
+        self.offset += self.lap_start
+        self.count = live
+        self.lap_start = 0
+        self.grown += 1
+
+    def append(self, row):
+        """add one sample, values in field order"""
+        self._reserve(1)
+        i = self.count
+        for (array, value) in zip(self.arrays.values(), row):
+            array[i] = value
+        self.count = i + 1
+
+    def extend(self, values):
+        """
+        add many samples, either a dict of columns, a structured array or a
+        2d array with one column per field
+        """
+        if isinstance(values, dict):
+            columns = [values[n] for n in self.names]
+        elif isinstance(values, np.ndarray) and values.dtype.names:
+            columns = [values[n] for n in self.names]
+        else:
+            values = np.asarray(values)
+            if values.ndim != 2 or values.shape[1] != len(self.names):
+                raise ValueError(f"expected {len(self.names)} columns")
+            columns = values.T
+        n = len(columns[0]) if len(columns) else 0
+        if any(len(c) != n for c in columns):
+            raise ValueError("columns have different lengths")
+        self._reserve(n)
+        for (name, column) in zip(self.names, columns):
+            self.arrays[name][self.count:self.count + n] = column
+        self.count += n
+
+    def _index(self, index):
+        # session index to array index, only the lap in progress can be split
+        index = len(self) if index is None else index
+        i = index - self.offset
+        if not self.lap_start <= i <= self.count:
+            raise IndexError(f"{index} is outside the lap in progress")
+        return i
+
+    def _views(self, start, stop):
+        views = {}
+        for (name, array) in self.arrays.items():
+            view = array[start:stop]
+            view.flags.writeable = False
+            views[name] = view
+        return views
+
+    def current_lap(self):
+        """read-only views of the lap in progress"""
+        return self._views(self.lap_start, self.count)
+
+    def finish_lap(self, stop=None):
+        """
+        finalise the lap in progress at session index stop (default: every
+        sample so far), returns its columns as read-only views. Samples from
+        stop on start the next lap
+        """
+        stop = self._index(stop)
+        columns = self._views(self.lap_start, stop)
+        self.lap_start = stop
+        return columns
+
+    def discard(self, stop=None):
+        """drop the lap in progress up to session index stop"""
+        self.lap_start = self._index(stop)
@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+
+from stm.live import LiveLapStore
+
+
+class TestLiveLapStore(unittest.TestCase):
+
+    def test_append_and_finish(self):
+        store = LiveLapStore(["a", ("b", np.int32)], capacity=4)
+        for i in range(3):
+            store.append((i * 0.5, i))
+        lap = store.finish_lap()
+        self.assertEqual(lap["a"].tolist(), [0.0, 0.5, 1.0])
+        self.assertEqual(lap["b"].dtype, np.int32)
+        self.assertFalse(lap["a"].flags.writeable)
+        self.assertEqual(store.lap_length, 0)
+        self.assertEqual(len(store), 3)
+
+    def test_grow_keeps_finished_laps(self):
+        store = LiveLapStore(["a"], capacity=4)
+        store.extend({"a": np.arange(3.0)})
+        first = store.finish_lap()
+        arrays = store.arrays
+        store.extend(np.arange(3.0, 10.0).reshape(-1, 1))
+        self.assertEqual(store.grown, 1)
+        self.assertIsNot(store.arrays, arrays)
+        # the finished lap is not copied, the new arrays only hold the lap in progress
+        self.assertTrue(np.shares_memory(first["a"], arrays["a"]))
+        self.assertEqual(store.count, 7)
+        self.assertEqual(first["a"].tolist(), [0.0, 1.0, 2.0])
+        self.assertEqual(store.current_lap()["a"].tolist(), list(range(3, 10)))
+
+    def test_finish_by_index(self):
+        store = LiveLapStore(["a"], capacity=2)
+        store.extend({"a": np.arange(10.0)})
+        store.discard(2)
+        lap = store.finish_lap(6)
+        self.assertEqual(lap["a"].tolist(), [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(store.current_lap()["a"].tolist(), [6.0, 7.0, 8.0, 9.0])
+        with self.assertRaises(IndexError):
+            store.finish_lap(5)
+
+    def test_bad_rows(self):
+        store = LiveLapStore(["a", "b"])
+        with self.assertRaises(ValueError):
+            store.extend(np.zeros((3, 3)))
+        with self.assertRaises(ValueError):
+            store.extend({"a": np.zeros(2), "b": np.zeros(3)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,12 @@
 from threading import Thread
 from queue import Empty
-from .motec import MotecLog, MotecLogExtra, MotecEvent
+from .motec import MotecLog, MotecLogExtra, MotecEvent, MotecChannel, MotecSpooledSamples
 from .channels import get_channel_definition
+from .raw import RawWriter, RawReader
+from .sampler import RawSampler
+from .live import LiveLapStore
 import os
 import re
-import sqlite3
 from pathlib import Path
 from datetime import datetime
 from logging import getLogger
@@ -12,7 +14,11 @@ l = getLogger(__name__)
 
 class BaseLogger(Thread):
 
-    def __init__(self, sampler=None, filetemplate=None, rawfile=None, imperial=False):
+    def __init__(self, sampler=None, filetemplate=None, rawfile=None, imperial=False, live=False):
+        """
+        with live=True the samples are also kept in a LiveLapStore and each
+        finished lap is appended to live_laps as (lap, laptime, columns)
+        """
         super().__init__()
         self.sampler = sampler
         self.filetemplate = filetemplate
@@ -21,40 +27,60 @@ class BaseLogger(Thread):
         self.rawfile = rawfile
         self.lap_samples = 0
         self.imperial = imperial
+        self.saved = []
+        self.live = live
+        self.live_store = None
+        self.live_laps = []
 
     def run(self):
 
         l.info("starting logger")
 
-        cur = None
-        con = None
+        raw = None
 
         # sort out the raw db
         if self.rawfile:
             l.info(f"writing raw samples to {self.rawfile}")
             os.makedirs(os.path.dirname(self.rawfile), exist_ok=True)
-            con = sqlite3.connect(self.rawfile, isolation_level="IMMEDIATE")
-            cur = con.cursor()
-            cur.execute("CREATE TABLE samples(timestamp float, data blob)")
-            cur.execute("CREATE TABLE settings(name, value)")
-            cur.execute("INSERT INTO settings(name, value) values (?, ?)", ("freq", self.sampler.freq) )
-            con.commit()
+            raw = RawWriter(self.rawfile, freq=self.sampler.freq)
 
+        replay = isinstance(self.sampler, RawSampler)
+        if replay:
+            # a replayed capture has no thread, drain it in batches here
+            try:
+                for batch in self.sampler.batches():
+                    if raw:
+                        for timestamp, sample in batch:
+                            raw.add(timestamp, sample)
+                    self.process_batch(batch)
+            except Exception as e:
+                if raw:
+                    raw.close()
+                raise e
+        else:
+            self.sample(raw)
+
+        if raw:
+            raw.close()
+        self.save_log()
+        if not replay:
+            self.sampler.join()
+
+    def sample(self, raw=None):
+        """
+        process samples from a sampler thread until it stops
+        """
         # start the sampler
         self.sampler.start()
 
-        last_sample = b''
-
         while self.sampler.is_alive():
 
             # wait for new samples
             try:
                 timestamp, sample = self.sampler.get(timeout = 1 ) # to allow windows to use CTRL+C
-                if cur:
-                    to_save = sample if sample != last_sample else None
-                    cur.execute("INSERT INTO samples(timestamp, data) VALUES (?, ?)", ( timestamp, to_save ))
+                if raw:
+                    raw.add(timestamp, sample)
                 self.process_sample(timestamp, sample)
-                last_sample = sample
 
             except Empty:
                 pass
@@ -62,16 +88,37 @@ class BaseLogger(Thread):
             except Exception as e:
                 # might have been something in the processing that triggered the exception
                 # so let's see if we can save it for later
-                if con:
-                    con.commit()
+                if raw:
+                    raw.close()
                 
                 # keep going?
                 raise e
 
-        if con:
-            con.commit()
+    def convert(self, rawfile, batchsize=4096):
+        """
+        process a whole raw capture on this thread, reading and decoding it
+        in batches instead of going through a sampler
+        """
+        reader = RawReader(rawfile, batchsize=batchsize)
+        self.sampler = reader # only the freq is used while processing
+        try:
+            for batch in reader.batches():
+                self.process_batch(batch)
+        finally:
+            reader.close()
         self.save_log()
-        self.sampler.join()
+
+    def decode(self, sample):
+        return sample
+
+    def process_batch(self, batch):
+        # repeated samples come back as the same object, so only decode them once
+        last_sample = packet = None
+        for timestamp, sample in batch:
+            if sample is not last_sample:
+                last_sample = sample
+                packet = self.decode(sample)
+            self.process_sample(timestamp, packet)
 
     def active_log(self):
         return self.log is not None
@@ -88,9 +135,18 @@ class BaseLogger(Thread):
         self.logx = MotecLogExtra()
         # add the channels
 
+        # samples are spilled to temp files as they arrive, so a long
+        # session does not have to be held in memory until save_log
         for channel in channels:
             cd = get_channel_definition(channel, self.sampler.freq, self.imperial)
-            self.log.add_channel(cd)
+            channel = MotecChannel(cd)
+            channel.samples = MotecSpooledSamples(channel=channel)
+            self.log.add_channel(channel)
+
+        if self.live:
+            names = [c["name"] if isinstance(c, dict) else c for c in channels]
+            self.live_store = LiveLapStore(names, capacity=int(self.sampler.freq * 180))
+            self.live_laps = []
 
     def update_event(self, event=None):
         if not event or not self.log:
@@ -139,6 +195,14 @@ class BaseLogger(Thread):
     def add_samples(self, samples):
         self.log.add_samples(samples)
         self.lap_samples += 1
+        if self.live_store is not None:
+            self.live_store.append(samples)
+
+    def add_sample_rows(self, rows):
+        self.log.add_sample_rows(rows)
+        self.lap_samples += len(rows)
+        if self.live_store is not None:
+            self.live_store.extend(rows)
 
     def add_lap(self, laptime=0.0, lap=None):
 
@@ -156,6 +220,8 @@ class BaseLogger(Thread):
 
         self.logx.add_lap(laptime)
         self.lap_samples = 0
+        if self.live_store is not None:
+            self.live_laps.append((lap, laptime, self.live_store.finish_lap()))
 
     def stop(self):
         if self.sampler:
@@ -184,10 +250,12 @@ class BaseLogger(Thread):
             ldfilename = f"{self.filename}.ld"
             l.info(f"writing MoTeC log to {ldfilename}")
             with open(ldfilename, "wb") as fout:
-                fout.write(self.log.to_string())
+                self.log.write(fout)
+            self.saved.append(ldfilename)
         else:
             l.warning(f"aborting log {self.filename}, not enough laps")
 
+        self.log.close()
         self.log = None
 
 
@@ -0,0 +1,92 @@
+"""
+shared sample encoding/decoding for .ld files
+
+every .ld reader and writer in the tree (MotecLog, parsers.ldparser) goes
+through these functions, so a channel is converted with a handful of array
+ops instead of one struct.pack/unpack per sample
+"""
+
+import struct
+import numpy as np
+
+# datatype -> datasize -> little endian numpy dtype
+DTYPES = {
+    0x0000: { 0x0001: np.dtype("<i1"), 0x0002: np.dtype("<i2"), 0x0004: np.dtype("<i4") }, # int
+    0x0003: { 0x0001: np.dtype("<i1"), 0x0002: np.dtype("<i2"), 0x0004: np.dtype("<i4") }, # int
+    0x0005: { 0x0001: np.dtype("<i1"), 0x0002: np.dtype("<i2"), 0x0004: np.dtype("<i4") }, # int
+    0x0007: { 0x0002: np.dtype("<f2"), 0x0004: np.dtype("<f4") }, # float
+}
+
+
+def sample_dtype(datatype, datasize):
+    """
+    return the numpy dtype for a channel, or None if unknown
+    """
+    return DTYPES.get(datatype, {}).get(datasize)
+
+
+def raw_samples(data, dtype, offset, count):
+    """
+    return a read-only view of count samples of dtype starting at offset
+
+    data can be anything exposing the buffer protocol (bytes, memoryview,
+    mmap). If the buffer is too short, only the complete samples are returned
+    """
+    dtype = np.dtype(dtype)
+    available = max(0, (len(data) - offset) // dtype.itemsize)
+    count = min(count, available)
+    if count <= 0:
+        return np.empty(0, dtype=dtype)
+    return np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+
+
+def to_engineering(raw, shift, multiplier, scale, decplaces):
+    """
+    convert raw sample words into engineering units
+
+    same operation order as the per-sample conversion used by the readers,
+    done in float64 so the results are identical
+    """
+    values = np.asarray(raw, dtype=np.float64)
+    return (values / scale * pow(10., -decplaces) + shift) * multiplier
+
+
+def decode_samples(data, datatype, datasize, offset, count, shift, multiplier, scale, decplaces):
+    """
+    decode count samples of a channel stored at offset in data
+    """
+    dtype = sample_dtype(datatype, datasize)
+    if dtype is None:
+        raise ValueError(f"failed to determine samples for {datatype} / {datasize}")
+    raw = raw_samples(data, dtype, offset, count)
+    return to_engineering(raw, shift, multiplier, scale, decplaces)
+
+
+def encode_samples(values, datatype, datasize, shift, multiplier, scale, decplaces):
+    """
+    encode engineering values into the raw little endian sample bytes
+
+    same operation order as the per-sample encoder, ints are truncated
+    towards zero like int() and out of range values raise like struct.pack
+    """
+    dtype = sample_dtype(datatype, datasize)
+    if dtype is None:
+        raise ValueError(f"failed to determine samples for {datatype} / {datasize}")
+
+    values = np.asarray(values, dtype=np.float64)
+    values = ((values / multiplier) - shift) * scale / pow(10.0, -decplaces)
+
+    if dtype.kind == "i":
+        if not np.isfinite(values).all():
+            raise ValueError("cannot convert non-finite sample to integer")
+        values = np.trunc(values)
+        info = np.iinfo(dtype)
+        if len(values) and (values.min() < info.min or values.max() > info.max):
+            raise struct.error(f"sample out of range {info.min} <= number <= {info.max}")
+        return values.astype(dtype).tobytes()
+
+    with np.errstate(over="ignore"):
+        raw = values.astype(dtype)
+    if (np.isinf(raw) & np.isfinite(values)).any():
+        raise OverflowError(f"float too large to pack as {dtype}")
+    return raw.tobytes()
@@ -0,0 +1,39 @@
+import struct
+import unittest
+
+from stm.motec.codec import decode_samples, raw_samples, sample_dtype
+
+class TestCodec(unittest.TestCase):
+
+    def test_matches_per_sample_conversion(self):
+
+        words = [-32768, -1234, 0, 1, 999, 32767]
+        data = b"\x00" * 8 + struct.pack("<6h", *words)
+        shift, multiplier, scale, decplaces = 3, 2, 10, 2
+
+        values = decode_samples(data, 0x0003, 0x0002, 8, len(words), shift, multiplier, scale, decplaces)
+
+        expected = [(v / scale * pow(10., -decplaces) + shift) * multiplier for v in words]
+        self.assertEqual(values.tolist(), expected, "should decode exactly like the per-sample loop")
+
+    def test_float_samples(self):
+
+        data = struct.pack("<3f", 1.5, -2.25, 100.0)
+        values = decode_samples(data, 0x0007, 0x0004, 0, 3, 0, 1, 1, 0)
+        self.assertEqual(values.tolist(), [1.5, -2.25, 100.0])
+
+    def test_short_buffer(self):
+
+        data = struct.pack("<3i", 1, 2, 3)
+        raw = raw_samples(data, sample_dtype(0x0005, 0x0004), 4, 10)
+        self.assertEqual(raw.tolist(), [2, 3], "should only return complete samples")
+        self.assertEqual(len(raw_samples(data, "<i4", 64, 1)), 0)
+
+    def test_unknown_datatype(self):
+
+        self.assertIsNone(sample_dtype(0x0007, 0x0001))
+        with self.assertRaises(ValueError):
+            decode_samples(b"\x00" * 4, 0x0001, 0x0004, 0, 1, 0, 1, 1, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,11 @@
 import struct
+import shutil
 import binascii
+import tempfile
+from array import array
 from io import BytesIO
+import numpy as np
+from .codec import decode_samples, encode_samples
 
 class MotecStruct:
 
@@ -122,10 +127,9 @@ class MotecSamples():
     }
 
     def __init__(self, channel = None, samples = None):
-        if samples:
-            self.samples = samples
-        else:
-            self.samples = []
+        # samples are kept in a growable float64 array, appends stay cheap
+        # and the encoder can view it as a numpy array without copying
+        self._samples = array("d")
 
         try:
             self.channel = channel
@@ -139,21 +143,44 @@ class MotecSamples():
         except Exception as e:
             raise ValueError(f"failed to determine samples for {channel.datatype} / {channel.datasize}")
 
+        if samples is not None:
+            self.samples = samples
+
+    @property
+    def samples(self):
+        return self._samples
+
+    @samples.setter
+    def samples(self, values):
+        if isinstance(values, array) and values.typecode == "d":
+            self._samples = values
+        else:
+            self._samples = array("d", np.asarray(values, dtype=np.float64).tobytes())
+
     @property
     def numsamples(self):
-        return len(self.samples)
+        return len(self._samples)
 
     def add_sample(self, sample):
-        self.samples.append(sample)
+        self._samples.append(sample)
+
+    def extend(self, values):
+        self._samples.frombytes(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+
+    @property
+    def size(self):
+        return self.numsamples * self.datasize
 
     def to_string(self):
-        data = bytearray()
-        for v in self.samples:
-            v = ( (v / self.multiplier) - self.shift) * self.scale / pow(10.0, -self.decplaces)
-            v = self.convert(v)
-            data += struct.pack(self.fmt, v)
+        values = np.frombuffer(self._samples, dtype=np.float64)
+        return encode_samples(values, self.channel.datatype, self.channel.datasize,
+                              self.shift, self.multiplier, self.scale, self.decplaces)
+
+    def write(self, fout):
+        fout.write(self.to_string())
 
-        return data
+    def close(self):
+        pass
 
     @classmethod
     def from_string(cls, data, channel = None):
@@ -163,16 +190,89 @@ class MotecSamples():
 
         samples = cls(channel=channel)
 
-        # go to the start of the data and unpack all the values
-        startpos = channel.datapos
-        endpos = startpos + (samples.datasize * channel.numsamples)
-        for (v, ) in struct.iter_unpack(samples.fmt, data[startpos:endpos]):
-            v = (v / channel.scale * pow(10., -channel.decplaces) + channel.shift) * channel.multiplier
-            samples.add_sample(v)
+        # decode the whole channel in one go
+        values = decode_samples(data, channel.datatype, channel.datasize,
+                                channel.datapos, channel.numsamples,
+                                channel.shift, channel.multiplier,
+                                channel.scale, channel.decplaces)
+        samples.samples = values
 
         return samples
 
 
+class MotecSpooledSamples(MotecSamples):
+    """
+    samples that are encoded and spilled to a temp file every chunksize
+    samples, so memory use stays flat however long the session runs
+    """
+
+    def __init__(self, channel = None, samples = None, chunksize = 4096, directory = None):
+        self.chunksize = chunksize
+        self.directory = directory
+        self.spool = None
+        self.spooled = 0
+        super().__init__(channel=channel, samples=samples)
+
+    @property
+    def samples(self):
+        # read back what has been spilled, quantised as it will be saved
+        self.flush()
+        data = b""
+        if self.spool:
+            self.spool.seek(0)
+            data = self.spool.read()
+        values = decode_samples(data, self.channel.datatype, self.channel.datasize,
+                                0, self.spooled, self.shift, self.multiplier,
+                                self.scale, self.decplaces)
+        return array("d", values.tobytes())
+
+    @samples.setter
+    def samples(self, values):
+        self.close()
+        MotecSamples.samples.fset(self, values)
+        self.flush()
+
+    @property
+    def numsamples(self):
+        return self.spooled + len(self._samples)
+
+    def add_sample(self, sample):
+        self._samples.append(sample)
+        if len(self._samples) >= self.chunksize:
+            self.flush()
+
+    def extend(self, values):
+        super().extend(values)
+        if len(self._samples) >= self.chunksize:
+            self.flush()
+
+    def flush(self):
+        if not self._samples:
+            return
+        if not self.spool:
+            self.spool = tempfile.TemporaryFile(dir=self.directory)
+        self.spool.seek(0, 2)
+        self.spool.write(super().to_string())
+        self.spooled += len(self._samples)
+        self._samples = array("d")
+
+    def to_string(self):
+        data = BytesIO()
+        self.write(data)
+        return data.getvalue()
+
+    def write(self, fout):
+        self.flush()
+        if self.spool:
+            self.spool.seek(0)
+            shutil.copyfileobj(self.spool, fout)
+
+    def close(self):
+        if self.spool:
+            self.spool.close()
+        self.spool = None
+        self.spooled = 0
+
 class MotecChannel(MotecBase):
 
     header = MotecStruct([
@@ -272,6 +372,11 @@ class MotecLog(MotecBase):
         for (idx, sample) in enumerate(samples):
             self.channels[idx].add_sample(sample)
 
+    def add_sample_rows(self, rows):
+        # rows is a 2d array, one row per sample and one column per channel
+        for (idx, channel) in enumerate(self.channels):
+            channel.samples.extend(rows[:, idx])
+
 
     @classmethod
     def from_string(cls, data, pad = False):
@@ -293,18 +398,27 @@ class MotecLog(MotecBase):
         return log
 
     def to_string(self):
-
         data = BytesIO()
+        self.write(data)
+        return data.getbuffer()
+
+    def write(self, fout):
+        """
+        write the log to a binary file object
 
-        # pack the event
+        the pointers only depend on the number of samples per channel, so they
+        are all worked out first and the samples are then streamed one channel
+        after the other straight after the headers
+        """
+
+        # place the event
         eventpos = 0
         nextpos = self.header.size
-        if getattr(self, "event", None):
+        event = getattr(self, "event", None)
+        if event:
             eventpos = nextpos
-            nextpos = nextpos + self.event.header.size
-            data.seek(eventpos)
-            data.write(self.event.to_string())
-            
+            nextpos = nextpos + event.header.size
+
         self.eventpos = eventpos
 
         # work out the channel pointers
@@ -330,20 +444,21 @@ class MotecLog(MotecBase):
 
                 ci.prevpos = prevpos
                 ci.datapos = datapos
-                data.seek(thispos)
-                data.write(ci.to_string())
-
-                # get the samples for the channel
-                samples = ci.samples.to_string()
-                data.seek(datapos)
-                data.write(samples)
-                
+
                 # finally, update all the pointers
-                datapos += len(samples)
+                datapos += ci.samples.size
                 prevpos = thispos
                 thispos = ci.nextpos
 
-        # now pack the log header
-        data.seek(0)
-        data.write(super().to_string())
-        return data.getbuffer()
\ No newline at end of file
+        # now everything is in place, write it out in file order
+        fout.write(super().to_string())
+        if event:
+            fout.write(event.to_string())
+        for ci in self.channels:
+            fout.write(ci.to_string())
+        for ci in self.channels:
+            ci.samples.write(fout)
+
+    def close(self):
+        for ci in self.channels:
+            ci.samples.close()
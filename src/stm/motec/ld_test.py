@@ -1,6 +1,20 @@
+import random
+import struct
 import unittest
 
 from motec import MotecLog
+from motec.ld import MotecChannel, MotecSpooledSamples
+
+def reference_encode(samples):
+    """
+    the original per-sample encoder, kept to check the vectorized one
+    """
+    data = bytearray()
+    for v in samples.samples:
+        v = ( (v / samples.multiplier) - samples.shift) * samples.scale / pow(10.0, -samples.decplaces)
+        v = samples.convert(v)
+        data += struct.pack(samples.fmt, v)
+    return data
 
 class TestMotecLog(unittest.TestCase):
 
@@ -12,5 +26,74 @@ class TestMotecLog(unittest.TestCase):
         self.assertIsInstance(log, MotecLog, "should be an instance of MotecLog")
         self.assertEqual(log.id, 0x40, "should have assigned the correct")
 
+    def test_encode_matches_reference(self):
+
+        rnd = random.Random(0)
+        for datatype, datasize, decplaces, limit in [
+            (3, 2, 1, 3000), (5, 4, 3, 100000), (0, 1, 0, 120), (7, 4, 0, 1e6), (7, 2, 0, 60000) ]:
+
+            channel = MotecChannel({ "datatype": datatype, "datasize": datasize,
+                "shift": 2, "multiplier": 3, "scale": 1, "decplaces": decplaces })
+            for _ in range(500):
+                channel.add_sample(rnd.uniform(-limit, limit))
+            channel.add_sample(-0.0)
+            channel.add_sample(True)
+
+            self.assertEqual(bytes(channel.samples.to_string()), bytes(reference_encode(channel.samples)),
+                f"should encode {datatype} / {datasize} byte for byte like the per-sample encoder")
+
+    def test_encode_out_of_range(self):
+
+        channel = MotecChannel({ "datatype": 3, "datasize": 2,
+            "shift": 0, "multiplier": 1, "scale": 1, "decplaces": 0 })
+        channel.add_sample(40000)
+        with self.assertRaises(struct.error):
+            channel.samples.to_string()
+
+    def test_roundtrip(self):
+
+        log = MotecLog()
+        log.date, log.time = "01/01/2025", "12:00:00"
+        log.driver = log.vehicle = log.venue = log.comment = ""
+        log.add_channel({ "id": 0, "name": "Speed", "shortname": "Speed", "datatype": 3, "datasize": 2, "freq": 20,
+            "shift": 0, "multiplier": 1, "scale": 1, "decplaces": 1, "units": "km/h" })
+        for v in range(100):
+            log.add_samples([ v / 2 ])
+
+        data = bytes(log.to_string())
+        decoded = MotecLog.from_string(data)
+        self.assertEqual(decoded.channels[0].numsamples, 100)
+        for v, sample in enumerate(decoded.channels[0].samples.samples):
+            self.assertAlmostEqual(sample, v / 2)
+
+    def test_spooled_matches_memory(self):
+
+        def build(spooled):
+            log = MotecLog()
+            log.date, log.time = "01/01/2025", "12:00:00"
+            log.driver = log.vehicle = log.venue = log.comment = ""
+            for idx, (datatype, datasize) in enumerate([ (3, 2), (5, 4), (7, 4) ]):
+                channel = MotecChannel({ "id": idx, "name": f"c{idx}", "shortname": f"c{idx}",
+                    "units": "", "datatype": datatype, "datasize": datasize, "freq": 20,
+                    "shift": 0, "multiplier": 1, "scale": 1, "decplaces": 1 })
+                if spooled:
+                    channel.samples = MotecSpooledSamples(channel=channel, chunksize=64)
+                log.add_channel(channel)
+            for v in range(1000):
+                log.add_samples([ v % 300, v * 1.5, v / 7 ])
+            return log
+
+        log = build(spooled=True)
+        for channel in log.channels:
+            self.assertLess(len(channel.samples._samples), 64, "should only buffer one chunk in memory")
+            self.assertEqual(channel.samples.numsamples, 1000)
+
+        expected = bytes(build(spooled=False).to_string())
+        self.assertEqual(bytes(log.to_string()), expected, "should write the same file as the in memory log")
+
+        decoded = MotecLog.from_string(expected)
+        self.assertEqual(list(log.channels[1].samples.samples), list(decoded.channels[1].samples.samples))
+        log.close()
+
 if __name__ == '__main__':
     unittest.main()
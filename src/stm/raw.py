@@ -0,0 +1,87 @@
+"""
+raw sample captures
+
+the capture is a sqlite db with a samples(timestamp, data) table, data is
+stored as NULL when it is identical to the previous sample. Writes are
+batched with executemany and committed every batchsize samples, reads are
+fetched batchsize rows at a time
+"""
+
+import sqlite3
+
+class RawWriter:
+
+    def __init__(self, rawfile, freq=None, batchsize=1000):
+        self.batchsize = batchsize
+        self.pending = []
+        self.last_sample = b''
+
+        self.con = sqlite3.connect(rawfile, isolation_level="IMMEDIATE")
+        cur = self.con.cursor()
+        cur.execute("CREATE TABLE samples(timestamp float, data blob)")
+        cur.execute("CREATE TABLE settings(name, value)")
+        cur.execute("INSERT INTO settings(name, value) values (?, ?)", ("freq", freq) )
+        self.con.commit()
+
+    def add(self, timestamp, sample):
+        # only store samples that changed
+        to_save = sample if sample != self.last_sample else None
+        self.pending.append( (timestamp, to_save) )
+        self.last_sample = sample
+
+        if len(self.pending) >= self.batchsize:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.con.executemany("INSERT INTO samples(timestamp, data) VALUES (?, ?)", self.pending)
+            self.pending = []
+        self.con.commit()
+
+    def close(self):
+        self.flush()
+        self.con.close()
+
+
+class RawReader:
+
+    def __init__(self, rawfile, batchsize=4096):
+        self.batchsize = batchsize
+        # opened by whoever creates the reader, read by whoever replays it
+        self.con = sqlite3.connect(rawfile, isolation_level=None, check_same_thread=False)
+        res = self.con.execute("SELECT value FROM settings WHERE name='freq'")
+        (self.freq, ) = res.fetchone()
+
+    def batches(self):
+        """
+        yield lists of (timestamp, data) with the repeated samples filled in
+        """
+        res = self.con.execute("SELECT timestamp, data FROM samples ORDER BY timestamp")
+        last_data = None
+
+        while True:
+            rows = res.fetchmany(self.batchsize)
+            if not rows:
+                break
+
+            batch = []
+            for timestamp, data in rows:
+                if isinstance(timestamp, int):
+                    timestamp = timestamp / 1000.0
+
+                if data is None:
+                    # repeat the last changed sample
+                    data = last_data
+                else:
+                    last_data = data
+
+                batch.append( (timestamp, data) )
+
+            yield batch
+
+    def __iter__(self):
+        for batch in self.batches():
+            yield from batch
+
+    def close(self):
+        self.con.close()
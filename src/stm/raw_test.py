@@ -0,0 +1,56 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from stm.raw import RawWriter, RawReader
+from stm.sampler import RawSampler
+
+class TestRawCapture(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.rawfile = os.path.join(self.dir.name, "raw.db")
+        self.samples = [ (i / 60.0, bytes([i // 3])) for i in range(100) ]
+
+        raw = RawWriter(self.rawfile, freq=60, batchsize=7)
+        for timestamp, sample in self.samples:
+            raw.add(timestamp, sample)
+        raw.close()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_dedupe(self):
+
+        con = sqlite3.connect(self.rawfile)
+        rows = con.execute("SELECT data FROM samples ORDER BY timestamp").fetchall()
+        con.close()
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(sum(1 for (data, ) in rows if data is None), 100 - 34, "should store repeated samples as NULL")
+
+    def test_reader(self):
+
+        reader = RawReader(self.rawfile, batchsize=16)
+        self.assertEqual(reader.freq, 60)
+        self.assertEqual(list(reader), self.samples, "should fill in the repeated samples")
+        reader.close()
+
+    def test_replay(self):
+
+        sampler = RawSampler(rawfile=self.rawfile, batchsize=16)
+        self.assertEqual(sampler.freq, 60)
+        self.assertEqual(list(sampler), self.samples)
+        self.assertFalse(sampler.running)
+
+    def test_replay_stop(self):
+
+        sampler = RawSampler(rawfile=self.rawfile, batchsize=16)
+        replayed = []
+        for batch in sampler.batches():
+            replayed.extend(batch)
+            sampler.stop()
+        self.assertEqual(replayed, self.samples[:16])
+
+if __name__ == '__main__':
+    unittest.main()
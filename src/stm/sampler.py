@@ -1,6 +1,6 @@
 from threading import Thread
 from queue import Queue
-import sqlite3
+from .raw import RawReader
 from logging import getLogger
 l = getLogger(__name__)
 
@@ -22,48 +22,41 @@ class BaseSampler(Thread):
         l.warning("stopping sampler")
         self.running = False
 
-class RawSampler(Thread):
+class RawSampler:
+    """
+    replays a raw capture. It is not a thread: the capture is read in batches
+    on the caller's thread, BaseLogger.run drains batches() directly
+    """
 
-    def __init__(self, rawfile=None):
-        super().__init__()
-        self.samples = Queue(maxsize=1)
-        self.running = False
+    def __init__(self, rawfile=None, batchsize=4096):
         self.rawfile = rawfile
-        self.freq = None # get the freq from the sample file
+        self.reader = RawReader(rawfile, batchsize=batchsize)
+        self.freq = self.reader.freq # get the freq from the sample file
+        self.running = False
 
-    def run(self):
+    def batches(self):
+        """
+        yield lists of (timestamp, sample) until the capture is exhausted or
+        stop() is called
+        """
         self.running = True
-        con = sqlite3.connect(self.rawfile, isolation_level=None)
-        cur = con.cursor()
-        res = cur.execute("SELECT value FROM settings WHERE name='freq'")
-        (self.freq, ) = res.fetchone()
-        res = cur.execute("SELECT * FROM samples ORDER BY timestamp")
-
-        last_data = None
-
-        while self.running:
-
-            try:
-                timestamp, data = next(res)
-                if isinstance(timestamp, int):
-                    timestamp = timestamp / 1000.0
-
-                if data is None:
-                    # repeat the last changed sample
-                    data = last_data
-                else:
-                    last_data = data
+        try:
+            for batch in self.reader.batches():
+                if not self.running:
+                    break
+                yield batch
+        finally:
+            self.running = False
+            self.reader.close()
+
+    def __iter__(self):
+        for batch in self.batches():
+            yield from batch
 
-                self.samples.put( (timestamp, data), block=True )
-            except Exception as e:
-                self.running = False
-                l.warning(e)
-
-        con.close()
-
-    def get(self, timeout=None):
-        return self.samples.get(timeout=timeout)
-    
     def stop(self):
-        l.warning("stopping sampler")
-        self.running = False
+        if self.running:
+            # batches() closes the reader once the current batch is done
+            l.warning("stopping sampler")
+            self.running = False
+        else:
+            self.reader.close()
@@ -6,11 +6,12 @@ Permite a comparação de múltiplas voltas.
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Optional, Tuple, Union
-from scipy.interpolate import interp1d
+from typing import Dict, List, Any, Tuple, Union
 from scipy.spatial.distance import cdist
 import itertools
 
+from src.analysis.distance_resampling import delta_trace, lap_grid
+
 class TelemetryComparison:
     """Classe principal para comparação de dados de telemetria entre múltiplas voltas."""
 
@@ -87,105 +88,46 @@ class TelemetryComparison:
             }
 
         try:
-            # Extrai distâncias e tempos, tratando possíveis erros de chave
-            ref_distances = [p['distance'] for p in ref_points if 'distance' in p]
-            ref_times = [p['time'] for p in ref_points if 'time' in p]
-            comp_distances = [p['distance'] for p in comp_points if 'distance' in p]
-            comp_times = [p['time'] for p in comp_points if 'time' in p]
-
-            if not ref_distances or not ref_times or not comp_distances or not comp_times:
-                 raise ValueError("Dados de distância ou tempo ausentes nos pontos de dados.")
-
-            # Garante que os dados tenham o mesmo comprimento após extração
-            min_len_ref = min(len(ref_distances), len(ref_times))
-            min_len_comp = min(len(comp_distances), len(comp_times))
-            ref_distances, ref_times = ref_distances[:min_len_ref], ref_times[:min_len_ref]
-            comp_distances, comp_times = comp_distances[:min_len_comp], comp_times[:min_len_comp]
-
-            # Verifica novamente se há pontos suficientes após a limpeza
-            if len(ref_distances) < 10 or len(comp_distances) < 10:
-                raise ValueError("Dados insuficientes após validação de distância/tempo.")
-
-            # Normaliza as distâncias para 0-1 (ou usa distância absoluta se preferir)
-            max_ref_dist = max(ref_distances) if ref_distances else 1.0
-            max_comp_dist = max(comp_distances) if comp_distances else 1.0
-            # Evita divisão por zero se a distância for zero
-            norm_ref_dist = np.array([d / max_ref_dist if max_ref_dist > 0 else 0 for d in ref_distances])
-            norm_comp_dist = np.array([d / max_comp_dist if max_comp_dist > 0 else 0 for d in comp_distances])
-
-            # Remove duplicatas nas distâncias normalizadas antes da interpolação
-            norm_ref_dist, unique_ref_indices = np.unique(norm_ref_dist, return_index=True)
-            ref_times_unique = np.array(ref_times)[unique_ref_indices]
-
-            norm_comp_dist, unique_comp_indices = np.unique(norm_comp_dist, return_index=True)
-            comp_times_unique = np.array(comp_times)[unique_comp_indices]
-
-            # Verifica se ainda há pontos suficientes após unique
-            if len(norm_ref_dist) < 2 or len(norm_comp_dist) < 2:
-                 raise ValueError("Pontos insuficientes para interpolação após remover duplicatas.")
-
-            # Cria interpoladores para os tempos
-            ref_time_interp = interp1d(norm_ref_dist, ref_times_unique, kind='linear', bounds_error=False, fill_value='extrapolate')
-            comp_time_interp = interp1d(norm_comp_dist, comp_times_unique, kind='linear', bounds_error=False, fill_value='extrapolate')
-
-            # Cria pontos de amostragem uniformes (baseados na distância normalizada 0-1)
-            num_samples = max(len(ref_points), len(comp_points)) # Ajusta o número de amostras
-            sample_points_norm_dist = np.linspace(0, 1, num_samples)
-
-            # Interpola os tempos nos pontos de amostragem
-            ref_times_sampled = ref_time_interp(sample_points_norm_dist)
-            comp_times_sampled = comp_time_interp(sample_points_norm_dist)
-
-            # Calcula o delta de tempo (positivo significa que a volta de comparação é mais lenta)
-            # Ajusta os tempos para começar em 0 relativo ao início da amostragem
-            ref_times_sampled_relative = ref_times_sampled - ref_times_sampled[0]
-            comp_times_sampled_relative = comp_times_sampled - comp_times_sampled[0]
-            delta_times = comp_times_sampled_relative - ref_times_sampled_relative
-
-            # Calcula o delta cumulativo (este cálculo parece incorreto, deve ser a integral do delta instantâneo)
-            # O delta cumulativo em um ponto de distância d é simplesmente delta_times nesse ponto d.
-            # O que pode ser útil é o delta *instantâneo* (derivada do delta_time em relação à distância)
-            # Mas por ora, manteremos o delta_times como está (diferença de tempo no mesmo ponto de distância normalizada)
-
-            # Interpola outros canais para análise (ex: velocidade)
-            # Precisa de tratamento semelhante para unique e interpolação
-            ref_speeds = [p['speed'] for p in ref_points if 'speed' in p]
-            comp_speeds = [p['speed'] for p in comp_points if 'speed' in p]
-            ref_speeds_unique = np.array(ref_speeds)[unique_ref_indices]
-            comp_speeds_unique = np.array(comp_speeds)[unique_comp_indices]
-
-            ref_speed_interp = interp1d(norm_ref_dist, ref_speeds_unique, kind='linear', bounds_error=False, fill_value='extrapolate')
-            comp_speed_interp = interp1d(norm_comp_dist, comp_speeds_unique, kind='linear', bounds_error=False, fill_value='extrapolate')
-
-            ref_speeds_sampled = ref_speed_interp(sample_points_norm_dist)
-            comp_speeds_sampled = comp_speed_interp(sample_points_norm_dist)
+            # Grades de distância das voltas (1 m), calculadas uma vez por volta
+            ref_grid = lap_grid(reference_lap)
+            comp_grid = lap_grid(comparison_lap)
+            if ref_grid is None or comp_grid is None:
+                raise ValueError("Dados de distância ou tempo ausentes nos pontos de dados.")
+            if not (ref_grid.has('time') and comp_grid.has('time')):
+                raise ValueError("Dados de tempo ausentes nos pontos de dados.")
+            if len(ref_grid) < 2 or len(comp_grid) < 2:
+                raise ValueError("Pontos insuficientes para interpolação.")
+
+            # Delta de tempo na mesma distância (positivo significa que a volta de comparação é mais lenta)
+            distance_abs, delta_times = delta_trace(ref_grid, comp_grid)
+            num_samples = len(distance_abs)
+            max_ref_dist = ref_grid.length
+            sample_points_norm_dist = distance_abs / max_ref_dist if max_ref_dist > 0 else np.zeros(num_samples)
+            ref_times_sampled_relative = ref_grid['time'][:num_samples]
+            comp_times_sampled_relative = comp_grid['time'][:num_samples]
+
+            # Outros canais na mesma grade (ex: velocidade)
+            zeros = np.zeros(num_samples)
+            ref_speeds_sampled = ref_grid['speed'][:num_samples] if ref_grid.has('speed') else zeros
+            comp_speeds_sampled = comp_grid['speed'][:num_samples] if comp_grid.has('speed') else zeros
 
             # Identifica pontos de ganho e perda (simplificado)
             # Um ponto de perda significa que delta_times > 0 (comp mais lento)
             # Um ponto de ganho significa que delta_times < 0 (comp mais rápido)
-            gain_points = []
-            loss_points = []
             threshold = 0.01 # 10ms
 
-            for i in range(num_samples):
-                delta = delta_times[i]
-                dist_val = sample_points_norm_dist[i] * max_ref_dist # Distância real aproximada
-                # Encontrar ponto original mais próximo para obter posição (pode ser impreciso)
-                # closest_ref_idx = self._find_closest_point_by_distance(ref_points, dist_val)
-                # position = ref_points[closest_ref_idx]['position'] if closest_ref_idx is not None else [0,0]
-
-                point_info = {
-                    'distance_norm': sample_points_norm_dist[i],
-                    'distance_abs': dist_val,
-                    'delta': delta,
-                    'speed_ref': ref_speeds_sampled[i],
-                    'speed_comp': comp_speeds_sampled[i],
-                    # 'position': position # Adicionar se a busca por ponto próximo for implementada
-                }
-                if delta < -threshold:
-                    gain_points.append({**point_info, 'type': 'gain'})
-                elif delta > threshold:
-                    loss_points.append({**point_info, 'type': 'loss'})
+            def points_where(mask, point_type):
+                return [{
+                    'distance_norm': float(sample_points_norm_dist[i]),
+                    'distance_abs': float(distance_abs[i]),
+                    'delta': float(delta_times[i]),
+                    'speed_ref': float(ref_speeds_sampled[i]),
+                    'speed_comp': float(comp_speeds_sampled[i]),
+                    'type': point_type,
+                } for i in np.flatnonzero(mask)]
+
+            gain_points = points_where(delta_times < -threshold, 'gain')
+            loss_points = points_where(delta_times > threshold, 'loss')
 
             # Analisa os setores (se disponíveis)
             sector_analysis = self._analyze_sectors(reference_lap, comparison_lap)
@@ -203,7 +145,7 @@ class TelemetryComparison:
                 'sectors': sector_analysis,
                 'delta_samples': {
                     'distance_norm': sample_points_norm_dist.tolist(),
-                    'distance_abs': (sample_points_norm_dist * max_ref_dist).tolist(),
+                    'distance_abs': distance_abs.tolist(),
                     'delta_time': delta_times.tolist(),
                     'ref_time_sampled': ref_times_sampled_relative.tolist(),
                     'comp_time_sampled': comp_times_sampled_relative.tolist(),
@@ -308,48 +250,6 @@ class TelemetryComparison:
             'acceleration_zones': []
         }
 
-    def _find_closest_point_by_distance(self, points: List[Dict[str, Any]], target_distance: float) -> Optional[int]:
-        """Encontra o índice do ponto mais próximo de uma distância alvo."""
-        if not points:
-            return None
-        distances = np.array([p.get('distance', -1) for p in points])
-        valid_indices = np.where(distances >= 0)[0]
-        if len(valid_indices) == 0:
-            return None
-        # Calcula a diferença absoluta e encontra o índice do mínimo
-        diffs = np.abs(distances[valid_indices] - target_distance)
-        closest_original_index = valid_indices[np.argmin(diffs)]
-        return closest_original_index
-
-    def _interpolate_value_at_distance(self, points: List[Dict[str, Any]], channel: str, target_distance: float) -> Optional[float]:
-        """Interpola o valor de um canal em uma distância específica."""
-        try:
-            distances = [p['distance'] for p in points if 'distance' in p and channel in p]
-            values = [p[channel] for p in points if 'distance' in p and channel in p]
-
-            if len(distances) < 2:
-                return None
-
-            # Garante que distâncias e valores tenham o mesmo comprimento
-            min_len = min(len(distances), len(values))
-            distances = np.array(distances[:min_len])
-            values = np.array(values[:min_len])
-
-            # Remove duplicatas nas distâncias
-            distances, unique_indices = np.unique(distances, return_index=True)
-            values_unique = values[unique_indices]
-
-            if len(distances) < 2:
-                return None
-
-            interp_func = interp1d(distances, values_unique, kind='linear', bounds_error=False, fill_value=None) # Retorna None fora dos limites
-            interpolated_value = interp_func(target_distance)
-
-            # interp1d retorna array, pegamos o valor escalar
-            return float(interpolated_value) if interpolated_value is not None else None
-        except Exception:
-            return None # Retorna None em caso de erro na interpolação
-
     def _generate_improvement_suggestions(self, gain_points: List[Dict], loss_points: List[Dict], key_points: Dict) -> List[str]:
         """Gera sugestões de melhoria com base nas diferenças encontradas. Placeholder."""
         suggestions = []
@@ -15,6 +15,26 @@ from typing import Dict, List, Any, Optional, Tuple, Union
 
 # Importar o parser MoTeC
 from .parsers.ldparser import ldData, read_ldfile
+# Sessões salvas pela captura (manifesto JSON + canais binários)
+from .data_capture.session_store import load_session, is_session_manifest
+from .parsers.csv_parser import ColumnarDataPoints, parse_csv_telemetry
+from .parsers.channel_registry import resolve_channels
+
+# Colunas do DataFrame MoTeC -> id canônico no registro de canais
+MOTEC_CHANNELS = {
+    'Time': 'time',
+    'Lap': 'lap',
+    'Distance': 'distance',
+    'Ground Speed': 'speed',
+    'RPM': 'rpm',
+    'Gear': 'gear',
+    'Throttle Pos': 'throttle',
+    'Brake Pos': 'brake',
+    'Steer Angle': 'steer',
+    'Pos X': 'posx',
+    'Pos Y': 'posy',
+    'Sector': 'sector',  # Canal opcional para setores
+}
 
 class TelemetryImporter:
     """Classe principal para importação de dados de telemetria."""
@@ -126,8 +146,77 @@ class TelemetryImporter:
 
         raise ValueError(f"Não foi possível detectar o formato do arquivo: {file_path}")
 
+    def _import_json_telemetry(self, file_path: str) -> Dict[str, Any]:
+        """
+        Importa telemetria salva em JSON pelo aplicativo.
+
+        O arquivo pode ser o JSON completo da sessão ou o manifesto de uma
+        sessão binária; nesse caso os canais são mapeados em memória a partir
+        do arquivo .dat e os pontos não são convertidos em dicionários.
+
+        Args:
+            file_path: Caminho para o arquivo .json
+
+        Returns:
+            Dicionário com os dados de telemetria processados
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if is_session_manifest(data):
+            data = load_session(file_path, manifest=data)
+
+        if not isinstance(data, dict) or 'laps' not in data:
+            raise ValueError("Formato de arquivo de telemetria JSON inválido")
+
+        session = data.get('session', {})
+        metadata = dict(data.get('metadata', {}))
+        metadata.setdefault('simulator', session.get('simulator', 'Desconhecido'))
+        metadata.setdefault('track', session.get('track', 'Desconhecido'))
+        metadata.setdefault('car', session.get('car', 'Desconhecido'))
+        metadata.setdefault('driver', session.get('player', 'Desconhecido'))
+        metadata['lap_count'] = len(data['laps'])
+        metadata['source_file'] = file_path
+
+        return {
+            'metadata': metadata,
+            'session': session,
+            'laps': data['laps']
+        }
+
+    def _import_csv_telemetry(self, file_path: str) -> Dict[str, Any]:
+        """
+        Importa telemetria de um arquivo CSV (MoTeC ou genérico).
+
+        Args:
+            file_path: Caminho para o arquivo .csv
+
+        Returns:
+            Dicionário com os dados de telemetria processados
+        """
+        data = parse_csv_telemetry(file_path)
 
-"))
+        metadata = dict(data.get('metadata', {}))
+        metadata['lap_count'] = len(data.get('laps', []))
+        metadata['source_file'] = file_path
+        data['metadata'] = metadata
+        return data
+
+    def _import_acc_telemetry(self, file_path: str) -> Dict[str, Any]:
+        """
+        Importa telemetria do ACC (.acc) (Placeholder).
+
+        A captura do ACC salva as sessões em JSON; use esse arquivo.
+        """
+        raise NotImplementedError("Importação de arquivos .acc ainda não implementada.")
+
+    def _import_lmu_telemetry(self, file_path: str) -> Dict[str, Any]:
+        """
+        Importa telemetria do LMU (.lmu) (Placeholder).
+
+        O LMU grava arquivos MoTeC (.ld), importados por ``_import_motec_telemetry``.
+        """
+        raise NotImplementedError("Importação de arquivos .lmu ainda não implementada.")
 
     def _import_motec_telemetry(self, file_path: str) -> Dict[str, Any]:
         """
@@ -151,33 +240,14 @@ class TelemetryImporter:
             required_channels = ['Time', 'Lap', 'Distance', 'Ground Speed', 'RPM', 'Gear', 'Throttle Pos', 'Brake Pos', 'Steer Angle', 'Pos X', 'Pos Y'] # Nomes comuns, podem variar
             available_channels = list(ld_data)
 
-            # Mapeamento flexível de nomes de canais comuns
-            channel_map = {
-                'Time': ['Time', 'TimeOfDay', 'Session Time'],
-                'Lap': ['Lap', 'Lap Number', 'Laps'],
-                'Distance': ['Distance', 'Lap Distance', 'Track Distance'],
-                'Ground Speed': ['Ground Speed', 'Speed'],
-                'RPM': ['RPM', 'Engine RPM'],
-                'Gear': ['Gear', 'Selected Gear'],
-                'Throttle Pos': ['Throttle Pos', 'Throttle', 'Accelerator Pedal Pos'],
-                'Brake Pos': ['Brake Pos', 'Brake', 'Brake Pedal Pos'],
-                'Steer Angle': ['Steer Angle', 'Steering Angle', 'Steer'],
-                'Pos X': ['Pos X', 'GPS Pos X', 'WorldPosX'],
-                'Pos Y': ['Pos Y', 'GPS Pos Y', 'WorldPosY'],
-                'Sector': ['Sector', 'Sector Index', 'Current Sector'] # Canal opcional para setores
-            }
-
-            # Encontra os nomes reais dos canais no arquivo .ld
+            # Nomes reais dos canais resolvidos pelo registro de canais (uma vez por arquivo)
+            resolved = resolve_channels(available_channels)
             actual_channel_names = {}
             missing_required = []
-            for standard_name, possible_names in channel_map.items():
-                found = False
-                for possible_name in possible_names:
-                    if possible_name in available_channels:
-                        actual_channel_names[standard_name] = possible_name
-                        found = True
-                        break
-                if not found and standard_name in required_channels:
+            for standard_name, channel_id in MOTEC_CHANNELS.items():
+                if channel_id in resolved:
+                    actual_channel_names[standard_name] = resolved.source(channel_id)
+                elif standard_name in required_channels:
                     missing_required.append(standard_name)
 
             if missing_required:
@@ -236,7 +306,8 @@ class TelemetryImporter:
                 # Trata todos os dados como uma única volta (volta 0 ou 1)
                 df['Lap'] = 1 # Ou 0, dependendo da convenção desejada
 
-            lap_channel = actual_channel_names.get('Lap', 'Lap')
+            # O DataFrame usa os nomes padrão, não os nomes do arquivo
+            lap_channel = 'Lap'
             metadata['lap_count'] = int(df[lap_channel].nunique())
 
             # Processa cada volta encontrada no DataFrame
@@ -250,7 +321,7 @@ class TelemetryImporter:
                 # Calcula o tempo da volta (requer o canal 'Time')
                 lap_time = 0
                 if 'Time' in lap_df.columns:
-                    time_channel = actual_channel_names.get('Time', 'Time')
+                    time_channel = 'Time'
                     # Garante que o tempo seja monotonicamente crescente dentro da volta
                     lap_df[time_channel] = lap_df[time_channel].ffill().bfill()
                     if not lap_df[time_channel].is_monotonic_increasing:
@@ -260,8 +331,36 @@ class TelemetryImporter:
                               print(f"Aviso: Tempo não monotônico detectado na volta {lap_num}. Tentando corrigir...")
                               # Estratégia simples: resetar o tempo no início de decréscimos
                               # Pode precisar de lógica mais sofisticada
-                              lap_df[time_channel] = lap_df[time_channel]. Posição final
-            
+                              lap_df[time_channel] = lap_df[time_channel].cummax()
+
+                    if len(lap_df) > 1:
+                        lap_time = float(lap_df[time_channel].iloc[-1] - lap_df[time_channel].iloc[0])
+
+                # Canais da volta como arrays; os pontos são uma visão sobre eles
+                columns = {name: lap_df[name].to_numpy() for name in lap_df.columns}
+                telemetry_data['laps'].append({
+                    'lap_number': int(lap_num),
+                    'lap_time': lap_time,
+                    'columns': columns,
+                    'data_points': ColumnarDataPoints(columns)
+                })
+
+            return telemetry_data
+
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Erro ao processar arquivo MoTeC: {str(e)}")
+
+    def _extract_string(self, data: bytes, start: int, end: int) -> str:
+        """
+        Extrai uma string terminada em nulo de um bloco de bytes.
+
+        Args:
+            data: Bytes de origem
+            start: Posição inicial
+            end: Posição final
+
         Returns:
             String extraída
         """
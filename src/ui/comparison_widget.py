@@ -3,6 +3,8 @@ Widget de Comparação de Voltas com design minimalista e moderno.
 """
 
 from typing import Dict, Any, List
+
+import numpy as np
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, 
     QComboBox, QPushButton, QTextEdit, QScrollArea, QFrame
@@ -10,6 +12,11 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
 
+from src.analysis.distance_resampling import delta_trace, lap_grid
+
+# Trecho (m) usado para localizar onde o tempo foi ganho ou perdido
+DELTA_SEGMENT = 100
+
 class ComparisonCard(QWidget):
     """Card para exibir uma comparação específica."""
     
@@ -317,6 +324,23 @@ class ComparisonWidget(QWidget):
         else:
             points_text += "❌ Uso do acelerador pode ser melhorado\n"
             
+        # Trechos com maior ganho e maior perda, pelo delta na mesma distância
+        ref_grid = lap_grid(ref_lap)
+        comp_grid = lap_grid(comp_lap)
+        if ref_grid is not None and comp_grid is not None and ref_grid.has('time') and comp_grid.has('time'):
+            distance, delta = delta_trace(ref_grid, comp_grid)
+            step = max(1, int(DELTA_SEGMENT / ref_grid.step))
+            segment_deltas = np.diff(delta[::step])
+            if len(segment_deltas):
+                worst = int(np.argmax(segment_deltas))
+                best = int(np.argmin(segment_deltas))
+                if segment_deltas[worst] > 0:
+                    points_text += (f"❌ Maior perda: {distance[worst * step]:.0f}-{distance[(worst + 1) * step]:.0f} m "
+                                    f"({segment_deltas[worst]:+.3f}s)\n")
+                if segment_deltas[best] < 0:
+                    points_text += (f"✅ Maior ganho: {distance[best * step]:.0f}-{distance[(best + 1) * step]:.0f} m "
+                                    f"({segment_deltas[best]:+.3f}s)\n")
+            
         self.points_text.setText(points_text)
         
     def update_insights(self, ref_lap: Dict[str, Any], comp_lap: Dict[str, Any], delta_time: float):
@@ -961,8 +961,14 @@ class ModernTelemetryWidget(QWidget):
         except Exception as e:
             logger.error(f"Erro ao atualizar análises: {e}")
     
-    def update_realtime_telemetry(self, data: Dict[str, Any]):
-        """Atualiza com dados de telemetria em tempo real."""
+    def update_realtime_telemetry(self, batch):
+        """
+        Atualiza com dados de telemetria em tempo real.
+
+        Args:
+            batch: RealtimeBatch com as amostras recebidas desde o último
+                quadro (``columns`` por canal e ``latest``)
+        """
         # Implementar quando necessário
         pass
 
@@ -0,0 +1,93 @@
+"""
+Ponte entre os coletores em tempo real e os widgets Qt.
+
+Os coletores chamam ``push`` da thread deles a cada pacote (60 a 300 Hz).
+As amostras ficam num buffer circular e a thread da UI é avisada por um
+sinal enfileirado, no máximo uma vez por lote. Os widgets recebem pelo
+sinal ``batch_ready`` um RealtimeBatch com arrays por canal, no máximo
+``rate`` vezes por segundo, em vez de um dicionário por pacote.
+
+Os setores e voltas concluídos pela análise ao vivo não passam pelo buffer:
+são poucos e cada um é entregue pelo sinal ``analysis_ready``.
+"""
+
+import time
+import logging
+from typing import Any, Dict, Optional
+
+from PyQt6.QtCore import QObject, Qt, QTimer, pyqtSignal, pyqtSlot
+
+from src.realtime.sample_buffer import RealtimeSampleBuffer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE = 30.0
+
+
+class RealtimeBridge(QObject):
+    """Agrupa as amostras em tempo real e as publica na thread da UI."""
+
+    # RealtimeBatch, emitido na thread da UI
+    batch_ready = pyqtSignal(object)
+    # SectorResult ou LapResult da análise ao vivo
+    analysis_ready = pyqtSignal(object)
+    # Aviso de amostras novas, enfileirado para a thread da UI
+    _samples_pending = pyqtSignal()
+
+    def __init__(self, rate: float = DEFAULT_RATE, capacity: int = 1024, parent: Optional[QObject] = None):
+        """
+        Args:
+            rate: Máximo de lotes publicados por segundo
+            capacity: Máximo de amostras guardadas entre dois lotes
+            parent: QObject pai
+        """
+        super().__init__(parent)
+        self.buffer = RealtimeSampleBuffer(capacity)
+        self.interval = 1.0 / rate
+        self.last_publish = 0.0
+        self.batches = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._publish)
+        self._samples_pending.connect(self._schedule, Qt.ConnectionType.QueuedConnection)
+
+    def set_rate(self, rate: float):
+        """Altera o máximo de lotes por segundo."""
+        self.interval = 1.0 / rate
+
+    def push(self, sample: Dict[str, Any]):
+        """Recebe uma amostra; pode ser chamado de qualquer thread."""
+        if self.buffer.push(sample):
+            self._samples_pending.emit()
+
+    def push_analysis(self, result: Any):
+        """Recebe um setor ou volta concluídos; pode ser chamado de qualquer thread."""
+        self.analysis_ready.emit(result)
+
+    def clear(self):
+        """Descarta as amostras pendentes."""
+        self._timer.stop()
+        self.buffer.clear()
+
+    @pyqtSlot()
+    def _schedule(self):
+        if self._timer.isActive():
+            return
+        wait = self.interval - (time.monotonic() - self.last_publish)
+        if wait <= 0:
+            self._publish()
+        else:
+            self._timer.start(max(1, int(wait * 1000)))
+
+    @pyqtSlot()
+    def _publish(self):
+        self.last_publish = time.monotonic()
+        batch = self.buffer.drain()
+        if batch is None:
+            return
+        if batch.dropped:
+            logger.debug(f"{batch.dropped} amostras em tempo real descartadas")
+        self.batches += 1
+        self.batch_ready.emit(batch)
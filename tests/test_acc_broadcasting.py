@@ -0,0 +1,265 @@
+"""
+Testes para o decodificador do broadcasting UDP do ACC e para o coletor,
+usando pacotes gravados de uma sessão e um servidor UDP local no lugar do jogo.
+"""
+
+import os
+import sys
+import time
+import socket
+import struct
+import threading
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.realtime.acc_broadcasting import (
+    ACCBroadcastingDecoder, CarStateTable, NO_LAP_TIME,
+    REGISTRATION_RESULT, REALTIME_UPDATE, REALTIME_CAR_UPDATE, ENTRY_LIST,
+    ENTRY_LIST_CAR, TRACK_DATA, BROADCASTING_EVENT, REQUEST_ENTRY_LIST,
+    REQUEST_TRACK_DATA, REGISTER_COMMAND_APPLICATION, UNREGISTER_COMMAND_APPLICATION
+)
+from src.realtime.acc_collector import ACCDataCollector
+
+
+def string(value):
+    data = value.encode("utf-8")
+    return struct.pack("<H", len(data)) + data
+
+
+def lap(lap_ms, car_index=0, splits=(), invalid=0):
+    return (struct.pack("<iHHB", lap_ms, car_index, 0, len(splits))
+            + struct.pack(f"<{len(splits)}i", *splits) + struct.pack("<BBBB", invalid, 1, 0, 0))
+
+
+def registration_result(connection_id=7, success=True):
+    return struct.pack("<BiBB", REGISTRATION_RESULT, connection_id, int(success), 0) + string("")
+
+
+def realtime_update(session_time_ms, focused_car, replay=False):
+    data = struct.pack("<BHHBBffi", REALTIME_UPDATE, 1, 0, 10, 5, session_time_ms, 3600000.0, focused_car)
+    data += string("Helicam") + string("Helicam") + string("Broadcasting")
+    data += struct.pack("<B", int(replay))
+    if replay:
+        data += struct.pack("<ff", 1000.0, 2000.0)
+    data += struct.pack("<fBBBBB", 50400000.0, 22, 30, 3, 0, 1)
+    return data + lap(101500, focused_car)
+
+
+def car_update(car_index, kmh, laps, spline, current_ms, gear=5, x=100.0, y=-50.0):
+    data = struct.pack("<BHHBBfffBHHHHfHi", REALTIME_CAR_UPDATE, car_index, 0, 1, gear + 2,
+                       x, y, 1.5, 1, kmh, car_index + 1, car_index + 1, car_index + 1, spline, laps, -250)
+    return data + lap(101500, car_index, (33000, 34000, 34500)) + lap(NO_LAP_TIME, car_index) + lap(current_ms, car_index, (30000, ))
+
+
+def entry_list(car_indices, connection_id=7):
+    return (struct.pack("<BiH", ENTRY_LIST, connection_id, len(car_indices))
+            + struct.pack(f"<{len(car_indices)}H", *car_indices))
+
+
+def entry_list_car(car_index, team, race_number, drivers):
+    data = struct.pack("<BHB", ENTRY_LIST_CAR, car_index, 20) + string(team)
+    data += struct.pack("<iBBHB", race_number, 0, 0, 14, len(drivers))
+    for (first, last) in drivers:
+        data += string(first) + string(last) + string(last[:3].upper()) + struct.pack("<BH", 2, 14)
+    return data
+
+
+def track_data(connection_id=7):
+    data = struct.pack("<Bi", TRACK_DATA, connection_id) + string("monza") + struct.pack("<ii", 21, 5793)
+    data += struct.pack("<B", 2)
+    data += string("Helicam") + struct.pack("<B", 1) + string("Helicam")
+    data += string("Onboard") + struct.pack("<B", 2) + string("Onboard0") + string("Onboard1")
+    data += struct.pack("<B", 2) + string("Blank") + string("Broadcasting")
+    return data
+
+
+def broadcasting_event(car_index):
+    return struct.pack("<BB", BROADCASTING_EVENT, 5) + string("Lap completed") + struct.pack("<ii", 95000, car_index)
+
+
+# Sessão gravada: registro, lista de carros, pista e atualizações de dois carros
+SESSION_SETUP = [entry_list([1, 2]),
+                 entry_list_car(1, "Team A", 88, [("Ana", "Silva")]),
+                 entry_list_car(2, "Team B", 12, [("Bruno", "Costa"), ("Carla", "Souza")]),
+                 track_data()]
+
+SESSION_REPLAY = []
+for step in range(5):
+    SESSION_REPLAY.append(realtime_update(60000.0 + step * 100, focused_car=1))
+    SESSION_REPLAY.append(car_update(1, kmh=200 + step, laps=3, spline=0.5 + step * 0.01, current_ms=45000 + step * 100))
+    SESSION_REPLAY.append(car_update(2, kmh=180 + step, laps=3, spline=0.4 + step * 0.01, current_ms=47000 + step * 100))
+SESSION_REPLAY.append(broadcasting_event(1))
+
+
+class FakeACCServer:
+    """Servidor UDP local que responde como o broadcasting do ACC."""
+
+    def __init__(self, replay):
+        self.replay = replay
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("127.0.0.1", 0))
+        self.socket.settimeout(0.1)
+        self.port = self.socket.getsockname()[1]
+        self.received = []
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while self.running:
+            try:
+                (data, addr) = self.socket.recvfrom(4096)
+            except socket.timeout:
+                continue
+            self.received.append(data[0])
+            if data[0] == REGISTER_COMMAND_APPLICATION:
+                self.socket.sendto(registration_result(), addr)
+            elif data[0] == REQUEST_ENTRY_LIST:
+                for packet in SESSION_SETUP[:3]:
+                    self.socket.sendto(packet, addr)
+            elif data[0] == REQUEST_TRACK_DATA:
+                self.socket.sendto(SESSION_SETUP[3], addr)
+                for packet in self.replay:
+                    self.socket.sendto(packet, addr)
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        self.socket.close()
+
+
+class TestACCBroadcastingDecoder(unittest.TestCase):
+    """Testes do decodificador com os pacotes gravados."""
+
+    def setUp(self):
+        self.decoder = ACCBroadcastingDecoder()
+        for packet in [registration_result()] + SESSION_SETUP + SESSION_REPLAY:
+            self.decoder.decode(bytearray(packet))
+
+    def test_registration_and_track(self):
+        self.assertTrue(self.decoder.registered)
+        self.assertEqual(self.decoder.connection_id, 7)
+        self.assertEqual(self.decoder.track["track_name"], "monza")
+        self.assertEqual(self.decoder.track["track_meters"], 5793)
+        self.assertEqual(self.decoder.track["camera_sets"]["Onboard"], ["Onboard0", "Onboard1"])
+        self.assertEqual(self.decoder.track["hud_pages"], ["Blank", "Broadcasting"])
+
+    def test_entry_list(self):
+        self.assertEqual(sorted(self.decoder.entries), [1, 2])
+        entry = self.decoder.entries[2]
+        self.assertEqual(entry["team_name"], "Team B")
+        self.assertEqual(entry["race_number"], 12)
+        self.assertEqual([d["last_name"] for d in entry["drivers"]], ["Costa", "Souza"])
+
+    def test_realtime_update(self):
+        session = self.decoder.session
+        self.assertEqual(session["session_type"], "Race")
+        self.assertEqual(session["phase"], "Session")
+        self.assertAlmostEqual(session["session_time"], 60.4)
+        self.assertEqual(session["focused_car_index"], 1)
+        self.assertEqual(session["best_session_lap"], 101.5)
+
+        self.decoder.decode(realtime_update(1.0, focused_car=2, replay=True))
+        self.assertTrue(self.decoder.session["replay_playing"])
+        self.assertEqual(self.decoder.session["replay_session_time"], 1000.0)
+        self.assertEqual(self.decoder.session["best_session_lap"], 101.5)
+
+    def test_car_table_is_columnar(self):
+        self.assertEqual(len(self.decoder.cars), 2)
+        self.assertEqual(self.decoder.cars.column("kmh").tolist(), [204, 184])
+        self.assertEqual(self.decoder.cars.column("gear").tolist(), [5, 5])
+        self.assertEqual(self.decoder.cars.column("last_lap_ms").tolist(), [NO_LAP_TIME] * 2)
+        with self.assertRaises(ValueError):
+            self.decoder.cars.column("kmh")[0] = 0
+
+    def test_car_telemetry(self):
+        telemetry = self.decoder.car_telemetry(1)
+        self.assertEqual(telemetry["track"], "monza")
+        self.assertEqual(telemetry["car"], "Team A")
+        self.assertEqual(telemetry["driver"], "Ana Silva")
+        self.assertEqual(telemetry["speed"], 204.0)
+        self.assertEqual(telemetry["lap_number"], 4)
+        self.assertEqual(telemetry["lap_time"], 45.4)
+        self.assertIsNone(telemetry["last_lap_time"])
+        self.assertEqual(telemetry["best_lap_time"], 101.5)
+        self.assertEqual(telemetry["delta"], -0.25)
+        self.assertAlmostEqual(telemetry["distance_travelled"], 3.54 * 5793, places=2)
+        self.assertNotIn("rpm", telemetry)
+        self.assertIsNone(self.decoder.car_telemetry(99))
+
+    def test_reverse_and_neutral(self):
+        self.decoder.decode(car_update(1, kmh=0, laps=0, spline=0.0, current_ms=0, gear=-1))
+        self.assertEqual(self.decoder.car_telemetry(1)["gear"], -1)
+        self.decoder.decode(car_update(1, kmh=0, laps=0, spline=0.0, current_ms=0, gear=0))
+        self.assertEqual(self.decoder.car_telemetry(1)["gear"], 0)
+
+    def test_decodes_memoryview_slice(self):
+        buffer = bytearray(4096)
+        packet = car_update(2, kmh=250, laps=4, spline=0.1, current_ms=1000)
+        buffer[:len(packet)] = packet
+        (msg_type, car_index) = self.decoder.decode(memoryview(buffer)[:len(packet)])
+        self.assertEqual((msg_type, car_index), (REALTIME_CAR_UPDATE, 2))
+        self.assertEqual(self.decoder.car_telemetry(2)["speed"], 250.0)
+
+    def test_broadcasting_event(self):
+        self.assertEqual(self.decoder.events[-1]["type"], "LapCompleted")
+        self.assertEqual(self.decoder.events[-1]["time"], 95.0)
+
+
+class TestCarStateTable(unittest.TestCase):
+    """Testes da tabela colunar de carros."""
+
+    def test_grows_and_keeps_rows(self):
+        table = CarStateTable(capacity=2)
+        for car_index in (10, 20, 30):
+            table.set_row(table.row_for(car_index), (car_index, 0, 1, 3))
+        self.assertEqual(table.capacity, 4)
+        self.assertEqual(table.column("car_index").tolist(), [10, 20, 30])
+        self.assertEqual(table.car(30)["gear"], 3)
+
+    def test_reset(self):
+        table = CarStateTable()
+        table.set_row(table.row_for(5), (5, ))
+        table.reset([7, 8])
+        self.assertNotIn(5, table)
+        self.assertEqual(table.column("car_index").tolist(), [0, 0])
+
+
+class TestACCDataCollector(unittest.TestCase):
+    """Testes do coletor contra um servidor UDP local."""
+
+    def setUp(self):
+        self.server = FakeACCServer(SESSION_REPLAY)
+        self.collector = ACCDataCollector(port=self.server.port, register_interval=0.2)
+        self.received = []
+
+    def tearDown(self):
+        if self.collector.running:
+            self.collector.stop()
+        self.server.close()
+
+    def test_collects_focused_car(self):
+        self.collector.start(self.received.append)
+        deadline = time.monotonic() + 5
+        while len(self.received) < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.collector.stop()
+
+        self.assertEqual(len(self.received), 5)
+        self.assertEqual([t["speed"] for t in self.received], [200.0, 201.0, 202.0, 203.0, 204.0])
+        self.assertTrue(all(t["car_index"] == 1 for t in self.received))
+        self.assertEqual(self.received[-1]["track"], "monza")
+        self.assertEqual(self.collector.get_last_telemetry_data(), self.received[-1])
+        self.assertEqual(len(self.collector.decoder.cars), 2)
+
+        deadline = time.monotonic() + 1
+        while UNREGISTER_COMMAND_APPLICATION not in self.server.received and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.server.received[:3], [REGISTER_COMMAND_APPLICATION, REQUEST_ENTRY_LIST, REQUEST_TRACK_DATA])
+        self.assertIn(UNREGISTER_COMMAND_APPLICATION, self.server.received)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Testes para a captura em alta frequência do ACC sobre o LiveLapStore.
+"""
+
+import os
+import sys
+import mmap
+import ctypes
+import unittest
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_capture.acc_shared_memory import (
+    ACCTelemetryCapture, SPageFilePhysics, SPageFileGraphic, SPageFileStatic, SAMPLE_DTYPE
+)
+
+
+class TestACCHighRateCapture(unittest.TestCase):
+    """Testes da captura do ACC sobre páginas simuladas com mmap anônimo."""
+
+    def setUp(self):
+        self.capture = ACCTelemetryCapture(physics_rate=100, graphics_rate=10)
+        self.capture.physics_mmap = mmap.mmap(-1, ctypes.sizeof(SPageFilePhysics))
+        self.capture.graphics_mmap = mmap.mmap(-1, ctypes.sizeof(SPageFileGraphic))
+        self.capture.static_mmap = mmap.mmap(-1, ctypes.sizeof(SPageFileStatic))
+        self.capture.physics_data = SPageFilePhysics()
+        self.capture.graphics_data = SPageFileGraphic()
+        self.capture.static_data = SPageFileStatic()
+        self.capture._map_pages()
+
+        self.physics = SPageFilePhysics.from_buffer(self.capture.physics_mmap)
+        self.graphics = SPageFileGraphic.from_buffer(self.capture.graphics_mmap)
+        self.static = SPageFileStatic.from_buffer(self.capture.static_mmap)
+        self.static.track = "monza"
+        self.static.carModel = "amr_v8_vantage_gt3"
+        self.static.sectorCount = 3
+        self.graphics.playerCarID = 2
+        self.graphics.carCoordinates[2][0] = 10.0
+        self.graphics.carCoordinates[2][2] = -5.0
+
+        # Captura sem a thread de background, os passos são chamados no teste
+        self.capture.is_capturing = True
+        self.capture.capture_start_time = 0.0
+
+    def tearDown(self):
+        del self.physics, self.graphics, self.static
+        self.capture._cleanup_memory()
+
+    def step(self, now, packet_id, speed=100.0):
+        self.physics.packetId = packet_id
+        self.physics.speedKmh = speed
+        return self.capture._capture_step(now)
+
+    def test_duplicate_packets_are_skipped(self):
+        self.assertTrue(self.step(0.0, 1))
+        self.assertFalse(self.step(0.01, 1))
+        self.assertTrue(self.step(0.02, 2))
+        self.assertEqual(self.capture.live_store.lap_length, 2)
+
+    def test_static_read_on_session_change(self):
+        self.step(0.0, 1)
+        self.assertEqual(self.capture.telemetry_data["session"]["track"], "monza")
+
+        # Muda só depois de uma nova sessão
+        self.static.track = "spa"
+        self.step(0.2, 2)
+        self.assertEqual(self.capture.telemetry_data["session"]["track"], "monza")
+        self.graphics.sessionIndex = 1
+        self.step(0.4, 3)
+        self.assertEqual(self.capture.telemetry_data["session"]["track"], "spa")
+
+    def test_graphics_read_at_lower_rate(self):
+        self.step(0.0, 1)
+        self.graphics.distanceTraveled = 50.0
+        self.step(0.01, 2) # antes do próximo ciclo da página gráfica
+        self.step(0.1, 3)
+        self.assertEqual(self.capture.live_store.current_lap()["distance"].tolist(), [0.0, 0.0, 50.0])
+
+    def test_lap_finalized_with_data_points(self):
+        for packet_id in range(1, 6):
+            self.step(packet_id * 0.1, packet_id, speed=packet_id * 10.0)
+        self.graphics.completedLaps = 1
+        self.graphics.iLastTime = 90500
+        self.step(1.0, 6)
+
+        laps = self.capture.telemetry_data["laps"]
+        self.assertEqual(len(laps), 1)
+        self.assertEqual(laps[0]["lap_time"], 90.5)
+        points = laps[0]["data_points"]
+        self.assertEqual([p["speed"] for p in points], [10.0, 20.0, 30.0, 40.0, 50.0])
+        self.assertEqual(points[0]["position"], [10.0, 0.0, -5.0])
+        self.assertEqual(set(points[0]), set(SAMPLE_DTYPE.names) - {"x", "y", "z"} | {"position"})
+        # A nova volta começa com a amostra que detectou a troca
+        self.assertEqual(self.capture.live_store.lap_length, 1)
+        # As colunas da volta apontam para os arrays da captura, sem cópia
+        self.assertTrue(np.shares_memory(laps[0]["columns"]["speed"], self.capture.live_store.arrays["speed"]))
+
+    def test_snapshot_without_copies(self):
+        for packet_id in range(1, 4):
+            self.step(packet_id * 0.1, packet_id, speed=packet_id * 10.0)
+        snapshot = self.capture.get_snapshot()
+        samples = snapshot.current_lap["samples"]
+        self.assertEqual(samples["speed"].tolist(), [10.0, 20.0, 30.0])
+        self.assertFalse(samples["speed"].flags.writeable)
+        self.assertTrue(np.shares_memory(samples["speed"], self.capture.live_store.arrays["speed"]))
+
+        self.graphics.completedLaps = 1
+        self.step(1.0, 4)
+        version, laps = self.capture.get_laps_since(snapshot.version)
+        self.assertEqual(len(laps), 1)
+        self.assertIs(self.capture.get_telemetry_data()["laps"][0], laps[0])
+        self.assertEqual(self.capture.get_laps_since(version), (version, ()))
+        # A visão entregue antes continua com as amostras da volta anterior
+        self.assertEqual(samples["speed"].tolist(), [10.0, 20.0, 30.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Testes para o motor vetorizado do AdvancedTelemetryAnalyzer.
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analysis.advanced_telemetry import AdvancedTelemetryAnalyzer, LapChannels
+from src.parsers.csv_parser import ColumnarDataPoints
+
+
+def make_lap(rng, lap_number, n=6000, rate=60.0):
+    """Volta sintética com os canais do analisador."""
+    columns = {
+        'time': np.arange(n) / rate,
+        'speed': np.clip(150 + np.cumsum(rng.normal(0, 2, n)), 0, 300),
+        'throttle': np.clip(np.cumsum(rng.normal(0, 5, n)), 0, 100),
+        'brake': np.clip(np.cumsum(rng.normal(0, 5, n)), 0, 100),
+        'steer': np.cumsum(rng.normal(0, 3, n)),
+        'glat': rng.normal(0, 1, n),
+        'glong': rng.normal(0, 1, n),
+        'rpm': np.clip(6000 + np.cumsum(rng.normal(0, 100, n)), 0, 12000),
+        'gear': np.clip(np.round(3 + np.cumsum(rng.normal(0, 0.05, n))), 1, 6),
+    }
+    return {'lap_number': lap_number, 'lap_time': n / rate, 'data_points': ColumnarDataPoints(columns)}
+
+
+class TestAdvancedTelemetryAnalyzer(unittest.TestCase):
+    """Testes para as métricas calculadas sobre arrays."""
+
+    def setUp(self):
+        self.analyzer = AdvancedTelemetryAnalyzer()
+
+    def test_shared_derivatives(self):
+        points = [{'Time': i * 0.02, 'SPEED': 100.0 + i} for i in range(10)]
+        channels = LapChannels.from_data_points(points)
+        self.assertAlmostEqual(channels.sample_rate, 50.0)
+        np.testing.assert_allclose(channels.diffs['speed'], np.ones(9))
+        self.assertTrue(channels.has('speed'))
+        self.assertFalse(channels.has('throttle'))
+
+    def test_event_counts(self):
+        brake = np.array([20, 20, 0, 0, 15, 15, 0, 30], dtype=float)
+        self.assertEqual(self.analyzer._count_braking_events(brake), 3)
+
+        throttle = np.array([100, 0, 0, 100, 0, 0, 0], dtype=float)
+        # O segundo lift ainda não terminou no fim da volta
+        self.assertEqual(self.analyzer._count_lift_and_coast(throttle), 1)
+        speed = np.array([200, 200, 190, 190, 190, 180, 180], dtype=float)
+        self.assertEqual(self.analyzer._count_lift_and_coast(throttle, speed), 2)
+
+        rpm = np.array([9000, 9600, 9700, 9000, 9600], dtype=float)
+        self.assertEqual(self.analyzer._count_rev_limit_hits(rpm), 2)
+
+    def test_braking_efficiency(self):
+        brake = np.array([0, 50, 50, 0, 0, 100, 0], dtype=float)
+        speed = np.array([200, 190, 170, 150, 150, 140, 130], dtype=float)
+        # Zonas: 200 -> 150 com 100 de freio e 150 -> 130 com 100 de freio
+        self.assertAlmostEqual(self.analyzer._calculate_braking_efficiency(brake, speed), (0.5 + 0.2) / 2)
+
+    def test_session_analysis(self):
+        rng = np.random.default_rng(0)
+        data = {'metadata': {'session_type': 'Race'}, 'laps': [make_lap(rng, i + 1) for i in range(50)]}
+        results = self.analyzer.comprehensive_analysis(data)
+
+        self.assertEqual(len(results['lap_analysis']), 50)
+        self.assertTrue(all(lap['valid'] for lap in results['lap_analysis']))
+        self.assertEqual(len(results['lap_analysis'][0]['sector_analysis']), 3)
+        self.assertGreater(results['predictive_analysis']['predicted_fuel_needed_1hr'], 0)
+        self.assertEqual(results['session_overview']['session_type'], 'Race')
+
+    def test_parallel_matches_sequential(self):
+        rng = np.random.default_rng(1)
+        data = {'metadata': {}, 'laps': [make_lap(rng, i + 1, n=1200) for i in range(6)]}
+        sequential = self.analyzer.comprehensive_analysis(data)
+
+        progress = []
+        parallel = AdvancedTelemetryAnalyzer(parallel=True, max_workers=2).comprehensive_analysis(
+            data, progress_callback=lambda done, total: progress.append((done, total)))
+
+        self.assertEqual(progress[-1], (6, 6))
+        self.assertEqual([lap['lap_number'] for lap in parallel['lap_analysis']], list(range(1, 7)))
+        self.assertEqual(repr(parallel['lap_analysis']), repr(sequential['lap_analysis']))
+
+    def test_single_worker_skips_pool(self):
+        rng = np.random.default_rng(2)
+        data = {'metadata': {}, 'laps': [make_lap(rng, i + 1, n=600) for i in range(6)]}
+        with mock.patch('src.analysis.parallel_analysis.analyze_laps_parallel') as pool:
+            result = AdvancedTelemetryAnalyzer(parallel=True, max_workers=1).comprehensive_analysis(data)
+        pool.assert_not_called()
+        self.assertEqual(len(result['lap_analysis']), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
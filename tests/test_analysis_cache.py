@@ -0,0 +1,113 @@
+"""
+Testes para o cache em disco de arquivos parseados e análises.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analysis.analysis_cache import AnalysisCache
+from src.parsers.csv_parser import ColumnarDataPoints
+
+
+class TestAnalysisCache(unittest.TestCase):
+    """Testes para chaves, serialização e remoção LRU."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = AnalysisCache(root=os.path.join(self.temp_dir, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_roundtrip(self):
+        channels = {"speed": np.linspace(0, 300, 1000), "gear": np.arange(1000) % 6}
+        value = {
+            "data": pd.DataFrame(channels),
+            "laps": [{"lap_number": 1, "data_points": ColumnarDataPoints(channels, 0, 500)},
+                     {"lap_number": 2, "data_points": ColumnarDataPoints(channels, 500)}],
+            "metadata": {"track": "Spa"},
+        }
+        self.cache.put("key", value)
+        loaded = self.cache.get("key")
+
+        np.testing.assert_array_equal(loaded["data"]["speed"].to_numpy(), channels["speed"])
+        self.assertEqual(len(loaded["laps"][1]["data_points"]), 500)
+        self.assertEqual(loaded["laps"][1]["data_points"][0]["gear"], 2)
+        self.assertEqual(loaded["metadata"], {"track": "Spa"})
+        # Os arrays vêm do arquivo mapeado e podem ser alterados sem mexer nele
+        speed = loaded["laps"][0]["data_points"].columns()["speed"]
+        speed[0] = -1.0
+        self.assertEqual(self.cache.get("key")["data"]["speed"][0], 0.0)
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_keys(self):
+        key = self.cache.make_key("abc", "analysis", {"rate": 60})
+        self.assertEqual(key, self.cache.make_key("abc", "analysis", {"rate": 60}))
+        self.assertNotEqual(key, self.cache.make_key("abc", "analysis", {"rate": 50}))
+        self.assertNotEqual(key, self.cache.make_key("abd", "analysis", {"rate": 60}))
+        self.assertNotEqual(key, self.cache.make_key("abc", "parse", {"rate": 60}))
+
+    def test_load_file(self):
+        path = self._write("session.csv", "Time,Speed\n0,100\n")
+        calls = []
+
+        def parser(filepath):
+            calls.append(filepath)
+            return {"columns": {"speed": np.array([100.0])}}
+
+        first, digest = self.cache.load_file(path, parser)
+        second, same_digest = self.cache.load_file(path, parser)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(digest, same_digest)
+        np.testing.assert_array_equal(second["columns"]["speed"], first["columns"]["speed"])
+
+        # Conteúdo novo, chave nova
+        self._write("session.csv", "Time,Speed\n0,120\n")
+        _, new_digest = self.cache.load_file(path, parser)
+        self.assertEqual(len(calls), 2)
+        self.assertNotEqual(new_digest, digest)
+
+    def test_lru_eviction(self):
+        block = np.zeros(100_000)
+        self.cache.max_bytes = int(block.nbytes * 2.5)
+        self.cache.put("a", block)
+        time.sleep(0.01)
+        self.cache.put("b", block)
+        time.sleep(0.01)
+        # "a" passa a ser a mais recente
+        self.assertIsNotNone(self.cache.get("a"))
+        time.sleep(0.01)
+        self.cache.put("c", block)
+
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("c"))
+        self.assertLessEqual(self.cache.size(), self.cache.max_bytes)
+
+    def test_corrupt_entry(self):
+        self.cache.put("key", {"value": np.ones(10)})
+        entry_path = os.path.join(self.cache.root, "key.pkl")
+        with open(entry_path, "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(self.cache.get("key"))
+        self.assertFalse(os.path.exists(entry_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
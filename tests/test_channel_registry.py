@@ -0,0 +1,97 @@
+"""
+Testes para o registro canônico de canais.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.parsers.channel_registry import canonical_id, resolve_channels, resolve_data_points
+from src.parsers.csv_parser import ColumnarDataPoints
+from src.analysis.advanced_telemetry import AdvancedTelemetryAnalyzer
+from src.parsers.ldparser import ldData
+from src.telemetry_import import TelemetryImporter
+
+
+class TestChannelRegistry(unittest.TestCase):
+    """Testes para a resolução de nomes de canais."""
+
+    def test_aliases(self):
+        self.assertEqual(canonical_id("SPEED"), "speed")
+        self.assertEqual(canonical_id("Ground Speed"), "speed")
+        self.assertEqual(canonical_id("STEERANGLE"), "steer")
+        self.assertEqual(canonical_id("G_LAT"), "glat")
+        self.assertEqual(canonical_id("Pos X"), "posx")
+        self.assertEqual(canonical_id("LAP_BEACON"), "beacon")
+        self.assertEqual(canonical_id("gas"), "throttle")
+        self.assertIsNone(canonical_id("position"))
+
+    def test_units_and_cache(self):
+        channel_map = resolve_channels(["Time", "Speed", "Foo"], {"Speed": "m/s", "Time": "ms"})
+        self.assertEqual(channel_map["speed"].scale, 3.6)
+        self.assertEqual(channel_map["speed"].units, "kph")
+        self.assertEqual(channel_map["time"].scale, 0.001)
+        self.assertEqual(channel_map.unresolved, ("Foo",))
+        columns = channel_map.columns({"Time": [0, 500], "Speed": [10.0, 20.0]})
+        np.testing.assert_allclose(columns["speed"], [36.0, 72.0])
+        np.testing.assert_allclose(columns["time"], [0.0, 0.5])
+        # A mesma lista de canais reaproveita o mapa já resolvido
+        self.assertIs(resolve_channels(["Time", "Speed", "Foo"], {"Speed": "m/s", "Time": "ms"}), channel_map)
+
+    def test_extract_from_points(self):
+        points = [{"SPEED": 100.0, "THROTTLE": 1.0}, {"SPEED": 110.0}]
+        channel_map = resolve_data_points(points)
+        columns = channel_map.extract(points)
+        np.testing.assert_allclose(columns["speed"], [100.0, 110.0])
+        self.assertTrue(np.isnan(columns["throttle"][1]))
+
+        columnar = ColumnarDataPoints({"speed": np.array([1.0, 2.0]), "steer": np.array([0.1, 0.2])})
+        columns = resolve_data_points(columnar).extract(columnar, ["speed", "steer", "brake"])
+        self.assertEqual(set(columns), {"speed", "steer"})
+
+    def test_analyzer_uses_registry(self):
+        points = [{"Speed": 100.0 + i, "Steering Angle": 0.1, "Lateral G": 1.5, "Timestamp": i * 0.1}
+                  for i in range(5)]
+        channels = AdvancedTelemetryAnalyzer()._extract_channels_data(points)
+        self.assertEqual(channels["speed"].tolist(), [100.0, 101.0, 102.0, 103.0, 104.0])
+        self.assertEqual(channels["glat"].tolist(), [1.5] * 5)
+        self.assertEqual(channels["brake"].tolist(), [0.0] * 5)
+        self.assertFalse(channels.has("brake"))
+        self.assertAlmostEqual(channels["time"][4], 0.4)
+
+    def test_motec_import_uses_registry(self):
+        # Nomes alternativos no .ld, mapeados para os nomes padrão do importador
+        n = 40
+        df = pd.DataFrame({
+            "Session Time": np.arange(n) * 0.1,
+            "Lap Number": np.repeat([1.0, 2.0], n // 2),
+            "Speed": np.full(n, 150.0),
+            "Steering Angle": np.zeros(n),
+            "Foo": np.ones(n),
+        })
+        test_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(test_dir, "session.ld")
+            ldData.frompd(df).write(path)
+            data = TelemetryImporter().import_telemetry(path)
+        finally:
+            shutil.rmtree(test_dir)
+
+        self.assertEqual(data["metadata"]["lap_count"], 2)
+        lap = data["laps"][1]
+        self.assertEqual(lap["lap_number"], 2)
+        self.assertEqual(set(lap["columns"]), {"Time", "Lap", "Ground Speed", "Steer Angle"})
+        self.assertAlmostEqual(lap["lap_time"], 1.9, places=5)
+        self.assertEqual(lap["data_points"][0]["Ground Speed"], 150.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Testes para o modo colunar do parser CSV MoTeC.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.parsers.csv_parser import CSVTelemetryParser, ColumnarDataPoints, parse_csv_telemetry
+
+EXAMPLE_CSV = os.path.join(
+    os.path.dirname(__file__), '..', 'exemplos',
+    'monza-mclaren_720s_gt3_evo-1-2025.06.01-19.40.55.csv'
+)
+
+
+class TestColumnarCSVParser(unittest.TestCase):
+    """Testes para CSVTelemetryParser(columnar=True)."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.rows = CSVTelemetryParser().parse_file(EXAMPLE_CSV)
+        cls.columns = CSVTelemetryParser(columnar=True).parse_file(EXAMPLE_CSV)
+
+    def test_channels_are_float32_arrays(self):
+        speed = self.columns["channels"]["SPEED"]
+        self.assertIsInstance(speed, np.ndarray)
+        self.assertEqual(speed.dtype, np.float32)
+        self.assertEqual(len(speed), len(self.rows["data_points"]))
+
+    def test_metadata_and_units(self):
+        self.assertEqual(self.columns["metadata"]["track"], "monza")
+        self.assertEqual(self.columns["metadata"], self.rows["metadata"])
+        self.assertEqual(self.columns["units"], self.rows["units"])
+
+    def test_data_points_view_matches_rows(self):
+        view = self.columns["data_points"]
+        self.assertIsInstance(view, ColumnarDataPoints)
+        for index in (0, 1234, -1):
+            expected = self.rows["data_points"][index]
+            actual = view[index]
+            self.assertEqual(list(actual.keys()), list(expected.keys()))
+            for channel, value in expected.items():
+                self.assertAlmostEqual(actual[channel], value, places=3)
+
+    def test_iteration_and_slicing(self):
+        view = self.columns["data_points"]
+        points = list(view[10:20])
+        self.assertEqual(len(points), 10)
+        self.assertAlmostEqual(points[0]["Time"], view[10]["Time"])
+        self.assertEqual(sum(1 for _ in view), len(view))
+
+    def test_laps_from_beacon_markers(self):
+        laps = self.columns["laps"]
+        self.assertEqual(len(laps), 1)
+        lap = laps[0]
+        self.assertAlmostEqual(lap["start_time"], 170.657)
+        self.assertGreaterEqual(lap["data_points"][0]["Time"], 170.657 - 1e-3)
+        self.assertAlmostEqual(lap["data_points"][-1]["Time"], 284.85, places=3)
+
+
+class TestParseCSVTelemetry(unittest.TestCase):
+    """Testes para parse_csv_telemetry com arquivos MoTeC reais."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.result = parse_csv_telemetry(EXAMPLE_CSV)
+
+    def test_reads_real_motec_body(self):
+        df = self.result["data"]
+        self.assertEqual(df.shape, (5698, 56))
+        self.assertTrue(all(dtype == np.float32 for dtype in df.dtypes))
+        self.assertAlmostEqual(float(df["Time"].iloc[-1]), 284.85, places=3)
+
+    def test_metadata_units_and_channels(self):
+        self.assertEqual(self.result["metadata"]["track"], "monza")
+        self.assertEqual(self.result["metadata"]["car"], "McLaren 720S GT3 Evo")
+        self.assertEqual(self.result["units"]["SPEED"], "km/h")
+        self.assertIs(self.result["channels"]["SPEED"].dtype, np.dtype(np.float32))
+
+    def test_data_points_is_lazy_view(self):
+        data_points = self.result["data_points"]
+        self.assertIsInstance(data_points, ColumnarDataPoints)
+        self.assertEqual(len(data_points), len(self.result["data"]))
+        self.assertAlmostEqual(data_points[20]["Time"], 1.0, places=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Testes para a reamostragem de voltas no domínio da distância.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analysis.distance_resampling import (
+    clear_grid_cache, delta_trace, lap_grid, resample_lap
+)
+from src.parsers.csv_parser import ColumnarDataPoints
+from src.telemetry_comparison import TelemetryComparison
+
+
+def make_lap(lap_time, length=1000.0, rate=20.0, start_distance=0.0, with_distance=True):
+    """Volta sintética com velocidade constante e troca de marcha no meio."""
+    n = int(lap_time * rate) + 1
+    elapsed = np.linspace(0.0, lap_time, n)
+    columns = {
+        "Time": 500.0 + elapsed,
+        "Speed": np.full(n, length / lap_time * 3.6),
+        "Gear": np.where(elapsed < lap_time / 2, 3.0, 4.0),
+        "Throttle": elapsed / lap_time * 100.0,
+    }
+    if with_distance:
+        columns["Distance"] = start_distance + elapsed / lap_time * length
+    return {"lap_number": 1, "lap_time": lap_time, "data_points": ColumnarDataPoints(columns)}
+
+
+class TestDistanceResampling(unittest.TestCase):
+    """Testes para a grade, o cache e os consumidores."""
+
+    def setUp(self):
+        clear_grid_cache()
+
+    def test_grid_from_distance(self):
+        grid = resample_lap(make_lap(50.0, start_distance=12000.0))
+        self.assertEqual(grid.step, 1.0)
+        self.assertEqual(len(grid), 1001)
+        self.assertAlmostEqual(grid.length, 1000.0)
+        # Tempo relativo ao início e linear na distância
+        self.assertAlmostEqual(grid["time"][0], 0.0)
+        self.assertAlmostEqual(grid["time"][500], 25.0)
+        self.assertAlmostEqual(grid["throttle"][250], 25.0)
+        self.assertAlmostEqual(float(grid.distance_at_time(10.0)), 200.0)
+        self.assertTrue(np.isnan(grid.value_at("speed", 2000.0)))
+        # Marcha mantém o último valor
+        self.assertEqual(set(np.unique(grid["gear"])), {3.0, 4.0})
+        self.assertEqual(grid["gear"][499], 3.0)
+
+    def test_grid_from_speed(self):
+        grid = resample_lap(make_lap(50.0, with_distance=False), step=5.0)
+        self.assertAlmostEqual(grid.length, 1000.0, places=6)
+        self.assertEqual(len(grid), 201)
+
+    def test_live_position_column(self):
+        t = np.linspace(0.0, 10.0, 101)
+        position = np.column_stack((t * 10.0, np.zeros_like(t), np.zeros_like(t)))
+        lap = {"columns": {"time": t, "position": position}}
+        grid = resample_lap(lap)
+        self.assertAlmostEqual(grid.length, 100.0)
+        np.testing.assert_allclose(grid["posx"], grid.distance)
+
+    def test_cached_grid(self):
+        lap = make_lap(50.0)
+        grid = lap_grid(lap)
+        self.assertIs(lap_grid(lap), grid)
+        self.assertIsNot(lap_grid(lap, step=2.0), grid)
+        self.assertIsNone(lap_grid({"lap_number": 1, "data_points": 100}))
+
+    def test_delta_trace(self):
+        fast = make_lap(50.0)
+        slow = make_lap(55.0, length=1010.0)
+        distance, delta = delta_trace(lap_grid(fast), lap_grid(slow))
+        self.assertEqual(len(distance), 1001)
+        # 1000 m a 72 km/h contra 1010 m em 55 s: o delta cresce com a distância
+        self.assertAlmostEqual(delta[-1], 1000.0 * 55.0 / 1010.0 - 50.0, places=6)
+        self.assertTrue(np.all(np.diff(delta) >= 0))
+
+    def test_comparison_uses_grid(self):
+        comparison = TelemetryComparison()
+        result = comparison._compare_laps_by_distance(make_lap(50.0), make_lap(52.0))
+        samples = result["delta_samples"]
+        self.assertEqual(len(samples["distance_abs"]), 1001)
+        self.assertAlmostEqual(samples["delta_time"][-1], 2.0, places=6)
+        self.assertEqual(len(result["key_differences"]["loss_points"]), 1001 - 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Testes para o modo mapeado em memória do ldparser.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.parsers.ldparser import ldData
+
+
+class TestLdDataMmap(unittest.TestCase):
+    """Testes para ldData.fromfile(..., mmap=True)."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.ld_file = os.path.join(self.test_dir, "test.ld")
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame(rng.standard_normal((500, 5)).astype(np.float32), columns=list("ABCDE"))
+        ldData.frompd(self.df).write(self.ld_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_same_channels_as_file_mode(self):
+        from_file = ldData.fromfile(self.ld_file)
+        with ldData.fromfile(self.ld_file, mmap=True) as mapped:
+            self.assertEqual(list(mapped), list(from_file))
+            self.assertEqual(mapped.head.venue, from_file.head.venue)
+            for name in from_file:
+                np.testing.assert_array_equal(mapped[name].data, from_file[name].data)
+
+    def test_raw_is_view_on_mapping(self):
+        with ldData.fromfile(self.ld_file, mmap=True) as mapped:
+            chan = mapped["C"]
+            raw = chan.raw
+            self.assertFalse(raw.flags.writeable)
+            self.assertFalse(raw.flags.owndata)
+            self.assertIsNone(chan._data, "scaling should only happen on access to data")
+            np.testing.assert_allclose(chan.data, self.df["C"].to_numpy())
+
+    def test_close_keeps_scaled_data(self):
+        mapped = ldData.fromfile(self.ld_file, mmap=True)
+        data = mapped["A"].data
+        mapped.close()
+        np.testing.assert_allclose(mapped["A"].data, data)
+
+
+if __name__ == "__main__":
+    unittest.main()
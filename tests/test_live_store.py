@@ -0,0 +1,50 @@
+"""
+Testes para o armazenamento comum das amostras em captura.
+"""
+
+import os
+import sys
+import time
+import unittest
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_capture.live_store import LAP_DTYPE, new_lap_store, finish_lap
+from src.data_capture.capture_manager import CaptureManager
+
+
+class TestLiveStore(unittest.TestCase):
+    """Testes para as voltas montadas a partir do LiveLapStore."""
+
+    def test_finish_lap_format(self):
+        store = new_lap_store(capacity=8)
+        for i in range(20):
+            store.append((i * 0.01, i, 1.0, 2.0, 3.0, 100.0 + i, 5000, 3, 1.0, 0.0, 0.0, 0.1, 1))
+        lap = finish_lap(store, 12, lap_number=1, lap_time=0.12, sectors=[])
+
+        self.assertEqual(lap["lap_number"], 1)
+        self.assertEqual(set(lap["columns"]), set(LAP_DTYPE.names) - {"x", "y", "z"} | {"position"})
+        self.assertEqual(lap["columns"]["position"].shape, (12, 3))
+        self.assertEqual(len(lap["data_points"]), 12)
+        self.assertEqual(lap["data_points"][0]["position"], [1.0, 2.0, 3.0])
+        self.assertEqual(lap["data_points"][11]["speed"], 111.0)
+        self.assertFalse(lap["columns"]["position"].flags.writeable)
+        # As amostras seguintes começam a próxima volta
+        self.assertEqual(store.current_lap()["speed"].tolist(), [112.0 + i for i in range(8)])
+
+    def test_demo_mode_writes_into_store(self):
+        manager = CaptureManager()
+        manager.start_time = time.time() - 30.2
+        manager._update_demo_telemetry_data()
+        laps = manager.telemetry_data["laps"]
+        self.assertEqual(len(laps), 1)
+        self.assertEqual(len(laps[0]["columns"]["speed"]), 1000)
+        self.assertTrue(np.shares_memory(laps[0]["columns"]["speed"], manager.demo_store.arrays["speed"]))
+        self.assertEqual(laps[0]["data_points"][0]["gear"], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
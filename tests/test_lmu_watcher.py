@@ -0,0 +1,207 @@
+"""
+Testes para o monitoramento da pasta MoTeC e a leitura incremental de LD.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_capture.folder_watcher import FolderWatcher, ProcessedFilesIndex, WATCHDOG_AVAILABLE, file_key
+from src.data_capture.lmu_plugin import LDParser, LMUTelemetryCapture
+from src.parsers.ldparser import ldData
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def write_ld(path, laps=3, samples_per_lap=50):
+    """Grava um arquivo LD com o leitor do projeto (10 Hz)."""
+    n = laps * samples_per_lap
+    lap = np.repeat(np.arange(laps), samples_per_lap)
+    df = pd.DataFrame({
+        "Lap": lap.astype(np.float32),
+        "Lap Distance": np.tile(np.linspace(0, 1000, samples_per_lap), laps),
+        "Ground Speed": np.linspace(100, 200, n),
+        "Gear": np.tile(np.repeat([3, 4], samples_per_lap // 2), laps).astype(np.float32),
+        "Sector": np.tile(np.repeat([1, 2], samples_per_lap // 2), laps).astype(np.float32),
+        "Pos X": np.arange(n, dtype=np.float32),
+    })
+    ldData.frompd(df).write(path)
+
+
+class TestLDParser(unittest.TestCase):
+    """Testes do LDParser sobre arquivos LD reais."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_parse_columnar_laps(self):
+        path = os.path.join(self.test_dir, "session.ld")
+        write_ld(path)
+        data = LDParser(path).parse()
+
+        self.assertEqual(data["session"]["track"], "testvenue")
+        self.assertEqual(data["session"]["car"], "testvehicleid")
+        self.assertEqual(data["session"]["sample_rate"], 10.0)
+        laps = data["laps"]
+        # A volta 0 (outlap) é ignorada
+        self.assertEqual([lap["lap_number"] for lap in laps], [1, 2])
+        lap = laps[0]
+        self.assertAlmostEqual(lap["lap_time"], 4.9)
+        self.assertEqual([s["sector"] for s in lap["sectors"]], [1, 2])
+        self.assertEqual(lap["columns"]["position"].shape, (50, 3))
+        self.assertEqual(lap["columns"]["position"][0, 0], 50.0)
+        self.assertEqual(lap["columns"]["rpm"].tolist(), [0] * 50)
+        self.assertFalse(lap["columns"]["speed"].flags.writeable)
+        point = lap["data_points"][1]
+        self.assertAlmostEqual(point["time"], 0.1)
+        self.assertEqual(point["gear"], 3)
+
+    def test_invalid_file(self):
+        path = os.path.join(self.test_dir, "broken.ld")
+        with open(path, "wb") as f:
+            f.write(b"LDFILE\x00\x00")
+        with self.assertRaises(Exception):
+            LDParser(path).parse()
+
+
+class TestProcessedFilesIndex(unittest.TestCase):
+    """Testes do índice persistente de arquivos processados."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.test_dir, "index", "processed.json")
+        self.file_path = os.path.join(self.test_dir, "a.ld")
+        with open(self.file_path, "wb") as f:
+            f.write(b"1234")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_persists_across_instances(self):
+        index = ProcessedFilesIndex(self.index_path)
+        self.assertIsNone(index.updated)
+        index.mark(self.file_path)
+
+        index = ProcessedFilesIndex(self.index_path)
+        self.assertIsNotNone(index.updated)
+        self.assertTrue(index.is_processed(self.file_path))
+
+        # Arquivo regravado volta a ser processado
+        with open(self.file_path, "ab") as f:
+            f.write(b"5678")
+        self.assertFalse(index.is_processed(self.file_path))
+
+    def test_corrupt_index(self):
+        os.makedirs(os.path.dirname(self.index_path))
+        with open(self.index_path, "w") as f:
+            f.write("{")
+        self.assertEqual(len(ProcessedFilesIndex(self.index_path)), 0)
+
+
+class TestFolderWatcher(unittest.TestCase):
+    """Testes do FolderWatcher por varredura e por notificações."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.ready = []
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _check_debounce(self, use_events):
+        with open(os.path.join(self.test_dir, "old.ld"), "wb") as f:
+            f.write(b"old")
+        watcher = FolderWatcher(self.test_dir, lambda path, key: self.ready.append((path, key)),
+                                debounce=0.3, poll_interval=0.05, use_events=use_events)
+        watcher.start()
+        try:
+            path = os.path.join(self.test_dir, "new.ld")
+            with open(path, "wb") as f:
+                # Arquivo ainda sendo gravado: não pode ser entregue
+                for _ in range(5):
+                    f.write(b"x" * 100)
+                    f.flush()
+                    time.sleep(0.1)
+                    self.assertEqual(self.ready, [])
+            with open(os.path.join(self.test_dir, "notes.txt"), "w") as f:
+                f.write("ignorado")
+            self.assertTrue(wait_for(lambda: self.ready))
+            time.sleep(0.4)
+        finally:
+            watcher.stop()
+        self.assertEqual(self.ready, [(path, file_key(path))])
+        self.assertEqual(self.ready[0][1][0], 500)
+
+    def test_polling_debounce(self):
+        self._check_debounce(use_events=False)
+
+    @unittest.skipUnless(WATCHDOG_AVAILABLE, "watchdog não instalado")
+    def test_events_debounce(self):
+        self._check_debounce(use_events=True)
+
+
+class TestLMUIncrementalCapture(unittest.TestCase):
+    """Testes da captura do LMU com o watcher e o índice."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.motec_dir = os.path.join(self.test_dir, "MoTeC")
+        os.makedirs(self.motec_dir)
+        self.index_path = os.path.join(self.test_dir, "processed.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def make_capture(self):
+        capture = LMUTelemetryCapture(index_path=self.index_path, debounce=0.1)
+        capture.motec_folder = self.motec_dir
+        capture.is_connected = True
+        capture._save_telemetry_data = lambda data: None
+        return capture
+
+    def test_new_files_and_restart(self):
+        write_ld(os.path.join(self.motec_dir, "old.ld"))
+
+        # Primeira execução: arquivos antigos só entram no índice
+        capture = self.make_capture()
+        self.assertTrue(capture.start_capture())
+        write_ld(os.path.join(self.motec_dir, "new.ld"), laps=4)
+        self.assertTrue(wait_for(lambda: len(capture.lap_store.laps) == 3))
+        capture.stop_capture()
+        self.assertEqual(len(capture.processed_index), 2)
+
+        # Arquivo gravado com o programa fechado é lido ao reiniciar; os já
+        # processados, não
+        time.sleep(0.05)
+        write_ld(os.path.join(self.motec_dir, "offline.ld"), laps=6)
+        capture = self.make_capture()
+        capture.start_capture()
+        try:
+            self.assertTrue(wait_for(lambda: len(capture.lap_store.laps) == 5))
+            time.sleep(0.3)
+            self.assertEqual(len(capture.lap_store.laps), 5)
+            self.assertEqual(capture.lap_store.session["track"], "testvenue")
+        finally:
+            capture.stop_capture()
+        self.assertTrue(capture.processed_index.is_processed(os.path.join(self.motec_dir, "offline.ld")))
+
+
+if __name__ == '__main__':
+    unittest.main()
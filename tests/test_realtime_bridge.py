@@ -0,0 +1,108 @@
+"""
+Testes para o buffer de amostras em tempo real e a ponte para a UI.
+"""
+
+import os
+import sys
+import time
+import threading
+import unittest
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.realtime.sample_buffer import RealtimeSampleBuffer, RealtimeBatch
+
+try:
+    from PyQt6.QtCore import QCoreApplication
+    from src.ui.realtime_bridge import RealtimeBridge
+    HAS_QT = True
+except ImportError:
+    HAS_QT = False
+
+
+def sample(i):
+    return {"speed": 100.0 + i, "gear": 3, "track": "monza", "lap_time": None if i == 1 else i * 0.1}
+
+
+class TestRealtimeSampleBuffer(unittest.TestCase):
+    """Testes para RealtimeSampleBuffer."""
+
+    def test_drain_returns_columns(self):
+        buf = RealtimeSampleBuffer()
+        self.assertTrue(buf.push(sample(0)))
+        self.assertFalse(buf.push(sample(1)))
+        buf.push(sample(2))
+
+        batch = buf.drain()
+        self.assertEqual(batch.count, 3)
+        self.assertEqual(batch.columns["speed"].tolist(), [100.0, 101.0, 102.0])
+        self.assertEqual(batch.columns["gear"].tolist(), [3, 3, 3])
+        self.assertTrue(np.isnan(batch.columns["lap_time"][1]))
+        self.assertNotIn("track", batch.columns)
+        self.assertEqual(batch.latest["track"], "monza")
+        self.assertIsNone(buf.drain())
+        # Depois de uma leitura, a próxima amostra volta a avisar
+        self.assertTrue(buf.push(sample(3)))
+
+    def test_overflow_drops_oldest(self):
+        buf = RealtimeSampleBuffer(capacity=4)
+        for i in range(10):
+            buf.push(sample(i))
+        batch = buf.drain()
+        self.assertEqual(batch.dropped, 6)
+        self.assertEqual(batch.columns["speed"].tolist(), [106.0, 107.0, 108.0, 109.0])
+        buf.push(sample(0))
+        self.assertEqual(buf.drain().dropped, 0)
+
+    def test_push_from_threads(self):
+        buf = RealtimeSampleBuffer(capacity=10000)
+        threads = [threading.Thread(target=lambda: [buf.push(sample(i)) for i in range(1000)]) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(buf.drain().count, 4000)
+
+    def test_empty_batch(self):
+        batch = RealtimeBatch.from_samples([{"game": "ACC"}])
+        self.assertEqual(batch.columns, {})
+        self.assertEqual(batch.count, 1)
+
+
+@unittest.skipUnless(HAS_QT, "PyQt6 não instalado")
+class TestRealtimeBridge(unittest.TestCase):
+    """Testes da ponte Qt com um produtor em outra thread."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def test_batches_are_rate_limited(self):
+        bridge = RealtimeBridge(rate=20)
+        batches = []
+        bridge.batch_ready.connect(batches.append)
+
+        def produce():
+            for i in range(300):
+                bridge.push(sample(i))
+                time.sleep(0.001)
+
+        producer = threading.Thread(target=produce)
+        start = time.monotonic()
+        producer.start()
+        while producer.is_alive() or bridge.buffer:
+            self.app.processEvents()
+            time.sleep(0.001)
+        producer.join()
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(sum(batch.count for batch in batches), 300)
+        self.assertLessEqual(len(batches), elapsed * 20 + 2)
+        self.assertEqual(batches[-1].latest["speed"], 399.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
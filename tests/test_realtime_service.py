@@ -0,0 +1,235 @@
+"""
+Testes para o serviço de coleta em tempo real com asyncio.
+"""
+
+import os
+import sys
+import time
+import socket
+import struct
+import asyncio
+import unittest
+
+# Adiciona o diretório raiz ao path; o stm (decodificador do GT7) usa
+# imports absolutos e precisa de src no path
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from src.realtime.udp_service import (
+    CoalescingQueue, DatagramSource, RealtimeService, DROP_OLDEST, BLOCK
+)
+from src.realtime.realtime_manager import RealtimeTelemetryManager
+from src.realtime.gt7_collector import GT7Source, HEARTBEAT
+
+GT7_PACKET = os.path.join(ROOT, 'src', 'stm', 'gt7', 'test', 'barcelonagp911.bin')
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class CountingSource(DatagramSource):
+    """Fonte que entrega o número contido em cada pacote."""
+
+    name = "counting"
+
+    def datagram_received(self, data, addr):
+        (value, ) = struct.unpack("<i", data)
+        if value < 0:
+            raise ValueError("pacote inválido")
+        return value
+
+
+class TestCoalescingQueue(unittest.TestCase):
+    """Testes para CoalescingQueue."""
+
+    def test_drop_oldest(self):
+        queue = CoalescingQueue(maxsize=3, policy=DROP_OLDEST)
+        for i in range(5):
+            queue.put(i)
+        self.assertEqual(queue.dropped, 2)
+        self.assertEqual(queue.get_nowait(), [2, 3, 4])
+        self.assertEqual(len(queue), 0)
+
+    def test_block_keeps_items(self):
+        queue = CoalescingQueue(maxsize=2, policy=BLOCK)
+        self.assertFalse(queue.put(1))
+        self.assertTrue(queue.put(2))
+        self.assertTrue(queue.put(3))
+        self.assertEqual(queue.dropped, 0)
+        self.assertEqual(queue.get_nowait(), [1, 2, 3])
+
+    def test_coalesce_by_key(self):
+        queue = CoalescingQueue(maxsize=10)
+        queue.put("a1", key="a")
+        queue.put("b1", key="b")
+        queue.put("a2", key="a")
+        self.assertEqual(queue.coalesced, 1)
+        self.assertEqual(queue.get_nowait(), ["a2", "b1"])
+
+    def test_get_batch_waits(self):
+        async def run():
+            queue = CoalescingQueue()
+            asyncio.get_running_loop().call_later(0.01, queue.put, 1)
+            return await asyncio.wait_for(queue.get_batch(), 1)
+
+        self.assertEqual(asyncio.run(run()), [1])
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            CoalescingQueue(policy="unknown")
+
+
+class TestRealtimeService(unittest.TestCase):
+    """Testes do serviço com fontes UDP locais."""
+
+    def setUp(self):
+        self.service = RealtimeService()
+        self.sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def tearDown(self):
+        self.service.stop()
+        self.sender.close()
+
+    def send(self, source, values):
+        addr = source.transport.get_extra_info("sockname")
+        for value in values:
+            self.sender.sendto(struct.pack("<i", value), addr)
+
+    def test_sources_share_one_loop(self):
+        received = {"a": [], "b": []}
+        sources = []
+        for name in received:
+            source = CountingSource(local_addr=("127.0.0.1", 0))
+            source.name = name
+            self.service.add_source(source, received[name].append)
+            sources.append(source)
+        self.assertEqual(sorted(self.service.sources), ["a", "b"])
+
+        self.send(sources[0], range(10))
+        self.send(sources[1], [-1, 5])
+        self.assertTrue(wait_for(lambda: len(received["a"]) == 10 and received["b"] == [5]))
+        self.assertEqual(received["a"], list(range(10)))
+
+        stats = self.service.get_stats()
+        self.assertEqual(stats["a"]["packets"], 10)
+        self.assertEqual(stats["a"]["bytes"], 40)
+        self.assertEqual(stats["b"]["errors"], 1)
+        self.assertEqual(stats["b"]["items"], 1)
+
+        self.service.remove_source("a")
+        self.assertEqual(list(self.service.sources), ["b"])
+
+    def test_packet_rate(self):
+        source = CountingSource(local_addr=("127.0.0.1", 0))
+        self.service.add_source(source, lambda item: None)
+        for _ in range(6):
+            self.send(source, range(10))
+            time.sleep(0.2)
+        self.assertTrue(wait_for(lambda: self.service.get_stats()["counting"]["rate"] > 0, 2))
+        self.assertLess(self.service.get_stats()["counting"]["rate"], 100)
+
+    def test_block_pauses_reading(self):
+        received = []
+
+        async def slow_consumer(item):
+            await asyncio.sleep(0.005)
+            received.append(item)
+
+        source = CountingSource(local_addr=("127.0.0.1", 0), maxsize=4, policy=BLOCK)
+        self.service.add_source(source, slow_consumer)
+        self.send(source, range(50))
+        self.assertTrue(wait_for(lambda: len(received) == 50))
+        stats = self.service.get_stats()["counting"]
+        self.assertEqual(received, list(range(50)))
+        self.assertEqual(stats["dropped"], 0)
+        self.assertGreater(stats["pauses"], 0)
+
+    def test_drop_oldest_with_slow_consumer(self):
+        received = []
+
+        async def slow_consumer(batch):
+            await asyncio.sleep(0.05)
+            received.extend(batch)
+
+        source = CountingSource(local_addr=("127.0.0.1", 0), maxsize=4)
+        self.service.add_source(source, slow_consumer, batch=True)
+        self.send(source, range(50))
+        self.assertTrue(wait_for(lambda: received and received[-1] == 49))
+        stats = self.service.get_stats()["counting"]
+        self.assertEqual(stats["packets"], 50)
+        self.assertGreater(stats["dropped"], 0)
+        self.assertEqual(stats["dropped"] + len(received), 50)
+
+
+class TestGT7Source(unittest.TestCase):
+    """Testes da fonte do GT7 com um pacote gravado."""
+
+    def setUp(self):
+        self.service = RealtimeService()
+        self.console = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.console.bind(("127.0.0.1", 0))
+        self.console.settimeout(2)
+
+    def tearDown(self):
+        self.service.stop()
+        self.console.close()
+
+    def test_heartbeat_and_decode(self):
+        received = []
+        source = GT7Source(host="127.0.0.1", port=0)
+        self.assertIsNone(source.hb_addr)
+        source.local_addr = ("127.0.0.1", 0)
+        source.hb_addr = self.console.getsockname()
+        self.service.add_source(source, received.append)
+
+        (data, addr) = self.console.recvfrom(16)
+        self.assertEqual(data, HEARTBEAT)
+
+        with open(GT7_PACKET, "rb") as f:
+            packet = f.read()
+        self.console.sendto(packet, addr)
+        self.console.sendto(b"short", addr)
+        self.assertTrue(wait_for(lambda: received))
+        self.assertEqual(received[0]["car_code"], 3358)
+        self.assertEqual(received[0]["gear"], 4)
+        self.assertEqual(received[0]["game"], "GT7")
+
+        # Sem pacotes, o heartbeat é repetido
+        (data, _) = self.console.recvfrom(16)
+        self.assertEqual(data, HEARTBEAT)
+
+
+class TestRealtimeTelemetryManager(unittest.TestCase):
+    """Testes do gerenciador sobre o serviço compartilhado."""
+
+    def test_start_and_stop(self):
+        manager = RealtimeTelemetryManager()
+        received = []
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        try:
+            manager.start_collector("lmu", received.append, port=port)
+            self.assertEqual(manager.current_game, "lmu")
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.sendto(struct.pack("<7f", 50.0, 6000.0, 80.0, 0.0, 4.0, 1.0, 2.0), ("127.0.0.1", port))
+            self.assertTrue(wait_for(lambda: received))
+            self.assertEqual(received[0]["rpm"], 6000.0)
+            self.assertIs(manager.get_last_data(), received[0])
+            self.assertEqual(manager.get_stats()["lmu"]["packets"], 1)
+
+            manager.start_collector("unknown", received.append)
+            self.assertIsNone(manager.current_game)
+            self.assertEqual(manager.get_stats(), {})
+        finally:
+            manager.shutdown()
+        self.assertFalse(manager.service.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
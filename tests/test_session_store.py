@@ -0,0 +1,106 @@
+"""
+Testes para o formato binário colunar de sessões capturadas.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_capture.session_store import save_session, load_session, is_session_manifest, data_file_for
+from src.data_capture.snapshot import LapStore
+from src.data_capture.capture_manager import CaptureManager
+from src.telemetry_import import TelemetryImporter
+
+
+def make_session():
+    points = [
+        {"time": i * 0.1, "distance": i * 5.0, "position": [float(i), 0.0, -float(i)],
+         "speed": 100.0 + i, "rpm": 5000 + i, "gear": 3, "sector": 0}
+        for i in range(10)
+    ]
+    points[3]["speed"] = None
+    return {
+        "session": {"track": "Monza", "car": "Ford Mustang GT3"},
+        "laps": [
+            {"lap_number": 1, "lap_time": 110.5,
+             "sectors": [{"sector": 1, "time": 35.2}], "data_points": points},
+            {"lap_number": 2, "lap_time": 0, "sectors": [], "data_points": []},
+        ],
+    }
+
+
+class TestSessionStore(unittest.TestCase):
+    """Testes para save_session / load_session."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "session.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_roundtrip_from_data_points(self):
+        session = make_session()
+        save_session(session, self.path)
+        self.assertTrue(os.path.exists(data_file_for(self.path)))
+
+        loaded = load_session(self.path)
+        self.assertEqual(loaded["session"], session["session"])
+        lap = loaded["laps"][0]
+        self.assertEqual(lap["lap_time"], 110.5)
+        self.assertEqual(lap["sectors"], [{"sector": 1, "time": 35.2}])
+        self.assertEqual(lap["columns"]["position"].shape, (10, 3))
+        self.assertEqual(lap["columns"]["rpm"].dtype.kind, "i")
+        self.assertIsInstance(lap["columns"]["speed"], np.memmap)
+
+        expected = session["laps"][0]["data_points"]
+        self.assertEqual(list(lap["data_points"]), expected)
+        self.assertEqual(lap["data_points"][2], expected[2])
+        self.assertEqual(len(loaded["laps"][1]["data_points"]), 0)
+
+    def test_manifest_is_small(self):
+        save_session(make_session(), self.path)
+        with open(self.path) as f:
+            manifest = json.load(f)
+        self.assertTrue(is_session_manifest(manifest))
+        self.assertNotIn("data_points", manifest["laps"][0])
+        self.assertEqual(manifest["laps"][0]["num_samples"], 10)
+
+    def test_columnar_laps_are_written_directly(self):
+        store = LapStore()
+        columns = {"time": np.arange(1000) / 333.0, "speed": np.full(1000, 150.0, dtype=np.float32)}
+        store.add_lap({"lap_number": 1, "lap_time": 3.0, "columns": columns})
+        save_session(store.snapshot().to_dict(), self.path)
+
+        lap = load_session(self.path, mmap=False)["laps"][0]
+        self.assertEqual(lap["columns"]["speed"].dtype, np.float32)
+        np.testing.assert_array_equal(lap["columns"]["time"], columns["time"])
+
+    def test_capture_manager_import(self):
+        save_session(make_session(), self.path)
+        manager = CaptureManager()
+        self.assertTrue(manager.import_telemetry(self.path))
+        laps = manager.get_telemetry_data()["laps"]
+        self.assertEqual(laps[0]["data_points"][0]["position"], [0.0, 0.0, 0.0])
+
+    def test_telemetry_importer(self):
+        save_session(make_session(), self.path)
+        data = TelemetryImporter().import_telemetry(self.path)
+        self.assertEqual(data["metadata"]["track"], "Monza")
+        self.assertEqual(data["metadata"]["lap_count"], 2)
+        self.assertEqual(data["metadata"]["source_file"], self.path)
+        lap = data["laps"][0]
+        self.assertIsInstance(lap["columns"]["speed"], np.memmap)
+        self.assertEqual(lap["data_points"][4]["speed"], 104.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
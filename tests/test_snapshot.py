@@ -0,0 +1,93 @@
+"""
+Testes para os snapshots de telemetria sem cópia profunda.
+"""
+
+import os
+import sys
+import copy
+import json
+import pickle
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_capture.snapshot import FrozenLap, LapStore
+
+
+def make_lap(number):
+    return {
+        "lap_number": number,
+        "lap_time": 90.0 + number,
+        "sectors": [{"sector": 1, "time": 30.0}],
+        "data_points": [{"time": 0.0, "speed": 100.0}],
+    }
+
+
+class TestFrozenLap(unittest.TestCase):
+    """Testes para FrozenLap."""
+
+    def test_is_read_only(self):
+        lap = FrozenLap(make_lap(1))
+        with self.assertRaises(TypeError):
+            lap["lap_time"] = 0
+        with self.assertRaises(TypeError):
+            lap.update({"lap_time": 0})
+        with self.assertRaises(AttributeError):
+            lap["data_points"].append({})
+
+    def test_copies_are_shared(self):
+        lap = FrozenLap(make_lap(1))
+        self.assertIs(copy.deepcopy(lap), lap)
+        self.assertIs(copy.deepcopy({"laps": [lap]})["laps"][0], lap)
+
+    def test_serialization(self):
+        lap = FrozenLap(make_lap(1), version=3)
+        self.assertEqual(json.loads(json.dumps(lap)), make_lap(1))
+        restored = pickle.loads(pickle.dumps(lap))
+        self.assertEqual(restored, lap)
+        self.assertEqual(restored.version, 3)
+
+
+class TestLapStore(unittest.TestCase):
+    """Testes para LapStore."""
+
+    def test_laps_shared_by_reference(self):
+        store = LapStore()
+        lap = store.add_lap(make_lap(1))
+        self.assertIs(store.snapshot().laps[0], lap)
+        self.assertIs(store.snapshot().to_dict()["laps"][0], lap)
+
+    def test_snapshot_is_stable(self):
+        store = LapStore()
+        store.add_lap(make_lap(1))
+        snapshot = store.snapshot()
+        store.add_lap(make_lap(2))
+        self.assertEqual(len(snapshot.laps), 1)
+        self.assertEqual(len(store.snapshot().laps), 2)
+
+    def test_laps_since(self):
+        store = LapStore()
+        store.add_lap(make_lap(1))
+        version, laps = store.laps_since(0)
+        self.assertEqual([lap["lap_number"] for lap in laps], [1])
+
+        store.add_laps([make_lap(3), make_lap(2)], sort=True)
+        version, laps = store.laps_since(version)
+        self.assertEqual(sorted(lap["lap_number"] for lap in laps), [2, 3])
+        self.assertEqual([lap["lap_number"] for lap in store.laps], [1, 2, 3])
+
+        self.assertEqual(store.laps_since(version), (version, ()))
+
+    def test_clear_keeps_session(self):
+        store = LapStore()
+        store.set_session({"track": "Monza"})
+        store.add_lap(make_lap(1))
+        version = store.version
+        store.clear_laps()
+        self.assertGreater(store.version, version)
+        self.assertEqual(store.snapshot().to_dict(), {"session": {"track": "Monza"}, "laps": []})
+
+
+if __name__ == '__main__':
+    unittest.main()
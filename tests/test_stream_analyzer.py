@@ -0,0 +1,131 @@
+"""
+Testes para o analisador incremental de voltas ao vivo.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.realtime.stream_analyzer import LapResult, SectorResult, StreamingLapAnalyzer
+
+
+def lap_samples(lap_number, lap_time, start_time=0.0, rate=10.0, length=3000.0, start_distance=0.0):
+    """Volta sintética: velocidade constante, uma curva no meio e uma frenagem."""
+    n = int(lap_time * rate)
+    samples = []
+    for i in range(n):
+        fraction = i / n
+        speed = 60.0 if 0.45 < fraction < 0.55 else 200.0
+        samples.append({
+            'time': start_time + i / rate,
+            'distance': start_distance + fraction * length,
+            'spline_position': fraction,
+            'lap_number': lap_number,
+            'speed': speed,
+            'throttle': 0.0 if 0.42 < fraction < 0.55 else 100.0,
+            'brake': 80.0 if 0.40 < fraction < 0.45 else 0.0,
+        })
+    return samples
+
+
+def session(lap_times, **kwargs):
+    samples = []
+    start_time = 0.0
+    for (i, lap_time) in enumerate(lap_times):
+        samples.extend(lap_samples(i + 1, lap_time, start_time=start_time,
+                                   start_distance=i * 3000.0, **kwargs))
+        start_time += lap_time
+    return samples
+
+
+class TestStreamingLapAnalyzer(unittest.TestCase):
+    """Testes para os acumuladores e os limites de setor e volta."""
+
+    def setUp(self):
+        self.analyzer = StreamingLapAnalyzer()
+
+    def _run(self, samples):
+        results = []
+        for sample in samples:
+            results.extend(self.analyzer.push(sample))
+        return results
+
+    def test_results_at_boundaries(self):
+        samples = session([90.0, 88.0, 87.0, 89.0])
+        results = []
+        emitted_at = []
+        for (i, sample) in enumerate(samples):
+            new = self.analyzer.push(sample)
+            results.extend(new)
+            emitted_at.extend([i] * len(new))
+
+        laps = [r for r in results if isinstance(r, LapResult)]
+        sectors = [r for r in results if isinstance(r, SectorResult)]
+        # A última volta ainda está em andamento
+        self.assertEqual([lap.lap_number for lap in laps], [1, 2, 3])
+        self.assertEqual([(s.lap_number, s.sector) for s in sectors][:4], [(1, 1), (1, 2), (1, 3), (2, 1)])
+        self.assertEqual([(s.lap_number, s.sector) for s in sectors][-2:], [(4, 1), (4, 2)])
+        # A volta sai na amostra que cruza a linha
+        self.assertEqual(emitted_at[results.index(laps[0])], 900)
+
+        first, second, third = laps
+        self.assertAlmostEqual(first.lap_time, 90.0)
+        # A volta em que a captura começou não vira referência
+        self.assertFalse(first.complete)
+        self.assertFalse(first.best)
+        self.assertTrue(second.complete)
+        self.assertTrue(second.best)
+        self.assertIsNone(second.delta)
+        self.assertTrue(third.best)
+        self.assertAlmostEqual(third.delta, -1.0)
+        self.assertAlmostEqual(sum(s.time for s in second.sectors), second.lap_time)
+
+        metrics = second.metrics
+        self.assertEqual(metrics['brake_events'], 1)
+        self.assertEqual(metrics['corners'], 1)
+        self.assertEqual(metrics['min_corner_speed'], 60.0)
+        self.assertEqual(second.corner_speeds, (60.0,))
+        self.assertAlmostEqual(metrics['distance'], 3000.0 * (879 / 880), places=3)
+        self.assertAlmostEqual(metrics['full_throttle_percentage'], 87.0, delta=1.0)
+        self.assertAlmostEqual(metrics['overlap_time'], 0.02 * 88.0, delta=0.2)
+
+    def test_delta_against_best_lap(self):
+        self._run(session([90.0, 88.0, 89.0]))
+        self.assertEqual(self.analyzer.best_lap_time, 88.0)
+
+        # Mesma trajetória 10% mais lenta: o delta cresce ao longo da volta
+        for sample in lap_samples(4, 96.8, start_time=267.0, start_distance=9000.0)[:500]:
+            self.analyzer.push(sample)
+        progress = self.analyzer.current_lap()
+        self.assertGreater(progress['delta'], 0.0)
+        self.assertAlmostEqual(progress['delta'], progress['time'] * (1 - 88.0 / 96.8), delta=0.2)
+        self.assertEqual(progress['sector'], 2)
+
+    def test_sector_channel_and_columns(self):
+        # Fonte com índice de setor (0, 1, 2) e pedais de 0 a 1, em colunas
+        analyzer = StreamingLapAnalyzer(pedal_scale=1.0)
+        n = 300
+        columns = {
+            'time': np.arange(2 * n) * 0.1,
+            'sector': np.tile(np.repeat([0, 1, 2], n // 3), 2),
+            'speed': np.full(2 * n, 150.0),
+            'throttle': np.full(2 * n, 1.0),
+            'brake': np.zeros(2 * n),
+        }
+        results = analyzer.push_columns(columns)
+        laps = [r for r in results if isinstance(r, LapResult)]
+        self.assertEqual(len(laps), 1)
+        self.assertEqual([s.sector for s in laps[0].sectors], [1, 2, 3])
+        self.assertAlmostEqual(laps[0].lap_time, 30.0)
+        self.assertAlmostEqual(laps[0].metrics['full_throttle_percentage'], 100.0, delta=0.5)
+        # Sem distância na fonte, ela é integrada pela velocidade
+        self.assertAlmostEqual(laps[0].metrics['distance'], 150 / 3.6 * 29.9, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Benchmark do AdvancedTelemetryAnalyzer.
+
+Gera uma sessão sintética (por padrão 50 voltas de 100 s a 60 Hz) e mede
+comprehensive_analysis com as voltas em colunas (ColumnarDataPoints) e com
+os pontos como lista de dicionários, o formato antigo das voltas.
+
+Uso:
+    python tools/bench_advanced_telemetry.py [--laps N] [--samples N] [--repeat N]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from src.analysis.advanced_telemetry import AdvancedTelemetryAnalyzer
+from src.parsers.csv_parser import ColumnarDataPoints
+
+RATE = 60.0
+# Meta: sessão de 50 voltas a 60 Hz em menos de um segundo
+TARGET_SECONDS = 1.0
+
+
+def make_lap(rng, lap_number, n):
+    """Volta sintética com os canais do analisador."""
+    columns = {
+        'time': np.arange(n) / RATE,
+        'speed': np.clip(150 + np.cumsum(rng.normal(0, 2, n)), 0, 300),
+        'throttle': np.clip(np.cumsum(rng.normal(0, 5, n)), 0, 100),
+        'brake': np.clip(np.cumsum(rng.normal(0, 5, n)), 0, 100),
+        'steer': np.cumsum(rng.normal(0, 3, n)),
+        'glat': rng.normal(0, 1, n),
+        'glong': rng.normal(0, 1, n),
+        'rpm': np.clip(6000 + np.cumsum(rng.normal(0, 100, n)), 0, 12000),
+        'gear': np.clip(np.round(3 + np.cumsum(rng.normal(0, 0.05, n))), 1, 6),
+    }
+    return {'lap_number': lap_number, 'lap_time': n / RATE, 'data_points': ColumnarDataPoints(columns)}
+
+
+def as_dicts(session):
+    """Mesma sessão com os pontos materializados como dicionários."""
+    laps = [dict(lap, data_points=list(lap['data_points'])) for lap in session['laps']]
+    return dict(session, laps=laps)
+
+
+def best_time(func, repeat):
+    func()  # aquecimento
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do AdvancedTelemetryAnalyzer")
+    parser.add_argument("--laps", type=int, default=50)
+    parser.add_argument("--samples", type=int, default=6000, help="amostras por volta")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    session = {'metadata': {'session_type': 'Race'},
+               'laps': [make_lap(rng, i + 1, args.samples) for i in range(args.laps)]}
+    analyzer = AdvancedTelemetryAnalyzer()
+
+    print(f"{args.laps} voltas x {args.samples} amostras ({args.samples / RATE:g} s a {RATE:g} Hz)")
+    cases = [
+        ("colunas (ColumnarDataPoints)", session),
+        ("lista de dicionários", as_dicts(session)),
+    ]
+    for name, data in cases:
+        elapsed = best_time(lambda: analyzer.comprehensive_analysis(data), args.repeat)
+        status = "ok" if elapsed < TARGET_SECONDS else "acima da meta"
+        print(f"{name:30s} {elapsed * 1000:9.1f} ms  ({status}, meta {TARGET_SECONDS:g} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark do parser CSV MoTeC.
+
+Compara o caminho por linhas (CSVTelemetryParser) com parse_csv_telemetry
+em tempo de execução e pico de memória alocada (tracemalloc).
+
+Uso:
+    python tools/bench_csv_parser.py [arquivo.csv] [--repeat N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from src.parsers.csv_parser import CSVTelemetryParser, parse_csv_telemetry
+
+DEFAULT_CSV = os.path.join(ROOT, 'exemplos', 'monza-mclaren_720s_gt3_evo-1-2025.06.01-19.40.55.csv')
+
+
+def measure(func, repeat):
+    """Retorna (melhor tempo em segundos, pico de memória em bytes)."""
+    func()  # aquecimento
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do parser CSV MoTeC")
+    parser.add_argument("csv_file", nargs="?", default=DEFAULT_CSV)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        ("CSVTelemetryParser (linhas)", lambda: CSVTelemetryParser().parse_file(args.csv_file)),
+        ("CSVTelemetryParser (colunar)", lambda: CSVTelemetryParser(columnar=True).parse_file(args.csv_file)),
+        ("parse_csv_telemetry", lambda: parse_csv_telemetry(args.csv_file)),
+    ]
+
+    results = []
+    for name, func in cases:
+        elapsed, peak = measure(func, args.repeat)
+        results.append((name, elapsed, peak))
+        print(f"{name:30s} {elapsed * 1000:9.1f} ms  {peak / 1e6:8.2f} MB")
+
+    _, base_time, base_peak = results[0]
+    for name, elapsed, peak in results[1:]:
+        print(f"{name:30s} {base_time / elapsed:6.1f}x mais rápido, {base_peak / peak:6.1f}x menos memória")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark de decodificação de arquivos MoTeC .ld.
+
+Gera um arquivo .ld sintético com o MotecLog (stm) e mede a vazão de
+decodificação (MB/s de amostras) de cada ponto de entrada de leitura:
+ldparser.ldData, ldparser.ldData com mmap, ldparser_github.ldData e
+MotecLog.from_string. A referência ("antes") é o MotecLog.from_string da
+revisão anterior ao núcleo vetorizado, carregado do git sem alterações.
+
+Uso:
+    python tools/bench_ld_decode.py [--channels N] [--samples N] [--repeat N] [--baseline REV]
+"""
+
+import os
+import sys
+import time
+import types
+import subprocess
+import argparse
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import numpy as np
+
+from stm.motec.ld import MotecLog
+from stm.motec.codec import to_engineering
+from stm.channels import CHANNELS, get_channel_definition
+from parsers import ldparser, ldparser_github
+
+# Árvore antes do núcleo vetorizado
+BASELINE_REV = "d5fb17a"
+
+
+def build_log(n_channels, n_samples):
+    """Cria um MotecLog com canais de tipos variados (int16, int32, float)."""
+    rng = np.random.default_rng(0)
+    names = list(CHANNELS.keys())
+    log = MotecLog()
+    log.date, log.time = "01/01/2025", "12:00:00"
+    log.driver = log.vehicle = log.venue = log.comment = "bench"
+
+    for i in range(n_channels):
+        cd = get_channel_definition(names[i % len(names)], 60)
+        cd["name"] = f"{cd['name']} {i}"
+        log.add_channel(cd)
+
+    # sorteia palavras brutas dentro da faixa do tipo e converte para
+    # unidades de engenharia, para que a codificação não estoure
+    for channel in log.channels:
+        limit = 30000 if channel.datasize == 2 else 1000000
+        raw = rng.integers(-limit, limit, n_samples)
+        values = to_engineering(raw, channel.shift, channel.multiplier, channel.scale, channel.decplaces)
+        channel.samples.samples = values
+
+    return log
+
+
+def load_baseline_ld(rev):
+    """
+    Carrega stm/motec/ld.py como estava em ``rev``, com o laço por amostra
+    original de MotecSamples.from_string. O módulo só depende da biblioteca
+    padrão, então é executado isolado, sem tocar no pacote atual.
+    """
+    source = subprocess.run(["git", "-C", ROOT, "show", f"{rev}:src/stm/motec/ld.py"],
+                            check=True, capture_output=True, text=True).stdout
+    module = types.ModuleType("baseline_ld")
+    exec(compile(source, f"{rev}:src/stm/motec/ld.py", "exec"), module.__dict__)
+    return module
+
+
+def decode_ldparser(module, path, **kwargs):
+    ld = module.ldData.fromfile(path, **kwargs)
+    for chan in ld.channs:
+        chan.data
+    return ld
+
+
+def decode_motec(data):
+    return MotecLog.from_string(data)
+
+
+def decode_motec_legacy(baseline, data):
+    return baseline.MotecLog.from_string(data)
+
+
+def measure(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de decodificação .ld")
+    parser.add_argument("--channels", type=int, default=100)
+    parser.add_argument("--samples", type=int, default=36000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_REV,
+                        help="revisão git com o decodificador por amostra original")
+    args = parser.parse_args()
+    baseline = load_baseline_ld(args.baseline)
+
+    log = build_log(args.channels, args.samples)
+    data = bytes(log.to_string())
+    payload = sum(c.numsamples * c.samples.datasize for c in log.channels)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.ld")
+        with open(path, "wb") as fout:
+            fout.write(data)
+
+        cases = [
+            (f"MotecLog.from_string ({args.baseline})", lambda: decode_motec_legacy(baseline, data)),
+            ("MotecLog.from_string", lambda: decode_motec(data)),
+            ("ldparser.ldData.fromfile", lambda: decode_ldparser(ldparser, path)),
+            ("ldparser.ldData.fromfile(mmap=True)", lambda: decode_ldparser(ldparser, path, mmap=True)),
+            ("ldparser_github.ldData.fromfile", lambda: decode_ldparser(ldparser_github, path)),
+        ]
+
+        print(f"{args.channels} canais x {args.samples} amostras, {payload / 1e6:.1f} MB de amostras")
+        for name, func in cases:
+            try:
+                elapsed = measure(func, args.repeat)
+            except TypeError as e:
+                # ponto de entrada sem suporte à opção (árvore antiga)
+                print(f"{name:42s} indisponível ({e})")
+                continue
+            print(f"{name:42s} {elapsed * 1000:9.1f} ms  {payload / elapsed / 1e6:9.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
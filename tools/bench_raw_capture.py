@@ -0,0 +1,151 @@
+"""
+Benchmark da captura bruta (raw) do stm.
+
+Mede a escrita de uma captura sintética no formato sqlite do BaseLogger
+(INSERT por amostra x RawWriter em lotes) e a reprodução pelo RawSampler
+(uma linha por vez x lotes), consumindo as amostras como o BaseLogger faz.
+
+Uso:
+    python tools/bench_raw_capture.py [--minutes N] [--freq HZ]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+from queue import Queue, Empty
+from threading import Thread
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from stm.raw import RawWriter
+from stm.sampler import RawSampler
+
+PACKET_SIZE = 296 # pacote GT7
+
+
+class LegacyRawSampler(Thread):
+    """RawSampler original: uma linha do cursor e um put na fila por amostra."""
+
+    def __init__(self, rawfile=None):
+        super().__init__()
+        self.samples = Queue(maxsize=1)
+        self.running = False
+        self.rawfile = rawfile
+        self.freq = None
+
+    def run(self):
+        self.running = True
+        con = sqlite3.connect(self.rawfile, isolation_level=None)
+        cur = con.cursor()
+        res = cur.execute("SELECT value FROM settings WHERE name='freq'")
+        (self.freq, ) = res.fetchone()
+        res = cur.execute("SELECT * FROM samples ORDER BY timestamp")
+        last_data = None
+        while self.running:
+            try:
+                timestamp, data = next(res)
+                if data is None:
+                    data = last_data
+                else:
+                    last_data = data
+                self.samples.put((timestamp, data), block=True)
+            except Exception:
+                self.running = False
+        con.close()
+
+    def get(self, timeout=None):
+        return self.samples.get(timeout=timeout)
+
+
+def make_samples(count):
+    """Pacotes sintéticos, com ~10% repetidos (jogo pausado / sem mudança)."""
+    rnd = random.Random(0)
+    packet = os.urandom(PACKET_SIZE)
+    for i in range(count):
+        if rnd.random() > 0.1:
+            packet = os.urandom(PACKET_SIZE)
+        yield 1700000000.0 + i / 60.0, packet
+
+
+def write_legacy(path, samples, freq):
+    con = sqlite3.connect(path, isolation_level="IMMEDIATE")
+    cur = con.cursor()
+    cur.execute("CREATE TABLE samples(timestamp float, data blob)")
+    cur.execute("CREATE TABLE settings(name, value)")
+    cur.execute("INSERT INTO settings(name, value) values (?, ?)", ("freq", freq))
+    con.commit()
+    last_sample = b''
+    for timestamp, sample in samples:
+        to_save = sample if sample != last_sample else None
+        cur.execute("INSERT INTO samples(timestamp, data) VALUES (?, ?)", (timestamp, to_save))
+        last_sample = sample
+    con.commit()
+    con.close()
+
+
+def write_batched(path, samples, freq):
+    raw = RawWriter(path, freq=freq)
+    for timestamp, sample in samples:
+        raw.add(timestamp, sample)
+    raw.close()
+
+
+def replay_legacy(path):
+    sampler = LegacyRawSampler(rawfile=path)
+    sampler.start()
+    count = 0
+    while sampler.is_alive():
+        try:
+            sampler.get(timeout=1)
+            count += 1
+        except Empty:
+            pass
+    return count
+
+
+def replay(path):
+    count = 0
+    for batch in RawSampler(rawfile=path).batches():
+        count += len(batch)
+    return count
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da captura bruta")
+    parser.add_argument("--minutes", type=float, default=120)
+    parser.add_argument("--freq", type=int, default=60)
+    args = parser.parse_args()
+
+    count = int(args.minutes * 60 * args.freq)
+    samples = list(make_samples(count))
+    print(f"{count} amostras de {PACKET_SIZE} bytes ({args.minutes:g} min a {args.freq} Hz)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.db")
+        batched_path = os.path.join(tmp, "batched.db")
+
+        elapsed, _ = timed(write_legacy, legacy_path, samples, args.freq)
+        print(f"{'escrita INSERT por amostra':32s} {elapsed:7.2f} s  {count / elapsed:10.0f} amostras/s")
+        elapsed, _ = timed(write_batched, batched_path, samples, args.freq)
+        print(f"{'escrita RawWriter':32s} {elapsed:7.2f} s  {count / elapsed:10.0f} amostras/s")
+
+        legacy_time, legacy_count = timed(replay_legacy, legacy_path)
+        print(f"{'reprodução por linha':32s} {legacy_time:7.2f} s  {legacy_count / legacy_time:10.0f} amostras/s")
+        batched_time, batched_count = timed(replay, batched_path)
+        print(f"{'reprodução RawSampler':32s} {batched_time:7.2f} s  {batched_count / batched_time:10.0f} amostras/s")
+        print(f"reprodução {legacy_time / batched_time:.1f}x mais rápida")
+
+
+if __name__ == "__main__":
+    main()